@@ -18,6 +18,7 @@ from python.helpers import (
     tokens,
     context as context_helper,
     dirty_json,
+    profiler,
     subagents
 )
 from python.helpers.print_style import PrintStyle
@@ -28,7 +29,7 @@ from langchain_core.prompts import (
 from langchain_core.messages import SystemMessage, BaseMessage
 
 import python.helpers.log as Log
-from python.helpers.dirty_json import DirtyJson
+from python.helpers.dirty_json import DirtyJson, IncrementalDirtyJson
 from python.helpers.defer import DeferredTask
 from typing import Callable
 from python.helpers.localization import Localization
@@ -157,6 +158,7 @@ class AgentContext:
     def remove(id: str):
         with AgentContext._contexts_lock:
             context = AgentContext._contexts.pop(id, None)
+        profiler.remove_store(id)
         if context and context.task:
             context.task.kill()
         return context
@@ -188,7 +190,7 @@ class AgentContext:
             ),
             "no": self.no,
             "log_guid": self.log.guid,
-            "log_version": len(self.log.updates),
+            "log_version": self.log.version,
             "log_length": len(self.log.logs),
             "paused": self.paused,
             "last_message": (
@@ -383,6 +385,8 @@ class Agent:
     async def monologue(self):
         error_retries = 0  # counter for critical error retries
         while True:
+            # attribute timings to this agent until the monologue ends
+            profile_scope = profiler.enter(self.context.id, self.number)
             try:
                 # loop data dictionary to pass to extensions
                 self.loop_data = LoopData(user_message=self.last_user_message)
@@ -397,6 +401,8 @@ class Agent:
                     self.context.streaming_agent = self  # mark self as current streamer
                     self.loop_data.iteration += 1
                     self.loop_data.params_temporary = {}  # clear temporary params
+                    profiler.set_iteration(self.loop_data.iteration)
+                    iteration_span = profiler.start("agent", "iteration")
 
                     # call message_loop_start extensions
                     await self.call_extensions(
@@ -406,7 +412,8 @@ class Agent:
 
                     try:
                         # prepare LLM chain (model, system, history)
-                        prompt = await self.prepare_prompt(loop_data=self.loop_data)
+                        with profiler.span("agent", "prompt"):
+                            prompt = await self.prepare_prompt(loop_data=self.loop_data)
 
                         # call before_main_llm_call extensions
                         await self.call_extensions(
@@ -432,6 +439,9 @@ class Agent:
                             # Use the potentially modified full text for downstream processing
                             await self.handle_reasoning_stream(stream_data["full"])
 
+                        # keeps parser state between chunks, each chunk is parsed once
+                        response_parser = IncrementalDirtyJson()
+
                         async def stream_callback(chunk: str, full: str):
                             await self.handle_intervention()
                             # output the agent response stream
@@ -448,7 +458,9 @@ class Agent:
                             if stream_data.get("chunk"):
                                 printer.stream(stream_data["chunk"])
                             # Use the potentially modified full text for downstream processing
-                            await self.handle_response_stream(stream_data["full"])
+                            await self.handle_response_stream(
+                                stream_data["full"], response_parser
+                            )
 
                         # call main LLM
                         agent_response, _reasoning = await self.call_chat_model(
@@ -516,6 +528,7 @@ class Agent:
                             await self.call_extensions(
                                 "message_loop_end", loop_data=self.loop_data
                             )
+                        profiler.end(iteration_span)
 
             # exceptions outside message loop:
             except InterventionException as e:
@@ -528,9 +541,12 @@ class Agent:
                 )
             finally:
                 self.context.streaming_agent = None  # unset current streamer
-                # call monologue_end extensions
-                if self.context.task and self.context.task.is_alive(): # don't call extensions post mortem
-                    await self.call_extensions("monologue_end", loop_data=self.loop_data)  # type: ignore
+                try:
+                    # call monologue_end extensions
+                    if self.context.task and self.context.task.is_alive(): # don't call extensions post mortem
+                        await self.call_extensions("monologue_end", loop_data=self.loop_data)  # type: ignore
+                finally:
+                    profiler.leave(profile_scope)
 
     async def prepare_prompt(self, loop_data: LoopData) -> list[BaseMessage]:
         self.context.log.set_progress("Building prompt")
@@ -643,15 +659,22 @@ class Agent:
         )
         return system_prompt
 
+    def get_prompt_dirs(self) -> list[str]:
+        from python.helpers import projects, prompt_cache
+
+        # the chain only depends on profile and project, skip re-checking it on every prompt
+        key = (self.config.profile, projects.get_context_project_name(self.context))
+        return prompt_cache.get_dirs(key, lambda: subagents.get_paths(self, "prompts"))
+
     def parse_prompt(self, _prompt_file: str, **kwargs):
-        dirs = subagents.get_paths(self, "prompts")
+        dirs = self.get_prompt_dirs()
         prompt = files.parse_file(
             _prompt_file, _directories=dirs, _agent=self, **kwargs
         )
         return prompt
 
     def read_prompt(self, file: str, **kwargs) -> str:
-        dirs = subagents.get_paths(self, "prompts")
+        dirs = self.get_prompt_dirs()
         prompt = files.read_prompt_file(file, _directories=dirs, _agent=self, **kwargs)
         if files.is_full_json_template(prompt):
             prompt = files.remove_code_fences(prompt)
@@ -913,7 +936,8 @@ class Agent:
                         tool_name=tool_name,
                     )
 
-                    response = await tool.execute(**tool_args)
+                    with profiler.span("tool", tool_name):
+                        response = await tool.execute(**tool_args)
                     await self.handle_intervention()
 
                     # Allow extensions to postprocess tool response
@@ -954,18 +978,27 @@ class Agent:
             text=stream,
         )
 
-    async def handle_response_stream(self, stream: str):
+    async def handle_response_stream(
+        self, stream: str, parser: IncrementalDirtyJson | None = None
+    ):
         await self.handle_intervention()
         try:
             if len(stream) < 25:
                 return  # no reason to try
-            response = DirtyJson.parse_string(stream)
+            if parser:
+                response = parser.update(stream)
+                delta, removed = parser.delta, parser.removed
+            else:
+                response = DirtyJson.parse_string(stream)
+                delta, removed = None, []
             if isinstance(response, dict):
                 await self.call_extensions(
                     "response_stream",
                     loop_data=self.loop_data,
                     text=stream,
                     parsed=response,
+                    delta=delta,  # top level keys changed by this chunk, None if unknown
+                    removed=removed,
                 )
 
         except Exception as e:
@@ -989,7 +1022,7 @@ class Agent:
         paths = subagents.get_paths(self, "tools", name + ".py", default_root="python")
         for path in paths:
             try:
-                classes = extract_tools.load_classes_from_file(path, Tool)  # type: ignore[arg-type]
+                classes = extract_tools.get_classes_from_file(path, Tool)  # type: ignore[arg-type]
                 break
             except Exception:
                 continue
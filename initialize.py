@@ -38,6 +38,7 @@ def initialize_agent(override_settings: dict | None = None):
         limit_requests=current_settings["chat_model_rl_requests"],
         limit_input=current_settings["chat_model_rl_input"],
         limit_output=current_settings["chat_model_rl_output"],
+        limit_mode=current_settings["chat_model_rl_mode"],  # type: ignore
         kwargs=_normalize_model_kwargs(current_settings["chat_model_kwargs"]),
     )
 
@@ -51,6 +52,7 @@ def initialize_agent(override_settings: dict | None = None):
         limit_requests=current_settings["util_model_rl_requests"],
         limit_input=current_settings["util_model_rl_input"],
         limit_output=current_settings["util_model_rl_output"],
+        limit_mode=current_settings["util_model_rl_mode"],  # type: ignore
         kwargs=_normalize_model_kwargs(current_settings["util_model_kwargs"]),
     )
     # embedding model from user settings
@@ -60,6 +62,7 @@ def initialize_agent(override_settings: dict | None = None):
         name=current_settings["embed_model_name"],
         api_base=current_settings["embed_model_api_base"],
         limit_requests=current_settings["embed_model_rl_requests"],
+        limit_mode=current_settings["embed_model_rl_mode"],  # type: ignore
         kwargs=_normalize_model_kwargs(current_settings["embed_model_kwargs"]),
     )
     # browser model from user settings
@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
 from enum import Enum
+import asyncio
+import hashlib
 import logging
 import os
 from typing import (
@@ -7,6 +9,7 @@ from typing import (
     Awaitable,
     Callable,
     List,
+    Literal,
     Optional,
     Iterator,
     AsyncIterator,
@@ -14,13 +17,13 @@ from typing import (
     TypedDict,
 )
 
-from litellm import completion, acompletion, embedding
+from litellm import completion, acompletion, embedding, aembedding
 import litellm
 import openai
 from litellm.types.utils import ModelResponse
 
 from python.helpers import dotenv
-from python.helpers import settings, dirty_json
+from python.helpers import settings, dirty_json, profiler
 from python.helpers.dotenv import load_dotenv
 from python.helpers.providers import ModelType as ProviderModelType, get_provider_config
 from python.helpers.rate_limiter import RateLimiter
@@ -76,6 +79,7 @@ class ModelConfig:
     limit_requests: int = 0
     limit_input: int = 0
     limit_output: int = 0
+    limit_mode: Literal["window", "bucket"] = "window"
     vision: bool = False
     kwargs: dict = field(default_factory=dict)
 
@@ -200,12 +204,7 @@ api_keys_round_robin: dict[str, int] = {}
 
 def get_api_key(service: str) -> str:
     # get api key for the service
-    key = (
-        dotenv.get_dotenv_value(f"API_KEY_{service.upper()}")
-        or dotenv.get_dotenv_value(f"{service.upper()}_API_KEY")
-        or dotenv.get_dotenv_value(f"{service.upper()}_API_TOKEN")
-        or "None"
-    )
+    key = _get_api_key_setting(service)
     # if the key contains a comma, use round-robin
     if "," in key:
         api_keys = [k.strip() for k in key.split(",") if k.strip()]
@@ -214,15 +213,40 @@ def get_api_key(service: str) -> str:
     return key
 
 
-def get_rate_limiter(
-    provider: str, name: str, requests: int, input: int, output: int
-) -> RateLimiter:
-    key = f"{provider}\\{name}"
-    rate_limiters[key] = limiter = rate_limiters.get(key, RateLimiter(seconds=60))
-    limiter.limits["requests"] = requests or 0
-    limiter.limits["input"] = input or 0
-    limiter.limits["output"] = output or 0
-    return limiter
+def _get_api_key_setting(service: str) -> str:
+    return (
+        dotenv.get_dotenv_value(f"API_KEY_{service.upper()}")
+        or dotenv.get_dotenv_value(f"{service.upper()}_API_KEY")
+        or dotenv.get_dotenv_value(f"{service.upper()}_API_TOKEN")
+        or "None"
+    )
+
+
+def get_rate_limiter(model_config: ModelConfig) -> RateLimiter:
+    # one limiter per provider account, models using the same API key share its usage
+    api_key = model_config.kwargs.get("api_key") or _get_api_key_setting(
+        model_config.provider
+    )
+    account = hashlib.sha256(str(api_key).encode()).hexdigest()[:16]
+    key = f"{model_config.provider}\\{account}"
+    if key not in rate_limiters:
+        rate_limiters[key] = RateLimiter(seconds=60)
+    return rate_limiters[key]
+
+
+def get_rate_limits(model_config: ModelConfig) -> dict[str, int]:
+    return {
+        "requests": model_config.limit_requests or 0,
+        "input": model_config.limit_input or 0,
+        "output": model_config.limit_output or 0,
+    }
+
+
+def get_rate_limit_utilization(model_config: ModelConfig) -> dict[str, float]:
+    """Share of the model's limits currently used on its provider account."""
+    return get_rate_limiter(model_config).utilization(
+        get_rate_limits(model_config), model_config.limit_mode
+    )
 
 
 def _is_transient_litellm_error(exc: Exception) -> bool:
@@ -259,16 +283,14 @@ async def apply_rate_limiter(
 ):
     if not model_config:
         return
-    limiter = get_rate_limiter(
-        model_config.provider,
-        model_config.name,
-        model_config.limit_requests,
-        model_config.limit_input,
-        model_config.limit_output,
-    )
-    limiter.add(input=approximate_tokens(input_text))
-    limiter.add(requests=1)
-    await limiter.wait(rate_limiter_callback)
+    limiter = get_rate_limiter(model_config)
+    limiter.add(input=approximate_tokens(input_text), requests=1)
+    with profiler.span("rate_limit", f"{model_config.provider}/{model_config.name}"):
+        await limiter.wait(
+            rate_limiter_callback,
+            limits=get_rate_limits(model_config),
+            mode=model_config.limit_mode,
+        )
     return limiter
 
 
@@ -281,12 +303,29 @@ def apply_rate_limiter_sync(
 ):
     if not model_config:
         return
-    import asyncio, nest_asyncio
+    limiter = get_rate_limiter(model_config)
+    limiter.add(input=approximate_tokens(input_text), requests=1)
+    limits = get_rate_limits(model_config)
+    if not limiter.wait_time(limits, model_config.limit_mode):
+        return limiter  # within limits, no event loop needed
+
+    import asyncio
 
-    nest_asyncio.apply()
-    return asyncio.run(
-        apply_rate_limiter(model_config, input_text, rate_limiter_callback)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        if not rate_limiter_callback:
+            limiter.wait_sync(limits, model_config.limit_mode)
+            return limiter
+    else:
+        # called on the event loop thread, keep other tasks running while waiting
+        import nest_asyncio
+
+        nest_asyncio.apply()
+    asyncio.run(
+        limiter.wait(rate_limiter_callback, limits=limits, mode=model_config.limit_mode)
     )
+    return limiter
 
 
 class LiteLLMChatWrapper(SimpleChatModel):
@@ -504,6 +543,10 @@ class LiteLLMChatWrapper(SimpleChatModel):
         # results
         result = ChatGenerationResult()
 
+        # total time and time to first token, retries included
+        llm_span = profiler.start("llm", self.model_name)
+        first_token = profiler.start("llm_first_token", self.model_name) if stream else None
+
         attempt = 0
         while True:
             got_any_chunk = False
@@ -519,6 +562,8 @@ class LiteLLMChatWrapper(SimpleChatModel):
                 if stream:
                     # iterate over chunks
                     async for chunk in _completion:  # type: ignore
+                        if not got_any_chunk:
+                            profiler.end(first_token)
                         got_any_chunk = True
                         # parse chunk
                         parsed = _parse_chunk(chunk)
@@ -560,6 +605,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
                             limiter.add(output=approximate_tokens(output["reasoning_delta"]))
 
                 # Successful completion of stream
+                profiler.end(llm_span, retries=attempt)
                 return result.response, result.reasoning
 
             except Exception as e:
@@ -567,6 +613,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
 
                 # Retry only if no chunks received and error is transient
                 if got_any_chunk or not _is_transient_litellm_error(e) or attempt >= max_retries:
+                    profiler.end(llm_span, retries=attempt, error=type(e).__name__)
                     raise
                 attempt += 1
                 await asyncio.sleep(retry_delay_s)
@@ -701,6 +748,24 @@ class LiteLLMEmbeddingWrapper(Embeddings):
         item = resp.data[0]  # type: ignore
         return item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
 
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Apply rate limiting if configured
+        await apply_rate_limiter(self.a0_model_conf, " ".join(texts))
+
+        resp = await aembedding(model=self.model_name, input=texts, **self.kwargs)
+        return [
+            item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
+            for item in resp.data  # type: ignore
+        ]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        # Apply rate limiting if configured
+        await apply_rate_limiter(self.a0_model_conf, text)
+
+        resp = await aembedding(model=self.model_name, input=[text], **self.kwargs)
+        item = resp.data[0]  # type: ignore
+        return item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
+
 
 class LocalSentenceTransformerWrapper(Embeddings):
     """Local wrapper for sentence-transformers models to avoid HuggingFace API calls"""
@@ -751,6 +816,19 @@ class LocalSentenceTransformerWrapper(Embeddings):
         )
         return result  # type: ignore
 
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Apply rate limiting if configured
+        await apply_rate_limiter(self.a0_model_conf, " ".join(texts))
+
+        # encode off the event loop so concurrent batches don't block it
+        embeddings = await asyncio.to_thread(
+            self.model.encode, texts, convert_to_tensor=False  # type: ignore
+        )
+        return embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings  # type: ignore
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
 
 def _get_litellm_chat(
     cls: type = LiteLLMChatWrapper,
@@ -0,0 +1,16 @@
+from python.helpers.api import ApiHandler, Input, Output, Request, Response
+
+from python.helpers import embedding_cache
+
+
+class EmbeddingCacheStats(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    async def process(self, input: Input, request: Request) -> Output:
+        cache = embedding_cache.get_cache()
+        if input.get("clear"):
+            cache.clear()
+        return cache.stats()
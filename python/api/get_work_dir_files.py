@@ -1,5 +1,5 @@
 from python.helpers.api import ApiHandler, Request, Response
-from python.helpers.file_browser import FileBrowser
+from python.helpers.file_browser import FileBrowser, PAGE_SIZE
 from python.helpers import runtime, files
 
 class GetWorkDirFiles(ApiHandler):
@@ -19,11 +19,19 @@ class GetWorkDirFiles(ApiHandler):
 
         # browser = FileBrowser()
         # result = browser.get_files(current_path)
-        result = await runtime.call_development_function(get_files, current_path)
+        result = await runtime.call_development_function(
+            get_files,
+            current_path,
+            cursor=request.args.get("cursor", ""),
+            limit=request.args.get("limit", PAGE_SIZE, type=int),
+            sort=request.args.get("sort", "name"),
+            direction=request.args.get("direction", "asc"),
+            filter=request.args.get("filter", ""),
+        )
 
         return {"data": result}
 
 
-async def get_files(path):
+async def get_files(path, cursor="", limit=PAGE_SIZE, sort="name", direction="asc", filter=""):
     browser = FileBrowser()
-    return browser.get_files(path)
+    return browser.get_files(path, cursor=cursor, limit=limit, sort=sort, direction=direction, filter=filter)
@@ -0,0 +1,34 @@
+from python.helpers.api import ApiHandler, Input, Output, Request, Response
+
+from python.helpers import profiler
+
+MAX_ITERATIONS = 50  # latest iterations returned with their spans
+
+
+class ProfilerGet(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    async def process(self, input: Input, request: Request) -> Output:
+        ctxid = input.get("context", "") or request.args.get("context", "")
+        fmt = input.get("format", "") or request.args.get("format", "")
+
+        # without a context, traces cover all profiled contexts
+        if fmt == "trace":
+            return profiler.chrome_trace([ctxid] if ctxid else profiler.context_ids())
+
+        if not ctxid:
+            return {"contexts": profiler.context_ids()}
+
+        store = profiler.get_store(ctxid)
+        if store and input.get("clear"):
+            store.clear()
+        if not store:
+            return {"context": ctxid, "aggregates": [], "iterations": []}
+        return {
+            "context": ctxid,
+            "aggregates": store.aggregates(),
+            "iterations": store.iterations()[:MAX_ITERATIONS],
+        }
@@ -0,0 +1,13 @@
+from python.helpers.api import ApiHandler, Input, Output, Request, Response
+
+from python.helpers import prompt_cache
+
+
+class PromptStats(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    async def process(self, input: Input, request: Request) -> Output:
+        return {"templates": prompt_cache.get_stats()}
@@ -119,20 +119,18 @@ class RecallMemories(Extension):
         # get memory database
         db = await Memory.get(self.agent)
 
-        # search for general memories and fragments
-        memories = await db.search_similarity_threshold(
-            query=query,
-            limit=set["memory_recall_memories_max_search"],
+        # search general memories and fragments and solutions in one batch, the query is embedded once
+        memories, solutions = await db.search_similarity_threshold_multi(
+            queries=[query, query],
+            limit=[
+                set["memory_recall_memories_max_search"],
+                set["memory_recall_solutions_max_search"],
+            ],
             threshold=set["memory_recall_similarity_threshold"],
-            filter=f"area == '{Memory.Area.MAIN.value}' or area == '{Memory.Area.FRAGMENTS.value}'",  # exclude solutions
-        )
-
-        # search for solutions
-        solutions = await db.search_similarity_threshold(
-            query=query,
-            limit=set["memory_recall_solutions_max_search"],
-            threshold=set["memory_recall_similarity_threshold"],
-            filter=f"area == '{Memory.Area.SOLUTIONS.value}'",  # exclude solutions
+            filter=[
+                f"area == '{Memory.Area.MAIN.value}' or area == '{Memory.Area.FRAGMENTS.value}'",  # exclude solutions
+                f"area == '{Memory.Area.SOLUTIONS.value}'",
+            ],
         )
 
         if not memories and not solutions:
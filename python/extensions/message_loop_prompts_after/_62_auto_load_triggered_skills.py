@@ -26,24 +26,11 @@ class AutoLoadTriggeredSkills(Extension):
         if not msg:
             return
 
-        msg_lower = msg.lower()
-
-        # Discover all skills that have trigger patterns
-        all_skills = skills_helper.list_skills(agent=self.agent, include_content=False)
+        # Skills with a trigger pattern appearing in the user message
+        matched_skills = skills_helper.match_triggered_skills(msg, agent=self.agent)
 
         auto_loaded = []
-        for skill in all_skills:
-            if not skill.triggers:
-                continue
-
-            # Check if any trigger pattern appears in the user message
-            matched = any(
-                trigger.lower() in msg_lower
-                for trigger in skill.triggers
-            )
-            if not matched:
-                continue
-
+        for skill in matched_skills:
             # Auto-load this skill (same logic as skills_tool._load)
             loaded = self.agent.data.get(DATA_NAME_LOADED_SKILLS) or []
             if skill.name in loaded:
@@ -15,6 +15,8 @@ class LogFromStream(Extension):
         loop_data: LoopData = LoopData(),
         text: str = "",
         parsed: dict = {},
+        delta: dict | None = None,
+        removed: list = [],
         **kwargs,
     ):
 
@@ -42,6 +44,11 @@ class LogFromStream(Extension):
         # update log message
         log_item = loop_data.params_temporary["log_item_generating"]
 
+        # parsed values unchanged by this chunk, only the raw text and heading moved on
+        if delta is not None and not delta and not removed and log_item.kvps:
+            log_item.update(heading=heading, content=text)
+            return
+
         # keep reasoning from previous logs in kvps
         kvps = {}
         if log_item.kvps is not None and "reasoning" in log_item.kvps:
@@ -9,10 +9,13 @@ class ReplaceIncludeAlias(Extension):
         loop_data=None,
         text: str = "",
         parsed: dict[str, Any] | None = None,
+        delta: dict[str, Any] | None = None,
         **kwargs
     ):
         if not parsed or not isinstance(parsed, dict):
             return
+        if delta is not None and "tool_args" not in delta and "tool_name" not in delta:
+            return  # unchanged tool_args were replaced with the previous chunk
 
         def replace_placeholders(value: Any) -> Any:
             if isinstance(value, str):
@@ -13,9 +13,12 @@ class LiveResponse(Extension):
         loop_data: LoopData = LoopData(),
         text: str = "",
         parsed: dict = {},
+        delta: dict | None = None,
         **kwargs,
     ):
         try:
+            if delta is not None and "tool_args" not in delta:
+                return  # response text unchanged
             if (
                 not "tool_name" in parsed
                 or parsed["tool_name"] != "response"
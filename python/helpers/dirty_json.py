@@ -1,4 +1,6 @@
 import json
+import re
+from typing import Any
 
 def try_parse(json_string: str):
     try:
@@ -157,6 +159,7 @@ class DirtyJson:
         return obj
 
     def _parse_object_content(self):
+        obj = self.stack[-1] if self.stack else None
         while self.current_char is not None:
             self._skip_whitespace()
             if self.current_char == "}":
@@ -193,6 +196,7 @@ class DirtyJson:
                     self.stack.pop()
                     return  # End of input reached after value
                 continue
+        self._close_truncated(obj)
 
     def _parse_key(self):
         self._skip_whitespace()
@@ -220,6 +224,7 @@ class DirtyJson:
         return arr
 
     def _parse_array_content(self):
+        arr = self.stack[-1] if self.stack else None
         while self.current_char is not None:
             self._skip_whitespace()
             if self.current_char == "]":
@@ -241,6 +246,12 @@ class DirtyJson:
             elif self.current_char != "]":
                 self.stack.pop()
                 return
+        self._close_truncated(arr)
+
+    def _close_truncated(self, container):
+        # input ended inside the container, close it so values after it go to the parent
+        if self.stack and self.stack[-1] is container:
+            self.stack.pop()
 
     def _parse_string(self):
         result = ""
@@ -333,3 +344,399 @@ class DirtyJson:
         chars = ["{", "[", '"']
         indices = [input_str.find(char) for char in chars if input_str.find(char) != -1]
         return min(indices) if indices else 0
+
+
+_START_CHARS = re.compile(r'[{\["]')
+_STRING_STOP = re.compile(r'["\\]')
+_WHITESPACE = re.compile(r"\s*")
+_NUMBER_CHARS = "-+.eE"
+_LITERALS = (("true", True), ("false", False), ("null", None), ("undefined", None))
+_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# object states
+_KEY, _COLON, _VALUE, _AFTER = range(4)
+# array states
+_ITEM, _AFTER_ITEM = range(4, 6)
+# tokens spanning chunks
+_KEY_STRING, _STRING, _NUMBER = range(3)
+
+
+class _Frame:
+    __slots__ = ("container", "state", "key", "index")
+
+    def __init__(self, container: dict | list):
+        self.container = container
+        self.state = _KEY if isinstance(container, dict) else _ITEM
+        self.key: Any = None
+        self.index: int | None = None  # array slot holding a partial value
+
+
+class IncrementalDirtyJson:
+    """
+    Resumable DirtyJson for streamed text whose top level value is an object.
+
+    Parser state is kept between chunks, so every character is scanned once and
+    each feed costs time proportional to the chunk, not to the whole response.
+    For every prefix the result equals DirtyJson.parse_string(prefix); input
+    outside the common grammar (comments, unquoted or single quoted strings,
+    {{ }} templates, a top level that is not an object) switches to reparsing
+    the full text with DirtyJson so results stay identical.
+
+    After each feed, `delta` holds the top level keys whose values changed and
+    `removed` the keys that disappeared (a partially streamed key that grew).
+    Results are snapshots: containers are copied, the parser keeps its own.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.text = ""
+        self.delta: dict[str, Any] = {}
+        self.removed: list[str] = []
+        self._pos = 0
+        self._root: dict | None = None
+        self._stack: list[_Frame] = []
+        self._done = False
+        self._fallback = False
+        self._token: int | None = None
+        self._token_start = 0
+        self._buffer = ""
+        self._escape: str | None = None  # "" after a backslash, "u..." inside \\u
+        self._provisional_key: tuple | None = None
+        self._touched: set = set()
+        self._snapshot: Any = None
+
+    @property
+    def result(self) -> Any:
+        return self._snapshot
+
+    def update(self, text: str) -> Any:
+        """Parse the whole text so far, only the part added since the last call is scanned."""
+        if text.startswith(self.text):
+            return self.feed(text[len(self.text):])
+        # earlier text changed (e.g. masked), start over
+        self._reset()
+        return self.feed(text)
+
+    def feed(self, chunk: str) -> Any:
+        self.text += chunk
+        if self._fallback:
+            return self._reparse()
+        self._undo_provisional_key()
+        invalid = False
+        try:
+            if not self._run():
+                invalid = not self._apply_partial()
+        except _Unsupported:
+            self._fallback = True
+            return self._reparse()
+        if invalid:
+            raise ValueError("Incomplete number in JSON stream")
+        return self._take_snapshot()
+
+    def _run(self) -> bool:
+        # consume as much as possible, False when more input is needed
+        text = self.text
+        while not self._done:
+            if self._token is not None:
+                if not self._continue_token():
+                    return False
+                continue
+            if not self._stack:
+                match = _START_CHARS.search(text, self._pos)
+                if not match:
+                    self._pos = len(text)
+                    return False
+                self._pos = match.start()
+                if text[self._pos] != "{":
+                    raise _Unsupported()
+                if self._pos + 1 >= len(text):
+                    return False
+                if text[self._pos + 1] == "{":
+                    raise _Unsupported()
+                self._root = {}
+                self._stack.append(_Frame(self._root))
+                self._pos += 1
+                continue
+
+            self._pos = _WHITESPACE.match(text, self._pos).end()  # type: ignore
+            if self._pos >= len(text):
+                return False
+            frame = self._stack[-1]
+            char = text[self._pos]
+            state = frame.state
+            if char == "/":
+                raise _Unsupported()  # comments
+
+            if state == _KEY or state == _AFTER:
+                if char == "}":
+                    if self._pos + 1 >= len(text):
+                        return False  # }} closes only one object, wait for the next char
+                    self._pos += 2 if text[self._pos + 1] == "}" else 1
+                    self._pop()
+                elif state == _AFTER and char == ",":
+                    self._pos += 1
+                    frame.state = _KEY
+                elif state == _AFTER:
+                    frame.state = _KEY  # missing comma, next key follows
+                elif char == '"':
+                    self._start_string(_KEY_STRING)
+                else:
+                    raise _Unsupported()
+            elif state == _COLON:
+                if char == ":":
+                    self._pos += 1
+                frame.state = _VALUE  # missing colon, value follows
+            elif state == _ITEM and char == "]":
+                if frame.index is not None:
+                    frame.container.pop()  # drop the value read from whitespace after [
+                    self._touch()
+                self._pos += 1
+                self._pop()
+            elif state == _VALUE or state == _ITEM:
+                if not self._start_value(char):
+                    return False
+            elif state == _AFTER_ITEM:
+                if char == ",":
+                    self._pos += 1
+                    frame.state = _ITEM
+                elif char == "]":
+                    self._pos += 1
+                    self._pop()
+                else:
+                    self._pop()  # anything else ends the array
+        return True
+
+    def _start_value(self, char: str) -> bool:
+        text, pos = self.text, self._pos
+        if char == "{":
+            if pos + 1 >= len(text):
+                return False
+            if text[pos + 1] == "{":
+                raise _Unsupported()
+            self._push({})
+        elif char == "[":
+            self._push([])
+        elif char == '"':
+            if len(text) - pos < 3:
+                return False  # could still become a """ string
+            if text[pos + 1 : pos + 3] == '""':
+                raise _Unsupported()
+            self._start_string(_STRING)
+        elif char.isdigit() or char in "-+":
+            self._token = _NUMBER
+            self._token_start = pos
+        else:
+            for word, value in _LITERALS:
+                if text[pos : pos + len(word)].lower() == word:
+                    self._pos += len(word)
+                    self._set(value)
+                    return True
+            tail = text[pos:].lower()
+            if any(word.startswith(tail) for word, _ in _LITERALS):
+                return False
+            raise _Unsupported()
+        return True
+
+    def _start_string(self, token: int):
+        self._token = token
+        self._buffer = ""
+        self._escape = None
+        self._pos += 1
+
+    def _continue_token(self) -> bool:
+        if self._token == _NUMBER:
+            text, pos = self.text, self._pos
+            while pos < len(text) and (text[pos].isdigit() or text[pos] in _NUMBER_CHARS):
+                pos += 1
+            self._pos = pos
+            if pos >= len(text):
+                return False
+            self._token = None
+            try:
+                number = _to_number(text[self._token_start : pos])
+            except ValueError:
+                raise _Unsupported()  # DirtyJson fails on this and every longer text
+            self._set(number)
+            return True
+
+        if not self._continue_string():
+            return False
+        value, token = self._buffer, self._token
+        self._token = None
+        self._buffer = ""
+        if token == _KEY_STRING:
+            frame = self._stack[-1]
+            frame.key = value
+            frame.state = _COLON
+        else:
+            self._set(value)
+        return True
+
+    def _continue_string(self) -> bool:
+        text = self.text
+        while True:
+            if self._escape is not None:
+                if not self._continue_escape():
+                    return False
+                continue
+            match = _STRING_STOP.search(text, self._pos)
+            if not match:
+                self._buffer += text[self._pos :]
+                self._pos = len(text)
+                return False
+            self._buffer += text[self._pos : match.start()]
+            self._pos = match.end()
+            if match.group() == '"':
+                return True
+            self._escape = ""
+
+    def _continue_escape(self) -> bool:
+        text = self.text
+        if self._escape == "":
+            if self._pos >= len(text):
+                return False
+            char = text[self._pos]
+            self._pos += 1
+            if char == "u":
+                self._escape = "u"
+                return True
+            if char in "\"'\\/bfnrt":
+                self._buffer += _ESCAPES.get(char, char)
+            # any other escaped char is dropped together with the backslash
+            self._escape = None
+            return True
+        while len(self._escape) < 5:
+            if self._pos >= len(text):
+                return False
+            char = text[self._pos]
+            if not char.isalnum():
+                raise _Unsupported()  # DirtyJson ends the string here
+            self._escape += char
+            self._pos += 1
+        try:
+            self._buffer += chr(int(self._escape[1:], 16))
+        except ValueError:
+            self._buffer += "\\" + self._escape
+        self._escape = None
+        return True
+
+    def _apply_partial(self) -> bool:
+        # put the value being streamed into the tree the way DirtyJson reads a cut-off text
+        if not self._stack:
+            return True
+        frame = self._stack[-1]
+        partial = self._buffer + ("\\" + self._escape if self._escape else "")
+        if self._token == _KEY_STRING:
+            obj = frame.container
+            self._provisional_key = (obj, partial, partial in obj, obj.get(partial))
+            obj[partial] = None
+            self._touch(partial if len(self._stack) == 1 else None)
+        elif self._token == _STRING:
+            self._set(partial, partial=True)
+        elif self._token == _NUMBER:
+            try:
+                self._set(_to_number(self.text[self._token_start : self._pos]), partial=True)
+            except ValueError:
+                return False
+        elif frame.state in (_VALUE, _ITEM):
+            tail = self.text[self._pos :]
+            if tail:
+                self._set(DirtyJson.parse_string(tail), partial=True)
+            elif frame.state == _VALUE or (
+                not frame.container and self.text[self._pos - 1] != "["
+            ):
+                # DirtyJson reads a value from whitespace after a key, or after [ but not after a comma
+                self._set(None, partial=True)
+        elif frame.state == _COLON:
+            self._set(None, partial=True)
+        return True
+
+    def _undo_provisional_key(self):
+        if self._provisional_key is None:
+            return
+        obj, key, existed, previous = self._provisional_key
+        self._provisional_key = None
+        if existed:
+            obj[key] = previous
+        else:
+            obj.pop(key, None)
+        self._touched.add(key if obj is self._root else self._stack[0].key)
+
+    def _set(self, value: Any, partial: bool = False):
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            frame.container[frame.key] = value
+            if not partial:
+                frame.state = _AFTER
+        else:
+            if frame.index is None:
+                frame.container.append(value)
+                frame.index = len(frame.container) - 1
+            else:
+                frame.container[frame.index] = value
+            if not partial:
+                frame.index = None
+                frame.state = _AFTER_ITEM
+        self._touch()
+
+    def _touch(self, key: Any = None):
+        # everything below the root changes under the root key being parsed
+        self._touched.add(key if key is not None else self._stack[0].key)
+
+    def _push(self, container: dict | list):
+        self._set(container)
+        self._stack.append(_Frame(container))
+        self._pos += 1
+
+    def _pop(self):
+        self._stack.pop()
+        if not self._stack:
+            self._done = True
+
+    def _take_snapshot(self) -> Any:
+        if self._root is None:
+            # no object yet, text before the first brace is read as a plain value
+            self._snapshot = DirtyJson.parse_string(self.text)
+            self.delta, self.removed = {}, []
+            return self._snapshot
+        previous = self._snapshot if isinstance(self._snapshot, dict) else {}
+        touched, self._touched = self._touched, set()
+        self.delta = {key: _copy(self._root[key]) for key in touched if key in self._root}
+        self.removed = [key for key in touched if key not in self._root and key in previous]
+        self._snapshot = {
+            key: self.delta[key] if key in self.delta else previous[key] for key in self._root
+        }
+        return self._snapshot
+
+    def _reparse(self) -> Any:
+        result = DirtyJson.parse_string(self.text)
+        previous = self._snapshot if isinstance(self._snapshot, dict) else {}
+        if isinstance(result, dict):
+            self.delta = {k: v for k, v in result.items() if k not in previous or previous[k] != v}
+            self.removed = [k for k in previous if k not in result]
+        else:
+            self.delta, self.removed = {}, []
+        self._snapshot = result
+        return result
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _to_number(text: str) -> int | float:
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _copy(value: Any) -> Any:
+    # containers are copied, strings and scalars are immutable and shared
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
@@ -0,0 +1,322 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import aiohttp
+
+from python.helpers import files
+from python.helpers.sqlite_lru import SqliteLru
+
+INDEX_FILE = "tmp/document_index.db"
+TTL = 7 * 24 * 3600  # seconds without use before a document is dropped
+MAX_BYTES = 256 * 1024 * 1024  # stored text and chunks, least recently used documents go first
+REVALIDATE_AFTER = 300  # seconds before a remote document is checked for changes again
+HEAD_TIMEOUT = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    uri TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    last_modified TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    checked REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_accessed ON documents (accessed);
+CREATE INDEX IF NOT EXISTS documents_hash ON documents (hash);
+CREATE TABLE IF NOT EXISTS contents (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    chunks TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class Validators:
+    """What a document looked like when it was read, used to tell if it changed since."""
+
+    etag: str = ""
+    last_modified: str = ""
+    mtime: float = 0.0
+
+    @staticmethod
+    def from_headers(headers) -> "Validators":
+        return Validators(
+            etag=headers.get("ETag", ""),
+            last_modified=headers.get("Last-Modified", ""),
+        )
+
+
+@dataclass
+class IndexedDocument:
+    uri: str
+    hash: str
+    validators: Validators
+    checked: float
+    accessed: float
+
+
+class DocumentIndex(SqliteLru):
+    """
+    Extracted text and chunks of documents in a single SQLite file.
+
+    Documents are keyed by normalized URI and point to their content by hash,
+    so identical content reached through several URIs is stored once and a
+    refetch that yields the same text doesn't have to be chunked again.
+    Documents unused for ttl seconds expire, and once the stored content
+    exceeds max_bytes the least recently used documents are evicted. Vectors
+    are not stored here, the chunks are embedded through the shared embedding
+    cache.
+    """
+
+    def __init__(self, path: str | None, max_bytes: int = MAX_BYTES, ttl: float = TTL):
+        super().__init__(path, _SCHEMA, max_bytes)
+        self.ttl = ttl
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM contents"
+        ).fetchone()[0]
+
+    def get(self, uri: str) -> IndexedDocument | None:
+        """The indexed document for uri, None if unknown or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uri, hash, etag, last_modified, mtime, checked, accessed FROM documents WHERE uri = ?",
+                (uri,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[6] > self.ttl:
+                self._delete([uri])
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE documents SET accessed = ? WHERE uri = ?", (now, uri))
+            self._conn.commit()
+        return IndexedDocument(
+            uri=row[0],
+            hash=row[1],
+            validators=Validators(etag=row[2], last_modified=row[3], mtime=row[4]),
+            checked=row[5],
+            accessed=now,
+        )
+
+    def content(self, hash: str) -> tuple[str, list[str]] | None:
+        """Text and chunks stored under hash."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, chunks FROM contents WHERE hash = ?", (hash,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def put(
+        self,
+        uri: str,
+        text: str,
+        chunks: list[str],
+        validators: Validators | None = None,
+    ) -> list[str]:
+        """Store the document, returns URIs of documents evicted to make room."""
+        hash = content_hash(text)
+        validators = validators or Validators()
+        now = time.time()
+        with self._lock:
+            if not self._conn.execute("SELECT 1 FROM contents WHERE hash = ?", (hash,)).fetchone():
+                encoded = json.dumps(chunks)
+                size = len(text.encode("utf-8")) + len(encoded.encode("utf-8"))
+                self._conn.execute(
+                    "INSERT INTO contents (hash, text, chunks, size) VALUES (?, ?, ?, ?)",
+                    (hash, text, encoded, size),
+                )
+                self._size += size
+            previous = self._conn.execute(
+                "SELECT hash FROM documents WHERE uri = ?", (uri,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (uri, hash, etag, last_modified, mtime, checked, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (uri, hash, validators.etag, validators.last_modified, validators.mtime, now, now),
+            )
+            if previous and previous[0] != hash:
+                self._drop_orphans([previous[0]])
+            evicted = self._evict(uri)
+            self._conn.commit()
+        return evicted
+
+    async def is_current(self, document: IndexedDocument) -> bool:
+        """
+        Whether the indexed document still matches its source.
+
+        Local files compare their modification time. Remote documents are trusted
+        for REVALIDATE_AFTER seconds, then checked with a conditional HEAD request.
+        A remote document without validators is considered changed so it is
+        refetched, an unreachable one is served from the index.
+        """
+        parsed = urlparse(document.uri)
+        validators = document.validators
+        if parsed.scheme == "file":
+            try:
+                return os.stat(parsed.path).st_mtime == validators.mtime
+            except OSError:
+                return False
+        if parsed.scheme not in ("http", "https"):
+            return True
+        if time.time() - document.checked < REVALIDATE_AFTER:
+            return True
+        if not validators.etag and not validators.last_modified:
+            return False
+
+        headers = {}
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.head(
+                    document.uri,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=HEAD_TIMEOUT),
+                    allow_redirects=True,
+                ) as response:
+                    if response.status == 304:
+                        current = True
+                    elif response.status > 399:
+                        return True  # source unavailable, keep serving what we have
+                    else:
+                        # servers ignoring conditional HEADs still send their validators
+                        fresh = Validators.from_headers(response.headers)
+                        current = bool(fresh.etag or fresh.last_modified) and (
+                            fresh.etag == validators.etag
+                            and fresh.last_modified == validators.last_modified
+                        )
+        except Exception:
+            return True
+        if current:
+            await asyncio.to_thread(self.mark_checked, document.uri)
+        return current
+
+    def mark_checked(self, uri: str):
+        """Record that the document was found unchanged."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET checked = ? WHERE uri = ?", (time.time(), uri)
+            )
+            self._conn.commit()
+
+    def remove(self, uri: str):
+        with self._lock:
+            self._delete([uri])
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM contents")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            contents = self._conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0]
+        return {
+            "documents": documents,
+            "contents": contents,
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _evict(self, keep: str) -> list[str]:
+        expired = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT uri FROM documents WHERE accessed < ? AND uri != ?",
+                (time.time() - self.ttl, keep),
+            ).fetchall()
+        ]
+        self._delete(expired)
+        evicted = expired
+        if not self._over_limit():
+            return evicted
+        # content shared with other documents is only freed with the last of them
+        return evicted + self._evict_lru(
+            "SELECT d.uri, c.size FROM documents d JOIN contents c ON c.hash = d.hash"
+            " WHERE d.uri != ? ORDER BY d.accessed",
+            (keep,),
+            self._delete,
+        )
+
+    def _delete(self, uris: list[str]):
+        if not uris:
+            return
+        hashes = set()
+        for uri in uris:
+            row = self._conn.execute("SELECT hash FROM documents WHERE uri = ?", (uri,)).fetchone()
+            if row:
+                hashes.add(row[0])
+                self._conn.execute("DELETE FROM documents WHERE uri = ?", (uri,))
+        self._drop_orphans(list(hashes))
+
+    def _drop_orphans(self, hashes: list[str]):
+        # content stays as long as any URI still points to it
+        for hash in hashes:
+            if self._conn.execute("SELECT 1 FROM documents WHERE hash = ?", (hash,)).fetchone():
+                continue
+            row = self._conn.execute("SELECT size FROM contents WHERE hash = ?", (hash,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM contents WHERE hash = ?", (hash,))
+                self._size -= row[0]
+
+
+_index: DocumentIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> DocumentIndex:
+    """Shared on-disk index used by all agents and contexts of the process."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DocumentIndex(files.get_abs_path(INDEX_FILE))
+        return _index
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def read_validators(uri: str, remote: bool = True) -> Validators:
+    """
+    Current validators of a normalized document URI, empty where they can't be read.
+
+    Remote documents cost a HEAD request, with remote=False they get empty
+    validators instead and are refetched once REVALIDATE_AFTER has passed.
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme == "file":
+        try:
+            return Validators(mtime=os.stat(parsed.path).st_mtime)
+        except OSError:
+            return Validators()
+    if parsed.scheme in ("http", "https") and remote:
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.head(
+                    uri,
+                    timeout=aiohttp.ClientTimeout(total=HEAD_TIMEOUT),
+                    allow_redirects=True,
+                ) as response:
+                    if response.status > 399:
+                        return Validators()
+                    return Validators.from_headers(response.headers)
+        except Exception:
+            return Validators()
+    return Validators()
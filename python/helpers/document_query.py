@@ -2,9 +2,12 @@ import mimetypes
 import os
 import asyncio
 import aiohttp
+import itertools
 import json
+import threading
 
 from python.helpers.vector_db import VectorDB
+from python.helpers import document_index
 
 os.environ["USER_AGENT"] = "@mixedbread-ai/unstructured"  # noqa E402
 from langchain_unstructured import UnstructuredLoader  # noqa E402
@@ -23,19 +26,31 @@ from langchain_core.documents import Document
 from langchain.schema import SystemMessage, HumanMessage
 
 from python.helpers.print_style import PrintStyle
-from python.helpers import files, errors
+from python.helpers import files, errors, tokens
 from agent import Agent
+import models
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 
 DEFAULT_SEARCH_THRESHOLD = 0.5
+QA_MAX_CONCURRENCY = 4  # utility model calls in flight while optimizing queries
+QA_CONTEXT_SHARE = 0.5  # share of the chat model context filled with document chunks
+QA_DEFAULT_CONTEXT_TOKENS = 32000  # chunk budget when the chat model has no context length set
 
 
 class DocumentQueryStore:
     """
     FAISS Store for document query results.
     Manages documents identified by URI for storage, retrieval, and searching.
+
+    One store is shared by all agents using the same embedding model. Extracted
+    text and chunks are kept in the persistent DocumentIndex, so documents read
+    before (by any agent, or before a restart) are loaded from there instead of
+    being fetched, parsed and chunked again.
+
+    Agents may run on different event loops, so the chunks of a document are
+    replaced under a thread lock, embedding happens before it is taken.
     """
 
     # Default chunking parameters
@@ -44,24 +59,31 @@ class DocumentQueryStore:
 
     # Cache for initialized stores
     _stores: dict[str, "DocumentQueryStore"] = {}
+    _stores_lock = threading.Lock()
 
     @staticmethod
     def get(agent: Agent):
-        """Create a DocumentQueryStore instance for the specified agent."""
+        """Get the DocumentQueryStore shared by agents with the same embedding model."""
         if not agent or not agent.config:
             raise ValueError("Agent and agent config must be provided")
 
-        # Initialize store
-        store = DocumentQueryStore(agent)
-        return store
+        model_config = agent.config.embeddings_model
+        key = f"{model_config.provider}/{model_config.name}"
+        with DocumentQueryStore._stores_lock:
+            if key not in DocumentQueryStore._stores:
+                DocumentQueryStore._stores[key] = DocumentQueryStore(model_config)
+            return DocumentQueryStore._stores[key]
 
     def __init__(
         self,
-        agent: Agent,
+        model_config: models.ModelConfig,
     ):
         """Initialize a DocumentQueryStore instance."""
-        self.agent = agent
+        self.model_config = model_config
         self.vector_db: VectorDB | None = None
+        self.index = document_index.get_index()
+        self._loaded: dict[str, str] = {}  # uri -> content hash of the chunks in vector_db
+        self._lock = threading.RLock()  # guards vector_db and _loaded
 
     @staticmethod
     def normalize_uri(uri: str) -> str:
@@ -95,10 +117,47 @@ class DocumentQueryStore:
         return normalized
 
     def init_vector_db(self):
-        return VectorDB(self.agent, cache=True)
+        return VectorDB(self.model_config, cache=True)
+
+    async def is_indexed(self, document_uri: str) -> bool:
+        """Whether the persistent index holds the document, current or not."""
+        doc = await asyncio.to_thread(self.index.get, self.normalize_uri(document_uri))
+        return doc is not None
+
+    async def load_document(
+        self, document_uri: str, add_to_db: bool = False
+    ) -> Optional[str]:
+        """
+        Get the text of a document from the persistent index.
+
+        Args:
+            document_uri: The URI of the document
+            add_to_db: Also make its chunks searchable in the vector db
+
+        Returns:
+            The document text, None if it is not indexed or its source changed
+        """
+        document_uri = self.normalize_uri(document_uri)
+        doc = await asyncio.to_thread(self.index.get, document_uri)
+        if not doc or not await self.index.is_current(doc):
+            return None
+        content = await asyncio.to_thread(self.index.content, doc.hash)
+        if not content:
+            return None
+        text, chunks = content
+
+        if add_to_db and self._loaded.get(document_uri) != doc.hash:
+            success, _ids = await self._insert_chunks(document_uri, doc.hash, chunks)
+            if not success:
+                return None
+        return text
 
     async def add_document(
-        self, text: str, document_uri: str, metadata: dict | None = None
+        self,
+        text: str,
+        document_uri: str,
+        metadata: dict | None = None,
+        validators: document_index.Validators | None = None,
     ) -> tuple[bool, list[str]]:
         """
         Add a document to the store with the given URI.
@@ -107,26 +166,73 @@ class DocumentQueryStore:
             text: The document text content
             document_uri: The URI that uniquely identifies this document
             metadata: Optional metadata for the document
+            validators: State of the source when text was read, used to detect changes later
 
         Returns:
             True if successful, False otherwise
         """
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
+        content_hash = document_index.content_hash(text)
+
+        # unchanged content is already chunked and indexed
+        if self._loaded.get(document_uri) == content_hash:
+            await asyncio.to_thread(self._persist, document_uri, text, [], validators)
+            chunks = await self._get_document_chunks(document_uri)
+            return True, [chunk.metadata["id"] for chunk in chunks]
+
+        stored = await asyncio.to_thread(self.index.content, content_hash)
+        chunks = stored[1] if stored else self._split_text(text)
+        success, ids = await self._insert_chunks(
+            document_uri, content_hash, chunks, metadata
+        )
+        if success:
+            await asyncio.to_thread(self._persist, document_uri, text, chunks, validators)
+        return success, ids
 
-        # Delete existing document if it exists to avoid duplicates
-        await self.delete_document(document_uri)
+    async def save_document(
+        self,
+        text: str,
+        document_uri: str,
+        validators: document_index.Validators | None = None,
+    ):
+        """Keep the text of a document in the persistent index without making it searchable."""
+        await asyncio.to_thread(
+            self._persist, self.normalize_uri(document_uri), text, [], validators
+        )
 
-        # Initialize metadata
-        doc_metadata = metadata or {}
-        doc_metadata["document_uri"] = document_uri
-        doc_metadata["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def _persist(
+        self,
+        document_uri: str,
+        text: str,
+        chunks: list[str],
+        validators: document_index.Validators | None,
+    ):
+        # blocking: encodes and commits the whole text, run it off the event loop
+        if not chunks:
+            stored = self.index.content(document_index.content_hash(text))
+            chunks = stored[1] if stored else self._split_text(text)
+        evicted = self.index.put(document_uri, text, chunks, validators)
+        for uri in evicted:
+            self._forget(uri)
 
-        # Split text into chunks
+    def _split_text(self, text: str) -> list[str]:
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.DEFAULT_CHUNK_SIZE, chunk_overlap=self.DEFAULT_CHUNK_OVERLAP
         )
-        chunks = text_splitter.split_text(text)
+        return text_splitter.split_text(text)
+
+    async def _insert_chunks(
+        self,
+        document_uri: str,
+        content_hash: str,
+        chunks: list[str],
+        metadata: dict | None = None,
+    ) -> tuple[bool, list[str]]:
+        # Initialize metadata
+        doc_metadata = metadata or {}
+        doc_metadata["document_uri"] = document_uri
+        doc_metadata["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # Create documents
         docs = []
@@ -141,11 +247,13 @@ class DocumentQueryStore:
             return False, []
 
         try:
-            # Initialize vector db if not already initialized
-            if not self.vector_db:
-                self.vector_db = self.init_vector_db()
-
-            ids = await self.vector_db.insert_documents(docs)
+            vector_db = self._get_vector_db()
+            vectors = await vector_db.embed_documents(docs)
+            with self._lock:
+                # replace existing chunks to avoid duplicates
+                self._delete_chunks(document_uri)
+                ids = vector_db.add_embedded(docs, vectors)
+                self._loaded[document_uri] = content_hash
             PrintStyle.standard(
                 f"Added document '{document_uri}' with {len(docs)} chunks"
             )
@@ -155,6 +263,23 @@ class DocumentQueryStore:
             PrintStyle.error(f"Error adding document '{document_uri}': {err_text}")
             return False, []
 
+    def _get_vector_db(self) -> VectorDB:
+        with self._lock:
+            if not self.vector_db:
+                self.vector_db = self.init_vector_db()
+            return self.vector_db
+
+    def _delete_chunks(self, document_uri: str) -> list[Document]:
+        with self._lock:
+            self._loaded.pop(document_uri, None)
+            if not self.vector_db:
+                return []
+            return self.vector_db.delete_by_metadata(f"document_uri == {document_uri!r}")
+
+    def _forget(self, document_uri: str):
+        # evicted from the persistent index, drop its chunks from the vector db as well
+        self._delete_chunks(document_uri)
+
     async def get_document(self, document_uri: str) -> Optional[Document]:
         """
         Retrieve a document by its URI.
@@ -211,7 +336,7 @@ class DocumentQueryStore:
         # get docs from vector db
 
         chunks = await self.vector_db.search_by_metadata(
-            filter=f"document_uri == '{document_uri}'",
+            filter=f"document_uri == {document_uri!r}",
         )
 
         PrintStyle.standard(f"Found {len(chunks)} chunks for document: {document_uri}")
@@ -241,6 +366,7 @@ class DocumentQueryStore:
     async def delete_document(self, document_uri: str) -> bool:
         """
         Delete a document from the store.
+        Its text stays in the persistent index for later reuse.
 
         Args:
             document_uri: The URI of the document to delete
@@ -256,24 +382,13 @@ class DocumentQueryStore:
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
 
-        chunks = await self.vector_db.search_by_metadata(
-            filter=f"document_uri == '{document_uri}'",
-        )
-        if not chunks:
+        deleted = self._delete_chunks(document_uri)
+        if not deleted:
             return False
-
-        # Collect IDs to delete
-        ids_to_delete = [chunk.metadata["id"] for chunk in chunks]
-
-        # Delete from vector store
-        if ids_to_delete:
-            dels = await self.vector_db.delete_documents_by_ids(ids_to_delete)
-            PrintStyle.standard(
-                f"Deleted document '{document_uri}' with {len(dels)} chunks"
-            )
-            return True
-
-        return False
+        PrintStyle.standard(
+            f"Deleted document '{document_uri}' with {len(deleted)} chunks"
+        )
+        return True
 
     async def search_documents(
         self, query: str, limit: int = 10, threshold: float = 0.5, filter: str = ""
@@ -310,6 +425,37 @@ class DocumentQueryStore:
             PrintStyle.error(f"Error searching documents: {str(e)}")
             return []
 
+    async def search_documents_multi(
+        self, queries: List[str], limit: int = 10, threshold: float = 0.5, filter: str = ""
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search for several queries at once, embedded in one batch and searched in one index pass.
+
+        Args:
+            queries: The search query strings
+            limit: Maximum number of results per query
+            threshold: Minimum similarity score threshold (0-1)
+
+        Returns:
+            Matching documents with their similarity score, one list per query
+        """
+
+        # DB not initialized or nothing to search
+        if not self.vector_db or not queries:
+            return [[] for _ in queries]
+
+        try:
+            results = await self.vector_db.search_by_similarity_threshold_multi(
+                queries=queries, limit=limit, threshold=threshold, filter=filter
+            )
+            PrintStyle.standard(
+                f"Search of {len(queries)} queries returned {sum(len(r) for r in results)} results"
+            )
+            return results
+        except Exception as e:
+            PrintStyle.error(f"Error searching documents: {str(e)}")
+            return [[] for _ in queries]
+
     async def search_document(
         self, document_uri: str, query: str, limit: int = 10, threshold: float = 0.5
     ) -> List[Document]:
@@ -326,7 +472,7 @@ class DocumentQueryStore:
             List of matching document chunks
         """
         return await self.search_documents(
-            query, limit, threshold, f"document_uri == '{document_uri}'"
+            query, limit, threshold, f"document_uri == {document_uri!r}"
         )
 
     async def list_documents(self) -> List[str]:
@@ -342,7 +488,9 @@ class DocumentQueryStore:
 
         # Extract unique URIs
         uris = set()
-        for doc in self.vector_db.db.get_all_docs().values():
+        with self.vector_db.db.lock:
+            docs = list(self.vector_db.db.get_all_docs().values())
+        for doc in docs:
             if isinstance(doc.metadata, dict):
                 uri = doc.metadata.get("document_uri")
                 if uri:
@@ -359,7 +507,6 @@ class DocumentQueryHelper:
         self.agent = agent
         self.store = DocumentQueryStore.get(agent)
         self.progress_callback = progress_callback or (lambda x: None)
-        self.store_lock = asyncio.Lock()
 
     async def document_qa(
         self, document_uris: List[str], questions: Sequence[str]
@@ -374,41 +521,25 @@ class DocumentQueryHelper:
             *[self.document_get_content(uri, True) for uri in document_uris]
         )
         await self.agent.handle_intervention()
-        selected_chunks = {}
-        for question in questions:
-            self.progress_callback(f"Optimizing query: {question}")
-            await self.agent.handle_intervention()
-            human_content = f'Search Query: "{question}"'
-            system_content = self.agent.parse_prompt(
-                "fw.document_query.optmimize_query.md"
-            )
-
-            optimized_query = (
-                await self.agent.call_utility_model(
-                    system=system_content, message=human_content
-                )
-            ).strip()
-
-            await self.agent.handle_intervention()
-            self.progress_callback(f"Searching documents with query: {optimized_query}")
 
-            normalized_uris = [self.store.normalize_uri(uri) for uri in document_uris]
-            doc_filter = " or ".join(
-                [f"document_uri == '{uri}'" for uri in normalized_uris]
-            )
-
-            chunks = await self.store.search_documents(
-                query=optimized_query,
-                limit=100,
-                threshold=DEFAULT_SEARCH_THRESHOLD,
-                filter=doc_filter,
-            )
-
-            self.progress_callback(f"Found {len(chunks)} chunks")
+        # optimize all queries concurrently, then search them together
+        optimized_queries = await self._run_bounded(self._optimize_query, questions)
+        await self.agent.handle_intervention()
 
-            for chunk in chunks:
-                selected_chunks[chunk.metadata["id"]] = chunk
+        normalized_uris = [self.store.normalize_uri(uri) for uri in document_uris]
+        doc_filter = " or ".join(
+            [f"document_uri == {uri!r}" for uri in normalized_uris]
+        )
+        results = await self.store.search_documents_multi(
+            queries=optimized_queries,
+            limit=100,
+            threshold=DEFAULT_SEARCH_THRESHOLD,
+            filter=doc_filter,
+        )
+        for query, hits in zip(optimized_queries, results):
+            self.progress_callback(f"Found {len(hits)} chunks for query: {query}")
 
+        selected_chunks = self._select_chunks(results, self._context_budget())
         if not selected_chunks:
             self.progress_callback("No relevant content found in the documents")
             content = f"!!! No content found for documents: {json.dumps(document_uris)} matching queries: {json.dumps(questions)}"
@@ -421,7 +552,7 @@ class DocumentQueryHelper:
 
         questions_str = "\n".join([f" *  {question}" for question in questions])
         content = "\n\n----\n\n".join(
-            [chunk.page_content for chunk in selected_chunks.values()]
+            [chunk.page_content for chunk in selected_chunks]
         )
 
         qa_system_message = self.agent.parse_prompt(
@@ -441,15 +572,90 @@ class DocumentQueryHelper:
 
         return True, str(ai_response)
 
+    async def _optimize_query(self, question: str) -> str:
+        self.progress_callback(f"Optimizing query: {question}")
+        human_content = f'Search Query: "{question}"'
+        system_content = self.agent.parse_prompt(
+            "fw.document_query.optmimize_query.md"
+        )
+        optimized_query = (
+            await self.agent.call_utility_model(
+                system=system_content, message=human_content
+            )
+        ).strip()
+        return optimized_query or question
+
+    async def _run_bounded(self, func, items: Sequence) -> list:
+        # at most QA_MAX_CONCURRENCY calls at once, an intervention cancels the rest
+        semaphore = asyncio.Semaphore(QA_MAX_CONCURRENCY)
+
+        async def run(item):
+            async with semaphore:
+                await self.agent.handle_intervention()
+                return await func(item)
+
+        tasks = [asyncio.create_task(run(item)) for item in items]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def _context_budget(self) -> int:
+        ctx_length = self.agent.config.chat_model.ctx_length
+        return int(ctx_length * QA_CONTEXT_SHARE) if ctx_length else QA_DEFAULT_CONTEXT_TOKENS
+
+    @staticmethod
+    def _select_chunks(
+        results: List[List[Tuple[Document, float]]], budget: int
+    ) -> List[Document]:
+        """
+        Deduplicate hits of all queries and pack the best ones into budget tokens.
+
+        Queries take turns, each contributing its next best hit, so one broad
+        query can't crowd out the others. Selected chunks are returned in
+        document order.
+        """
+        selected: List[Document] = []
+        seen = set()
+        used = 0
+        for hits in itertools.zip_longest(*results):
+            for doc, _score in sorted((hit for hit in hits if hit), key=lambda hit: -hit[1]):
+                id = doc.metadata["id"]
+                if id in seen:
+                    continue
+                seen.add(id)
+                cost = tokens.approximate_tokens(doc.page_content)
+                if used + cost > budget:
+                    continue  # a smaller chunk may still fit
+                selected.append(doc)
+                used += cost
+        return sorted(
+            selected,
+            key=lambda doc: (
+                doc.metadata.get("document_uri", ""),
+                doc.metadata.get("chunk_index", 0),
+            ),
+        )
+
     async def document_get_content(
         self, document_uri: str, add_to_db: bool = False
     ) -> str:
         self.progress_callback(f"Fetching document content")
         await self.agent.handle_intervention()
+
+        # documents read before, by any agent, come from the persistent index
+        cached = await self.store.load_document(document_uri, add_to_db)
+        if cached is not None:
+            self.progress_callback(f"Loaded document from index")
+            return cached
+
         url = urlparse(document_uri)
         scheme = url.scheme or "file"
         mimetype, encoding = mimetypes.guess_type(document_uri)
         mimetype = mimetype or "application/octet-stream"
+        validators: document_index.Validators | None = None
 
         if mimetype == "application/octet-stream":
             if url.scheme in ["http", "https"]:
@@ -479,6 +685,7 @@ class DocumentQueryHelper:
                     )
 
                 mimetype = response.headers["content-type"]
+                validators = document_index.Validators.from_headers(response.headers)
                 if "content-length" in response.headers:
                     content_length = (
                         float(response.headers["content-length"]) / 1024 / 1024
@@ -510,44 +717,37 @@ class DocumentQueryHelper:
         document_uri_norm = self.store.normalize_uri(document_uri)
 
         await self.agent.handle_intervention()
-        exists = await self.store.document_exists(document_uri_norm)
-        document_content = ""
-        if not exists:
-            await self.agent.handle_intervention()
-            if mimetype.startswith("image/"):
-                document_content = self.handle_image_document(document_uri, scheme)
-            elif mimetype == "text/html":
-                document_content = self.handle_html_document(document_uri, scheme)
-            elif mimetype.startswith("text/") or mimetype == "application/json":
-                document_content = self.handle_text_document(document_uri, scheme)
-            elif mimetype == "application/pdf":
-                document_content = self.handle_pdf_document(document_uri, scheme)
-            else:
-                document_content = self.handle_unstructured_document(
-                    document_uri, scheme
-                )
-            if add_to_db:
-                self.progress_callback(f"Indexing document")
-                await self.agent.handle_intervention()
-                async with self.store_lock:
-                    success, ids = await self.store.add_document(
-                        document_content, document_uri_norm
-                    )
-                if not success:
-                    self.progress_callback(f"Failed to index document")
-                    raise ValueError(
-                        f"DocumentQueryHelper::document_get_content: Failed to index document: {document_uri_norm}"
-                    )
-                self.progress_callback(f"Indexed {len(ids)} chunks")
+        if validators is None:
+            # a HEAD just for validators only pays off for an entry that will be revalidated
+            validators = await document_index.read_validators(
+                document_uri_norm, remote=await self.store.is_indexed(document_uri_norm)
+            )
+        if mimetype.startswith("image/"):
+            document_content = self.handle_image_document(document_uri, scheme)
+        elif mimetype == "text/html":
+            document_content = self.handle_html_document(document_uri, scheme)
+        elif mimetype.startswith("text/") or mimetype == "application/json":
+            document_content = self.handle_text_document(document_uri, scheme)
+        elif mimetype == "application/pdf":
+            document_content = self.handle_pdf_document(document_uri, scheme)
         else:
+            document_content = self.handle_unstructured_document(
+                document_uri, scheme
+            )
+        if add_to_db:
+            self.progress_callback(f"Indexing document")
             await self.agent.handle_intervention()
-            doc = await self.store.get_document(document_uri_norm)
-            if doc:
-                document_content = doc.page_content
-            else:
+            success, ids = await self.store.add_document(
+                document_content, document_uri_norm, validators=validators
+            )
+            if not success:
+                self.progress_callback(f"Failed to index document")
                 raise ValueError(
-                    f"DocumentQueryHelper::document_get_content: Document not found: {document_uri_norm}"
+                    f"DocumentQueryHelper::document_get_content: Failed to index document: {document_uri_norm}"
                 )
+            self.progress_callback(f"Indexed {len(ids)} chunks")
+        else:
+            await self.store.save_document(document_content, document_uri_norm, validators)
         return document_content
 
     def handle_image_document(self, document: str, scheme: str) -> str:
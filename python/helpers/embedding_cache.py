@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import threading
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from python.helpers import files
+from python.helpers.print_style import PrintStyle
+from python.helpers.sqlite_lru import SqliteLru, chunks, marks
+
+CACHE_FILE = "tmp/memory/embeddings.db"
+LEGACY_CACHE_DIR = "tmp/memory/embeddings"  # one file per text, replaced by CACHE_FILE
+TOUCH_INTERVAL = 60  # seconds, hits on entries used more recently don't write their access time
+IN_MEMORY_MAX_BYTES = 64 * 1024 * 1024  # caches of embedders that don't persist anything
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed);
+"""
+
+
+class EmbeddingCache(SqliteLru):
+    """
+    Size-bounded store of float32 embedding vectors in a single SQLite file.
+
+    Least recently used entries are evicted once the stored vectors exceed
+    max_bytes. One instance is shared by all embedders of the process, keys are
+    namespaced by model so different models never collide.
+    """
+
+    def __init__(self, path: str | None, max_bytes: int):
+        super().__init__(path, _SCHEMA, max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def mget(self, keys: list[str]) -> list[list[float] | None]:
+        if not keys:
+            return []
+        found: dict[str, bytes] = {}
+        touch: list[str] = []
+        now = time.time()
+        with self._lock:
+            for chunk in chunks(list(set(keys))):
+                rows = self._conn.execute(
+                    f"SELECT key, vector, accessed FROM embeddings WHERE key IN ({marks(chunk)})",
+                    chunk,
+                ).fetchall()
+                for key, vector, accessed in rows:
+                    found[key] = vector
+                    if now - accessed > TOUCH_INTERVAL:
+                        touch.append(key)
+            # eviction order doesn't need finer access times, repeated hits stay read-only
+            if touch:
+                for chunk in chunks(touch):
+                    self._conn.execute(
+                        f"UPDATE embeddings SET accessed = ? WHERE key IN ({marks(chunk)})",
+                        [now, *chunk],
+                    )
+                self._conn.commit()
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+    def mset(self, items: list[tuple[str, list[float]]]):
+        if not items:
+            return
+        now = time.time()
+        rows = {key: np.asarray(vector, dtype=np.float32).tobytes() for key, vector in items}
+        with self._lock:
+            self._size -= self._stored_size(list(rows))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, accessed) VALUES (?, ?, ?)",
+                [(key, blob, now) for key, blob in rows.items()],
+            )
+            self._size += sum(len(blob) for blob in rows.values())
+            if self._over_limit():
+                evicted = self._evict_lru(
+                    "SELECT key, LENGTH(vector) FROM embeddings ORDER BY accessed", (), self._delete
+                )
+                self.evictions += len(evicted)
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _stored_size(self, keys: list[str]) -> int:
+        size = 0
+        for chunk in chunks(keys):
+            size += self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE key IN ({marks(chunk)})",
+                chunk,
+            ).fetchone()[0]
+        return size
+
+    def _delete(self, keys: list[str]):
+        self._size -= self._stored_size(keys)
+        for chunk in chunks(keys):
+            self._conn.execute(f"DELETE FROM embeddings WHERE key IN ({marks(chunk)})", chunk)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that reads and writes vectors through an EmbeddingCache in batches."""
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, namespace: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.namespace = namespace
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.mget(self._keys(texts, "doc"))
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            self._fill(texts, vectors, missing, self.underlying.embed_documents([texts[i] for i in missing]))
+        return vectors  # type: ignore
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # SQLite calls block, keep them off the event loop
+        vectors = await asyncio.to_thread(self.cache.mget, self._keys(texts, "doc"))
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            embedded = await self.underlying.aembed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(self._fill, texts, vectors, missing, embedded)
+        return vectors  # type: ignore
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._keys([text], "query")
+        vector = self.cache.mget(key)[0]
+        if vector is None:
+            vector = self.underlying.embed_query(text)
+            self.cache.mset([(key[0], vector)])
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._keys([text], "query")
+        vector = (await asyncio.to_thread(self.cache.mget, key))[0]
+        if vector is None:
+            vector = await self.underlying.aembed_query(text)
+            await asyncio.to_thread(self.cache.mset, [(key[0], vector)])
+        return vector
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries in one request, cached under their query keys."""
+        keys = self._keys(texts, "query")
+        vectors = await asyncio.to_thread(self.cache.mget, keys)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            # the embedding wrappers in models.py embed queries and documents alike
+            embedded = await self.underlying.aembed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(
+                self.cache.mset, [(keys[i], vector) for i, vector in zip(missing, embedded)]
+            )
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+        return vectors  # type: ignore
+
+    def _fill(self, texts, vectors, missing, embedded):
+        keys = self._keys([texts[i] for i in missing], "doc")
+        self.cache.mset(list(zip(keys, embedded)))
+        for i, vector in zip(missing, embedded):
+            vectors[i] = vector
+
+    def _keys(self, texts: List[str], kind: str) -> list[str]:
+        # queries get their own keys, some models embed them differently than documents
+        prefix = f"{self.namespace}:{kind}:"
+        return [prefix + hashlib.sha1(t.encode("utf-8")).hexdigest() for t in texts]
+
+
+_cache: EmbeddingCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> EmbeddingCache:
+    """Shared on-disk cache, sized by the embed_cache_max_mb setting."""
+    global _cache
+    from python.helpers import settings
+
+    max_bytes = settings.get_settings()["embed_cache_max_mb"] * 1024 * 1024
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(files.get_abs_path(CACHE_FILE), max_bytes)
+            _remove_legacy_cache()
+        _cache.max_bytes = max_bytes
+        return _cache
+
+
+def cached_embeddings(underlying: Embeddings, namespace: str, in_memory: bool = False) -> CachedEmbeddings:
+    cache = EmbeddingCache(None, IN_MEMORY_MAX_BYTES) if in_memory else get_cache()
+    return CachedEmbeddings(underlying, cache, namespace)
+
+
+def _remove_legacy_cache():
+    legacy = files.get_abs_path(LEGACY_CACHE_DIR)
+    if not os.path.isdir(legacy):
+        return
+    PrintStyle.standard("Removing legacy embedding cache files...")
+    # can be millions of files, don't block startup
+    threading.Thread(target=shutil.rmtree, args=(legacy, True), daemon=True).start()
+
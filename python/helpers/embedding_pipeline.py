@@ -0,0 +1,45 @@
+import asyncio
+from typing import Callable, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_CONCURRENCY = 4
+
+ProgressCallback = Callable[[int, int], None]  # (embedded, total)
+
+
+async def embed_texts(
+    embedder: Embeddings,
+    texts: Sequence[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_progress: ProgressCallback | None = None,
+) -> list[list[float]]:
+    """
+    Embed texts in batches with at most `concurrency` requests in flight.
+
+    Vectors are returned in input order. With a cache-backed embedder every
+    finished batch is persisted by the cache, so a run that is interrupted
+    resumes from the batches already embedded.
+    """
+    total = len(texts)
+    if not total:
+        return []
+    batch_size = max(1, batch_size)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    vectors: list[list[float]] = [[] for _ in range(total)]
+    done = 0
+
+    async def run(start: int):
+        nonlocal done
+        batch = list(texts[start : start + batch_size])
+        async with semaphore:
+            result = await embedder.aembed_documents(batch)
+        vectors[start : start + len(batch)] = result
+        done += len(batch)
+        if on_progress:
+            on_progress(done, total)
+
+    await asyncio.gather(*(run(start) for start in range(0, total, batch_size)))
+    return vectors
@@ -1,6 +1,6 @@
 from abc import abstractmethod
 from typing import Any
-from python.helpers import extract_tools, files
+from python.helpers import extract_tools, files, fs_cache, profiler
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -10,7 +10,11 @@ if TYPE_CHECKING:
 DEFAULT_EXTENSIONS_FOLDER = "python/extensions"
 USER_EXTENSIONS_FOLDER = "usr/extensions"
 
-_cache: dict[str, list[type["Extension"]]] = {}
+# cached lookups are re-validated against the file system at most this often (seconds)
+CHECK_INTERVAL = 1.0
+
+_cache: dict[str, fs_cache.Entry] = {}  # folder -> extension classes
+_chains: dict[tuple, fs_cache.Entry] = {}  # (profile, project, extension point) -> classes
 
 
 class Extension:
@@ -27,7 +31,33 @@ class Extension:
 async def call_extensions(
     extension_point: str, agent: "Agent|None" = None, **kwargs
 ) -> Any:
-    from python.helpers import projects, subagents
+    # execute unique extensions
+    for cls in get_extension_classes(extension_point, agent):
+        with profiler.span("extension", f"{extension_point}/{_get_file_from_module(cls.__module__)}"):
+            await cls(agent=agent).execute(**kwargs)
+
+
+def get_extension_classes(
+    extension_point: str, agent: "Agent|None" = None
+) -> list[type["Extension"]]:
+    """Ordered extension classes for an extension point, resolved once per profile and project."""
+    from python.helpers import projects
+
+    profile = agent.config.profile if agent else ""
+    project = (projects.get_context_project_name(agent.context) or "") if agent else ""
+    return fs_cache.cached(
+        _chains,
+        (profile, project, extension_point),
+        lambda: None,  # re-resolve after the interval, folders check their own files
+        lambda: _resolve_extensions(extension_point, agent),
+        CHECK_INTERVAL,
+    )
+
+
+def _resolve_extensions(
+    extension_point: str, agent: "Agent|None"
+) -> list[type["Extension"]]:
+    from python.helpers import subagents
 
     # search for extension folders in all agent's paths
     paths = subagents.get_paths(agent, "extensions", extension_point, default_root="python")
@@ -39,28 +69,26 @@ async def call_extensions(
         file = _get_file_from_module(cls.__module__)
         if file not in unique:
             unique[file] = cls
-    classes = sorted(
+    return sorted(
         unique.values(), key=lambda cls: _get_file_from_module(cls.__module__)
     )
 
-    # execute unique extensions
-    for cls in classes:
-        await cls(agent=agent).execute(**kwargs)
-
 
 def _get_file_from_module(module_name: str) -> str:
     return module_name.split(".")[-1]
 
 
 def _get_extensions(folder: str):
-    global _cache
     folder = files.get_abs_path(folder)
-    if folder in _cache:
-        classes = _cache[folder]
-    else:
-        if not files.exists(folder):
-            return []
-        classes = extract_tools.load_classes_from_folder(folder, "*", Extension)
-        _cache[folder] = classes
-
-    return classes
+    # modules are imported again only when a file in the folder is added, removed or changed
+    return fs_cache.cached(
+        _cache,
+        folder,
+        lambda: fs_cache.dir_stamp(folder, ".py"),
+        lambda: (
+            extract_tools.load_classes_from_folder(folder, "*", Extension)
+            if files.exists(folder)
+            else []
+        ),
+        CHECK_INTERVAL,
+    )
@@ -118,3 +118,20 @@ def load_classes_from_file(file: str, base_class: type[T], one_per_file: bool =
                 break
                 
     return classes
+
+
+_file_classes: dict[tuple, tuple[int | None, list]] = {}
+
+def get_classes_from_file(file: str, base_class: type[T], one_per_file: bool = True) -> list[type[T]]:
+    """Like load_classes_from_file, but the module is only executed again when the file changes."""
+    from python.helpers import fs_cache
+
+    abs_path = get_abs_path(file)
+    key = (abs_path, base_class, one_per_file)
+    mtime = fs_cache.mtime(abs_path)
+    hit = _file_classes.get(key)
+    if hit and mtime is not None and hit[0] == mtime:
+        return hit[1]
+    classes = load_classes_from_file(abs_path, base_class, one_per_file)
+    _file_classes[key] = (mtime, classes)
+    return classes
@@ -2,14 +2,53 @@ import os
 from pathlib import Path
 import shutil
 import base64
-import subprocess
-from typing import Dict, List, Tuple, Any
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any
 from python.helpers.security import safe_filename
 from datetime import datetime
 
 from python.helpers import files
 from python.helpers.print_style import PrintStyle
 
+PAGE_SIZE = 1000  # entries per listing page by default
+MAX_PAGE_SIZE = 10000  # largest page a client can ask for
+SNAPSHOT_TTL = 2.0  # seconds a directory snapshot is reused while the directory's mtime is unchanged
+MAX_SNAPSHOTS = 16  # directory snapshots kept, least recently used go first
+SORT_FIELDS = ("name", "size", "date")
+
+
+@dataclass(slots=True)
+class _Entry:
+    name: str
+    is_dir: bool
+    size: int
+    mtime: float
+    symlink_target: Optional[str] = None
+
+
+@dataclass
+class _Snapshot:
+    """Stats of one directory, read once with os.scandir and shared by all pages."""
+
+    mtime_ns: int
+    created: float
+    entries: List[_Entry]
+    orders: Dict[Tuple[str, bool], List[_Entry]] = field(default_factory=dict)
+
+
+_snapshots: "OrderedDict[str, _Snapshot]" = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def clear_snapshots():
+    """Forget cached directory stats, called after the browser changes files."""
+    with _snapshots_lock:
+        _snapshots.clear()
+
 
 class FileBrowser:
     ALLOWED_EXTENSIONS = {
@@ -49,6 +88,7 @@ class FileBrowser:
             # Save file
             with open(target_file, "wb") as file:
                 file.write(base64.b64decode(base64_content))
+            clear_snapshots()
             return True
         except Exception as e:
             PrintStyle.error(f"Error saving file {filename}: {e}")
@@ -83,6 +123,7 @@ class FileBrowser:
                     PrintStyle.error(f"Error saving file {file.filename}: {e}")
                     failed.append(file.filename)
 
+            clear_snapshots()
             return successful, failed
 
         except Exception as e:
@@ -102,6 +143,7 @@ class FileBrowser:
                     os.remove(full_path)
                 elif os.path.isdir(full_path):
                     shutil.rmtree(full_path)
+                clear_snapshots()
                 return True
 
             return False
@@ -132,6 +174,7 @@ class FileBrowser:
                 raise FileExistsError("Target already exists")
 
             os.rename(full_path, new_path)
+            clear_snapshots()
             return True
         except Exception as e:
             PrintStyle.error(f"Error renaming {file_path}: {e}")
@@ -155,6 +198,7 @@ class FileBrowser:
                 raise FileExistsError("Folder already exists")
 
             os.makedirs(target_dir, exist_ok=False)
+            clear_snapshots()
             return True
         except Exception as e:
             PrintStyle.error(f"Error creating folder {folder_name}: {e}")
@@ -177,6 +221,7 @@ class FileBrowser:
             os.makedirs(full_path.parent, exist_ok=True)
             with open(full_path, "w", encoding="utf-8") as file:
                 file.write(content)
+            clear_snapshots()
             return True
         except Exception as e:
             PrintStyle.error(f"Error saving file {file_path}: {e}")
@@ -197,148 +242,173 @@ class FileBrowser:
     def _get_file_extension(self, filename: str) -> str:
         return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
 
-    def _get_files_via_ls(self, full_path: Path) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Get files and folders using ls command for better error handling"""
-        files: List[Dict[str, Any]] = []
-        folders: List[Dict[str, Any]] = []
-
+    def _scan_directory(self, full_path: Path) -> List[_Entry]:
+        """Entries of a directory with their stats, symlinks resolved, inaccessible entries skipped."""
+        entries: List[_Entry] = []
         try:
-            # Use ls command to get directory listing
-            result = subprocess.run(
-                ['ls', '-la', str(full_path)],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                PrintStyle.error(f"ls command failed: {result.stderr}")
-                return files, folders
-
-            # Parse ls output (skip first line which is "total X")
-            lines = result.stdout.strip().split('\n')
-            if len(lines) <= 1:
-                return files, folders
-
-            for line in lines[1:]:  # Skip the "total" line
-                try:
-                    # Skip current and parent directory entries
-                    if line.endswith(' .') or line.endswith(' ..'):
-                        continue
-
-                    # Parse ls -la output format
-                    parts = line.split()
-                    if len(parts) < 9:
-                        continue
-
-                    # Check if this is a symlink (permissions start with 'l')
-                    permissions = parts[0]
-                    is_symlink = permissions.startswith('l')
-
-                    if is_symlink:
-                        # For symlinks, extract the name before the '->' arrow
-                        full_name_part = ' '.join(parts[8:])
-                        if ' -> ' in full_name_part:
-                            filename = full_name_part.split(' -> ')[0]
-                            symlink_target = full_name_part.split(' -> ')[1]
-                        else:
-                            filename = full_name_part
-                            symlink_target = None
-                    else:
-                        filename = ' '.join(parts[8:])  # Handle filenames with spaces
-                        symlink_target = None
-
-                    if not filename:
-                        continue
-
-                    # Get full path for this entry
-                    entry_path = full_path / filename
-
+            with os.scandir(full_path) as iterator:
+                for item in iterator:
                     try:
-                        stat_info = entry_path.stat()
-
-                        entry_data: Dict[str, Any] = {
-                            "name": filename,
-                            "path": str(entry_path.relative_to(self.base_dir)),
-                            "modified": datetime.fromtimestamp(stat_info.st_mtime).isoformat()
-                        }
-
-                        # Add symlink information if this is a symlink
-                        if is_symlink and symlink_target:
-                            entry_data["symlink_target"] = symlink_target
-                            entry_data["is_symlink"] = True
-
-                        if entry_path.is_file():
-                            entry_data.update({
-                                "type": self._get_file_type(filename),
-                                "size": stat_info.st_size,
-                                "is_dir": False
-                            })
-                            files.append(entry_data)
-                        elif entry_path.is_dir():
-                            entry_data.update({
-                                "type": "folder",
-                                "size": 0,  # Directories show as 0 bytes
-                                "is_dir": True
-                            })
-                            folders.append(entry_data)
-
-                    except (OSError, PermissionError, FileNotFoundError) as e:
+                        stat_info = item.stat()  # follows symlinks like the entry's type
+                        is_dir = item.is_dir()
+                        if not is_dir and not item.is_file():
+                            continue
+                        entries.append(
+                            _Entry(
+                                name=item.name,
+                                is_dir=is_dir,
+                                size=0 if is_dir else stat_info.st_size,  # Directories show as 0 bytes
+                                mtime=stat_info.st_mtime,
+                                symlink_target=os.readlink(item.path) if item.is_symlink() else None,
+                            )
+                        )
+                    except OSError as e:
                         # Log error but continue with other files
-                        PrintStyle.warning(f"No access to {filename}: {e}")
-                        continue
-
-                    if len(files) + len(folders) > 10000:
-                        break
-
-                except Exception as e:
-                    # Log error and continue with next line
-                    PrintStyle.error(f"Error parsing ls line '{line}': {e}")
-                    continue
-
-        except subprocess.TimeoutExpired:
-            PrintStyle.error("ls command timed out")
-        except Exception as e:
-            PrintStyle.error(f"Error running ls command: {e}")
-
-        return files, folders
-
-    def get_files(self, current_path: str = "") -> Dict:
+                        PrintStyle.warning(f"No access to {item.name}: {e}")
+        except OSError as e:
+            PrintStyle.error(f"Error listing directory {full_path}: {e}")
+        return entries
+
+    def _get_snapshot(self, full_path: Path) -> _Snapshot:
+        key = str(full_path)
+        mtime_ns = os.stat(full_path).st_mtime_ns
+        with _snapshots_lock:
+            snapshot = _snapshots.get(key)
+            if snapshot is not None:
+                _snapshots.move_to_end(key)
+        # sizes and dates of files change without touching the directory, so snapshots also expire
+        if (
+            snapshot is None
+            or snapshot.mtime_ns != mtime_ns
+            or time.monotonic() - snapshot.created > SNAPSHOT_TTL
+        ):
+            snapshot = _Snapshot(mtime_ns=mtime_ns, created=time.monotonic(), entries=self._scan_directory(full_path))
+            with _snapshots_lock:
+                _snapshots[key] = snapshot
+                while len(_snapshots) > MAX_SNAPSHOTS:
+                    _snapshots.popitem(last=False)
+        return snapshot
+
+    @staticmethod
+    def _sort_value(entry: _Entry, sort: str) -> Any:
+        if sort == "size":
+            return entry.size
+        if sort == "date":
+            return entry.mtime
+        return entry.name.casefold()
+
+    def _sorted_entries(self, snapshot: _Snapshot, sort: str, descending: bool) -> List[_Entry]:
+        # folders first, then by the sort field with the name as tie breaker
+        order = snapshot.orders.get((sort, descending))
+        if order is None:
+            key = lambda e: (self._sort_value(e, sort), e.name)
+            folders = sorted((e for e in snapshot.entries if e.is_dir), key=key, reverse=descending)
+            files_ = sorted((e for e in snapshot.entries if not e.is_dir), key=key, reverse=descending)
+            order = snapshot.orders[(sort, descending)] = folders + files_
+        return order
+
+    def _cursor_key(self, entry: _Entry, sort: str) -> list:
+        return [0 if entry.is_dir else 1, self._sort_value(entry, sort), entry.name]
+
+    @staticmethod
+    def _is_after(key: list, cursor: list, descending: bool) -> bool:
+        if key[0] != cursor[0]:
+            return key[0] > cursor[0]
+        rest, cursor_rest = tuple(key[1:]), tuple(cursor[1:])
+        return rest < cursor_rest if descending else rest > cursor_rest
+
+    def _entry_data(self, full_path: Path, entry: _Entry) -> Dict[str, Any]:
+        entry_data: Dict[str, Any] = {
+            "name": entry.name,
+            "path": str((full_path / entry.name).relative_to(self.base_dir)),
+            "modified": datetime.fromtimestamp(entry.mtime).isoformat(),
+        }
+
+        # Add symlink information if this is a symlink
+        if entry.symlink_target:
+            entry_data["symlink_target"] = entry.symlink_target
+            entry_data["is_symlink"] = True
+
+        entry_data.update({
+            "type": "folder" if entry.is_dir else self._get_file_type(entry.name),
+            "size": entry.size,
+            "is_dir": entry.is_dir,
+        })
+        return entry_data
+
+    def get_files(
+        self,
+        current_path: str = "",
+        cursor: str = "",
+        limit: int = PAGE_SIZE,
+        sort: str = "name",
+        direction: str = "asc",
+        filter: str = "",
+    ) -> Dict:
+        """
+        One page of a directory listing, folders first.
+
+        Pages continue after the cursor of the previous page (its `next_cursor`),
+        so entries added or removed meanwhile do not shift later pages. `filter`
+        keeps entries whose name contains it, case-insensitive.
+        """
         try:
             # Resolve the full path while preventing directory traversal
             full_path = (self.base_dir / current_path).resolve()
             if not str(full_path).startswith(str(self.base_dir)):
                 raise ValueError("Invalid path")
 
-            # Use ls command instead of os.scandir for better error handling
-            files, folders = self._get_files_via_ls(full_path)
+            sort = sort if sort in SORT_FIELDS else "name"
+            descending = direction == "desc"
+            limit = max(1, min(int(limit or PAGE_SIZE), MAX_PAGE_SIZE))
+
+            entries = self._sorted_entries(self._get_snapshot(full_path), sort, descending)
+            if filter:
+                needle = filter.casefold()
+                entries = [e for e in entries if needle in e.name.casefold()]
+            total = len(entries)
+
+            # binary search for the first entry after the cursor
+            start = 0
+            if cursor:
+                cursor_key = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+                low, high = 0, total
+                while low < high:
+                    middle = (low + high) // 2
+                    if self._is_after(self._cursor_key(entries[middle], sort), cursor_key, descending):
+                        high = middle
+                    else:
+                        low = middle + 1
+                start = low
 
-            # Combine folders and files, folders first
-            all_entries = folders + files
+            page = entries[start : start + limit]
+            next_cursor = None
+            if start + limit < total:
+                last_key = json.dumps(self._cursor_key(page[-1], sort))
+                next_cursor = base64.urlsafe_b64encode(last_key.encode()).decode()
 
             # Get parent directory path if not at root
             parent_path = ""
             if current_path:
                 try:
-                    # Get the absolute path of current directory
-                    current_abs = (self.base_dir / current_path).resolve()
-
                     # parent_path is empty only if we're already at root
-                    if str(current_abs) != str(self.base_dir):
+                    if str(full_path) != str(self.base_dir):
                         parent_path = str(Path(current_path).parent)
 
                 except Exception:
                     parent_path = ""
 
             return {
-                "entries": all_entries,
+                "entries": [self._entry_data(full_path, e) for e in page],
                 "current_path": current_path,
-                "parent_path": parent_path
+                "parent_path": parent_path,
+                "total": total,
+                "next_cursor": next_cursor,
             }
 
         except Exception as e:
             PrintStyle.error(f"Error reading directory: {e}")
-            return {"entries": [], "current_path": "", "parent_path": ""}
+            return {"entries": [], "current_path": "", "parent_path": "", "total": 0, "next_cursor": None}
 
     def get_full_path(self, file_path: str, allow_dir: bool = False) -> str:
         """Get full file path if it exists and is within base_dir"""
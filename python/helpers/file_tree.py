@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from collections import deque
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 import os
+import threading
+import time
 from typing import Any, Callable, Iterable, Literal, Optional, Sequence
 
 from pathspec import PathSpec
@@ -21,6 +23,12 @@ OUTPUT_MODE_STRING = "string"
 OUTPUT_MODE_FLAT = "flat"
 OUTPUT_MODE_NESTED = "nested"
 
+# directory listings and rendered trees are reused while the stats they were built from are unchanged
+MAX_CACHED_LISTINGS = 20_000  # directories, least recently used go first
+MAX_CACHED_TREES = 32  # rendered string trees, least recently used go first
+MAX_CACHED_SPECS = 64  # compiled ignore rules
+RACY_WINDOW_NS = 2_000_000_000  # entries changed this recently are not cached, the mtime may not have ticked yet
+
 
 def file_tree(
     relative_path: str,
@@ -71,6 +79,9 @@ def file_tree(
 
     Notes:
         * The utility is synchronous; avoid calling from latency-sensitive async loops.
+        * Directory listings (with ignore rules applied) are cached until the directory's mtime changes,
+          so only changed subtrees are scanned again. String output is returned from cache while no
+          directory or entry it was built from changed, which only costs a stat per entry.
         * The ASCII renderer walks the established tree depth-first so connectors reflect parent/child structure,
           while traversal and limit calculations remain breadth-first by depth. When ``max_lines`` is set, the number
           of non-comment entries (excluding the root banner) never exceeds that limit; informational summary comments
@@ -103,9 +114,27 @@ def file_tree(
     if max_lines < 0:
         raise ValueError("max_lines must be >= 0")
 
-    ignore_spec = _resolve_ignore_patterns(ignore, abs_root)
+    ignore_lines = _resolve_ignore_lines(ignore, abs_root)
+    scan = _Scan(
+        root=abs_root,
+        ignore_spec=_compile_ignore(ignore_lines),
+        ignore_key=ignore_lines,
+        started_ns=time.time_ns(),
+    )
+    ignore_spec = scan.ignore_spec
+
+    tree_key = None
+    if output_mode == OUTPUT_MODE_STRING:
+        tree_key = (abs_root, output_root, max_depth, max_lines, folders_first, max_folders, max_files, sort, ignore_lines)
+        with _lock:
+            cached_tree = _trees.get(tree_key)
+            if cached_tree is not None:
+                _trees.move_to_end(tree_key)
+        if cached_tree is not None and _unchanged(cached_tree[0]):
+            return cached_tree[1]
 
     root_stat = os.stat(abs_root, follow_symlinks=False)
+    scan.inputs.append((abs_root, False, root_stat.st_mtime_ns, root_stat.st_ctime_ns))
     root_name = os.path.basename(os.path.normpath(abs_root)) or os.path.basename(abs_root)
     root_node = _TreeEntry(
         name=root_name,
@@ -122,10 +151,11 @@ def file_tree(
     nodes_in_order: list[_TreeEntry] = []
     rendered_count = 0
     limit_reached = False
-    visibility_cache: dict[str, bool] = {}
+    visibility_cache: dict[str, tuple[bool, tuple[str, ...]]] = {}
 
-    def make_entry(entry: os.DirEntry, parent: _TreeEntry, level: int, item_type: Literal["file", "folder"]) -> _TreeEntry:
+    def make_entry(entry: _Child, parent: _TreeEntry, level: int, item_type: Literal["file", "folder"]) -> _TreeEntry:
         stat = entry.stat(follow_symlinks=False)
+        scan.inputs.append((entry.path, False, stat.st_mtime_ns, stat.st_ctime_ns))
         rel_path = os.path.relpath(entry.path, abs_root)
         rel_posix = _normalize_relative_path(rel_path)
         return _TreeEntry(
@@ -146,10 +176,9 @@ def file_tree(
             continue
 
         remaining_depth = max_depth - level if max_depth else -1
-        folders, files = _list_directory_children(
+        folders, files = _cached_children(
+            scan,
             current_dir,
-            abs_root,
-            ignore_spec,
             max_depth_remaining=remaining_depth,
             cache=visibility_cache,
         )
@@ -215,8 +244,7 @@ def file_tree(
             summary = _create_folder_unprocessed_comment(
                 folder_node,
                 folder_path,
-                abs_root,
-                ignore_spec,
+                scan,
             )
             if summary is None:
                 continue
@@ -250,7 +278,13 @@ def file_tree(
         lines = [root_line]
         for node in iter_visible():
             lines.append(node.text)
-        return "\n".join(lines)
+        result = "\n".join(lines)
+        if tree_key is not None and not _is_racy(scan.inputs, scan.started_ns):
+            with _lock:
+                _trees[tree_key] = (tuple(scan.inputs), result)
+                while len(_trees) > MAX_CACHED_TREES:
+                    _trees.popitem(last=False)
+        return result
 
     if output_mode == OUTPUT_MODE_FLAT:
         return [make_root_item(None)] + _build_tree_items_flat(list(iter_visible()))
@@ -283,6 +317,100 @@ class _TreeEntry:
         }
 
 
+@dataclass(slots=True, frozen=True)
+class _Child:
+    """Directory entry of a cached listing, stat() always reads the current state."""
+
+    name: str
+    path: str
+
+    def stat(self, follow_symlinks: bool = False) -> os.stat_result:
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+
+@dataclass(slots=True)
+class _Listing:
+    stamp: tuple  # stamps of the directory and of the ignored folders probed for visible entries
+    folders: list[_Child]
+    files: list[_Child]
+
+
+@dataclass(slots=True)
+class _Scan:
+    root: str
+    ignore_spec: Optional[PathSpec]
+    ignore_key: Optional[tuple[str, ...]]
+    started_ns: int
+    inputs: list = field(default_factory=list)  # stamps of everything the tree was built from
+
+
+_lock = threading.Lock()
+_listings: OrderedDict[tuple, _Listing] = OrderedDict()
+_trees: OrderedDict[tuple, tuple[tuple, str]] = OrderedDict()
+_specs: dict[tuple[str, ...], PathSpec] = {}
+
+
+def clear_cache() -> None:
+    with _lock:
+        _listings.clear()
+        _trees.clear()
+        _specs.clear()
+
+
+def _stamp(path: str, follow_symlinks: bool = True) -> Optional[tuple]:
+    try:
+        stat = os.stat(path, follow_symlinks=follow_symlinks)
+    except OSError:
+        return None
+    return (path, follow_symlinks, stat.st_mtime_ns, stat.st_ctime_ns)
+
+
+def _unchanged(stamps: Iterable[tuple]) -> bool:
+    return all(_stamp(stamp[0], stamp[1]) == stamp for stamp in stamps)
+
+
+def _is_racy(stamps: Iterable[Optional[tuple]], started_ns: int) -> bool:
+    # a change right after the scan could keep the same mtime, such results are not cached
+    return any(stamp is None or stamp[2] >= started_ns - RACY_WINDOW_NS for stamp in stamps)
+
+
+def _cached_children(
+    scan: _Scan,
+    directory: str,
+    *,
+    max_depth_remaining: int,
+    cache: dict[str, tuple[bool, tuple[str, ...]]],
+) -> tuple[list[_Child], list[_Child]]:
+    """_list_directory_children, reused while the directory and the probed ignored folders are unchanged."""
+    key = (scan.root, scan.ignore_key, directory, max_depth_remaining if scan.ignore_spec else 0)
+    with _lock:
+        listing = _listings.get(key)
+        if listing is not None:
+            _listings.move_to_end(key)
+    if listing is not None and _unchanged(listing.stamp):
+        scan.inputs.extend(listing.stamp)
+        return listing.folders, listing.files
+
+    before = _stamp(directory)
+    probed: list[str] = []
+    folders, files = _list_directory_children(
+        directory,
+        scan.root,
+        scan.ignore_spec,
+        max_depth_remaining=max_depth_remaining,
+        cache=cache,
+        visited=probed,
+    )
+    stamp = (before, *(_stamp(path) for path in probed))
+    scan.inputs.extend(stamp)
+    if not _is_racy(stamp, scan.started_ns):
+        with _lock:
+            _listings[key] = _Listing(stamp=stamp, folders=folders, files=files)
+            while len(_listings) > MAX_CACHED_LISTINGS:
+                _listings.popitem(last=False)
+    return folders, files
+
+
 def _normalize_relative_path(path: str) -> str:
     normalized = path.replace(os.sep, "/")
     if normalized in {".", ""}:
@@ -296,16 +424,21 @@ def _directory_has_visible_entries(
     directory: str,
     root_abs_path: str,
     ignore_spec: PathSpec,
-    cache: dict[str, bool],
+    cache: dict[str, tuple[bool, tuple[str, ...]]],
     max_depth_remaining: int,
+    visited: list[str],
 ) -> bool:
     if max_depth_remaining == 0:
         return False
 
     cached = cache.get(directory)
     if cached is not None:
-        return cached
+        visited.extend(cached[1])
+        return cached[0]
 
+    # folders scanned for the answer, a change in any of them can change it
+    scanned: list[str] = [directory]
+    visible = False
     try:
         with os.scandir(directory) as iterator:
             for entry in iterator:
@@ -325,22 +458,23 @@ def _directory_has_visible_entries(
                             ignore_spec,
                             cache,
                             next_depth,
+                            scanned,
                         ):
-                            cache[directory] = True
-                            return True
+                            visible = True
+                            break
                         continue
                 else:
                     if ignore_spec.match_file(rel_posix):
                         continue
 
-                cache[directory] = True
-                return True
+                visible = True
+                break
     except FileNotFoundError:
-        cache[directory] = False
-        return False
+        pass
 
-    cache[directory] = False
-    return False
+    cache[directory] = (visible, tuple(scanned))
+    visited.extend(scanned)
+    return visible
 
 
 def _create_summary_comment(parent: _TreeEntry, noun: str, count: int) -> _TreeEntry:
@@ -391,14 +525,12 @@ def _create_global_limit_comment(parent: _TreeEntry, hidden_children: Sequence[_
 def _create_folder_unprocessed_comment(
     folder_node: _TreeEntry,
     folder_path: str,
-    abs_root: str,
-    ignore_spec: Optional[PathSpec],
+    scan: _Scan,
 ) -> Optional[_TreeEntry]:
     try:
-        folders, files = _list_directory_children(
+        folders, files = _cached_children(
+            scan,
             folder_path,
-            abs_root,
-            ignore_spec,
             max_depth_remaining=-1,
             cache={},
         )
@@ -470,6 +602,24 @@ def _refresh_render_metadata(node: _TreeEntry) -> None:
 
 
 def _resolve_ignore_patterns(ignore: str | None, root_abs_path: str) -> Optional[PathSpec]:
+    return _compile_ignore(_resolve_ignore_lines(ignore, root_abs_path))
+
+
+def _compile_ignore(lines: Optional[tuple[str, ...]]) -> Optional[PathSpec]:
+    if not lines:
+        return None
+    with _lock:
+        spec = _specs.get(lines)
+    if spec is None:
+        spec = PathSpec.from_lines("gitwildmatch", lines)
+        with _lock:
+            if len(_specs) >= MAX_CACHED_SPECS:
+                _specs.clear()
+            _specs[lines] = spec
+    return spec
+
+
+def _resolve_ignore_lines(ignore: str | None, root_abs_path: str) -> Optional[tuple[str, ...]]:
     if ignore is None:
         return None
 
@@ -493,16 +643,13 @@ def _resolve_ignore_patterns(ignore: str | None, root_abs_path: str) -> Optional
     else:
         content = ignore
 
-    lines = [
+    lines = tuple(
         line.strip()
         for line in content.splitlines()
         if line.strip() and not line.strip().startswith("#")
-    ]
-
-    if not lines:
-        return None
+    )
 
-    return PathSpec.from_lines("gitwildmatch", lines)
+    return lines or None
 
 
 def _list_directory_children(
@@ -511,10 +658,13 @@ def _list_directory_children(
     ignore_spec: Optional[PathSpec],
     *,
     max_depth_remaining: int,
-    cache: dict[str, bool],
-) -> tuple[list[os.DirEntry], list[os.DirEntry]]:
-    folders: list[os.DirEntry] = []
-    files: list[os.DirEntry] = []
+    cache: dict[str, tuple[bool, tuple[str, ...]]],
+    visited: Optional[list[str]] = None,
+) -> tuple[list[_Child], list[_Child]]:
+    folders: list[_Child] = []
+    files: list[_Child] = []
+    if visited is None:
+        visited = []
 
     try:
         with os.scandir(directory) as iterator:
@@ -535,17 +685,18 @@ def _list_directory_children(
                                 ignore_spec,
                                 cache,
                                 max_depth_remaining - 1,
+                                visited,
                             ):
-                                folders.append(entry)
+                                folders.append(_Child(entry.name, entry.path))
                             continue
                     else:
                         if ignore_spec.match_file(rel_posix):
                             continue
 
                 if is_directory:
-                    folders.append(entry)
+                    folders.append(_Child(entry.name, entry.path))
                 else:
-                    files.append(entry)
+                    files.append(_Child(entry.name, entry.path))
     except FileNotFoundError:
         return ([], [])
 
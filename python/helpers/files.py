@@ -8,6 +8,7 @@ import re
 import base64
 import shutil
 import tempfile
+import time
 from typing import Any, Literal
 import zipfile
 import importlib
@@ -33,23 +34,15 @@ def load_plugin_variables(
     if backup_dirs is None:
         backup_dirs = []
 
-    try:
-        # Create filename and directories list
-        plugin_filename = basename(file, ".md") + ".py"
-        directories = [dirname(file)] + backup_dirs
-        plugin_file = find_file_in_dirs(plugin_filename, directories)
-    except FileNotFoundError:
-        plugin_file = None
-
-    if plugin_file and exists(plugin_file):
+    # Create filename and directories list
+    directories = [dirname(file)] + backup_dirs
 
-        from python.helpers import extract_tools
+    from python.helpers import prompt_cache
 
-        classes = extract_tools.load_classes_from_file(
-            plugin_file, VariablesPlugin, one_per_file=False
-        )
-        for cls in classes:
-            return cls().get_variables(file, backup_dirs, **kwargs)  # type: ignore < abstract class here is ok, it is always a subclass
+    # the plugin class is imported once and re-imported only when its file changes
+    cls = prompt_cache.get_plugin_class(file, directories)
+    if cls:
+        return cls().get_variables(file, backup_dirs, **kwargs)  # type: ignore < abstract class here is ok, it is always a subclass
 
         # load python code and extract variables variables from it
         # module = None
@@ -87,23 +80,22 @@ def parse_file(
     if _directories is None:
         _directories = []
 
-    # Find the file in the directories
-    absolute_path = find_file_in_dirs(_filename, _directories)
+    from python.helpers import prompt_cache
 
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
+    # Find the file in the directories, resolved and read once until it changes
+    absolute_path = prompt_cache.find_file(_filename, _directories)
+    template = prompt_cache.read_template(absolute_path, _encoding)
+    start = time.perf_counter()
 
-    is_json = is_full_json_template(content)
-    content = remove_code_fences(content)
+    is_json = template.is_json
+    content = remove_code_fences(template.content)
     variables = load_plugin_variables(absolute_path, _directories, **kwargs) or {}  # type: ignore
     variables.update(kwargs)
     if is_json:
         content = replace_placeholders_json(content, **variables)
         obj = json.loads(content)
         # obj = replace_placeholders_dict(obj, **variables)
-        return obj
+        result = obj
     else:
         content = replace_placeholders_text(content, **variables)
         # Process include statements
@@ -113,7 +105,9 @@ def parse_file(
             _directories,
             **kwargs,
         )
-        return content
+        result = content
+    prompt_cache.record_render(absolute_path, time.perf_counter() - start)
+    return result
 
 
 def read_prompt_file(
@@ -128,19 +122,20 @@ def read_prompt_file(
         _file = os.path.basename(_file)
         _directories = [folder_path] + _directories
 
-    # Find the file in the directories
-    absolute_path = find_file_in_dirs(_file, _directories)
+    from python.helpers import prompt_cache
 
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
+    # Find the file in the directories, resolved and read once until it changes
+    absolute_path = prompt_cache.find_file(_file, _directories)
+    template = prompt_cache.read_template(absolute_path, _encoding)
+    start = time.perf_counter()
+    content = template.content
 
     variables = load_plugin_variables(_file, _directories, **kwargs) or {}  # type: ignore
     variables.update(kwargs)
 
     # evaluate conditions
-    content = evaluate_text_conditions(content, **variables)
+    if template.has_conditions:
+        content = evaluate_text_conditions(content, **variables)
 
     # Replace placeholders with values from kwargs
     content = replace_placeholders_text(content, **variables)
@@ -153,13 +148,19 @@ def read_prompt_file(
         **kwargs,
     )
 
+    prompt_cache.record_render(absolute_path, time.perf_counter() - start)
     return content
 
 
+_IF_PATTERN = re.compile(r"{{\s*if\s+(.*?)}}", flags=re.DOTALL)
+_IF_TOKEN_PATTERN = re.compile(r"{{\s*(if\b.*?|endif)\s*}}", flags=re.DOTALL)
+_INCLUDE_PATTERN = re.compile(r"{{\s*include\s*['\"](.*?)['\"]\s*}}")
+
+
 def evaluate_text_conditions(_content: str, **kwargs):
     # search for {{if ...}} ... {{endif}} blocks and evaluate conditions with nesting support
-    if_pattern = re.compile(r"{{\s*if\s+(.*?)}}", flags=re.DOTALL)
-    token_pattern = re.compile(r"{{\s*(if\b.*?|endif)\s*}}", flags=re.DOTALL)
+    if_pattern = _IF_PATTERN
+    token_pattern = _IF_TOKEN_PATTERN
 
     def _process(text: str) -> str:
         m_if = if_pattern.search(text)
@@ -316,7 +317,9 @@ def replace_placeholders_dict(_content: dict, **kwargs):
 
 def process_includes(_content: str, _directories: list[str], **kwargs):
     # Regex to find {{ include 'path' }} or {{include'path'}}
-    include_pattern = re.compile(r"{{\s*include\s*['\"](.*?)['\"]\s*}}")
+    include_pattern = _INCLUDE_PATTERN
+    if "include" not in _content:
+        return _content
 
     def replace_include(match):
         include_path = match.group(1)
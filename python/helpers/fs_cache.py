@@ -0,0 +1,63 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Entry:
+    value: Any
+    stamp: Any  # file system state the value was built from
+    checked: float
+
+
+def cached(
+    cache: dict,
+    key: Any,
+    stamp: Callable[[], Any],
+    build: Callable[[], T],
+    interval: float,
+) -> T:
+    """
+    Memoize a value derived from files.
+
+    Within `interval` seconds of the last check the cached value is returned
+    without touching the file system. After that stamp() is compared with the
+    stamp the value was built from and the value is rebuilt when it differs.
+    A stamp of None always rebuilds.
+    """
+    now = time.monotonic()
+    entry = cache.get(key)
+    if entry and now - entry.checked < interval:
+        return entry.value
+    current = stamp()
+    if entry and entry.stamp == current and current is not None:
+        entry.checked = now
+        return entry.value
+    value = build()
+    cache[key] = Entry(value=value, stamp=current, checked=now)
+    return value
+
+
+def mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def dir_stamp(folder: str, suffix: str = "") -> tuple | None:
+    """Names and mtimes of the files in a folder, None if it does not exist."""
+    try:
+        with os.scandir(folder) as it:
+            return tuple(
+                sorted(
+                    (e.name, e.stat().st_mtime_ns)
+                    for e in it
+                    if e.name.endswith(suffix) and e.is_file()
+                )
+            )
+    except OSError:
+        return None
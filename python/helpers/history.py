@@ -79,10 +79,12 @@ class Record:
 
 
 class Message(Record):
-    def __init__(self, ai: bool, content: MessageContent, tokens: int = 0):
+    def __init__(
+        self, ai: bool, content: MessageContent, tokens: int = 0, summary: str = ""
+    ):
         self.ai = ai
         self.content = content
-        self.summary: str = ""
+        self.summary: str = summary
         self.tokens: int = tokens or self.calculate_tokens()
 
     def get_tokens(self) -> int:
@@ -122,29 +124,54 @@ class Message(Record):
     @staticmethod
     def from_dict(data: dict, history: "History"):
         content = data.get("content", "Content lost")
-        msg = Message(ai=data["ai"], content=content)
-        msg.summary = data.get("summary", "")
-        msg.tokens = data.get("tokens", 0)
-        return msg
+        # saved token counts are reused instead of tokenizing the content again
+        return Message(
+            ai=data["ai"],
+            content=content,
+            tokens=data.get("tokens", 0),
+            summary=data.get("summary", ""),
+        )
 
 
 class Topic(Record):
+    # token counts are running totals, mutate messages only through Topic methods
     def __init__(self, history: "History"):
         self.history = history
-        self.summary: str = ""
-        self.messages: list[Message] = []
+        self._summary: str = ""
+        self._summary_tokens = 0
+        self._messages: list[Message] = []
+        self._messages_tokens = 0
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @summary.setter
+    def summary(self, value: str):
+        self._summary = value
+        self._summary_tokens = tokens.approximate_tokens(value) if value else 0
+
+    @property
+    def messages(self) -> list[Message]:
+        return self._messages
+
+    @messages.setter
+    def messages(self, value: list[Message]):
+        self._messages = value
+        self._messages_tokens = sum(msg.get_tokens() for msg in value)
 
     def get_tokens(self):
-        if self.summary:
-            return tokens.approximate_tokens(self.summary)
+        if self._summary:
+            return self._summary_tokens
         else:
-            return sum(msg.get_tokens() for msg in self.messages)
+            return self._messages_tokens
 
     def add_message(
         self, ai: bool, content: MessageContent, tokens: int = 0
     ) -> Message:
         msg = Message(ai=ai, content=content, tokens=tokens)
-        self.messages.append(msg)
+        self._messages.append(msg)
+        self._messages_tokens += msg.get_tokens()
         return msg
 
     def output(self) -> list[OutputMessage]:
@@ -167,16 +194,15 @@ class Topic(Record):
         )
         large_msgs = []
         for m in (m for m in self.messages if not m.summary):
-            # TODO refactor this
-            out = m.output()
-            text = output_text(out)
+            # token counts are cached, only stringify messages that are over the limit
             tok = m.get_tokens()
-            leng = len(text)
             if tok > msg_max_size:
-                large_msgs.append((m, tok, leng, out))
+                out = m.output()
+                large_msgs.append((m, tok, len(output_text(out)), out))
         large_msgs.sort(key=lambda x: x[1], reverse=True)
         for msg, tok, leng, out in large_msgs:
             trim_to_chars = leng * (msg_max_size / tok)
+            self._messages_tokens -= tok
             # raw messages will be replaced as a whole, they would become invalid when truncated
             if _is_raw_message(out[0]["content"]):
                 msg.set_summary(
@@ -193,6 +219,7 @@ class Topic(Record):
                 )
                 msg.set_summary(_json_dumps(trunc))
 
+            self._messages_tokens += msg.get_tokens()
             return True
         return False
 
@@ -216,7 +243,10 @@ class Topic(Record):
             "fw.msg_summary.md", summary=summary
         )
         sum_msg = Message(False, sum_msg_content)
-        self.messages[1 : cnt_to_sum + 1] = [sum_msg]
+        self._messages[1 : cnt_to_sum + 1] = [sum_msg]
+        self._messages_tokens += sum_msg.get_tokens() - sum(
+            m.get_tokens() for m in msg_to_sum
+        )
         return True
 
     async def summarize_messages(self, messages: list[Message]):
@@ -249,14 +279,35 @@ class Topic(Record):
 class Bulk(Record):
     def __init__(self, history: "History"):
         self.history = history
-        self.summary: str = ""
-        self.records: list[Record] = []
+        self._summary: str = ""
+        self._summary_tokens = 0
+        self._records: list[Record] = []
+        self._records_tokens = 0
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @summary.setter
+    def summary(self, value: str):
+        self._summary = value
+        self._summary_tokens = tokens.approximate_tokens(value) if value else 0
+
+    @property
+    def records(self) -> list[Record]:
+        return self._records
+
+    @records.setter
+    def records(self, value: list[Record]):
+        # records of a bulk don't change once it is built
+        self._records = value
+        self._records_tokens = sum(r.get_tokens() for r in value)
 
     def get_tokens(self):
-        if self.summary:
-            return tokens.approximate_tokens(self.summary)
+        if self._summary:
+            return self._summary_tokens
         else:
-            return sum([r.get_tokens() for r in self.records])
+            return self._records_tokens
 
     def output(
         self, human_label: str = "user", ai_label: str = "ai"
@@ -300,11 +351,31 @@ class History(Record):
         from agent import Agent
 
         self.counter = 0
-        self.bulks: list[Bulk] = []
-        self.topics: list[Topic] = []
+        self._bulks: list[Bulk] = []
+        self._bulks_tokens = 0
+        self._topics: list[Topic] = []
+        self._topics_tokens = 0
         self.current = Topic(history=self)
         self.agent: Agent = agent
 
+    @property
+    def bulks(self) -> list[Bulk]:
+        return self._bulks
+
+    @bulks.setter
+    def bulks(self, value: list[Bulk]):
+        self._bulks = value
+        self._bulks_tokens = sum(b.get_tokens() for b in value)
+
+    @property
+    def topics(self) -> list[Topic]:
+        return self._topics
+
+    @topics.setter
+    def topics(self, value: list[Topic]):
+        self._topics = value
+        self._topics_tokens = sum(t.get_tokens() for t in value)
+
     def get_tokens(self) -> int:
         return (
             self.get_bulks_tokens()
@@ -318,10 +389,10 @@ class History(Record):
         return total > limit
 
     def get_bulks_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.bulks)
+        return self._bulks_tokens
 
     def get_topics_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.topics)
+        return self._topics_tokens
 
     def get_current_topic_tokens(self) -> int:
         return self.current.get_tokens()
@@ -334,7 +405,8 @@ class History(Record):
 
     def new_topic(self):
         if self.current.messages:
-            self.topics.append(self.current)
+            self._topics.append(self.current)
+            self._topics_tokens += self.current.get_tokens()
             self.current = Topic(history=self)
 
     def output(self) -> list[OutputMessage]:
@@ -420,12 +492,16 @@ class History(Record):
 
         # 1. first identify large messages and compress them cheaply
         for topic in self.topics:
+            before = topic.get_tokens()
             if topic.compress_large_messages(HISTORY_TOPIC_RATIO*LARGE_MESSAGE_TO_HISTORY_TOPIC_RATIO):
+                self._topics_tokens += topic.get_tokens() - before
                 return True
 
         # 2. summarize topics attention window one by one
         for topic in self.topics:
+            before = topic.get_tokens()
             if await topic.compress_attention(HISTORY_TOPIC_ATTENTION_COMPRESSION):
+                self._topics_tokens += topic.get_tokens() - before
                 return True
 
         # 3. move oldest topics to bulks in chunks
@@ -433,10 +509,12 @@ class History(Record):
             count = TOPICS_MERGE_COUNT if len(self.topics) >= TOPICS_MERGE_COUNT else 1
             chunk = self.topics[:count]
             bulk = Bulk(history=self)
-            bulk.records.extend(chunk)
+            bulk.records = list(chunk)
             await bulk.summarize()
-            self.bulks.append(bulk)
-            self.topics[:count] = []
+            self._bulks.append(bulk)
+            self._bulks_tokens += bulk.get_tokens()
+            self._topics[:count] = []
+            self._topics_tokens -= sum(t.get_tokens() for t in chunk)
             return True
         return False
 
@@ -445,7 +523,7 @@ class History(Record):
         compressed = await self.merge_bulks_by(BULK_MERGE_COUNT)
         # remove oldest bulk if necessary
         if not compressed:
-            self.bulks.pop(0)
+            self._bulks_tokens -= self._bulks.pop(0).get_tokens()
             return True
         return compressed
 
@@ -7,7 +7,7 @@ from python.helpers import errors
 from python.helpers import runtime
 
 
-SLEEP_TIME = 60
+SLEEP_TIME = 60  # longest sleep between ticks, the scheduler wakes up earlier when a task is due or changes
 
 keep_running = True
 pause_time = 0
@@ -31,7 +31,10 @@ async def run_loop():
                 await scheduler_tick()
             except Exception as e:
                 PrintStyle().error(errors.format_error(e))
-        await asyncio.sleep(SLEEP_TIME)  # TODO! - if we lower it under 1min, it can run a 5min job multiple times in it's target minute
+            # launches are claimed per planned time, waking up early never runs a task twice
+            await TaskScheduler.get().wait_for_next(SLEEP_TIME)
+        else:
+            await asyncio.sleep(SLEEP_TIME)
 
 
 async def scheduler_tick():
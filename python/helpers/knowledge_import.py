@@ -1,7 +1,9 @@
 import glob
 import os
 import hashlib
-from typing import Any, Dict, Literal, TypedDict
+import stat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Literal, NotRequired, TypedDict
 from langchain_community.document_loaders import (
     CSVLoader,
     PyPDFLoader,
@@ -13,10 +15,28 @@ from python.helpers.print_style import PrintStyle
 
 text_loader_kwargs = {"autodetect_encoding": True}
 
+# Mapping file extensions to corresponding loader classes
+# Note: Using TextLoader for JSON and MD to avoid parsing issues with consolidation
+file_types_loaders = {
+    "txt": TextLoader,
+    "pdf": PyPDFLoader,
+    "csv": CSVLoader,
+    "html": UnstructuredHTMLLoader,
+    "json": TextLoader,  # Use TextLoader for better consolidation compatibility
+    "md": TextLoader,    # Use TextLoader for better consolidation compatibility
+}
+
+# upper bound of processes used to load and split changed files
+MAX_LOAD_WORKERS = 8
+# upper bound of threads hashing files whose fingerprint changed, hashlib releases the GIL
+MAX_HASH_WORKERS = 8
+HASH_BLOCK_SIZE = 1024 * 1024
+
 
 class KnowledgeImport(TypedDict):
     file: str
     checksum: str
+    fingerprint: NotRequired[list[int]]  # size, mtime_ns and inode when checksum was taken
     ids: list[str]
     state: Literal["changed", "original", "removed"]
     documents: list[Any]
@@ -25,11 +45,40 @@ class KnowledgeImport(TypedDict):
 def calculate_checksum(file_path: str) -> str:
     hasher = hashlib.md5()
     with open(file_path, "rb") as f:
-        buf = f.read()
-        hasher.update(buf)
+        while buf := f.read(HASH_BLOCK_SIZE):
+            hasher.update(buf)
     return hasher.hexdigest()
 
 
+def fingerprint(st: os.stat_result) -> list[int]:
+    """Cheap identity of a file version, the checksum is only taken again when it changes."""
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def list_files(
+    knowledge_dir: str, filename_pattern: str = "**/*", recursive: bool = True
+) -> dict[str, os.stat_result]:
+    """Supported knowledge files in knowledge_dir with their stat results."""
+    result = {}
+    for file_path in glob.glob(os.path.join(knowledge_dir, filename_pattern), recursive=recursive):
+        if os.path.basename(file_path).startswith(".") or _extension(file_path) not in file_types_loaders:
+            continue
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            result[file_path] = st
+    return result
+
+
+def has_changes(index: Dict[str, KnowledgeImport], files: dict[str, os.stat_result]) -> bool:
+    """Whether any file was added, removed or modified since the index was written."""
+    if set(index) != set(files):
+        return True
+    return any(index[path].get("fingerprint") != fingerprint(st) for path, st in files.items())
+
+
 def load_knowledge(
     log_item: LogItem | None,
     knowledge_dir: str,
@@ -45,17 +94,6 @@ def load_knowledge(
     intelligent memory consolidation system.
     """
 
-    # Mapping file extensions to corresponding loader classes
-    # Note: Using TextLoader for JSON and MD to avoid parsing issues with consolidation
-    file_types_loaders = {
-        "txt": TextLoader,
-        "pdf": PyPDFLoader,
-        "csv": CSVLoader,
-        "html": UnstructuredHTMLLoader,
-        "json": TextLoader,  # Use TextLoader for better consolidation compatibility
-        "md": TextLoader,    # Use TextLoader for better consolidation compatibility
-    }
-
     cnt_files = 0
     cnt_docs = 0
 
@@ -97,8 +135,8 @@ def load_knowledge(
 
     # Fetch all files in the directory with specified extensions
     try:
-        kn_files = glob.glob(os.path.join(knowledge_dir, filename_pattern), recursive=recursive)
-        kn_files = [f for f in kn_files if os.path.isfile(f) and not os.path.basename(f).startswith('.')]
+        kn_stats = list_files(knowledge_dir, filename_pattern, recursive)
+        kn_files = list(kn_stats)
     except Exception as e:
         PrintStyle(font_color="red").print(f"Error scanning knowledge directory {knowledge_dir}: {e}")
         if log_item:
@@ -114,84 +152,57 @@ def load_knowledge(
                 progress=f"\nFound {len(kn_files)} knowledge files in {knowledge_dir}, processing...",
             )
 
-    for file_path in kn_files:
-        try:
-            # Get file extension safely
-            file_parts = os.path.basename(file_path).split('.')
-            if len(file_parts) < 2:
-                continue  # Skip files without extensions
-
-            ext = file_parts[-1].lower()
-            if ext not in file_types_loaders:
-                continue  # Skip unsupported file types
-
-            checksum = calculate_checksum(file_path)
-            if not checksum:
-                continue  # Skip files with checksum errors
-
-            file_key = file_path
-
-            # Load existing data from the index or create a new entry
-            file_data: KnowledgeImport = index.get(file_key, {
-                "file": file_key,
-                "checksum": "",
-                "ids": [],
-                "state": "changed",
-                "documents": []
-            })
-
-            # Check if file has changed
-            if file_data.get("checksum") == checksum:
-                file_data["state"] = "original"
-            else:
-                file_data["state"] = "changed"
-
-            # Process changed files
-            if file_data["state"] == "changed":
-                file_data["checksum"] = checksum
-                loader_cls = file_types_loaders[ext]
-
-                try:
-                    loader = loader_cls(
-                        file_path,
-                        **(
-                            text_loader_kwargs
-                            if ext in ["txt", "csv", "html", "md"]
-                            else {}
-                        ),
-                    )
-                    documents = loader.load_and_split()
-
-                    # Enhanced metadata for better consolidation compatibility
-                    enhanced_metadata = {
-                        **metadata,
-                        "source_file": os.path.basename(file_path),
-                        "source_path": file_path,
-                        "file_type": ext,
-                        "knowledge_source": True,  # Flag to distinguish from conversation memories
-                        "import_timestamp": None,  # Will be set when inserted into memory
-                    }
-
-                    # Apply metadata to all documents
-                    for doc in documents:
-                        doc.metadata = {**doc.metadata, **enhanced_metadata}
-
-                    file_data["documents"] = documents
-                    cnt_files += 1
-                    cnt_docs += len(documents)
-
-                except Exception as e:
-                    PrintStyle(font_color="red").print(f"Error loading {file_path}: {e}")
-                    if log_item:
-                        log_item.stream(progress=f"\nError loading {os.path.basename(file_path)}: {e}")
-                    continue
-
-            # Update the index
-            index[file_key] = file_data
+    # files with an unchanged fingerprint keep their checksum, only the rest is hashed
+    to_hash: list[tuple[str, list[int], KnowledgeImport]] = []
+    for file_path, st in kn_stats.items():
+        file_fingerprint = fingerprint(st)
+
+        # Load existing data from the index or create a new entry
+        file_data: KnowledgeImport = index.get(file_path, {
+            "file": file_path,
+            "checksum": "",
+            "ids": [],
+            "state": "changed",
+            "documents": []
+        })
+        if file_data.get("checksum") and file_data.get("fingerprint") == file_fingerprint:
+            file_data["state"] = "original"
+            index[file_path] = file_data
+        else:
+            to_hash.append((file_path, file_fingerprint, file_data))
+
+    changed: list[tuple[str, str, str, list[int], KnowledgeImport]] = []
+    for (file_path, file_fingerprint, file_data), checksum in zip(
+        to_hash, _hash_files([file_path for file_path, _, _ in to_hash])
+    ):
+        if isinstance(checksum, Exception):
+            PrintStyle(font_color="red").print(f"Error processing {file_path}: {checksum}")
+            continue
 
-        except Exception as e:
-            PrintStyle(font_color="red").print(f"Error processing {file_path}: {e}")
+        # Check if file has changed
+        if file_data.get("checksum") == checksum:
+            file_data["state"] = "original"
+            file_data["fingerprint"] = file_fingerprint
+            index[file_path] = file_data
+        else:
+            file_data["state"] = "changed"
+            changed.append((file_path, _extension(file_path), checksum, file_fingerprint, file_data))
+
+    # Load and split changed files, in parallel when there are several
+    for (file_path, ext, checksum, file_fingerprint, file_data), result in zip(
+        changed, _load_files([(f, ext, metadata) for f, ext, _, _, _ in changed])
+    ):
+        if isinstance(result, Exception):
+            PrintStyle(font_color="red").print(f"Error loading {file_path}: {result}")
+            if log_item:
+                log_item.stream(progress=f"\nError loading {os.path.basename(file_path)}: {result}")
             continue
+        file_data["checksum"] = checksum
+        file_data["fingerprint"] = file_fingerprint
+        file_data["documents"] = result
+        cnt_files += 1
+        cnt_docs += len(result)
+        index[file_path] = file_data
 
     # Mark removed files
     current_files = set(kn_files)
@@ -208,3 +219,75 @@ def load_knowledge(
             )
 
     return index
+
+
+def load_file(file_path: str, ext: str, metadata: dict[str, Any]) -> list[Any]:
+    """Load and split one knowledge file, top-level so it can run in a worker process."""
+    loader_cls = file_types_loaders[ext]
+    loader = loader_cls(
+        file_path,
+        **(
+            text_loader_kwargs
+            if ext in ["txt", "csv", "html", "md"]
+            else {}
+        ),
+    )
+    documents = loader.load_and_split()
+
+    # Enhanced metadata for better consolidation compatibility
+    enhanced_metadata = {
+        **metadata,
+        "source_file": os.path.basename(file_path),
+        "source_path": file_path,
+        "file_type": ext,
+        "knowledge_source": True,  # Flag to distinguish from conversation memories
+        "import_timestamp": None,  # Will be set when inserted into memory
+    }
+
+    # Apply metadata to all documents
+    for doc in documents:
+        doc.metadata = {**doc.metadata, **enhanced_metadata}
+    return documents
+
+
+def _load_files(
+    jobs: list[tuple[str, str, dict[str, Any]]],
+) -> list[list[Any] | Exception]:
+    workers = min(len(jobs), os.cpu_count() or 1, MAX_LOAD_WORKERS)
+    if workers <= 1:
+        results: list[list[Any] | Exception] = []
+        for job in jobs:
+            try:
+                results.append(load_file(*job))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(load_file, *job) for job in jobs]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def _hash_files(file_paths: list[str]) -> list[str | Exception]:
+    def checksum(file_path: str) -> str | Exception:
+        try:
+            return calculate_checksum(file_path)
+        except Exception as e:
+            return e
+
+    workers = min(len(file_paths), MAX_HASH_WORKERS)
+    if workers <= 1:
+        return [checksum(file_path) for file_path in file_paths]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(checksum, file_paths))
+
+
+def _extension(file_path: str) -> str:
+    file_parts = os.path.basename(file_path).split(".")
+    return file_parts[-1].lower() if len(file_parts) > 1 else ""
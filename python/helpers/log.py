@@ -3,11 +3,12 @@ import json
 import threading
 import time
 import uuid
+from bisect import bisect_right
 from collections import OrderedDict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Literal, Optional, TYPE_CHECKING, TypeVar, cast
 
-from python.helpers.secrets import get_secrets_manager
+from python.helpers.secrets import StreamingSecretsFilter, get_secrets_manager
 from python.helpers.strings import truncate_text_by_ratio
 
 
@@ -68,6 +69,11 @@ RESPONSE_CONTENT_MAX_LEN: int = 250_000
 KEY_MAX_LEN: int = 60
 VALUE_MAX_LEN: int = 5000
 PROGRESS_MAX_LEN: int = 120
+# content lengths remembered per item for shipping appended text only, older clients get full content
+CONTENT_MARKS_MAX: int = 256
+# head and tail kept of long streamed content, enough for any truncated output
+STREAM_KEEP_LEN: int = RESPONSE_CONTENT_MAX_LEN
+MASK_MIN_LENGTH: int = 4  # same as SecretsManager.mask_values
 
 
 def _truncate_heading(text: str | None) -> str:
@@ -121,22 +127,24 @@ def _truncate_value(val: T) -> T:
     return cast(T, truncated)
 
 
-def _truncate_content(text: str | None, type: Type) -> str:
+def _truncate_content(text: str | None, type: Type, hidden: int = 0) -> str:
+    # hidden: characters already cut from the middle of text, counted as removed
 
     max_len = CONTENT_MAX_LEN if type != "response" else RESPONSE_CONTENT_MAX_LEN
 
     if text is None:
         return ""
     raw = str(text)
-    if len(raw) <= max_len:
+    total = len(raw) + hidden
+    if total <= max_len:
         return raw
 
     # Same dynamic replacement logic as value truncation
-    removed = len(raw) - max_len
+    removed = total - max_len
     while True:
         replacement = f"\n\n<< {removed} Characters hidden >>\n\n"
         truncated = truncate_text_by_ratio(raw, max_len, replacement, ratio=0.3)
-        new_removed = len(raw) - (len(truncated) - len(replacement))
+        new_removed = total - (len(truncated) - len(replacement))
         if new_removed == removed:
             break
         removed = new_removed
@@ -156,6 +164,9 @@ class LogItem:
     guid: str = ""
     timestamp: float = 0.0
     agentno: int = 0
+    # streaming state, not part of the output
+    _stream: Optional["_ContentStream"] = field(default=None, repr=False, compare=False)
+    _marks: list[tuple[int, int]] = field(default_factory=list, repr=False, compare=False)
 
     def __post_init__(self):
         self.guid = self.log.guid
@@ -189,8 +200,8 @@ class LogItem:
     ):
         if heading is not None:
             self.update(heading=self.heading + heading)
-        if content is not None:
-            self.update(content=self.content + content)
+        if content is not None and self.guid == self.log.guid:
+            self.log._update_item(self.no, content_append=content)
 
         for k, v in kwargs.items():
             prev = self.kvps.get(k, "") if self.kvps else ""
@@ -208,6 +219,65 @@ class LogItem:
             "agentno": self.agentno,
         }
 
+    def _content_offset(self, version: int) -> int:
+        # length of content at the given log version when it only grew since, else 0
+        if not self._marks or self._marks[0][0] > version:
+            return 0
+        return self._marks[bisect_right(self._marks, (version, float("inf"))) - 1][1]
+
+
+class _ContentStream:
+    """Raw content of a log item and its masked form, grown by appends.
+
+    Only appended text is masked; the filter holds back a tail that could still
+    turn into a secret, so secrets split across appends are masked too. Past
+    three times STREAM_KEEP_LEN only the head and tail are kept, truncation
+    never shows more.
+    """
+
+    def __init__(self, source: str, masked: str, secrets_filter: StreamingSecretsFilter):
+        self.source = source
+        self.source_length = len(source)
+        self.hidden = 0  # masked characters dropped from the middle
+        self.filter = secrets_filter
+        secrets_filter.process_chunk(masked)
+        self._compact()
+
+    def append(self, text: str):
+        self.source += text
+        self.source_length += len(text)
+        self.filter.process_chunk(text)
+        self._compact()
+
+    def extension(self, content: str) -> str | None:
+        """What content adds to the source, None when it does not start with it."""
+        if len(content) < self.source_length:
+            return None
+        if len(self.source) == self.source_length:
+            if not content.startswith(self.source):
+                return None
+        else:
+            head, tail = self.source[:STREAM_KEEP_LEN], self.source[STREAM_KEEP_LEN:]
+            if not (content.startswith(head) and content.endswith(tail, 0, self.source_length)):
+                return None
+        return content[self.source_length :]
+
+    def text(self) -> str:
+        # a held tail is only a secret prefix, the full masking didn't hide those either
+        return self.filter.text + self.filter.pending
+
+    def committed(self) -> int:
+        # length of text that stays as is, the held tail may still become a placeholder
+        return len(self.filter.text)
+
+    def _compact(self):
+        if len(self.source) > 3 * STREAM_KEEP_LEN:
+            self.source = self.source[:STREAM_KEEP_LEN] + self.source[-STREAM_KEEP_LEN:]
+        text = self.filter.text
+        if len(text) > 3 * STREAM_KEEP_LEN:
+            self.hidden += len(text) - 2 * STREAM_KEEP_LEN
+            self.filter.text = text[:STREAM_KEEP_LEN] + text[-STREAM_KEEP_LEN:]
+
 
 class Log:
 
@@ -215,7 +285,9 @@ class Log:
         self._lock = threading.RLock()
         self.context: "AgentContext|None" = None  # set from outside
         self.guid: str = str(uuid.uuid4())
-        self.updates: list[int] = []
+        self.version: int = 0
+        # item no -> log version of its last update, ordered by version
+        self.updates: dict[int, int] = {}
         self.logs: list[LogItem] = []
         self.progress: str = ""
         self.progress_no: int = 0
@@ -275,21 +347,29 @@ class Log:
         update_progress: ProgressUpdate | None = None,
         id: Optional[str] = None,
         notify_state_monitor: bool = True,
+        content_append: str | None = None,
         **kwargs,
     ):
         # Capture the effective type for truncation without holding the lock during
         # masking/truncation work.
         with self._lock:
             current_type = self.logs[no].type
+            stream = self.logs[no]._stream
         type_for_truncation = type if type is not None else current_type
 
         heading_out: str | None = None
         if heading is not None:
             heading_out = _truncate_heading(self._mask_recursive(heading))
 
-        content_out: str | None = None
+        # content that only grew is masked from the new text on, the rest is masked in full
+        stream_out: _ContentStream | None = None
+        source_len = stream.source_length if stream else 0
         if content is not None:
-            content_out = _truncate_content(self._mask_recursive(content), type_for_truncation)
+            extension = stream.extension(content) if stream else None
+            if extension is not None:
+                content_append = extension
+            else:
+                stream_out = self._new_stream(content)
 
         kvps_out: OrderedDict | None = None
         if kvps is not None:
@@ -318,8 +398,22 @@ class Log:
             if heading_out is not None:
                 item.heading = heading_out
 
-            if content_out is not None:
-                item.content = content_out
+            self.version += 1
+            if stream_out is None and content_append is not None:
+                if item._stream is None:
+                    # seeded with what the item shows, e.g. when restored from a saved chat
+                    stream_out = _ContentStream(item.content, item.content, self._streaming_filter())
+                    stream_out.append(content_append)
+                elif item._stream is not stream or item._stream.source_length != source_len:
+                    # changed by a concurrent update meanwhile, clients get the full content
+                    item._stream.append(content_append)
+                    self._set_content(item, type_for_truncation, appended=False)
+                elif content_append:
+                    item._stream.append(content_append)
+                    self._set_content(item, type_for_truncation, appended=True)
+            if stream_out is not None:
+                item._stream = stream_out
+                self._set_content(item, type_for_truncation, appended=False)
 
             if kvps_out is not None:
                 item.kvps = kvps_out
@@ -331,7 +425,8 @@ class Log:
                     item.kvps = OrderedDict()
                 item.kvps.update(kwargs_out)
 
-            self.updates.append(item.no)
+            self.updates.pop(item.no, None)
+            self.updates[item.no] = self.version
 
             if item.heading and item.update_progress != "none":
                 if item.no >= self.progress_no:
@@ -343,6 +438,39 @@ class Log:
         if notify_state_monitor:
             self._notify_state_monitor_for_context_update()
 
+    def mark_updated(self, no: int):
+        """Record an update of item no made without _update_item (e.g. loading a saved chat)."""
+        with self._lock:
+            self.version += 1
+            self.updates.pop(no, None)
+            self.updates[no] = self.version
+
+    def _set_content(self, item: LogItem, type: Type, appended: bool):
+        stream = cast(_ContentStream, item._stream)
+        text = stream.text()
+        item.content = _truncate_content(text, type, stream.hidden)
+        if item.content is not text:
+            item._marks = []  # truncation cuts the middle, clients need the full content
+        elif appended and item._marks:
+            item._marks.append((self.version, stream.committed()))
+            del item._marks[:-CONTENT_MARKS_MAX]
+        else:
+            item._marks = [(self.version, stream.committed())]
+
+    def _new_stream(self, content: str) -> _ContentStream:
+        return _ContentStream(content, self._mask_recursive(content), self._streaming_filter())
+
+    def _streaming_filter(self) -> StreamingSecretsFilter:
+        try:
+            return self._secrets_manager().create_streaming_filter(min_length=MASK_MIN_LENGTH)
+        except Exception:
+            return StreamingSecretsFilter({})
+
+    def _secrets_manager(self):
+        from agent import AgentContext
+
+        return get_secrets_manager(self.context or AgentContext.current())
+
     def _notify_state_monitor(self) -> None:
         ctx = self.context
         if not ctx:
@@ -385,51 +513,62 @@ class Log:
     def set_initial_progress(self):
         self.set_progress("Waiting for input", 0, False)
 
-    def output(self, start=None, end=None):
+    def output(self, start=None, end=None, appends: bool = False):
+        """
+        Items updated after log version start (up to end), in log order.
+        With appends, content a client at version start already has is left out:
+        such items carry content_offset and content_append instead of content.
+        """
         with self._lock:
             if start is None:
                 start = 0
             if end is None:
-                end = len(self.updates)
-            updates = self.updates[start:end]
-            logs = list(self.logs)
-
-        out = []
-        seen = set()
-        for update in updates:
-            if update not in seen and update < len(logs):
-                out.append(logs[update].output())
-                seen.add(update)
+                end = self.version
+            nos = []
+            for no, version in reversed(self.updates.items()):
+                if version <= start:
+                    break  # journal is ordered by version
+                if version <= end and no < len(self.logs):
+                    nos.append(no)
+            nos.sort()
+
+            out = []
+            for no in nos:
+                item = self.logs[no]
+                data = item.output()
+                offset = item._content_offset(start) if appends else 0
+                if offset:
+                    del data["content"]
+                    data["content_offset"] = offset
+                    data["content_append"] = item.content[offset:]
+                out.append(data)
         return out
 
     def reset(self):
         with self._lock:
             self.guid = str(uuid.uuid4())
-            self.updates = []
+            self.version = 0
+            self.updates = {}
             self.logs = []
         self.set_initial_progress()
 
     def _mask_recursive(self, obj: T) -> T:
         """Recursively mask secrets in nested objects."""
         try:
-            from agent import AgentContext
-            secrets_mgr = get_secrets_manager(self.context or AgentContext.current())
-
-            # debug helper to identify context mismatch
-            # self_id = self.context.id if self.context else None
-            # current_ctx = AgentContext.current()
-            # current_id = current_ctx.id if current_ctx else None
-            # if self_id != current_id:
-            #     print(f"Context ID mismatch: {self_id} != {current_id}")
-
-            if isinstance(obj, str):
-                return cast(Any, secrets_mgr.mask_values(obj))
-            elif isinstance(obj, dict):
-                return {k: self._mask_recursive(v) for k, v in obj.items()}  # type: ignore
-            elif isinstance(obj, list):
-                return [self._mask_recursive(item) for item in obj]  # type: ignore
-            else:
+            secrets_mgr = self._secrets_manager()
+            if not secrets_mgr.load_secrets():
                 return obj
+            return self._mask_with(secrets_mgr, obj)
         except Exception:
             # If masking fails, return original object
             return obj
+
+    def _mask_with(self, secrets_mgr, obj: T) -> T:
+        if isinstance(obj, str):
+            return cast(Any, secrets_mgr.mask_values(obj, min_length=MASK_MIN_LENGTH))
+        elif isinstance(obj, dict):
+            return {k: self._mask_with(secrets_mgr, v) for k, v in obj.items()}  # type: ignore
+        elif isinstance(obj, list):
+            return [self._mask_with(secrets_mgr, item) for item in obj]  # type: ignore
+        else:
+            return obj
@@ -40,6 +40,7 @@ from anyio.streams.memory import (
 
 from pydantic import BaseModel, Field, Discriminator, Tag, PrivateAttr
 from python.helpers import dirty_json
+from python.helpers.mcp_pool import MCPSessionPool
 from python.helpers.print_style import PrintStyle
 from python.helpers.tool import Tool, Response
 
@@ -234,8 +235,8 @@ class MCPServerRemote(BaseModel):
 
     def __init__(self, config: dict[str, Any]):
         super().__init__()
-        self.__client = MCPClientRemote(self)
         self.update(config)
+        self.__client = MCPClientRemote(self)
 
     def get_error(self) -> str:
         with self.__lock:
@@ -255,13 +256,23 @@ class MCPServerRemote(BaseModel):
         with self.__lock:
             return self.__client.has_tool(tool_name)  # type: ignore
 
+    def get_session_status(self) -> dict[str, Any]:
+        with self.__lock:
+            return self.__client.get_session_status()  # type: ignore
+
     async def call_tool(
         self, tool_name: str, input_data: Dict[str, Any]
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # the lock is not held while waiting, calls run concurrently on the pooled session
+        return await client.call_tool(tool_name, input_data)  # type: ignore
+
+    def close(self):
+        """Close the pooled session, used when the server is removed or reconfigured."""
+        with self.__lock:
+            self.__client.close()  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerRemote":
         with self.__lock:
@@ -312,8 +323,8 @@ class MCPServerLocal(BaseModel):
 
     def __init__(self, config: dict[str, Any]):
         super().__init__()
-        self.__client = MCPClientLocal(self)
         self.update(config)
+        self.__client = MCPClientLocal(self)
 
     def get_error(self) -> str:
         with self.__lock:
@@ -333,13 +344,23 @@ class MCPServerLocal(BaseModel):
         with self.__lock:
             return self.__client.has_tool(tool_name)  # type: ignore
 
+    def get_session_status(self) -> dict[str, Any]:
+        with self.__lock:
+            return self.__client.get_session_status()  # type: ignore
+
     async def call_tool(
         self, tool_name: str, input_data: Dict[str, Any]
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # the lock is not held while waiting, calls run concurrently on the pooled session
+        return await client.call_tool(tool_name, input_data)  # type: ignore
+
+    def close(self):
+        """Close the pooled session, used when the server is removed or reconfigured."""
+        with self.__lock:
+            self.__client.close()  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerLocal":
         with self.__lock:
@@ -516,6 +537,13 @@ class MCPConfig(BaseModel):
     def __init__(self, servers_list: List[Dict[str, Any]]):
         from collections.abc import Mapping, Iterable
 
+        # servers of a previous configuration keep their sessions open until closed
+        for previous in getattr(self, "servers", None) or []:
+            try:
+                previous.close()
+            except Exception:
+                pass
+
         # # DEBUG: Print the received servers_list
         # if servers_list:
         #     PrintStyle(background_color="blue", font_color="white", padding=True).print(
@@ -662,6 +690,8 @@ class MCPConfig(BaseModel):
                 error = server.get_error()
                 # get log bool
                 has_log = server.get_log() != ""
+                # pooled session health, latency and errors
+                session = server.get_session_status()
 
                 # add server status to result
                 result.append(
@@ -671,6 +701,7 @@ class MCPConfig(BaseModel):
                         "error": error,
                         "tool_count": tool_count,
                         "has_log": has_log,
+                        "session": session,
                     }
                 )
 
@@ -683,6 +714,7 @@ class MCPConfig(BaseModel):
                         "error": disconnected["error"],
                         "tool_count": 0,
                         "has_log": False,
+                        "session": None,
                     }
                 )
 
@@ -797,10 +829,13 @@ class MCPConfig(BaseModel):
             raise ValueError(f"Tool {tool_name} not found")
         server_name_part, tool_name_part = tool_name.split(".")
         with self.__lock:
-            for server in self.servers:
-                if server.name == server_name_part and server.has_tool(tool_name_part):
-                    return await server.call_tool(tool_name_part, input_data)
+            server = next(
+                (s for s in self.servers if s.name == server_name_part and s.has_tool(tool_name_part)),
+                None,
+            )
+        if server is None:
             raise ValueError(f"Tool {tool_name} not found")
+        return await server.call_tool(tool_name_part, input_data)
 
 
 T = TypeVar("T")
@@ -809,7 +844,7 @@ T = TypeVar("T")
 class MCPClientBase(ABC):
     # server: Union[MCPServerLocal, MCPServerRemote] # Defined in __init__
     # tools: List[dict[str, Any]] # Defined in __init__
-    # No self.session, self.exit_stack, self.stdio, self.write as persistent instance fields
+    # The session lives in self.pool, opened on first use and shared by all operations
 
     __lock: ClassVar[threading.Lock] = threading.Lock()
 
@@ -819,6 +854,9 @@ class MCPClientBase(ABC):
         self.error: str = ""
         self.log: List[str] = []
         self.log_file: Optional[TextIO] = None
+        self.pool: MCPSessionPool[ClientSession] = MCPSessionPool(
+            server.name or type(server).__name__, self._open_session
+        )
 
     # Protected method
     @abstractmethod
@@ -831,68 +869,43 @@ class MCPClientBase(ABC):
         """Create stdio/write streams using the provided exit_stack."""
         ...
 
+    async def _open_session(self, exit_stack: AsyncExitStack) -> ClientSession:
+        """Open transport and session on the pool's exit stack, called again after a disconnect."""
+        set = settings.get_settings()
+        stdio, write = await self._create_stdio_transport(exit_stack)
+        session = await exit_stack.enter_async_context(
+            ClientSession(
+                stdio,  # type: ignore
+                write,  # type: ignore
+                read_timeout_seconds=timedelta(
+                    seconds=self.server.init_timeout or set["mcp_client_init_timeout"]
+                ),
+            )
+        )
+        await session.initialize()
+        return session
+
     async def _execute_with_session(
         self,
         coro_func: Callable[[ClientSession], Awaitable[T]],
-        read_timeout_seconds=60,
     ) -> T:
         """
-        Manages the lifecycle of an MCP session for a single operation.
-        Creates a temporary session, executes coro_func with it, and ensures cleanup.
+        Executes coro_func with the pooled session of this server.
+        The session is reused across operations and reopened when it breaks.
         """
         operation_name = coro_func.__name__  # For logging
-        # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Creating new session for operation '{operation_name}'...")
-        # Store the original exception outside the async block
-        original_exception = None
         try:
-            async with AsyncExitStack() as temp_stack:
-                try:
-
-                    stdio, write = await self._create_stdio_transport(temp_stack)
-                    # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name} - {operation_name}): Transport created. Initializing session...")
-                    session = await temp_stack.enter_async_context(
-                        ClientSession(
-                            stdio,  # type: ignore
-                            write,  # type: ignore
-                            read_timeout_seconds=timedelta(
-                                seconds=read_timeout_seconds
-                            ),
-                        )
-                    )
-                    await session.initialize()
-
-                    result = await coro_func(session)
-
-                    return result
-                except Exception as e:
-                    # Store the original exception and raise a dummy exception
-                    excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
-                    if excs:
-                        original_exception = excs[0]
-                    else:
-                        original_exception = e
-                    # Create a dummy exception to break out of the async block
-                    raise RuntimeError("Dummy exception to break out of async block")
+            return await self.pool.run(coro_func)
         except Exception as e:
-            # Check if this is our dummy exception
-            if original_exception is not None:
-                e = original_exception
-            # We have the original exception stored
+            excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
+            if excs:
+                e = excs[0]
             PrintStyle(
                 background_color="#AA4455", font_color="white", padding=False
             ).print(
                 f"MCPClientBase ({self.server.name} - {operation_name}): Error during operation: {type(e).__name__}: {e}"
             )
             raise e  # Re-raise the original exception
-        # finally:
-        #     PrintStyle(font_color="cyan").print(
-        #         f"MCPClientBase ({self.server.name} - {operation_name}): Session and transport will be closed by AsyncExitStack."
-        #     )
-        # This line should ideally be unreachable if the try/except/finally logic within the 'async with' is exhaustive.
-        # Adding it to satisfy linters that might not fully trace the raise/return paths through async context managers.
-        raise RuntimeError(
-            f"MCPClientBase ({self.server.name} - {operation_name}): _execute_with_session exited 'async with' block unexpectedly."
-        )
 
     async def update_tools(self) -> "MCPClientBase":
         # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Starting 'update_tools' operation...")
@@ -913,12 +926,7 @@ class MCPClientBase(ABC):
             )
 
         try:
-            set = settings.get_settings()
-            await self._execute_with_session(
-                list_tools_op,
-                read_timeout_seconds=self.server.init_timeout
-                or set["mcp_client_init_timeout"],
-            )
+            await self._execute_with_session(list_tools_op)
         except Exception as e:
             # e = eg.exceptions[0]
             error_text = errors.format_error(e, 0, 0)
@@ -990,6 +998,12 @@ class MCPClientBase(ABC):
                 f"MCPClientBase::Failed to call tool '{tool_name}' on server '{self.server.name}'. Original error: {type(e).__name__}: {e}"
             )
 
+    def get_session_status(self) -> dict[str, Any]:
+        return self.pool.status()
+
+    def close(self):
+        self.pool.close_soon()
+
     def get_log(self):
         # read and return lines from self.log_file, do not close it
         if not hasattr(self, "log_file") or self.log_file is None:
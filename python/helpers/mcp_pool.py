@@ -0,0 +1,247 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Coroutine, Generic, TypeVar
+
+import anyio
+from mcp.types import CONNECTION_CLOSED
+
+from python.helpers.defer import EventLoopThread
+from python.helpers.print_style import PrintStyle
+
+# all pooled sessions live on this loop, MCP transports must be closed by the task that opened them
+POOL_THREAD = "MCPSessions"
+MAX_CONCURRENT_CALLS = 8  # in-flight requests per session
+IDLE_TIMEOUT = 300  # seconds without calls before a session is closed
+HEALTH_CHECK_INTERVAL = 30  # seconds between checks, idle sessions are pinged
+PING_TIMEOUT = 10
+CLOSE_TIMEOUT = 5
+BACKOFF_BASE = 1.0  # seconds before the first reconnect attempt after a failed connect
+BACKOFF_MAX = 60.0
+LATENCY_SAMPLES = 200
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+# raised when the transport is already gone, the request never reached the server
+_DISCONNECTED = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+
+@dataclass
+class PoolMetrics:
+    calls: int = 0
+    errors: int = 0
+    connects: int = 0
+    connect_errors: int = 0
+    last_error: str = ""
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+
+class MCPSessionPool(Generic[S]):
+    """
+    One long-lived session per MCP server, shared by all callers.
+
+    The session is opened on first use and reused until it has been idle for
+    IDLE_TIMEOUT or fails a health check. At most max_concurrent requests run on
+    it at once. A broken session is dropped and reopened on the next call;
+    failed connects back off exponentially so a dead server is not respawned on
+    every call. Calls from any thread or event loop are forwarded to the pool
+    loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[AsyncExitStack], Awaitable[S]],
+        max_concurrent: int = MAX_CONCURRENT_CALLS,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.metrics = PoolMetrics()
+        self._connect = connect
+        # state below is only touched on the pool loop
+        self._session: S | None = None
+        self._holder: asyncio.Task | None = None
+        self._closing: asyncio.Event | None = None
+        self._connecting: asyncio.Future | None = None
+        self._monitor: asyncio.Task | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_flight = 0
+        self._last_used = 0.0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+    async def run(self, op: Callable[[S], Awaitable[T]]) -> T:
+        """Run op with the pooled session, opening or reopening it as needed."""
+        return await _on_pool_loop(self._run(op))
+
+    async def close(self):
+        await _on_pool_loop(self._close())
+
+    def close_soon(self):
+        """Close the session in the background, for synchronous callers."""
+        if self._holder is not None:
+            EventLoopThread(POOL_THREAD).run_coroutine(self._close())
+
+    def status(self) -> dict[str, Any]:
+        latencies = sorted(self.metrics.latencies)
+        return {
+            "connected": self._session is not None,
+            "in_flight": self._in_flight,
+            "calls": self.metrics.calls,
+            "errors": self.metrics.errors,
+            "connects": self.metrics.connects,
+            "connect_errors": self.metrics.connect_errors,
+            "avg_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+            "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+            "idle_seconds": round(time.monotonic() - self._last_used) if self._session is not None else None,
+            "last_error": self.metrics.last_error,
+        }
+
+    async def _run(self, op: Callable[[S], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        try:
+            for attempt in range(2):
+                session = await self._acquire()
+                self._in_flight += 1
+                try:
+                    async with self._semaphore:  # type: ignore
+                        return await op(session)
+                except _DISCONNECTED:
+                    # transport died while idle, safe to retry once on a fresh session
+                    await self._drop(session)
+                    if attempt:
+                        raise
+                except Exception as e:
+                    if _is_connection_closed(e) or (self._holder and self._holder.done()):
+                        await self._drop(session)
+                    raise
+                finally:
+                    self._in_flight -= 1
+                    self._last_used = time.monotonic()
+            raise RuntimeError("unreachable")
+        except Exception as e:
+            self.metrics.errors += 1
+            self.metrics.last_error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.metrics.calls += 1
+            self.metrics.latencies.append(time.perf_counter() - start)
+
+    async def _acquire(self) -> S:
+        if self._session is not None and self._holder and not self._holder.done():
+            return self._session
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._open())
+        # a cancelled caller must not cancel a connect other callers are waiting for
+        return await asyncio.shield(self._connecting)
+
+    async def _open(self) -> S:
+        try:
+            await self._close()
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                raise ConnectionError(
+                    f"MCP server '{self.name}' is unavailable, next reconnect in {wait:.0f}s. "
+                    f"Last error: {self.metrics.last_error}"
+                )
+            ready: asyncio.Future = asyncio.get_running_loop().create_future()
+            closing = asyncio.Event()
+            holder = asyncio.create_task(self._hold(ready, closing))
+            try:
+                session = await ready
+            except Exception as e:
+                self.metrics.connect_errors += 1
+                self.metrics.last_error = f"{type(e).__name__}: {e}"
+                self._backoff = min(BACKOFF_MAX, self._backoff * 2 or BACKOFF_BASE)
+                self._retry_at = time.monotonic() + self._backoff
+                raise
+            self._session, self._holder, self._closing = session, holder, closing
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._backoff = self._retry_at = 0.0
+            self._last_used = time.monotonic()
+            self.metrics.connects += 1
+            if self._monitor is None or self._monitor.done():
+                self._monitor = asyncio.create_task(self._watch())
+            return session
+        finally:
+            self._connecting = None
+
+    async def _hold(self, ready: asyncio.Future, closing: asyncio.Event):
+        # owns the transport for its whole life, enter and exit happen in this task
+        try:
+            async with AsyncExitStack() as stack:
+                session = await self._connect(stack)
+                ready.set_result(session)
+                await closing.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except BaseException as e:
+            e = _unwrap(e)
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                PrintStyle.warning(f"MCP session '{self.name}' closed with error: {type(e).__name__}: {e}")
+
+    async def _drop(self, session: S):
+        if self._session is session:
+            await self._close()
+
+    async def _close(self):
+        holder, closing = self._holder, self._closing
+        self._session = self._holder = self._closing = None
+        if closing:
+            closing.set()
+        if holder and not holder.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(holder), CLOSE_TIMEOUT)
+            except BaseException:
+                holder.cancel()
+
+    async def _watch(self):
+        while self._session is not None:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+            session = self._session
+            if session is None or self._in_flight:
+                continue
+            if self._holder is None or self._holder.done():
+                await self._close()
+                break
+            idle = time.monotonic() - self._last_used
+            if idle >= IDLE_TIMEOUT:
+                await self._close()
+                break
+            if idle < HEALTH_CHECK_INTERVAL:
+                continue
+            try:
+                await asyncio.wait_for(session.send_ping(), PING_TIMEOUT)  # type: ignore
+            except Exception as e:
+                self.metrics.last_error = f"Health check failed: {type(e).__name__}: {e}"
+                await self._drop(session)
+                try:
+                    # reconnect right away so the next call doesn't pay for it
+                    await self._acquire()
+                except Exception:
+                    break
+
+
+async def _on_pool_loop(coro: Coroutine[Any, Any, T]) -> T:
+    thread = EventLoopThread(POOL_THREAD)
+    if asyncio.get_running_loop() is thread.loop:
+        return await coro
+    return await asyncio.wrap_future(thread.run_coroutine(coro))
+
+
+def _unwrap(e: BaseException) -> BaseException:
+    # anyio task groups wrap transport errors in exception groups
+    while excs := getattr(e, "exceptions", None):
+        e = excs[0]
+    return e
+
+
+def _is_connection_closed(e: Exception) -> bool:
+    return getattr(getattr(e, "error", None), "code", None) == CONNECTION_CLOSED
@@ -1,7 +1,6 @@
+import asyncio
 from datetime import datetime
 from typing import Any, List, Sequence
-from langchain.storage import InMemoryByteStore, LocalFileStore
-from langchain.embeddings import CacheBackedEmbeddings
 from python.helpers import guids
 
 # from langchain_chroma import Chroma
@@ -26,19 +25,25 @@ from python.helpers.print_style import PrintStyle
 from . import files
 from langchain_core.documents import Document
 from python.helpers import knowledge_import
+from python.helpers.memory_wal import MemoryWal
+from python.helpers import memory_index, memory_filter, embedding_pipeline, embedding_cache
+from python.helpers.memory_index import AnnFaiss, IndexMeta
 from python.helpers.log import Log, LogItem
+from python.helpers.defer import EventLoopThread
 from enum import Enum
 from agent import Agent, AgentContext
 import models
 import logging
-from simpleeval import simple_eval
 
 
 # Raise the log level so WARNING messages aren't shown
 logging.getLogger("langchain_core.vectorstores.base").setLevel(logging.ERROR)
 
+KNOWLEDGE_WATCH_THREAD = "KnowledgeWatch"
+KNOWLEDGE_WATCH_INTERVAL = 10  # seconds between knowledge folder scans in watch mode
 
-class MyFaiss(FAISS):
+
+class MyFaiss(AnnFaiss):
     # override aget_by_ids
     def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
         # return all self.docstore._dict[id] in ids
@@ -50,6 +55,8 @@ class MyFaiss(FAISS):
     def get_all_docs(self):
         return self.docstore._dict  # type: ignore
 
+    index_meta: IndexMeta | None = None
+
 
 class Memory:
 
@@ -59,6 +66,7 @@ class Memory:
         SOLUTIONS = "solutions"
 
     index: dict[str, "MyFaiss"] = {}
+    _knowledge_watchers: dict[str, "MyFaiss"] = {}  # memory subdir -> db being watched
 
     @staticmethod
     async def get(agent: Agent):
@@ -68,7 +76,7 @@ class Memory:
                 type="util",
                 heading=f"Initializing VectorDB in '/{memory_subdir}'",
             )
-            db, created = Memory.initialize(
+            db, created = await Memory.initialize(
                 log_item,
                 agent.config.embeddings_model,
                 memory_subdir,
@@ -81,6 +89,7 @@ class Memory:
             )
             if knowledge_subdirs:
                 await wrap.preload_knowledge(log_item, knowledge_subdirs, memory_subdir)
+                wrap._watch_knowledge(knowledge_subdirs)
             return wrap
         else:
             return Memory(
@@ -99,7 +108,7 @@ class Memory:
 
             agent_config = initialize.initialize_agent()
             model_config = agent_config.embeddings_model
-            db, _created = Memory.initialize(
+            db, _created = await Memory.initialize(
                 log_item=log_item,
                 model_config=model_config,
                 memory_subdir=memory_subdir,
@@ -115,6 +124,8 @@ class Memory:
                         log_item, knowledge_subdirs, memory_subdir
                     )
             Memory.index[memory_subdir] = db
+            if preload_knowledge and knowledge_subdirs:
+                wrap._watch_knowledge(knowledge_subdirs)
         return Memory(db=Memory.index[memory_subdir], memory_subdir=memory_subdir)
 
     @staticmethod
@@ -125,7 +136,7 @@ class Memory:
         return await Memory.get(agent)
 
     @staticmethod
-    def initialize(
+    async def initialize(
         log_item: LogItem | None,
         model_config: models.ModelConfig,
         memory_subdir: str,
@@ -137,20 +148,11 @@ class Memory:
         if log_item:
             log_item.stream(progress="\nInitializing VectorDB")
 
-        em_dir = files.get_abs_path(
-            "tmp/memory/embeddings"
-        )  # just caching, no need to parameterize
         db_dir = abs_db_dir(memory_subdir)
 
-        # make sure embeddings and database directories exist
+        # make sure database directory exists
         os.makedirs(db_dir, exist_ok=True)
 
-        if in_memory:
-            store = InMemoryByteStore()
-        else:
-            os.makedirs(em_dir, exist_ok=True)
-            store = LocalFileStore(em_dir)
-
         embeddings_model = models.get_embedding_model(
             model_config.provider,
             model_config.name,
@@ -160,9 +162,9 @@ class Memory:
             model_config.provider + "_" + model_config.name
         )
 
-        # here we setup the embeddings model with the chosen cache storage
-        embedder = CacheBackedEmbeddings.from_bytes_store(
-            embeddings_model, store, namespace=embeddings_model_id
+        # here we setup the embeddings model with the shared, size-bounded cache
+        embedder = embedding_cache.cached_embeddings(
+            embeddings_model, embeddings_model_id, in_memory=in_memory
         )
 
         # initial DB and docs variables
@@ -181,6 +183,17 @@ class Memory:
                 # normalize_L2=True,
                 relevance_score_fn=Memory._cosine_normalizer,
             )  # type: ignore
+            memory_index.load_tombstones(db)
+            db.index_meta = IndexMeta.load(db_dir) or memory_index.infer_meta(db.index)
+
+            # apply mutations appended since the last snapshot
+            wal = MemoryWal(db_dir)
+            # also compact after corrupted records so they are dropped from the log
+            if wal.replay(db) or wal.skipped:
+                PrintStyle.standard("Compacting memory log...")
+                if log_item:
+                    log_item.stream(progress="\nCompacting memory log")
+                Memory._save_db_file(db, memory_subdir)
 
             # if there is a mismatch in embeddings used, re-index the whole DB
             emb_ok = False
@@ -201,7 +214,10 @@ class Memory:
 
         # DB not loaded, create one
         if not db:
-            index = faiss.IndexFlatIP(len(embedder.embed_query("example")))
+            # start flat, _maintain_index promotes once there is enough data to train on
+            index = memory_index.create_index(
+                memory_index.INDEX_FLAT, len(embedder.embed_query("example"))
+            )
 
             db = MyFaiss(
                 embedding_function=embedder,
@@ -218,7 +234,19 @@ class Memory:
                 PrintStyle.standard("Indexing memories...")
                 if log_item:
                     log_item.stream(progress="\nIndexing memories")
-                db.add_documents(documents=list(docs.values()), ids=list(docs.keys()))
+                texts = [doc.page_content for doc in docs.values()]
+                vectors = await Memory._embed_texts(
+                    embedder, texts, Memory._progress_reporter(log_item, "Indexing memories")
+                )
+                db.add_embeddings(
+                    text_embeddings=list(zip(texts, vectors)),
+                    metadatas=[doc.metadata for doc in docs.values()],
+                    ids=list(docs.keys()),
+                )
+
+            # build the configured index type right away for large re-indexes
+            db.index_meta = IndexMeta()
+            Memory._maintain_index(db, memory_subdir, save=False)
 
             # save DB
             Memory._save_db_file(db, memory_subdir)
@@ -235,6 +263,9 @@ class Memory:
             )
 
             created = True
+        else:
+            # settings may ask for a different index type than the one on disk
+            Memory._maintain_index(db, memory_subdir)
 
         return db, created
 
@@ -262,25 +293,36 @@ class Memory:
         if not os.path.exists(db_dir):
             os.makedirs(db_dir)
 
-        index: dict[str, knowledge_import.KnowledgeImport] = {}
-        if os.path.exists(index_path):
-            with open(index_path, "r") as f:
-                index = json.load(f)
+        index = Memory._read_knowledge_index(memory_subdir)
 
-        # preload knowledge folders
-        index = self._preload_knowledge_folders(log_item, kn_dirs, index)
+        # preload knowledge folders, hashing files and parsing documents blocks
+        index = await asyncio.to_thread(self._preload_knowledge_folders, log_item, kn_dirs, index)
 
-        for file in index:
-            if index[file]["state"] in ["changed", "removed"] and index[file].get(
-                "ids", []
-            ):  # for knowledge files that have been changed or removed and have IDs
-                await self.delete_documents_by_ids(
-                    index[file]["ids"]
-                )  # remove original version
-            if index[file]["state"] == "changed":
-                index[file]["ids"] = await self.insert_documents(
-                    index[file]["documents"]
-                )  # insert new version
+        # remove original versions of knowledge files that have been changed or removed
+        old_ids = [
+            id
+            for file in index
+            if index[file]["state"] in ["changed", "removed"]
+            for id in index[file].get("ids", [])
+        ]
+        removed = await self._locked(self._delete_existing, old_ids, False) if old_ids else []
+
+        # insert new versions in one embedding pass
+        changed = [file for file in index if index[file]["state"] == "changed"]
+        docs = [doc for file in changed for doc in index[file].get("documents", [])]
+        ids = await self._insert_bulk(docs, log_item) if docs else []
+        for file in changed:
+            count = len(index[file].get("documents", []))
+            index[file]["ids"], ids = ids[:count], ids[count:]
+
+        # persist once, the snapshot also covers deletions
+        if removed or docs:
+
+            def persist():
+                if not Memory._maintain_index(self.db, self.memory_subdir):
+                    self._save_db()
+
+            await self._locked(persist)
 
         # remove index where state="removed"
         index = {k: v for k, v in index.items() if v["state"] != "removed"}
@@ -300,29 +342,81 @@ class Memory:
         kn_dirs: list[str],
         index: dict[str, knowledge_import.KnowledgeImport],
     ):
-        # load knowledge folders, subfolders by area
-        for kn_dir in kn_dirs:
-            # everything in the root of the knowledge goes to main
+        for kn_dir, metadata, filename_pattern, recursive in Memory._knowledge_sources(kn_dirs):
             index = knowledge_import.load_knowledge(
                 log_item,
-                abs_knowledge_dir(kn_dir),
+                kn_dir,
                 index,
-                {"area": Memory.Area.MAIN.value},
-                filename_pattern="*",
-                recursive=False,
+                metadata,
+                filename_pattern=filename_pattern,
+                recursive=recursive,
+            )
+
+        return index
+
+    @staticmethod
+    def _knowledge_sources(kn_dirs: list[str]) -> list[tuple[str, dict, str, bool]]:
+        # (directory, metadata, filename pattern, recursive) of every knowledge folder
+        sources = []
+        for kn_dir in kn_dirs:
+            # everything in the root of the knowledge goes to main
+            sources.append(
+                (abs_knowledge_dir(kn_dir), {"area": Memory.Area.MAIN.value}, "*", False)
             )
             # subdirectories go to their folders
             for area in Memory.Area:
-                index = knowledge_import.load_knowledge(
-                    log_item,
-                    # files.get_abs_path("knowledge", kn_dir, area.value),
-                    abs_knowledge_dir(kn_dir, area.value),
-                    index,
-                    {"area": area.value},
-                    recursive=True,
+                sources.append(
+                    (abs_knowledge_dir(kn_dir, area.value), {"area": area.value}, "**/*", True)
                 )
+        return sources
 
-        return index
+    @staticmethod
+    def _read_knowledge_index(memory_subdir: str) -> dict[str, knowledge_import.KnowledgeImport]:
+        index_path = files.get_abs_path(abs_db_dir(memory_subdir), "knowledge_import.json")
+        if not os.path.exists(index_path):
+            return {}
+        with open(index_path, "r") as f:
+            return json.load(f)
+
+    def _watch_knowledge(self, kn_dirs: list[str]):
+        """Re-import changed knowledge files in the background while memory_knowledge_watch is on."""
+        if Memory._knowledge_watchers.get(self.memory_subdir) is self.db:
+            return
+        Memory._knowledge_watchers[self.memory_subdir] = self.db
+        EventLoopThread(KNOWLEDGE_WATCH_THREAD).run_coroutine(self._watch_knowledge_loop(kn_dirs))
+
+    async def _watch_knowledge_loop(self, kn_dirs: list[str]):
+        from python.helpers import settings
+
+        last_seen: dict[str, list[int]] = {}
+        try:
+            # a reload replaces the db, its watcher takes over
+            while Memory.index.get(self.memory_subdir) is self.db:
+                await asyncio.sleep(KNOWLEDGE_WATCH_INTERVAL)
+                try:
+                    if not settings.get_settings()["memory_knowledge_watch"]:
+                        continue
+                    files_found = await asyncio.to_thread(self._scan_knowledge, kn_dirs)
+                    seen = {path: knowledge_import.fingerprint(st) for path, st in files_found.items()}
+                    # files that failed to load stay out of the index, don't retry them until they change
+                    if seen == last_seen:
+                        continue
+                    last_seen = seen
+                    index = Memory._read_knowledge_index(self.memory_subdir)
+                    if knowledge_import.has_changes(index, files_found):
+                        await self.preload_knowledge(None, kn_dirs, self.memory_subdir)
+                except Exception as e:
+                    PrintStyle.error(f"Knowledge watch of '{self.memory_subdir}' failed: {e}")
+        finally:
+            if Memory._knowledge_watchers.get(self.memory_subdir) is self.db:
+                del Memory._knowledge_watchers[self.memory_subdir]
+
+    @staticmethod
+    def _scan_knowledge(kn_dirs: list[str]) -> dict[str, os.stat_result]:
+        found: dict[str, os.stat_result] = {}
+        for kn_dir, _metadata, filename_pattern, recursive in Memory._knowledge_sources(kn_dirs):
+            found.update(knowledge_import.list_files(kn_dir, filename_pattern, recursive))
+        return found
 
     def get_document_by_id(self, id: str) -> Document | None:
         return self.db.get_by_ids(id)[0]
@@ -332,7 +426,8 @@ class Memory:
     ):
         comparator = Memory._get_comparator(filter) if filter else None
 
-        return await self.db.asearch(
+        return await self._locked(
+            self.db.search,
             query,
             search_type="similarity_score_threshold",
             k=limit,
@@ -340,6 +435,45 @@ class Memory:
             filter=comparator,
         )
 
+    async def search_similarity_threshold_multi(
+        self,
+        queries: list[str],
+        limit: int | list[int],
+        threshold: float,
+        filter: str | list[str] = "",
+    ) -> list[list[Document]]:
+        """
+        Search several queries at once, one result list per query.
+
+        limit and filter are shared or given per query. All queries are embedded
+        in one batch and queries with the same filter are searched together in
+        one index call, so each filter is resolved only once.
+        """
+        if not queries:
+            return []
+        limits = limit if isinstance(limit, list) else [limit] * len(queries)
+        conditions = filter if isinstance(filter, list) else [filter] * len(queries)
+        comparators = [
+            Memory._get_comparator(condition) if condition else None
+            for condition in conditions
+        ]
+
+        unique = list(dict.fromkeys(queries))
+        embedded = await Memory._embed_queries(self.db.embedding_function, unique)  # type: ignore
+        vectors = dict(zip(unique, embedded))
+        found = await self._locked(
+            self.db.similarity_search_with_score_by_vectors,
+            [vectors[query] for query in queries],
+            k=limits,
+            filter=comparators,
+        )
+
+        relevance = self.db._select_relevance_score_fn()
+        return [
+            [doc for doc, score in docs if relevance(score) >= threshold]
+            for docs in found
+        ]
+
     async def delete_documents_by_query(
         self, query: str, threshold: float, filter: str = ""
     ):
@@ -363,28 +497,21 @@ class Memory:
                 # fnd = self.db.get(where={"id": {"$in": document_ids}})
                 # if fnd["ids"]: self.db.delete(ids=fnd["ids"])
                 # tot += len(fnd["ids"])
-                await self.db.adelete(ids=document_ids)
-                tot += len(document_ids)
+                deleted = await self._locked(self._delete_existing, document_ids)
+                tot += len(deleted)
 
             # If fewer than K document IDs, break the loop
             if len(document_ids) < k:
                 break
 
         if tot:
-            self._save_db()  # persist
+            await self._locked(self._compact_if_needed)
         return removed
 
     async def delete_documents_by_ids(self, ids: list[str]):
-        # aget_by_ids is not yet implemented in faiss, need to do a workaround
-        rem_docs = await self.db.aget_by_ids(
-            ids
-        )  # existing docs to remove (prevents error)
+        rem_docs = await self._locked(self._delete_existing, ids)
         if rem_docs:
-            rem_ids = [doc.metadata["id"] for doc in rem_docs]  # ids to remove
-            await self.db.adelete(ids=rem_ids)
-
-        if rem_docs:
-            self._save_db()  # persist
+            await self._locked(self._compact_if_needed)
         return rem_docs
 
     async def insert_text(self, text, metadata: dict = {}):
@@ -403,17 +530,81 @@ class Memory:
                 if not doc.metadata.get("area", ""):
                     doc.metadata["area"] = Memory.Area.MAIN.value
 
-            await self.db.aadd_documents(documents=docs, ids=ids)
-            self._save_db()  # persist
+            await self._add_documents(docs, ids)
+            await self._locked(self._compact_if_needed)
         return ids
 
     async def update_documents(self, docs: list[Document]):
         ids = [doc.metadata["id"] for doc in docs]
-        await self.db.adelete(ids=ids)  # delete originals
-        ins = await self.db.aadd_documents(documents=docs, ids=ids)  # add updated
-        self._save_db()  # persist
+        await self._locked(self._delete_existing, ids)  # delete originals
+        ins = await self._add_documents(docs, ids)  # add updated
+        await self._locked(self._compact_if_needed)
+        return ins
+
+    async def _insert_bulk(self, docs: list[Document], log_item: LogItem | None):
+        # like insert_documents, but persisted by the caller with a snapshot instead of the log
+        ids = [self._generate_doc_id() for _ in range(len(docs))]
+        timestamp = self.get_timestamp()
+        for doc, id in zip(docs, ids):
+            doc.metadata["id"] = id
+            doc.metadata["timestamp"] = timestamp
+            if not doc.metadata.get("area", ""):
+                doc.metadata["area"] = Memory.Area.MAIN.value
+
+        texts = [doc.page_content for doc in docs]
+        vectors = await Memory._embed_texts(
+            self.db.embedding_function,  # type: ignore
+            texts,
+            Memory._progress_reporter(log_item, "Preloading knowledge"),
+        )
+        await self._locked(self._add_embedded, docs, ids, vectors, False)
+        return ids
+
+    async def _add_documents(self, docs: list[Document], ids: list[str]):
+        # embed explicitly so the vectors can be appended to the log
+        texts = [doc.page_content for doc in docs]
+        vectors = await Memory._embed_texts(self.db.embedding_function, texts)  # type: ignore
+        return await self._locked(self._add_embedded, docs, ids, vectors)
+
+    async def _locked(self, fn, *args, **kwargs):
+        # db mutations and searches run off the event loop under the db lock, the
+        # knowledge watcher and agent loops use the same db from different threads
+        def run():
+            with self.db.lock:
+                return fn(*args, **kwargs)
+
+        return await asyncio.to_thread(run)
+
+    def _add_embedded(
+        self, docs: list[Document], ids: list[str], vectors: list[list[float]], log: bool = True
+    ):
+        ins = self.db.add_embeddings(
+            text_embeddings=list(zip([doc.page_content for doc in docs], vectors)),
+            metadatas=[doc.metadata for doc in docs],
+            ids=ids,
+        )
+        if log:
+            self._wal().append_add(docs, vectors)  # persist
         return ins
 
+    def _delete_existing(self, ids: list[str], log: bool = True) -> list[Document]:
+        docs = self.db.get_by_ids(ids)  # only existing docs, deleting others raises
+        if docs:
+            rem_ids = [doc.metadata["id"] for doc in docs]
+            self.db.delete(ids=rem_ids)
+            if log:
+                self._wal().append_delete(rem_ids)  # persist
+        return docs
+
+    def _wal(self) -> MemoryWal:
+        return MemoryWal(abs_db_dir(self.memory_subdir))
+
+    def _compact_if_needed(self):
+        if Memory._maintain_index(self.db, self.memory_subdir):
+            return  # rebuilt and saved
+        if self._wal().needs_compaction():
+            self._save_db()
+
     def _save_db(self):
         Memory._save_db_file(self.db, self.memory_subdir)
 
@@ -423,22 +614,74 @@ class Memory:
             if not self.db.get_by_ids(doc_id):  # check if exists
                 return doc_id
 
+    @staticmethod
+    async def _embed_texts(
+        embedder: Embeddings,
+        texts: list[str],
+        on_progress: embedding_pipeline.ProgressCallback | None = None,
+    ) -> list[list[float]]:
+        from python.helpers import settings
+
+        set = settings.get_settings()
+        return await embedding_pipeline.embed_texts(
+            embedder,
+            texts,
+            batch_size=set["embed_model_batch_size"],
+            concurrency=set["embed_model_concurrency"],
+            on_progress=on_progress,
+        )
+
+    @staticmethod
+    async def _embed_queries(embedder: Embeddings, queries: list[str]) -> list[list[float]]:
+        if isinstance(embedder, embedding_cache.CachedEmbeddings):
+            return await embedder.aembed_queries(queries)
+        return [await embedder.aembed_query(query) for query in queries]
+
+    @staticmethod
+    def _progress_reporter(
+        log_item: LogItem | None, heading: str
+    ) -> embedding_pipeline.ProgressCallback | None:
+        if not log_item:
+            return None
+
+        def report(done: int, total: int):
+            log_item.update(heading=f"{heading}... embedded {done}/{total} chunks")
+
+        return report
+
+    @staticmethod
+    def _maintain_index(db: MyFaiss, memory_subdir: str, save: bool = True) -> bool:
+        """Promote, re-train or compact the ANN index when needed, returns True if it was rebuilt."""
+        from python.helpers import settings
+
+        set = settings.get_settings()
+        meta = db.index_meta or memory_index.infer_meta(db.index)
+        target = memory_index.resolve_index_type(
+            set["memory_index_type"],
+            len(db.index_to_docstore_id),
+            set["memory_index_promote_threshold"],
+        )
+        if not memory_index.needs_rebuild(db, meta, target, set["memory_index_pq"]):
+            return False
+
+        PrintStyle.standard(f"Rebuilding memory index '{memory_subdir}' as {target}...")
+        db.index_meta = memory_index.rebuild_index(db, target, set["memory_index_pq"])
+        if save:
+            Memory._save_db_file(db, memory_subdir)
+        return True
+
     @staticmethod
     def _save_db_file(db: MyFaiss, memory_subdir: str):
         abs_dir = abs_db_dir(memory_subdir)
         db.save_local(folder_path=abs_dir)
+        (db.index_meta or memory_index.infer_meta(db.index)).save(abs_dir)
+        # the snapshot now contains everything the log did
+        MemoryWal(abs_dir).truncate()
 
     @staticmethod
     def _get_comparator(condition: str):
-        def comparator(data: dict[str, Any]):
-            try:
-                result = simple_eval(condition, names=data)
-                return result
-            except Exception as e:
-                PrintStyle.error(f"Error evaluating condition: {e}")
-                return False
-
-        return comparator
+        # parsed once, resolved against the columnar metadata index before the vector search
+        return memory_filter.compile_filter(condition)
 
     @staticmethod
     def _score_normalizer(val: float) -> float:
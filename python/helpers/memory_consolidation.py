@@ -334,29 +334,18 @@ class MemoryConsolidator:
         # Step 1: Extract keywords/queries for enhanced search
         search_queries = await self._extract_search_keywords(new_memory, log_item)
 
-        all_similar = []
-
-        # Step 2: Semantic similarity search with scores
-        semantic_similar = await db.search_similarity_threshold(
-            query=new_memory,
-            limit=self.config.max_similar_memories,
+        # Step 2 and 3: Semantic search for the memory itself plus keyword-based searches,
+        # embedded and searched together in one batch
+        keyword_queries = [query.strip() for query in search_queries if query.strip()]
+        queries_count = max(1, len(search_queries))  # Prevent division by zero
+        results = await db.search_similarity_threshold_multi(
+            queries=[new_memory] + keyword_queries,
+            limit=[self.config.max_similar_memories]
+            + [max(3, self.config.max_similar_memories // queries_count)] * len(keyword_queries),
             threshold=self.config.similarity_threshold,
-            filter=f"area == '{area}'"
+            filter=f"area == '{area}'",
         )
-        all_similar.extend(semantic_similar)
-
-        # Step 3: Keyword-based searches
-        for query in search_queries:
-            if query.strip():
-                # Fix division by zero: ensure len(search_queries) > 0
-                queries_count = max(1, len(search_queries))  # Prevent division by zero
-                keyword_similar = await db.search_similarity_threshold(
-                    query=query.strip(),
-                    limit=max(3, self.config.max_similar_memories // queries_count),
-                    threshold=self.config.similarity_threshold,
-                    filter=f"area == '{area}'"
-                )
-                all_similar.extend(keyword_similar)
+        all_similar = [doc for docs in results for doc in docs]
 
         # Step 4: Deduplicate by document ID and store similarity info
         seen_ids = set()
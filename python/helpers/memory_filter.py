@@ -0,0 +1,247 @@
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable
+
+from simpleeval import SimpleEval
+
+_COMPARE_OPS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+
+class MetadataIndex:
+    """
+    Columnar view of document metadata: column -> value -> document IDs.
+
+    Kept next to the FAISS docstore so filter expressions can be answered with
+    set operations over distinct values instead of evaluating every document.
+    """
+
+    def __init__(self):
+        self.ids: set[str] = set()
+        self.columns: dict[str, dict[Hashable, set[str]]] = {}
+        self.present: dict[str, set[str]] = {}  # column -> IDs having it
+        self.unindexed: set[str] = set()  # columns holding unhashable values
+
+    @staticmethod
+    def from_docs(docs: Iterable[tuple[str, dict[str, Any]]]) -> "MetadataIndex":
+        index = MetadataIndex()
+        for id, metadata in docs:
+            index.add(id, metadata)
+        return index
+
+    def add(self, id: str, metadata: dict[str, Any]):
+        self.ids.add(id)
+        for key, value in metadata.items():
+            if key in self.unindexed:
+                continue
+            try:
+                self.columns.setdefault(key, {}).setdefault(value, set()).add(id)
+            except TypeError:
+                self.unindexed.add(key)
+                self.columns.pop(key, None)
+                self.present.pop(key, None)
+                continue
+            self.present.setdefault(key, set()).add(id)
+
+    def remove(self, id: str, metadata: dict[str, Any]):
+        self.ids.discard(id)
+        for key, value in metadata.items():
+            column = self.columns.get(key)
+            if column is None:
+                continue
+            try:
+                ids = column.get(value)
+            except TypeError:
+                continue
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del column[value]
+            self.present.get(key, set()).discard(id)
+
+    def column(self, name: str) -> dict[Hashable, set[str]]:
+        return self.columns.get(name, {})
+
+    def having(self, name: str) -> set[str]:
+        return self.present.get(name, set())
+
+
+class MetadataFilter:
+    """
+    Filter expression parsed once.
+
+    Expressions made of comparisons between a metadata field and constants,
+    combined with and/or/not, are evaluated over a MetadataIndex via select().
+    Anything else falls back to simpleeval per document, still without
+    re-parsing. Calling the filter with a metadata dict evaluates it for one
+    document with the same semantics as simple_eval.
+    """
+
+    def __init__(self, condition: str):
+        self.condition = condition
+        try:
+            self._parsed = SimpleEval().parse(condition)
+        except Exception:
+            self._parsed = None  # malformed, often model written, filters match nothing
+        try:
+            tree = ast.parse(condition.strip(), mode="eval").body
+            self.names = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+            self._plan = _plan(tree)
+        except (SyntaxError, _Unsupported):
+            self.names = set()
+            self._plan = None
+
+    @property
+    def columnar(self) -> bool:
+        return self._plan is not None
+
+    def __call__(self, data: dict[str, Any]) -> bool:
+        # compiled filters are shared across search threads, names go to a fresh evaluator
+        if self._parsed is None:
+            return False
+        try:
+            evaluator = SimpleEval(names=data)
+            return bool(evaluator.eval(self.condition, previously_parsed=self._parsed))
+        except Exception:
+            return False  # like the previous vector_db comparator, a failing document doesn't match
+
+    def select(
+        self, index: MetadataIndex, metadata: Callable[[str], dict[str, Any]]
+    ) -> set[str]:
+        """Return IDs of matching documents, metadata(id) is only used for non-columnar filters."""
+        if self._parsed is None:
+            return set()
+        if self._plan is not None and not (self.names & index.unindexed):
+            true, _error = self._plan(index)
+            return true
+        return {id for id in index.ids if self(metadata(id))}
+
+
+@lru_cache(maxsize=256)
+def compile_filter(condition: str) -> MetadataFilter:
+    return MetadataFilter(condition)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+# a plan returns (ids where the expression is truthy, ids where evaluating it raises)
+_Plan = Callable[[MetadataIndex], tuple[set[str], set[str]]]
+
+
+def _plan(node: ast.AST) -> _Plan:
+    if isinstance(node, ast.BoolOp):
+        parts = [_plan(v) for v in node.values]
+        return _plan_and(parts) if isinstance(node.op, ast.And) else _plan_or(parts)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        inner = _plan(node.operand)
+
+        def not_(index: MetadataIndex):
+            true, error = inner(index)
+            return index.ids - true - error, error
+
+        return not_
+    if isinstance(node, ast.Compare) and len(node.ops) == 1:
+        return _plan_compare(node.left, node.ops[0], node.comparators[0])
+    if isinstance(node, ast.Name):
+        name = node.id
+        return _plan_values(name, bool)
+    raise _Unsupported()
+
+
+def _plan_and(parts: list[_Plan]) -> _Plan:
+    def and_(index: MetadataIndex):
+        true, error = parts[0](index)
+        for part in parts[1:]:
+            # short-circuit: the next operand only runs where everything so far was truthy
+            t, e = part(index)
+            error = error | (true & e)
+            true = true & t
+        return true, error
+
+    return and_
+
+
+def _plan_or(parts: list[_Plan]) -> _Plan:
+    def or_(index: MetadataIndex):
+        true, error = parts[0](index)
+        for part in parts[1:]:
+            # the next operand only runs where everything so far was falsy
+            pending = index.ids - true - error
+            t, e = part(index)
+            true = true | (pending & t)
+            error = error | (pending & e)
+        return true, error
+
+    return or_
+
+
+def _plan_compare(left: ast.AST, op: ast.cmpop, right: ast.AST) -> _Plan:
+    fn = _COMPARE_OPS.get(type(op))
+    if fn is None:
+        raise _Unsupported()
+    if isinstance(left, ast.Name) and _is_constant(right):
+        name, const = left.id, _constant(right)
+        if isinstance(op, ast.Eq):
+            return _plan_equals(name, const)
+        return _plan_values(name, lambda v: fn(v, const))
+    if isinstance(right, ast.Name) and _is_constant(left):
+        name, const = right.id, _constant(left)
+        return _plan_values(name, lambda v: fn(const, v))
+    raise _Unsupported()
+
+
+def _plan_equals(name: str, const: Any) -> _Plan:
+    def equals(index: MetadataIndex):
+        present = index.having(name)
+        try:
+            true = set(index.column(name).get(const, ()))
+        except TypeError:
+            true = set()
+        return true, index.ids - present
+
+    return equals
+
+
+def _plan_values(name: str, test: Callable[[Any], Any]) -> _Plan:
+    # evaluate the test once per distinct value, not once per document
+    def values(index: MetadataIndex):
+        true: set[str] = set()
+        error: set[str] = set()
+        for value, ids in index.column(name).items():
+            try:
+                if test(value):
+                    true |= ids
+            except Exception:
+                error |= ids
+        # unknown names raise in simple_eval
+        return true, error | (index.ids - index.having(name))
+
+    return values
+
+
+def _is_constant(node: ast.AST) -> bool:
+    # simple_eval has no tuple/list literals, so only plain constants qualify
+    if isinstance(node, ast.Constant):
+        return True
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return isinstance(node.operand, ast.Constant)
+    return False
+
+
+def _constant(node: ast.AST) -> Any:
+    if isinstance(node, ast.UnaryOp):
+        return -node.operand.value  # type: ignore
+    return node.value  # type: ignore
@@ -0,0 +1,526 @@
+import json
+import math
+import operator
+import os
+import threading
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, List, Literal, Optional
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+
+# faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
+from python.helpers import faiss_monkey_patch
+import faiss
+
+from python.helpers.memory_filter import MetadataFilter, MetadataIndex
+
+IndexType = Literal["flat", "ivf", "hnsw"]
+
+INDEX_AUTO = "auto"
+INDEX_FLAT: IndexType = "flat"
+INDEX_IVF: IndexType = "ivf"
+INDEX_HNSW: IndexType = "hnsw"
+INDEX_TYPES: tuple[str, ...] = (INDEX_AUTO, INDEX_FLAT, INDEX_IVF, INDEX_HNSW)
+
+INDEX_META_FILE = "index.json"
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 256
+IVF_MIN_LISTS = 16
+IVF_MAX_LISTS = 65536
+IVF_TRAIN_POINTS_PER_LIST = 39  # faiss warns below this
+IVF_RETRAIN_GROWTH = 4.0  # retrain once the index has grown this many times
+IVF_MIN_TRAIN_COUNT = 1024  # below this ivf falls back to flat
+PQ_MIN_TRAIN_COUNT = 4096  # pq codebooks need plenty of points per centroid
+PQ_MAX_SUBQUANTIZERS = 64
+TOMBSTONE_REBUILD_RATIO = 0.2  # rebuild hnsw once this share of vectors is dead
+PREFILTER_EXACT_LIMIT = 4096  # filtered ANN searches this small are scored exactly
+
+
+@dataclass
+class IndexMeta:
+    type: IndexType = INDEX_FLAT
+    pq: bool = False
+    trained_count: int = 0
+
+    @staticmethod
+    def load(db_dir: str) -> "IndexMeta | None":
+        path = os.path.join(db_dir, INDEX_META_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return IndexMeta(
+            type=data.get("type", INDEX_FLAT),
+            pq=bool(data.get("pq", False)),
+            trained_count=int(data.get("trained_count", 0)),
+        )
+
+    def save(self, db_dir: str):
+        os.makedirs(db_dir, exist_ok=True)
+        with open(os.path.join(db_dir, INDEX_META_FILE), "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+
+
+def resolve_index_type(
+    configured: str, doc_count: int, promote_threshold: int
+) -> IndexType:
+    """Map the configured index type (possibly "auto") to a concrete one for doc_count documents."""
+    if configured == INDEX_IVF:
+        # clusters can't be trained on a handful of vectors
+        return INDEX_IVF if doc_count >= IVF_MIN_TRAIN_COUNT else INDEX_FLAT
+    if configured in (INDEX_FLAT, INDEX_HNSW):
+        return configured  # type: ignore
+    if promote_threshold > 0 and doc_count >= promote_threshold:
+        return INDEX_HNSW
+    return INDEX_FLAT
+
+
+def needs_rebuild(db: "AnnFaiss", meta: IndexMeta, target: IndexType, pq: bool) -> bool:
+    if meta.type != target:
+        return True
+    if target == INDEX_IVF:
+        live = len(db.index_to_docstore_id)
+        if meta.pq != (pq and live >= PQ_MIN_TRAIN_COUNT):
+            return True
+        # clusters trained on a much smaller set degrade recall, re-train them
+        return meta.trained_count > 0 and live >= meta.trained_count * IVF_RETRAIN_GROWTH
+    if target == INDEX_HNSW:
+        return len(db.tombstones) > db.index.ntotal * TOMBSTONE_REBUILD_RATIO
+    return False
+
+
+def create_index(
+    type: IndexType, dim: int, vectors: np.ndarray | None = None, pq: bool = False
+):
+    """Create an empty inner-product index of the given type, training it on vectors if required."""
+    if type == INDEX_FLAT:
+        return faiss.IndexFlatIP(dim)
+
+    if type == INDEX_HNSW:
+        hnsw = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        hnsw.hnsw.efSearch = HNSW_EF_SEARCH
+        # hnsw has no native ids nor removal, wrap it to get stable labels
+        return faiss.IndexIDMap2(hnsw)
+
+    if type == INDEX_IVF:
+        count = 0 if vectors is None else len(vectors)
+        nlist = _ivf_lists(count)
+        quantizer = faiss.IndexFlatIP(dim)
+        m = _pq_subquantizers(dim) if pq and count >= PQ_MIN_TRAIN_COUNT else 0
+        if m:
+            index = faiss.IndexIVFPQ(
+                quantizer, dim, nlist, m, 8, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        if vectors is not None and count:
+            index.train(_training_sample(vectors, nlist))
+        index.nprobe = max(1, min(nlist, int(math.sqrt(nlist)) * 2))
+        # keep a hashtable direct map so vectors can be reconstructed and removed by label
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+
+    raise ValueError(f"Unknown index type: {type}")
+
+
+def rebuild_index(
+    db: "AnnFaiss", type: IndexType, pq: bool = False
+) -> IndexMeta:
+    """
+    Re-create db.index as the given type from the vectors it currently holds.
+
+    Vectors are reconstructed from the existing index, so rebuilding from a
+    PQ-compressed index is approximate.
+    """
+    labels = sorted(db.index_to_docstore_id)
+    ids = [db.index_to_docstore_id[label] for label in labels]
+    vectors = _reconstruct(db.index, labels)
+
+    index = create_index(type, db.index.d, vectors, pq=pq)
+    if len(vectors):
+        if type == INDEX_FLAT:
+            index.add(vectors)
+        else:
+            index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+
+    db.index = index
+    db.index_to_docstore_id = {i: id for i, id in enumerate(ids)}
+    db.tombstones = set()
+    db.next_label = len(ids)
+    return IndexMeta(
+        type=type,
+        pq=isinstance(index, faiss.IndexIVFPQ),
+        trained_count=len(vectors) if type == INDEX_IVF else 0,
+    )
+
+
+def infer_meta(index: Any) -> IndexMeta:
+    """Describe an index loaded without index.json (databases created before ANN support are flat)."""
+    if isinstance(index, faiss.IndexIVF):
+        return IndexMeta(
+            type=INDEX_IVF, pq=isinstance(index, faiss.IndexIVFPQ), trained_count=index.ntotal
+        )
+    if isinstance(index, faiss.IndexIDMap):
+        return IndexMeta(type=INDEX_HNSW)
+    return IndexMeta(type=INDEX_FLAT)
+
+
+def is_labeled(index: Any) -> bool:
+    """Flat indexes renumber on removal, everything else keeps stable labels."""
+    return not isinstance(index, faiss.IndexFlat)
+
+
+class AnnFaiss(FAISS):
+    """
+    FAISS vector store that also works with labeled ANN indexes.
+
+    Flat indexes keep the upstream behaviour. IVF indexes are addressed by
+    stable labels via add_with_ids/remove_ids, and hnsw indexes (which cannot
+    remove vectors) are wrapped in IndexIDMap2 with deleted labels tombstoned
+    until the next rebuild.
+
+    A columnar MetadataIndex is kept alongside, so MetadataFilter filters are
+    resolved to a label selector before the vector search instead of being
+    evaluated on every candidate.
+
+    Callers hold lock around mutations and searches that can run on
+    different threads.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+        # label of the next added vector, counted up instead of scanning all labels per add
+        self.next_label = max(self.index_to_docstore_id, default=-1) + 1
+
+    @property
+    def tombstones(self) -> set[int]:
+        """Labels of deleted vectors still stored in an hnsw index."""
+        if not hasattr(self, "_tombstones"):
+            self._tombstones: set[int] = set()
+        return self._tombstones
+
+    @tombstones.setter
+    def tombstones(self, value: set[int]):
+        self._tombstones = value
+
+    @property
+    def metadata_index(self) -> MetadataIndex:
+        """Columnar metadata of all documents, built on first use."""
+        if getattr(self, "_metadata_index", None) is None:
+            self._metadata_index = MetadataIndex.from_docs(
+                (id, doc.metadata) for id, doc in self.docstore._dict.items()  # type: ignore
+            )
+        return self._metadata_index  # type: ignore
+
+    def _FAISS__add(
+        self,
+        texts: Iterable[str],
+        embeddings: Iterable[List[float]],
+        metadatas: Optional[Iterable[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        if not is_labeled(self.index):
+            ids = super()._FAISS__add(texts, embeddings, metadatas, ids)  # type: ignore
+        else:
+            ids = self._add_labeled(texts, embeddings, metadatas, ids)
+
+        self._labels_version = getattr(self, "_labels_version", 0) + 1
+        if getattr(self, "_metadata_index", None) is not None:
+            for id_ in ids:
+                self._metadata_index.add(id_, self.docstore._dict[id_].metadata)  # type: ignore
+        return ids
+
+    def _add_labeled(
+        self,
+        texts: Iterable[str],
+        embeddings: Iterable[List[float]],
+        metadatas: Optional[Iterable[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Duplicate ids found in the ids list.")
+        _metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        vector = np.array(list(embeddings), dtype=np.float32)
+        if self._normalize_L2:
+            faiss.normalize_L2(vector)
+
+        start = self.next_label
+        labels = np.arange(start, start + len(texts), dtype=np.int64)
+        self.index.add_with_ids(vector, labels)
+        self.next_label = start + len(texts)
+
+        self.docstore.add(  # type: ignore
+            {
+                id_: Document(id=id_, page_content=t, metadata=m)
+                for id_, t, m in zip(ids, texts, _metadatas)
+            }
+        )
+        self.index_to_docstore_id.update(
+            {int(label): id_ for label, id_ in zip(labels, ids)}
+        )
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        removed = [
+            (id_, self.docstore._dict[id_].metadata)  # type: ignore
+            for id_ in ids or []
+            if id_ in self.docstore._dict  # type: ignore
+        ]
+        if not is_labeled(self.index):
+            result = super().delete(ids, **kwargs)
+        else:
+            result = self._delete_labeled(ids)
+
+        self._labels_version = getattr(self, "_labels_version", 0) + 1
+        if getattr(self, "_metadata_index", None) is not None:
+            for id_, metadata in removed:
+                self._metadata_index.remove(id_, metadata)
+        return result
+
+    def _delete_labeled(self, ids: Optional[List[str]] = None) -> Optional[bool]:
+        if ids is None:
+            raise ValueError("No ids provided to delete.")
+        reversed_index = self._labels_by_id()
+        missing_ids = set(ids).difference(reversed_index)
+        if missing_ids:
+            raise ValueError(
+                f"Some specified ids do not exist in the current store. Ids not found: "
+                f"{missing_ids}"
+            )
+        labels = np.array([reversed_index[id_] for id_ in ids], dtype=np.int64)
+
+        try:
+            self.index.remove_ids(labels)
+        except RuntimeError:
+            # hnsw can't remove vectors, hide them until the index is rebuilt
+            self.tombstones.update(int(label) for label in labels)
+
+        self.docstore.delete(ids)  # type: ignore
+        for label in labels:
+            del self.index_to_docstore_id[int(label)]
+        return True
+
+    def select_documents(self, filter: MetadataFilter, limit: int = 0) -> list[Document]:
+        """Documents matching filter in insertion order, without any vector search."""
+        docs = self.docstore._dict  # type: ignore
+        ids = filter.select(self.metadata_index, lambda id_: docs[id_].metadata)
+        by_id = self._labels_by_id()
+        ordered = sorted(ids, key=lambda id_: by_id.get(id_, -1))
+        if limit > 0:
+            ordered = ordered[:limit]
+        return [docs[id_] for id_ in ordered]
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Any = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ):
+        if isinstance(filter, MetadataFilter):
+            return self._search_prefiltered(
+                self._query_vectors([embedding]), [k], filter, **kwargs
+            )[0]
+
+        if not is_labeled(self.index):
+            return super().similarity_search_with_score_by_vector(
+                embedding, k=k, filter=filter, fetch_k=fetch_k, **kwargs
+            )
+
+        # over-fetch by the number of tombstones so dead hits don't starve the result
+        dead = len(self.tombstones)
+        search_k = (k if filter is None else fetch_k) + dead
+        scores, labels = self.index.search(self._query_vectors([embedding]), search_k)
+        filter_func = self._create_filter_func(filter) if filter is not None else None
+        return self._collect(scores[0], labels[0], k, filter_func, **kwargs)
+
+    def similarity_search_with_score_by_vectors(
+        self,
+        embeddings: List[List[float]],
+        k: int | List[int] = 4,
+        filter: Any = None,
+        **kwargs: Any,
+    ) -> list[list[tuple[Document, float]]]:
+        """
+        Search several query vectors at once, one result list per vector.
+
+        k and filter are either shared or given per vector as lists. Vectors
+        with the same filter go to the index in a single batched search, a
+        MetadataFilter is resolved once for all of them.
+        """
+        count = len(embeddings)
+        ks = list(k) if isinstance(k, (list, tuple)) else [k] * count
+        filters = list(filter) if isinstance(filter, (list, tuple)) else [filter] * count
+        results: list[list[tuple[Document, float]]] = [[] for _ in range(count)]
+        if not count:
+            return results
+
+        # compile_filter caches parsed filters, equal conditions share the object
+        groups: dict[int, list[int]] = {}
+        for row, row_filter in enumerate(filters):
+            groups.setdefault(id(row_filter), []).append(row)
+
+        vectors = self._query_vectors(embeddings)
+        for rows in groups.values():
+            group_filter, group_ks = filters[rows[0]], [ks[row] for row in rows]
+            if isinstance(group_filter, MetadataFilter):
+                found = self._search_prefiltered(
+                    vectors[rows], group_ks, group_filter, **kwargs
+                )
+            elif group_filter is None:
+                found = self._search_unfiltered(vectors[rows], group_ks, **kwargs)
+            else:
+                found = [
+                    self.similarity_search_with_score_by_vector(
+                        embeddings[row], k=ks[row], filter=group_filter, **kwargs
+                    )
+                    for row in rows
+                ]
+            for row, docs in zip(rows, found):
+                results[row] = docs
+        return results
+
+    def _search_unfiltered(self, vectors: np.ndarray, ks: List[int], **kwargs: Any):
+        # over-fetch by the number of tombstones so dead hits don't starve the result
+        search_k = max(ks) + len(self.tombstones)
+        scores, labels = self.index.search(vectors, search_k)
+        return [
+            self._collect(row_scores, row_labels, k, None, **kwargs)
+            for row_scores, row_labels, k in zip(scores, labels, ks)
+        ]
+
+    def _search_prefiltered(
+        self, vectors: np.ndarray, ks: List[int], filter: MetadataFilter, **kwargs: Any
+    ):
+        ids = filter.select(
+            self.metadata_index,
+            lambda id_: self.docstore._dict[id_].metadata,  # type: ignore
+        )
+        by_id = self._labels_by_id()
+        labels = np.fromiter(
+            (by_id[id_] for id_ in ids if id_ in by_id), dtype=np.int64
+        )
+        if not len(labels):
+            return [[] for _ in ks]
+        k = max(ks)
+
+        if is_labeled(self.index) and len(labels) <= PREFILTER_EXACT_LIMIT:
+            # graph and cluster search degrade on tiny subsets, score them exactly
+            stored = _reconstruct(self.index, labels.tolist())
+            scores = vectors @ stored.T  # all memory indexes are inner product
+            order = np.argsort(-scores, axis=1)[:, :k]
+            return [
+                self._collect(row_scores[row_order], labels[row_order], row_k, None, **kwargs)
+                for row_scores, row_order, row_k in zip(scores, order, ks)
+            ]
+
+        params = _search_params(self.index, faiss.IDSelectorBatch(labels))
+        scores, found = self.index.search(vectors, min(k, len(labels)), params=params)
+        return [
+            self._collect(row_scores, row_found, row_k, None, **kwargs)
+            for row_scores, row_found, row_k in zip(scores, found, ks)
+        ]
+
+    def _collect(self, scores, labels, k: int, filter_func, **kwargs: Any):
+        docs = []
+        for score, label in zip(scores, labels):
+            _id = self.index_to_docstore_id.get(int(label))
+            if _id is None:  # -1 or tombstone
+                continue
+            doc = self.docstore.search(_id)  # type: ignore
+            if not isinstance(doc, Document):
+                continue
+            if filter_func is None or filter_func(doc.metadata):
+                docs.append((doc, float(score)))
+
+        score_threshold = kwargs.get("score_threshold")
+        if score_threshold is not None:
+            cmp = (
+                operator.ge
+                if self.distance_strategy
+                in (DistanceStrategy.MAX_INNER_PRODUCT, DistanceStrategy.JACCARD)
+                else operator.le
+            )
+            docs = [(doc, s) for doc, s in docs if cmp(s, score_threshold)]
+        return docs[:k]
+
+    def _query_vectors(self, embeddings: List[List[float]]) -> np.ndarray:
+        vectors = np.array(embeddings, dtype=np.float32)
+        if self._normalize_L2:
+            faiss.normalize_L2(vectors)
+        return vectors
+
+    def _labels_by_id(self) -> dict[str, int]:
+        # rebuilds and flat deletes swap in a new dict, everything else bumps the version
+        key = (id(self.index_to_docstore_id), getattr(self, "_labels_version", 0))
+        if getattr(self, "_labels_key", None) != key:
+            self._labels_cache = {
+                id_: label for label, id_ in self.index_to_docstore_id.items()
+            }
+            self._labels_key = key
+        return self._labels_cache
+
+
+def load_tombstones(db: AnnFaiss):
+    """Restore hnsw tombstones after loading, they are every stored label without a document."""
+    if not isinstance(db.index, faiss.IndexIDMap):
+        return
+    stored = faiss.vector_to_array(db.index.id_map)
+    live = set(db.index_to_docstore_id)
+    db.tombstones = {int(label) for label in stored if int(label) not in live}
+    if db.tombstones:
+        # tombstoned labels are still stored, new vectors must not reuse them
+        db.next_label = max(db.next_label, max(db.tombstones) + 1)
+
+
+def _reconstruct(index: Any, labels: list[int]) -> np.ndarray:
+    if not labels:
+        return np.zeros((0, index.d), dtype=np.float32)
+    if not is_labeled(index):
+        return index.reconstruct_n(0, index.ntotal)
+    return np.vstack([index.reconstruct(int(label)) for label in labels]).astype(
+        np.float32
+    )
+
+
+def _search_params(index: Any, selector: Any):
+    """Search parameters restricted to selector, keeping the index's own tuning."""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    if isinstance(inner, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=inner.nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+
+def _ivf_lists(count: int) -> int:
+    nlist = int(4 * math.sqrt(max(count, 1)))
+    # keep enough training points per centroid
+    nlist = min(nlist, max(1, count // IVF_TRAIN_POINTS_PER_LIST))
+    return max(1, min(IVF_MAX_LISTS, max(min(IVF_MIN_LISTS, count), nlist)))
+
+
+def _pq_subquantizers(dim: int) -> int:
+    for m in range(min(PQ_MAX_SUBQUANTIZERS, dim), 0, -1):
+        if dim % m == 0 and dim // m >= 2:
+            return m
+    return 0
+
+
+def _training_sample(vectors: np.ndarray, nlist: int) -> np.ndarray:
+    limit = nlist * 256
+    if len(vectors) <= limit:
+        return vectors
+    rng = np.random.default_rng(0)
+    return vectors[rng.choice(len(vectors), limit, replace=False)]
@@ -0,0 +1,148 @@
+import base64
+import json
+import os
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+from python.helpers.print_style import PrintStyle
+
+if TYPE_CHECKING:
+    from python.helpers.memory import MyFaiss
+
+WAL_FILE = "memory.wal"
+SNAPSHOT_FILES = ("index.faiss", "index.pkl")
+
+# compact when the log outgrows this many bytes...
+COMPACT_MIN_BYTES = 8 * 1024 * 1024
+# ...and is at least this large relative to the snapshot
+COMPACT_SNAPSHOT_RATIO = 0.5
+
+
+class MemoryWal:
+    """
+    Append-only log of memory mutations stored next to the FAISS snapshot.
+
+    Each line is one JSON record, either an "add" with documents and their
+    float32 vectors or a "delete" with document IDs. Records are replayed on
+    top of the snapshot at load time and the log is truncated whenever the
+    full snapshot is written.
+    """
+
+    def __init__(self, db_dir: str):
+        self.db_dir = db_dir
+        self.path = os.path.join(db_dir, WAL_FILE)
+        self.skipped = 0  # corrupted records seen by the last replay
+
+    def append_add(self, docs: Sequence[Document], vectors: Sequence[Sequence[float]]):
+        records = []
+        for doc, vector in zip(docs, vectors):
+            records.append(
+                {
+                    "id": doc.metadata["id"],
+                    "text": doc.page_content,
+                    "metadata": doc.metadata,
+                    "vector": _encode_vector(vector),
+                }
+            )
+        if records:
+            self._append({"op": "add", "docs": records})
+
+    def append_delete(self, ids: Iterable[str]):
+        ids = list(ids)
+        if ids:
+            self._append({"op": "delete", "ids": ids})
+
+    def replay(self, db: "MyFaiss") -> int:
+        """Apply all logged operations to db, returns the number of records applied."""
+        applied = 0
+        self.skipped = 0
+        existing = set(db.index_to_docstore_id.values())
+        for record in self._read():
+            if record.get("op") == "add":
+                docs = record.get("docs", [])
+                ids = [d["id"] for d in docs]
+                # replay is idempotent - the snapshot may already contain these
+                present = [id for id in ids if id in existing]
+                if present:
+                    db.delete(ids=present)
+                db.add_embeddings(
+                    text_embeddings=[
+                        (d["text"], _decode_vector(d["vector"])) for d in docs
+                    ],
+                    metadatas=[d["metadata"] for d in docs],
+                    ids=ids,
+                )
+                existing.update(ids)
+            elif record.get("op") == "delete":
+                ids = [id for id in record.get("ids", []) if id in existing]
+                if ids:
+                    db.delete(ids=ids)
+                    existing.difference_update(ids)
+            else:
+                continue
+            applied += 1
+        return applied
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def needs_compaction(self) -> bool:
+        size = self.size()
+        if size < COMPACT_MIN_BYTES:
+            return False
+        snapshot_size = 0
+        for name in SNAPSHOT_FILES:
+            try:
+                snapshot_size += os.path.getsize(os.path.join(self.db_dir, name))
+            except OSError:
+                pass
+        return size >= snapshot_size * COMPACT_SNAPSHOT_RATIO
+
+    def truncate(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _append(self, record: dict[str, Any]):
+        os.makedirs(self.db_dir, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with open(self.path, "a+b") as f:
+            # start a new line after a torn write, or this record would be lost with it
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn write, records appended after it start on a new line
+                    PrintStyle.warning(
+                        f"Skipping corrupted memory log record at {self.path}:{line_no}"
+                    )
+                    self.skipped += 1
+
+
+def _encode_vector(vector: Sequence[float]) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode(
+        "ascii"
+    )
+
+
+def _decode_vector(data: str) -> list[float]:
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).tolist()
@@ -282,7 +282,7 @@ def _deserialize_log(data: dict[str, Any]) -> "Log":
                 id=item_data.get("id"),
             )
         )
-        log.updates.append(i)
+        log.mark_updated(i)
         i += 1
 
     return log
@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+MAX_SPANS = 5000  # spans kept per context for traces, oldest go first
+MAX_CONTEXTS = 64  # contexts with profiles, least recently recorded go first
+LATENCY_SAMPLES = 500  # durations kept per span name for percentiles
+MIN_TRACE_US = 1000  # shorter spans only count towards aggregates, keeps per-chunk extensions out of traces
+
+
+@dataclass(slots=True)
+class Span:
+    cat: str
+    name: str
+    start_us: int  # wall clock, so spans of several contexts line up
+    dur_us: int
+    agent: int
+    iteration: int
+    args: dict[str, Any]
+
+
+@dataclass
+class _Scope:
+    context_id: str
+    agent: int
+    iteration: int = 0
+
+
+@dataclass
+class _Open:
+    scope: _Scope
+    cat: str
+    name: str
+    start_us: int
+    start_ns: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+# set by the agent monologue, inherited by everything it awaits and the tasks it starts
+_scope: ContextVar[_Scope | None] = ContextVar("profiler_scope", default=None)
+
+
+class ProfileStore:
+    """
+    Timings of one context: the latest spans for traces and, per (category, name),
+    the latest durations for percentiles. Both are bounded.
+    """
+
+    def __init__(self, max_spans: int = MAX_SPANS, samples: int = LATENCY_SAMPLES):
+        self.samples = samples
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self._durations: dict[tuple[str, str], deque[int]] = {}
+        self._counts: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        key = (span.cat, span.name)
+        with self._lock:
+            durations = self._durations.get(key)
+            if durations is None:
+                durations = self._durations[key] = deque(maxlen=self.samples)
+            durations.append(span.dur_us)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if span.dur_us >= MIN_TRACE_US:
+                self.spans.append(span)
+
+    def aggregates(self) -> list[dict[str, Any]]:
+        """Percentiles per span name over the latest samples, slowest total first."""
+        with self._lock:
+            items = [(key, sorted(durations), self._counts[key]) for key, durations in self._durations.items()]
+        result = []
+        for (cat, name), durations, count in items:
+            n = len(durations)
+            result.append(
+                {
+                    "cat": cat,
+                    "name": name,
+                    "count": count,
+                    "avg_ms": round(sum(durations) / n / 1000, 2),
+                    "p50_ms": round(durations[int(n * 0.5)] / 1000, 2),
+                    "p95_ms": round(durations[min(n - 1, int(n * 0.95))] / 1000, 2),
+                    "p99_ms": round(durations[min(n - 1, int(n * 0.99))] / 1000, 2),
+                    "max_ms": round(durations[-1] / 1000, 2),
+                    "total_ms": round(sum(durations) / 1000, 2),
+                }
+            )
+        result.sort(key=lambda item: item["total_ms"], reverse=True)
+        return result
+
+    def iterations(self) -> list[dict[str, Any]]:
+        """Spans grouped by (agent, iteration), latest first."""
+        with self._lock:
+            spans = list(self.spans)
+        grouped: dict[tuple[int, int], list[Span]] = {}
+        for span in spans:
+            grouped.setdefault((span.agent, span.iteration), []).append(span)
+        result = []
+        for (agent, iteration), items in grouped.items():
+            start = min(span.start_us for span in items)
+            result.append(
+                {
+                    "agent": agent,
+                    "iteration": iteration,
+                    "start_us": start,
+                    "spans": [
+                        {
+                            "cat": span.cat,
+                            "name": span.name,
+                            "offset_ms": round((span.start_us - start) / 1000, 2),
+                            "dur_ms": round(span.dur_us / 1000, 2),
+                            "args": span.args,
+                        }
+                        for span in sorted(items, key=lambda span: span.start_us)
+                    ],
+                }
+            )
+        result.sort(key=lambda item: item["start_us"], reverse=True)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self._durations.clear()
+            self._counts.clear()
+
+
+_stores: "OrderedDict[str, ProfileStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def get_store(context_id: str, create: bool = False) -> ProfileStore | None:
+    with _stores_lock:
+        store = _stores.get(context_id)
+        if store is None and create:
+            store = _stores[context_id] = ProfileStore()
+            while len(_stores) > MAX_CONTEXTS:
+                _stores.popitem(last=False)
+        if store is not None:
+            _stores.move_to_end(context_id)
+        return store
+
+
+def context_ids() -> list[str]:
+    with _stores_lock:
+        return list(_stores)
+
+
+def remove_store(context_id: str):
+    with _stores_lock:
+        _stores.pop(context_id, None)
+
+
+def enter(context_id: str, agent: int) -> Token:
+    """Attribute spans recorded from here on to the agent of a context, undo with leave()."""
+    return _scope.set(_Scope(context_id=context_id, agent=agent))
+
+
+def leave(token: Token):
+    _scope.reset(token)
+
+
+def set_iteration(iteration: int):
+    scope = _scope.get()
+    if scope is not None:
+        scope.iteration = iteration
+
+
+def start(cat: str, name: str, **args: Any) -> _Open | None:
+    """Open a span in the current scope, None outside of any agent."""
+    scope = _scope.get()
+    if scope is None:
+        return None
+    return _Open(scope, cat, name, time.time_ns() // 1000, time.perf_counter_ns(), args)
+
+
+def end(span: _Open | None, **args: Any):
+    if span is None:
+        return
+    span.args.update(args)
+    dur_us = (time.perf_counter_ns() - span.start_ns) // 1000
+    store = get_store(span.scope.context_id, create=True)
+    store.add(  # type: ignore
+        Span(
+            cat=span.cat,
+            name=span.name,
+            start_us=span.start_us,
+            dur_us=dur_us,
+            agent=span.scope.agent,
+            iteration=span.scope.iteration,
+            args=span.args,
+        )
+    )
+
+
+@contextmanager
+def span(cat: str, name: str, **args: Any) -> Iterator[dict[str, Any]]:
+    """Time the block, yields the span args so the block can add to them."""
+    opened = start(cat, name, **args)
+    try:
+        yield opened.args if opened else {}
+    finally:
+        end(opened)
+
+
+def chrome_trace(ids: list[str]) -> dict[str, Any]:
+    """Spans in the Chrome trace event format, loads in Perfetto and chrome://tracing."""
+    events: list[dict[str, Any]] = []
+    for pid, context_id in enumerate(ids, start=1):
+        store = get_store(context_id)
+        if store is None:
+            continue
+        with store._lock:
+            spans = list(store.spans)
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"context {context_id}"}})
+        for agent in sorted({span.agent for span in spans}):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": agent, "args": {"name": f"A{agent}"}})
+        for span in spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.cat,
+                    "ph": "X",
+                    "ts": span.start_us,
+                    "dur": span.dur_us,
+                    "pid": pid,
+                    "tid": span.agent,
+                    "args": {"iteration": span.iteration, **span.args},
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
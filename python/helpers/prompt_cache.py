@@ -0,0 +1,147 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+from python.helpers import fs_cache
+
+# cached lookups are re-validated against the file system at most this often (seconds)
+CHECK_INTERVAL = 1.0
+
+T = TypeVar("T")
+
+_CONDITION_PATTERN = re.compile(r"{{\s*if\s+", flags=re.DOTALL)
+
+
+@dataclass
+class Template:
+    """A prompt file read once: raw content plus what rendering needs to know about it."""
+
+    path: str
+    mtime: int | None
+    content: str
+    is_json: bool
+    has_conditions: bool
+
+
+@dataclass
+class RenderStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+_lock = threading.Lock()
+_paths: dict[tuple, fs_cache.Entry] = {}
+_templates: dict[str, fs_cache.Entry] = {}
+_plugins: dict[tuple, fs_cache.Entry] = {}
+_dirs: dict[tuple, fs_cache.Entry] = {}
+_stats: dict[str, RenderStats] = {}
+
+
+def find_file(filename: str, directories: list[str]) -> str:
+    """Cached files.find_file_in_dirs, raises FileNotFoundError the same way."""
+    from python.helpers import files
+
+    def resolve():
+        try:
+            return files.find_file_in_dirs(filename, directories)
+        except FileNotFoundError:
+            return None
+
+    path = _cached(_paths, (filename, tuple(directories)), lambda: None, resolve)
+    if path is None:
+        raise FileNotFoundError(
+            f"File '{filename}' not found in any of the provided directories."
+        )
+    return path
+
+
+def read_template(path: str, encoding: str = "utf-8") -> Template:
+    """Read and pre-scan a prompt file, re-read only when its mtime changes."""
+    from python.helpers import files
+
+    def load():
+        with open(path, "r", encoding=encoding) as f:
+            content = f.read()
+        return Template(
+            path=path,
+            mtime=fs_cache.mtime(path),
+            content=content,
+            is_json=files.is_full_json_template(content),
+            has_conditions=bool(_CONDITION_PATTERN.search(content)),
+        )
+
+    return _cached(_templates, path, lambda: fs_cache.mtime(path), load)
+
+
+def get_plugin_class(file: str, directories: list[str]) -> type | None:
+    """VariablesPlugin subclass for a prompt file, the module is imported once per change."""
+    from python.helpers import files, extract_tools
+
+    plugin_filename = files.basename(file, ".md") + ".py"
+
+    def plugin_file():
+        try:
+            return files.find_file_in_dirs(plugin_filename, directories)
+        except FileNotFoundError:
+            return None
+
+    def stamp():
+        path = plugin_file()
+        return path, fs_cache.mtime(path) if path else None
+
+    def load():
+        path = plugin_file()
+        if not path or not files.exists(path):
+            return None
+        classes = extract_tools.load_classes_from_file(
+            path, files.VariablesPlugin, one_per_file=False
+        )
+        return classes[0] if classes else None
+
+    return _cached(_plugins, (file, tuple(directories)), stamp, load)
+
+
+def get_dirs(key: tuple, compute: Callable[[], list[str]]) -> list[str]:
+    """Directory chain for a key such as (profile, project), recomputed every CHECK_INTERVAL."""
+    return _cached(_dirs, key, lambda: None, compute)
+
+
+def record_render(path: str, elapsed: float):
+    with _lock:
+        stats = _stats.setdefault(path, RenderStats())
+        stats.count += 1
+        stats.total_ms += elapsed * 1000
+        stats.max_ms = max(stats.max_ms, elapsed * 1000)
+
+
+def get_stats() -> list[dict[str, Any]]:
+    """Per-template render times, slowest total first."""
+    with _lock:
+        items = list(_stats.items())
+    result = [
+        {
+            "template": path,
+            "count": s.count,
+            "total_ms": round(s.total_ms, 3),
+            "avg_ms": round(s.total_ms / s.count, 3) if s.count else 0.0,
+            "max_ms": round(s.max_ms, 3),
+        }
+        for path, s in items
+    ]
+    result.sort(key=lambda s: s["total_ms"], reverse=True)
+    return result
+
+
+def clear():
+    with _lock:
+        _paths.clear()
+        _templates.clear()
+        _plugins.clear()
+        _dirs.clear()
+        _stats.clear()
+
+
+def _cached(cache: dict, key: Any, stamp: Callable[[], Any], build: Callable[[], T]) -> T:
+    return fs_cache.cached(cache, key, stamp, build, CHECK_INTERVAL)
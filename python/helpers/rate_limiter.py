@@ -1,57 +1,157 @@
 import asyncio
+import threading
 import time
-from typing import Callable, Awaitable
+from collections import deque
+from typing import Callable, Awaitable, Literal
+
+Mode = Literal["window", "bucket"]
+
+# sliding window resolution, usage is kept in timeframe / WINDOW_BUCKETS wide buckets
+WINDOW_BUCKETS = 600
 
 
 class RateLimiter:
-    def __init__(self, seconds: int = 60, **limits: int):
+    """
+    Usage tracker with limits over a sliding window or as token buckets.
+
+    Usage added with add() is shared by everyone holding the limiter; limits and
+    mode can be passed per call, so models with different limits can share one
+    limiter per provider account. In "window" mode the usage of the last
+    `seconds` is compared to the limit. In "bucket" mode each limit is a token
+    bucket refilled at limit/seconds per second, allowing bursts up to the limit.
+    All accounting is O(1) amortized and wait() sleeps until the exact time the
+    usage falls back under the limit.
+    """
+
+    def __init__(self, seconds: int = 60, mode: Mode = "window", **limits: int):
         self.timeframe = seconds
+        self.mode: Mode = mode
         self.limits = {key: value if isinstance(value, (int, float)) else 0 for key, value in (limits or {}).items()}
-        self.values = {key: [] for key in self.limits.keys()}
-        self._lock = asyncio.Lock()
+        self._width = seconds / WINDOW_BUCKETS
+        self._buckets: dict[str, deque[list[float]]] = {}  # key -> [bucket number, value]
+        self._totals: dict[str, float] = {}
+        self._levels: dict[tuple[str, float], list[float]] = {}  # (key, limit) -> [used, at]
+        self._lock = threading.Lock()
 
     def add(self, **kwargs: int):
         now = time.time()
-        for key, value in kwargs.items():
-            if not key in self.values:
-                self.values[key] = []
-            self.values[key].append((now, value))
-
-    async def cleanup(self):
-        async with self._lock:
-            now = time.time()
-            cutoff = now - self.timeframe
-            for key in self.values:
-                self.values[key] = [(t, v) for t, v in self.values[key] if t > cutoff]
+        number = int(now / self._width)
+        with self._lock:
+            for key, value in kwargs.items():
+                buckets = self._buckets.setdefault(key, deque())
+                if buckets and buckets[-1][0] == number:
+                    buckets[-1][1] += value
+                else:
+                    buckets.append([number, value])
+                self._totals[key] = self._totals.get(key, 0) + value
+                for (level_key, limit), level in self._levels.items():
+                    if level_key == key:
+                        self._drain(level, limit, now)
+                        level[0] += value
 
     async def get_total(self, key: str) -> int:
-        async with self._lock:
-            if not key in self.values:
-                return 0
-            return sum(value for _, value in self.values[key])
+        return self.total(key)
+
+    def total(self, key: str) -> int:
+        with self._lock:
+            self._expire(key, time.time())
+            return int(self._totals.get(key, 0))
+
+    def utilization(
+        self, limits: dict[str, int] | None = None, mode: Mode | None = None
+    ) -> dict[str, float]:
+        """Share of each set limit currently used, above 1.0 means callers are waiting."""
+        now = time.time()
+        with self._lock:
+            return {
+                key: self._used(key, limit, mode or self.mode, now) / limit
+                for key, limit in (limits or self.limits).items()
+                if limit > 0
+            }
+
+    def wait_time(
+        self, limits: dict[str, int] | None = None, mode: Mode | None = None
+    ) -> float:
+        """Seconds until usage is within all limits, 0 if it already is."""
+        return max((w[1] for w in self._over_limits(limits, mode)), default=0.0)
 
     async def wait(
         self,
         callback: Callable[[str, str, int, int], Awaitable[bool]] | None = None,
+        limits: dict[str, int] | None = None,
+        mode: Mode | None = None,
+    ):
+        while True:
+            over = self._over_limits(limits, mode)
+            if not over:
+                break
+            (key, delay, total, limit) = max(over, key=lambda o: o[1])
+            if callback:
+                msg = f"Rate limit exceeded for {key} ({total}/{limit}), waiting {delay:.0f}s..."
+                if await callback(msg, key, total, limit):
+                    break
+            await asyncio.sleep(delay)
+
+    def wait_sync(
+        self, limits: dict[str, int] | None = None, mode: Mode | None = None
     ):
         while True:
-            await self.cleanup()
-            should_wait = False
+            delay = self.wait_time(limits, mode)
+            if delay <= 0:
+                break
+            time.sleep(delay)
 
-            for key, limit in self.limits.items():
+    def _over_limits(
+        self, limits: dict[str, int] | None, mode: Mode | None
+    ) -> list[tuple[str, float, int, int]]:
+        # (key, seconds until within limit, used, limit) for every exceeded limit
+        now = time.time()
+        mode = mode or self.mode
+        result = []
+        with self._lock:
+            for key, limit in (limits or self.limits).items():
                 if limit <= 0:  # Skip if no limit set
                     continue
+                used = self._used(key, limit, mode, now)
+                if used > limit:
+                    delay = self._delay(key, limit, mode, now)
+                    result.append((key, max(delay, 0.001), int(used), limit))
+        return result
 
-                total = await self.get_total(key)
-                if total > limit:
-                    if callback:
-                        msg = f"Rate limit exceeded for {key} ({total}/{limit}), waiting..."
-                        should_wait = not await callback(msg, key, total, limit)
-                    else:
-                        should_wait = True
-                    break
+    def _used(self, key: str, limit: float, mode: Mode, now: float) -> float:
+        if mode == "bucket":
+            level = self._levels.get((key, limit))
+            if level is None:
+                # start from the window so a new limit doesn't forget recent usage
+                self._expire(key, now)
+                level = self._levels[(key, limit)] = [self._totals.get(key, 0), now]
+            self._drain(level, limit, now)
+            return level[0]
+        self._expire(key, now)
+        return self._totals.get(key, 0)
 
-            if not should_wait:
-                break
+    def _delay(self, key: str, limit: float, mode: Mode, now: float) -> float:
+        if mode == "bucket":
+            used = self._levels[(key, limit)][0]
+            return (used - limit) / (limit / self.timeframe)
+        # oldest buckets leave the window first, find when enough of them have left
+        excess = self._totals[key] - limit
+        for number, value in self._buckets[key]:
+            excess -= value
+            if excess <= 0:
+                return (number + 1) * self._width + self.timeframe - now
+        return 0.0
+
+    def _expire(self, key: str, now: float):
+        buckets = self._buckets.get(key)
+        if not buckets:
+            return
+        cutoff = int((now - self.timeframe) / self._width)
+        while buckets and buckets[0][0] < cutoff:
+            self._totals[key] -= buckets.popleft()[1]
+        if not buckets:
+            self._totals[key] = 0  # drop float drift
 
-            await asyncio.sleep(1)
+    def _drain(self, level: list[float], limit: float, now: float):
+        level[0] = max(0.0, level[0] - (now - level[1]) * limit / self.timeframe)
+        level[1] = now
@@ -0,0 +1,138 @@
+import asyncio
+import heapq
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+# claimed launch times remembered per key, enough to cover launches still being started
+CLAIM_HISTORY = 32
+
+
+class ScheduleQueue:
+    """
+    Keys (task ids) ordered by their next run time in a heap.
+
+    set() and remove() are O(log n), stale heap entries are skipped lazily when
+    popped. Every launch is claimed per (key, run time) so the same planned
+    moment never starts twice, even when the queue is rebuilt or ticked from
+    several places. wait() sleeps until the next run time or until the queue
+    changes, whichever comes first.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._entries: dict[str, tuple[datetime, int]] = {}
+        self._claims: dict[str, deque[datetime]] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._event: asyncio.Event | None = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def set(self, key: str, run_at: datetime | None):
+        """Schedule key at run_at, None removes it from the queue."""
+        with self._lock:
+            if run_at is None:
+                self._entries.pop(key, None)
+            else:
+                self._counter += 1
+                self._entries[key] = (run_at, self._counter)
+                heapq.heappush(self._heap, (run_at, self._counter, key))
+                self._compact()
+        self.notify()
+
+    def remove(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._claims.pop(key, None)
+        self.notify()
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._entries.clear()
+        self.notify()
+
+    def get(self, key: str) -> datetime | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+    def next_run(self) -> datetime | None:
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime | None = None) -> list[tuple[str, datetime]]:
+        """Remove and return (key, run time) of all entries due at now, earliest first."""
+        now = now or datetime.now(timezone.utc)
+        due = []
+        with self._lock:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                run_at, _, key = heapq.heappop(self._heap)
+                del self._entries[key]
+                due.append((key, run_at))
+        return due
+
+    def claim(self, key: str, run_at: datetime) -> bool:
+        """Record the launch of key at run_at, False if it has been claimed already."""
+        with self._lock:
+            claims = self._claims.setdefault(key, deque(maxlen=CLAIM_HISTORY))
+            if run_at in claims:
+                return False
+            claims.append(run_at)
+            return True
+
+    def is_claimed(self, key: str, run_at: datetime) -> bool:
+        with self._lock:
+            return run_at in self._claims.get(key, ())
+
+    def last_claim(self, key: str) -> datetime | None:
+        with self._lock:
+            claims = self._claims.get(key)
+            return max(claims) if claims else None
+
+    def notify(self):
+        """Wake up wait(), safe to call from any thread."""
+        loop, event = self._loop, self._event
+        if loop and event and not loop.is_closed():
+            loop.call_soon_threadsafe(event.set)
+
+    async def wait(self, max_seconds: float):
+        """Sleep until the next entry is due, the queue changes or max_seconds pass."""
+        loop = asyncio.get_running_loop()
+        if self._event is None or self._loop is not loop:
+            self._event = asyncio.Event()
+            self._loop = loop
+        self._event.clear()
+        timeout = max_seconds
+        next_run = self.next_run()
+        if next_run is not None:
+            delay = (next_run - datetime.now(timezone.utc)).total_seconds()
+            timeout = min(timeout, max(delay, 0))
+        if timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _drop_stale(self):
+        # entries replaced by set() or removed stay in the heap until they surface
+        while self._heap:
+            run_at, counter, key = self._heap[0]
+            if self._entries.get(key) == (run_at, counter):
+                return
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        # rebuild when stale entries dominate, keeps memory bounded under frequent updates
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(run_at, counter, key) for key, (run_at, counter) in self._entries.items()]
+            heapq.heapify(self._heap)
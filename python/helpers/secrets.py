@@ -35,91 +35,154 @@ class EnvLine:
     )
 
 
+class SecretsMasker:
+    """Compiled matcher for a set of secret values, built once per secrets version.
+
+    - mask() replaces all values in a single pass, at each position the longest
+      value wins.
+    - An Aho-Corasick automaton over the values tracks how much of the end of a
+      stream could still become a secret, so streaming filters hold back only
+      that and scan each chunk once.
+    """
+
+    def __init__(
+        self,
+        key_to_value: Dict[str, str],
+        placeholder: str = "§§secret({key})",
+        min_length: int = 0,
+    ):
+        self.replacements: Dict[str, str] = {}
+        for key, value in key_to_value.items():
+            if isinstance(value, str) and value and len(value.strip()) >= min_length:
+                self.replacements.setdefault(value, alias_for_key(key, placeholder))
+        values = sorted(self.replacements, key=len, reverse=True)
+        self.max_len: int = len(values[0]) if values else 0
+        self._pattern = re.compile("|".join(map(re.escape, values))) if values else None
+
+        # trie of values with failure links, state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._depth: List[int] = [0]
+        for value in values:
+            state = 0
+            for char in value:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._depth.append(self._depth[state] + 1)
+                state = next_state
+        # breadth first, children of the root fail to the root
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                queue.append(child)
+
+    def mask(self, text: str) -> str:
+        if not self._pattern or not text:
+            return text
+        return self._pattern.sub(self._replace, text)
+
+    def _replace(self, match: "re.Match[str]") -> str:
+        return self.replacements[match.group()]
+
+    def advance(self, state: int, text: str) -> int:
+        """Automaton state after reading text, its depth is the longest tail that is part of a value."""
+        goto, fail = self._goto, self._fail
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+        return state
+
+    def depth(self, state: int) -> int:
+        return self._depth[state]
+
+    def split(self, text: str, state: int) -> int:
+        """Length of the prefix of text that is safe to mask and emit; state is the automaton state at its end."""
+        # the longest tail that can still grow into a value is held, complete values
+        # that can't grow further are masked now
+        while state and not self._goto[state]:
+            state = self._fail[state]
+        end = len(text) - self._depth[state]
+        if self._pattern and end:
+            # a complete value crossing the boundary is emitted whole, scanned like mask() would
+            for match in self._pattern.finditer(text):
+                if match.start() >= end:
+                    break
+                if match.end() > end:
+                    return match.end()
+        return end
+
+
 class StreamingSecretsFilter:
     """Stateful streaming filter that masks secrets on the fly.
 
     - Replaces full secret values with placeholders §§secret(KEY) when detected.
-    - Holds the longest suffix of the current buffer that matches any secret prefix
-      (with minimum trigger length of 3) to avoid leaking partial secrets across chunks.
-    - On finalize(), any unresolved partial is masked with '***'.
+    - Holds back the tail of the stream that could still become a secret, so
+      partial secrets never leak across chunks. Each chunk is scanned once.
+    - On finalize(), an unresolved partial of min_trigger chars or more is masked with '***'.
     """
 
-    def __init__(self, key_to_value: Dict[str, str], min_trigger: int = 3):
+    def __init__(
+        self,
+        key_to_value: Dict[str, str],
+        min_trigger: int = 3,
+        masker: Optional[SecretsMasker] = None,
+    ):
         self.min_trigger = max(1, int(min_trigger))
-        # Map value -> key for placeholder construction
-        self.value_to_key: Dict[str, str] = {
-            v: k for k, v in key_to_value.items() if isinstance(v, str) and v
-        }
-        # Only keep non-empty values
-        self.secret_values: List[str] = [v for v in self.value_to_key.keys() if v]
-        # Precompute all prefixes for quick suffix matching
-        self.prefixes: Set[str] = set()
-        for v in self.secret_values:
-            for i in range(self.min_trigger, len(v) + 1):
-                self.prefixes.add(v[:i])
-        self.max_len: int = max((len(v) for v in self.secret_values), default=0)
-
+        self.masker = masker or SecretsMasker(key_to_value)
         # Internal buffer of pending text that is not safe to flush yet
         self.pending: str = ""
-
-    def _replace_full_values(self, text: str) -> str:
-        """Replace all full secret values with placeholders in the given text."""
-        # Sort by length desc to avoid partial overlaps
-        for val in sorted(self.secret_values, key=len, reverse=True):
-            if not val:
-                continue
-            key = self.value_to_key.get(val, "")
-            if key:
-                text = text.replace(val, alias_for_key(key))
-        return text
-
-    def _longest_suffix_prefix(self, text: str) -> int:
-        """Return length of longest suffix of text that is a known secret prefix.
-        Returns 0 if none found (or only shorter than min_trigger)."""
-        max_check = min(len(text), self.max_len)
-        for length in range(max_check, self.min_trigger - 1, -1):
-            suffix = text[-length:]
-            if suffix in self.prefixes:
-                return length
-        return 0
+        self.text: str = ""  # everything emitted so far
+        self.length: int = 0  # raw characters processed
+        self._state = 0
 
     def process_chunk(self, chunk: str) -> str:
         if not chunk:
             return ""
-
-        self.pending += chunk
-
-        # Replace any full secret occurrences first
-        self.pending = self._replace_full_values(self.pending)
-
-        # Determine the longest suffix that could still form a secret
-        hold_len = self._longest_suffix_prefix(self.pending)
-        if hold_len > 0:
-            # Flush everything except the hold suffix
-            emit = self.pending[:-hold_len]
-            self.pending = self.pending[-hold_len:]
-        else:
-            # Safe to flush everything
-            emit = self.pending
-            self.pending = ""
-
+        self.length += len(chunk)
+        text = self.pending + chunk
+        self._state = self.masker.advance(self._state, chunk)
+        split = self.masker.split(text, self._state)
+        self.pending = text[split:]
+        if len(self.pending) < self.masker.depth(self._state):
+            # the held tail was cut, matches can only start within what is left
+            self._state = self.masker.advance(0, self.pending)
+        emit = self.masker.mask(text[:split])
+        self.text += emit
         return emit
 
+    def mask_full(self, full: str) -> str:
+        """Masked full stream text, without rescanning it when full is what was processed so far."""
+        if len(full) != self.length:
+            return self.masker.mask(full)
+        return self.text + self.masker.mask(self.pending)
+
     def finalize(self) -> str:
         """Flush any remaining buffered text. If pending contains an unresolved partial
         (i.e., a prefix of a secret >= min_trigger), mask it with *** to avoid leaks."""
         if not self.pending:
             return ""
-
-        hold_len = self._longest_suffix_prefix(self.pending)
-        if hold_len > 0:
-            safe = self.pending[:-hold_len]
-            # Mask unresolved partial
-            result = safe + "***"
+        text, self.pending = self.pending, ""
+        split = self.masker.split(text, self._state)
+        self._state = 0
+        emit, tail = self.masker.mask(text[:split]), text[split:]
+        masked_tail = self.masker.mask(tail)
+        if masked_tail != tail:
+            emit += masked_tail
+        elif len(tail) >= self.min_trigger:
+            emit += "***"
         else:
-            result = self.pending
-        self.pending = ""
-        return result
+            emit += tail
+        self.text += emit
+        return emit
 
 
 class SecretsManager:
@@ -146,6 +209,7 @@ class SecretsManager:
         self._raw_snapshots: Dict[str, str] = {}
         self._secrets_cache = None
         self._last_raw_text = None
+        self._maskers: Dict[Tuple[str, int], SecretsMasker] = {}
 
     def read_secrets_raw(self) -> str:
         """Read raw secrets file content from local filesystem (same system)."""
@@ -254,9 +318,21 @@ class SecretsManager:
             key_formatter=alias_for_key,
         )
 
-    def create_streaming_filter(self) -> "StreamingSecretsFilter":
+    def get_masker(
+        self, placeholder: str = "§§secret({key})", min_length: int = 0
+    ) -> SecretsMasker:
+        """Compiled masker for the current secret values, rebuilt when secrets change."""
+        with self._lock:
+            secrets = self.load_secrets()
+            key = (placeholder, min_length)
+            masker = self._maskers.get(key)
+            if masker is None:
+                masker = self._maskers[key] = SecretsMasker(secrets, placeholder, min_length)
+            return masker
+
+    def create_streaming_filter(self, min_length: int = 0) -> "StreamingSecretsFilter":
         """Create a streaming-aware secrets filter snapshotting current secret values."""
-        return StreamingSecretsFilter(self.load_secrets())
+        return StreamingSecretsFilter({}, masker=self.get_masker(min_length=min_length))
 
     def replace_placeholders(self, text: str) -> str:
         """Replace secret placeholders with actual values"""
@@ -301,18 +377,7 @@ class SecretsManager:
         """Replace actual secret values with placeholders in text"""
         if not text:
             return text
-
-        secrets = self.load_secrets()
-        result = text
-
-        # Sort by length (longest first) to avoid partial replacements
-        for key, value in sorted(
-            secrets.items(), key=lambda x: len(x[1]), reverse=True
-        ):
-            if value and len(value.strip()) >= min_length:
-                result = result.replace(value, alias_for_key(key, placeholder))
-
-        return result
+        return self.get_masker(placeholder, min_length).mask(text)
 
     def get_masked_secrets(self) -> str:
         """Get content with values masked for frontend display (preserves comments and unrecognized lines)"""
@@ -351,6 +416,7 @@ class SecretsManager:
             self._secrets_cache = None
             self._raw_snapshots = {}
             self._last_raw_text = None
+            self._maskers = {}
 
     @classmethod
     def _invalidate_all_caches(cls):
@@ -1,17 +1,20 @@
 import base64
+import copy
 import hashlib
 import json
 import os
 import re
 import subprocess
-from typing import Any, Literal, TypedDict, cast, TypeVar
+import threading
+import time
+from typing import Any, Callable, Literal, TypedDict, cast, TypeVar
 
 import models
-from python.helpers import runtime, whisper, defer, git
+from python.helpers import runtime, whisper, defer, git, fs_cache
 from . import files, dotenv
 from python.helpers.print_style import PrintStyle
 from python.helpers.providers import get_providers, FieldOption as ProvidersFO
-from python.helpers.secrets import get_default_secrets_manager
+from python.helpers.secrets import DEFAULT_SECRETS_FILE, get_default_secrets_manager
 from python.helpers import dirty_json
 from python.helpers.notification import NotificationManager, NotificationType, NotificationPriority
 
@@ -63,6 +66,7 @@ class Settings(TypedDict):
     chat_model_rl_requests: int
     chat_model_rl_input: int
     chat_model_rl_output: int
+    chat_model_rl_mode: str
 
     util_model_provider: str
     util_model_name: str
@@ -73,6 +77,7 @@ class Settings(TypedDict):
     util_model_rl_requests: int
     util_model_rl_input: int
     util_model_rl_output: int
+    util_model_rl_mode: str
 
     embed_model_provider: str
     embed_model_name: str
@@ -80,6 +85,10 @@ class Settings(TypedDict):
     embed_model_kwargs: dict[str, Any]
     embed_model_rl_requests: int
     embed_model_rl_input: int
+    embed_model_rl_mode: str
+    embed_model_batch_size: int
+    embed_model_concurrency: int
+    embed_cache_max_mb: int
 
     browser_model_provider: str
     browser_model_name: str
@@ -117,6 +126,10 @@ class Settings(TypedDict):
     memory_memorize_enabled: bool
     memory_memorize_consolidation: bool
     memory_memorize_replace_threshold: float
+    memory_index_type: str
+    memory_index_pq: bool
+    memory_index_promote_threshold: int
+    memory_knowledge_watch: bool
 
     api_keys: dict[str, str]
 
@@ -221,9 +234,20 @@ PASSWORD_PLACEHOLDER = "****PSWD****"
 API_KEY_PLACEHOLDER = "************"
 
 SETTINGS_FILE = files.get_abs_path("usr/settings.json")
+# the settings snapshot is re-validated against its source files at most this often (seconds)
+CHECK_INTERVAL = 1.0
+
 _settings: Settings | None = None
 _runtime_settings_snapshot: Settings | None = None
 
+# read-only settings served by get_settings(), rebuilt on set_settings() or when source files change
+_snapshot: Settings | None = None
+_snapshot_stamp: tuple | None = None
+_snapshot_checked = 0.0
+_version = 0
+_subscribers: list[Callable[[Settings], None]] = []
+_lock = threading.RLock()
+
 OptionT = TypeVar("OptionT", bound=FieldOption)
 
 def _ensure_option_present(options: list[OptionT] | None, current_value: str | None) -> list[OptionT]:
@@ -291,10 +315,11 @@ def convert_out(settings: Settings) -> SettingsOutput:
 
     # masked api keys
     providers = get_providers("chat") + get_providers("embedding")
+    api_keys = out["settings"]["api_keys"] = dict(settings["api_keys"])
     for provider in providers:
         provider_name = provider["value"]
         api_key = settings["api_keys"].get(provider_name, models.get_api_key(provider_name))
-        settings["api_keys"][provider_name] = API_KEY_PLACEHOLDER if api_key and api_key != "None" else ""
+        api_keys[provider_name] = API_KEY_PLACEHOLDER if api_key and api_key != "None" else ""
 
     # load auth from dotenv
     out["settings"]["auth_login"] = dotenv.get_dotenv_value(dotenv.KEY_AUTH_LOGIN) or ""
@@ -340,7 +365,7 @@ def _get_api_key_field(settings: Settings, provider: str, title: str) -> Setting
 
 
 def convert_in(settings: Settings) -> Settings:
-    current = get_settings()
+    current = get_settings().copy()
 
     for key, value in settings.items():
         # Special handling for browser_http_headers and *_kwargs (stored as .env text)
@@ -352,23 +377,126 @@ def convert_in(settings: Settings) -> Settings:
     return current
 
 
+class FrozenDict(dict):
+    """A dict that refuses changes, its copies are plain dicts."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Settings snapshot is read-only, change a copy and pass it to set_settings()")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only  # type: ignore
+    clear = pop = popitem = setdefault = update = _read_only  # type: ignore
+
+    def copy(self) -> dict:  # type: ignore
+        return dict(self)
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
 def get_settings() -> Settings:
-    global _settings
-    if not _settings:
-        _settings = _read_settings_file()
-    if not _settings:
-        _settings = get_default_settings()
-    norm = normalize_settings(_settings)
-    _load_sensitive_settings(norm)
-    return norm
+    """
+    Current settings as a read-only snapshot shared by all callers.
+
+    The snapshot is built once and reused, within CHECK_INTERVAL seconds of
+    the last check without touching the file system. Copy it before changing
+    values.
+    """
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _snapshot_checked < CHECK_INTERVAL:
+        return snapshot
+    return _refresh_snapshot()
+
+
+def get_settings_version() -> int:
+    """Increases every time the settings snapshot changes."""
+    get_settings()
+    return _version
+
+
+def subscribe(callback: Callable[[Settings], None]) -> Callable[[], None]:
+    """Call callback with the new snapshot whenever settings change, returns a function to unsubscribe."""
+    with _lock:
+        _subscribers.append(callback)
+
+    def unsubscribe():
+        with _lock:
+            if callback in _subscribers:
+                _subscribers.remove(callback)
+
+    return unsubscribe
 
 
 def reload_settings() -> Settings:
     global _settings
-    _settings = None
+    with _lock:
+        _settings = None
+        _invalidate_snapshot()
     return get_settings()
 
 
+def _invalidate_snapshot():
+    global _snapshot_stamp, _snapshot_checked
+    with _lock:
+        _snapshot_stamp = None
+        _snapshot_checked = 0.0  # skip the fast path, the next get_settings() rebuilds
+
+
+def _snapshot_sources() -> tuple:
+    # everything the snapshot is built from besides the process environment
+    return (
+        fs_cache.mtime(SETTINGS_FILE),
+        fs_cache.mtime(dotenv.get_dotenv_file_path()),
+        fs_cache.mtime(files.get_abs_path(DEFAULT_SECRETS_FILE)),
+        fs_cache.mtime(files.get_abs_path("conf/workdir.gitignore")),
+    )
+
+
+def _refresh_snapshot() -> Settings:
+    global _settings, _snapshot, _snapshot_stamp, _snapshot_checked, _version
+    with _lock:
+        stamp = _snapshot_sources()
+        if _snapshot is not None and stamp == _snapshot_stamp:
+            _snapshot_checked = time.monotonic()
+            return _snapshot
+        if _snapshot_stamp is not None and stamp[0] != _snapshot_stamp[0]:
+            _settings = None  # settings file changed on disk
+        if not _settings:
+            _settings = _read_settings_file()
+        if not _settings:
+            _settings = get_default_settings()
+        norm = normalize_settings(_settings)
+        _load_sensitive_settings(norm)
+
+        previous = _snapshot
+        changed = previous is None or norm != previous
+        if changed:
+            _snapshot = cast(Settings, _freeze(norm))
+            _version += 1
+        _snapshot_stamp = stamp
+        _snapshot_checked = time.monotonic()
+        snapshot = _snapshot
+        subscribers = list(_subscribers) if changed and previous is not None else []
+
+    for callback in subscribers:
+        try:
+            callback(snapshot)  # type: ignore
+        except Exception as e:
+            PrintStyle.error(f"Settings subscriber failed: {e}")
+    return snapshot  # type: ignore
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
 def set_runtime_settings_snapshot(settings: Settings) -> None:
     global _runtime_settings_snapshot
     _runtime_settings_snapshot = settings.copy()
@@ -379,6 +507,7 @@ def set_settings(settings: Settings, apply: bool = True):
     previous = _settings
     _settings = normalize_settings(settings)
     _write_settings_file(_settings)
+    _invalidate_snapshot()
     if apply:
         _apply_settings(previous)
     return reload_settings()
@@ -523,6 +652,7 @@ def get_default_settings() -> Settings:
         chat_model_rl_requests=get_default_value("chat_model_rl_requests", 0),
         chat_model_rl_input=get_default_value("chat_model_rl_input", 0),
         chat_model_rl_output=get_default_value("chat_model_rl_output", 0),
+        chat_model_rl_mode=get_default_value("chat_model_rl_mode", "window"),
         util_model_provider=get_default_value("util_model_provider", "openrouter"),
         util_model_name=get_default_value("util_model_name", "google/gemini-3-flash-preview"),
         util_model_api_base=get_default_value("util_model_api_base", ""),
@@ -532,12 +662,17 @@ def get_default_settings() -> Settings:
         util_model_rl_requests=get_default_value("util_model_rl_requests", 0),
         util_model_rl_input=get_default_value("util_model_rl_input", 0),
         util_model_rl_output=get_default_value("util_model_rl_output", 0),
+        util_model_rl_mode=get_default_value("util_model_rl_mode", "window"),
         embed_model_provider=get_default_value("embed_model_provider", "huggingface"),
         embed_model_name=get_default_value("embed_model_name", "sentence-transformers/all-MiniLM-L6-v2"),
         embed_model_api_base=get_default_value("embed_model_api_base", ""),
         embed_model_kwargs=get_default_value("embed_model_kwargs", {}),
         embed_model_rl_requests=get_default_value("embed_model_rl_requests", 0),
         embed_model_rl_input=get_default_value("embed_model_rl_input", 0),
+        embed_model_rl_mode=get_default_value("embed_model_rl_mode", "window"),
+        embed_model_batch_size=get_default_value("embed_model_batch_size", 64),
+        embed_model_concurrency=get_default_value("embed_model_concurrency", 4),
+        embed_cache_max_mb=get_default_value("embed_cache_max_mb", 1024),
         browser_model_provider=get_default_value("browser_model_provider", "openrouter"),
         browser_model_name=get_default_value("browser_model_name", "anthropic/claude-sonnet-4.6"),
         browser_model_api_base=get_default_value("browser_model_api_base", ""),
@@ -561,6 +696,10 @@ def get_default_settings() -> Settings:
         memory_memorize_enabled=get_default_value("memory_memorize_enabled", True),
         memory_memorize_consolidation=get_default_value("memory_memorize_consolidation", True),
         memory_memorize_replace_threshold=get_default_value("memory_memorize_replace_threshold", 0.9),
+        memory_index_type=get_default_value("memory_index_type", "auto"),
+        memory_index_pq=get_default_value("memory_index_pq", False),
+        memory_index_promote_threshold=get_default_value("memory_index_promote_threshold", 50000),
+        memory_knowledge_watch=get_default_value("memory_knowledge_watch", False),
         api_keys={},
         auth_login="",
         auth_password="",
@@ -633,6 +772,16 @@ def _apply_settings(previous: Settings | None):
 
             memory_reload()
 
+        # reload memory to rebuild indexes when the index type changes
+        elif (
+            _settings["memory_index_type"] != previous["memory_index_type"]
+            or _settings["memory_index_pq"] != previous["memory_index_pq"]
+            or _settings["memory_index_promote_threshold"] != previous["memory_index_promote_threshold"]
+        ):
+            from python.helpers.memory import reload as memory_reload
+
+            memory_reload()
+
         # update mcp settings if necessary
         if not previous or _settings["mcp_servers"] != previous["mcp_servers"]:
             from python.helpers.mcp_handler import MCPConfig
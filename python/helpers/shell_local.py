@@ -6,11 +6,12 @@ import sys
 from typing import Optional, Tuple
 from python.helpers import tty_session, runtime
 from python.helpers.shell_ssh import clean_string
+from python.helpers.terminal_output import TerminalOutput
 
 class LocalInteractiveSession:
     def __init__(self, cwd: str|None = None):
         self.session: tty_session.TTYSession|None = None
-        self.full_output = ''
+        self.output = TerminalOutput()
         self.cwd = cwd
 
     async def connect(self):
@@ -26,23 +27,31 @@ class LocalInteractiveSession:
     async def send_command(self, command: str):
         if not self.session:
             raise Exception("Shell not connected")
-        self.full_output = ""
+        self.output.reset()
         await self.session.sendline(command)
- 
+
+    async def wait_output(self, timeout: float) -> bool:
+        """Wait until the terminal produces new output, False on timeout."""
+        if not self.session:
+            raise Exception("Shell not connected")
+        return await self.session.wait_output(timeout)
+
     async def read_output(self, timeout: float = 0, reset_full_output: bool = False) -> Tuple[str, Optional[str]]:
         if not self.session:
             raise Exception("Shell not connected")
 
         if reset_full_output:
-            self.full_output = ""
+            self.output.reset()
 
-        # get output from terminal
-        partial_output = await self.session.read_full_until_idle(idle_timeout=0.01, total_timeout=timeout)
-        self.full_output += partial_output
+        # get output from terminal, what already arrived and more until idle
+        partial_output = self.session.read_nowait()
+        if timeout > 0:
+            partial_output += await self.session.read_full_until_idle(idle_timeout=0.01, total_timeout=timeout)
 
-        # clean output
+        # only the new output is cleaned, the full output is kept clean incrementally
+        self.output.feed(partial_output)
         partial_output = clean_string(partial_output)
-        clean_full_output = clean_string(self.full_output)
+        clean_full_output = self.output.text()
 
         if not partial_output:
             return clean_full_output, None
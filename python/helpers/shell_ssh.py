@@ -1,12 +1,19 @@
 import asyncio
+import codecs
+import threading
 import paramiko
 import time
 import re
+from collections import deque
 from typing import Tuple
 from python.helpers.log import Log
 from python.helpers.print_style import PrintStyle
+from python.helpers.terminal_output import TerminalOutput
 # from python.helpers.strings import calculate_valid_match_lengths
 
+RECV_SIZE = 1 << 16  # bytes per channel read on the reader thread
+MAX_UNREAD = 1 << 22  # unread bytes before the reader pauses and the channel window pushes back
+
 
 class SSHInteractiveSession:
 
@@ -24,10 +31,17 @@ class SSHInteractiveSession:
         self.client = paramiko.SSHClient()
         self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         self.shell = None
-        self.full_output = b""
+        self.output = TerminalOutput()
         self.last_command = b""
         self.trimmed_command_length = 0  # Initialize trimmed_command_length
         self.cwd = cwd
+        # raw output pushed by the reader thread, decoded and cleaned when read
+        self._received: deque[bytes] = deque()
+        self._received_bytes = 0
+        self._drained = threading.Condition()
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ready: asyncio.Event | None = None
 
     async def connect(self, keepalive_interval: int = 5):
         """
@@ -61,6 +75,7 @@ class SSHInteractiveSession:
 
                 # invoke interactive shell
                 self.shell = self.client.invoke_shell(width=100, height=50)
+                self._start_reader(self.shell)
 
                 # disable systemd/OSC prompt metadata and disable local echo
                 initial_command = "unset PROMPT_COMMAND PS0; stty -echo"
@@ -73,7 +88,7 @@ class SSHInteractiveSession:
                     full, part = await self.read_output()
                     if full and not part:
                         return
-                    time.sleep(0.1)
+                    await self.wait_output(0.1)
 
             except Exception as e:
                 errors += 1
@@ -92,11 +107,13 @@ class SSHInteractiveSession:
             self.shell.close()
         if self.client:
             self.client.close()
+        with self._drained:
+            self._drained.notify_all()  # a paused reader sees the closed channel
 
     async def send_command(self, command: str):
         if not self.shell:
             raise Exception("Shell not connected")
-        self.full_output = b""
+        self.output.reset()
         # if len(command) > 10: # if command is long, add end_comment to split output
         #     command = (command + " \\\n" +SSHInteractiveSession.end_comment + "\n")
         # else:
@@ -104,7 +121,22 @@ class SSHInteractiveSession:
         self.last_command = command.encode()
         self.trimmed_command_length = 0
         self.shell.send(self.last_command)
-        
+
+    async def wait_output(self, timeout: float) -> bool:
+        """Wait until the shell produces new output, False on timeout."""
+        if self._received:
+            return True
+        loop = asyncio.get_running_loop()
+        if self._ready is None or self._loop is not loop:
+            self._ready = asyncio.Event()
+            self._loop = loop
+        self._ready.clear()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
     async def read_output(
         self, timeout: float = 0, reset_full_output: bool = False
     ) -> Tuple[str, str]:
@@ -112,105 +144,47 @@ class SSHInteractiveSession:
             raise Exception("Shell not connected")
 
         if reset_full_output:
-            self.full_output = b""
-        partial_output = b""
-        leftover = b""
-        start_time = time.time()
-
-        while self.shell.recv_ready() and (
-            timeout <= 0 or time.time() - start_time < timeout
-        ):
-
-            # data = self.shell.recv(1024)
-            data = self.receive_bytes()
-
-            # # Trim own command from output
-            # if (
-            #     self.last_command
-            #     and len(self.last_command) > self.trimmed_command_length
-            # ):
-            #     command_to_trim = self.last_command[self.trimmed_command_length :]
-            #     data_to_trim = leftover + data
-
-            #     trim_com, trim_out = calculate_valid_match_lengths(
-            #         command_to_trim,
-            #         data_to_trim,
-            #         deviation_threshold=8,
-            #         deviation_reset=2,
-            #         ignore_patterns=[
-            #             rb"\x1b\[\?\d{4}[a-zA-Z](?:> )?",  # ANSI escape sequences
-            #             rb"\r",  # Carriage return
-            #             rb">\s",  # Greater-than symbol
-            #         ],
-            #         debug=False,
-            #     )
-
-            #     leftover = b""
-            #     if trim_com > 0 and trim_out > 0:
-            #         data = data_to_trim[trim_out:]
-            #         leftover = data
-            #         self.trimmed_command_length += trim_com
-
-            partial_output += data
-            self.full_output += data
-            await asyncio.sleep(0.1)  # Prevent busy waiting
-
-        # Decode once at the end
-        decoded_partial_output = partial_output.decode("utf-8", errors="replace")
-        decoded_full_output = self.full_output.decode("utf-8", errors="replace")
-
-        decoded_partial_output = clean_string(decoded_partial_output)
-        decoded_full_output = clean_string(decoded_full_output)
-
-        return decoded_full_output, decoded_partial_output
-
-    def receive_bytes(self, num_bytes=1024):
-        if not self.shell:
-            raise Exception("Shell not connected")
-        # Receive initial chunk of data
-        shell = self.shell
-        data = self.shell.recv(num_bytes)
-
-        # Helper function to ensure that we receive exactly `num_bytes`
-        def recv_all(num_bytes):
-            data = b""
-            while len(data) < num_bytes:
-                chunk = shell.recv(num_bytes - len(data))
-                if not chunk:
-                    break  # Connection might be closed or no more data
-                data += chunk
-            return data
-
-        # Check if the last byte(s) form an incomplete multi-byte UTF-8 sequence
-        if len(data) > 0:
-            last_byte = data[-1]
-
-            # Check if the last byte is part of a multi-byte UTF-8 sequence (continuation byte)
-            if (last_byte & 0b11000000) == 0b10000000:  # It's a continuation byte
-                # Now, find the start of this sequence by checking earlier bytes
-                for i in range(
-                    2, 5
-                ):  # Look back up to 4 bytes (since UTF-8 is up to 4 bytes long)
-                    if len(data) - i < 0:
-                        break
-                    byte = data[-i]
-
-                    # Detect the leading byte of a multi-byte sequence
-                    if (byte & 0b11100000) == 0b11000000:  # 2-byte sequence (110xxxxx)
-                        data += recv_all(1)  # Need 1 more byte to complete
-                        break
-                    elif (
-                        byte & 0b11110000
-                    ) == 0b11100000:  # 3-byte sequence (1110xxxx)
-                        data += recv_all(2)  # Need 2 more bytes to complete
-                        break
-                    elif (
-                        byte & 0b11111000
-                    ) == 0b11110000:  # 4-byte sequence (11110xxx)
-                        data += recv_all(3)  # Need 3 more bytes to complete
-                        break
-
-        return data
+            self.output.reset()
+
+        # everything received so far, the decoder keeps multi-byte characters split between reads
+        with self._drained:
+            chunks = list(self._received)
+            self._received.clear()
+            self._received_bytes = 0
+            self._drained.notify_all()
+        partial_output = self._decoder.decode(b"".join(chunks))
+
+        # only the new output is cleaned, the full output is kept clean incrementally
+        self.output.feed(partial_output)
+        return self.output.text(), clean_string(partial_output)
+
+    def _start_reader(self, shell: paramiko.Channel):
+        self._received.clear()
+        self._received_bytes = 0
+        self._decoder.reset()
+        threading.Thread(
+            target=self._read_channel, args=(shell,), name="SSHOutput", daemon=True
+        ).start()
+
+    def _read_channel(self, shell: paramiko.Channel):
+        # blocking reads, paramiko channels have no asyncio interface; ends when the channel closes
+        while True:
+            try:
+                data = shell.recv(RECV_SIZE)
+            except Exception:
+                break
+            if not data or shell is not self.shell:
+                break
+            with self._drained:
+                # nobody reads between commands, stop reading so memory stays bounded
+                while self._received_bytes >= MAX_UNREAD and not shell.closed and shell is self.shell:
+                    self._drained.wait(timeout=1)
+                self._received.append(data)
+                self._received_bytes += len(data)
+            loop, ready = self._loop, self._ready
+            if loop and ready and not loop.is_closed():
+                loop.call_soon_threadsafe(ready.set)
+
 
 def clean_string(input_string):
     # Remove ANSI escape codes
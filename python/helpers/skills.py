@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import math
 import os
 import re
-from dataclasses import dataclass, field
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, TYPE_CHECKING
 
-from python.helpers import files, subagents, projects, file_tree, runtime
+from python.helpers import files, subagents, projects, file_tree, runtime, fs_cache
 
 if TYPE_CHECKING:
     from agent import Agent
@@ -16,6 +18,18 @@ try:
 except Exception:  # pragma: no cover
     yaml = None  # type: ignore
 
+# skill folders are re-scanned at most this often (seconds)
+CHECK_INTERVAL = 1.0
+
+# search field weights, name matches count most
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 2.0
+TAG_WEIGHT = 1.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
 
 @dataclass(slots=True)
 class Skill:
@@ -65,31 +79,31 @@ def get_skill_roots(
     return paths
 
 
-def _is_hidden_path(path: Path) -> bool:
-    return any(part.startswith(".") for part in path.parts)
-
-
 def discover_skill_md_files(root: Path) -> List[Path]:
     """
     Recursively discover SKILL.md files under a root directory.
     Hidden folders/files are ignored.
     """
-    if not root.exists():
-        return []
+    return [Path(path) for path, _mtime in _scan_root(str(root))]
 
-    results: List[Path] = []
-    for p in root.rglob("SKILL.md"):
-        try:
-            if not p.is_file():
-                continue
-            if _is_hidden_path(p.relative_to(root)):
-                continue
-            results.append(p)
-        except Exception:
-            # If relative_to fails (weird symlink), fall back to conservative checks
-            if p.is_file() and ".git" not in str(p):
-                results.append(p)
-    results.sort(key=lambda x: str(x))
+
+def _scan_root(root: str) -> List[Tuple[str, int]]:
+    """SKILL.md files under root with their mtimes, sorted by path, hidden folders skipped."""
+    results: List[Tuple[str, int]] = []
+    visited: set[str] = set()
+    for folder, dirnames, filenames in os.walk(root, followlinks=True):
+        real = os.path.realpath(folder)
+        if real in visited:  # symlink loop
+            dirnames[:] = []
+            continue
+        visited.add(real)
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        if "SKILL.md" in filenames:
+            path = os.path.join(folder, "SKILL.md")
+            mtime = fs_cache.mtime(path)
+            if mtime is not None and os.path.isfile(path):
+                results.append((path, mtime))
+    results.sort()
     return results
 
 
@@ -290,33 +304,187 @@ def skill_from_markdown(
     return skill
 
 
+class SkillCatalog:
+    """
+    Parsed skills of a set of roots, built once per change of their SKILL.md files.
+
+    - match_triggers() finds all skills whose trigger phrases occur in a text
+      with a single compiled pattern.
+    - search() ranks skills with BM25 over name, description and tags.
+    """
+
+    def __init__(self, parsed: List[Tuple[Skill, Skill]], dedupe: bool):
+        # (without content, with content) in root order
+        self._all = parsed
+        if dedupe:
+            # Dedupe by normalized name, preserving root_order priority (earlier wins)
+            by_name: Dict[str, Tuple[Skill, Skill]] = {}
+            for pair in parsed:
+                key = _normalize_name(pair[0].name) or _normalize_name(pair[0].path.name)
+                if key and key not in by_name:
+                    by_name[key] = pair
+            self._skills = list(by_name.values())
+        else:
+            # no deduplication for global skills
+            self._skills = list(parsed)
+        self._build_triggers()
+        self._build_index()
+
+    def list(self, include_content: bool = False) -> List[Skill]:
+        return [pair[1] if include_content else pair[0] for pair in self._skills]
+
+    def find(self, skill_name: str, include_content: bool = False) -> Optional[Skill]:
+        target = _normalize_name(skill_name)
+        if not target:
+            return None
+        for light, full in self._all:
+            if _normalize_name(light.name) == target or _normalize_name(light.path.name) == target:
+                return full if include_content else light
+        return None
+
+    def _build_triggers(self):
+        self._trigger_skills: Dict[str, List[int]] = {}
+        for index, (skill, _full) in enumerate(self._skills):
+            for trigger in {t.lower() for t in skill.triggers if t}:
+                self._trigger_skills.setdefault(trigger, []).append(index)
+        triggers = sorted(self._trigger_skills, key=len, reverse=True)
+        # at one position the longest trigger wins, the shorter ones matching there are its prefixes
+        self._trigger_prefixes = {
+            trigger: [trigger[:n] for n in range(1, len(trigger) + 1) if trigger[:n] in self._trigger_skills]
+            for trigger in triggers
+        }
+        self._trigger_pattern = (
+            re.compile("(?=(" + "|".join(map(re.escape, triggers)) + "))") if triggers else None
+        )
+
+    def match_triggers(self, text: str) -> List[Skill]:
+        """Skills with a trigger phrase contained in text (case-insensitive), in catalog order."""
+        if not self._trigger_pattern or not text:
+            return []
+        matched: set[int] = set()
+        for found in {m.group(1) for m in self._trigger_pattern.finditer(text.lower())}:
+            for trigger in self._trigger_prefixes[found]:
+                matched.update(self._trigger_skills[trigger])
+        return [self._skills[index][0] for index in sorted(matched)]
+
+    def _build_index(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._lengths: List[float] = []
+        for index, (skill, _full) in enumerate(self._skills):
+            weighted: Dict[str, float] = {}
+            for text, weight in (
+                (skill.name, NAME_WEIGHT),
+                (skill.description or "", DESCRIPTION_WEIGHT),
+                (" ".join(skill.tags), TAG_WEIGHT),
+            ):
+                for token in _tokenize(text):
+                    weighted[token] = weighted.get(token, 0.0) + weight
+            for token, tf in weighted.items():
+                self._postings.setdefault(token, {})[index] = tf
+            self._lengths.append(sum(weighted.values()))
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        self._vocabulary = sorted(self._postings)
+
+    def _expand(self, term: str) -> List[str]:
+        # tokens starting with the term, "deploy" also finds "deployment"
+        start = bisect_left(self._vocabulary, term)
+        expanded = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            expanded.append(token)
+        return expanded
+
+    def search(self, query: str, limit: int = 25) -> List[Skill]:
+        count = len(self._skills)
+        scores: Dict[int, float] = {}
+        for term in set(_tokenize(query)):
+            # a term counts once per skill, summed over the tokens it expands to
+            frequencies: Dict[int, float] = {}
+            for token in self._expand(term):
+                for index, tf in self._postings[token].items():
+                    frequencies[index] = frequencies.get(index, 0.0) + tf
+            idf = math.log(1 + (count - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+            for index, tf in frequencies.items():
+                norm = 1 - BM25_B + BM25_B * self._lengths[index] / self._avg_length
+                scores[index] = scores.get(index, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self._skills[item[0]][0].name))
+        return [self._skills[index][0] for index, _score in ranked[:limit]]
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+_catalogs: Dict[tuple, fs_cache.Entry] = {}  # (skill roots, deduplicated) -> SkillCatalog
+_roots: Dict[tuple, fs_cache.Entry] = {}  # (profile, project) -> skill roots
+_parsed: Dict[str, Tuple[int, Optional[Tuple[Skill, Skill]]]] = {}  # SKILL.md path -> (mtime, skills)
+
+
+def get_catalog(agent: Agent | None = None) -> SkillCatalog:
+    """Skill catalog of the agent's scope (profile and project) or of all roots without agent."""
+    if agent:
+        scope = (agent.config.profile or "", projects.get_context_project_name(agent.context) or "")
+    else:
+        scope = None
+    roots = tuple(
+        fs_cache.cached(_roots, scope, lambda: None, lambda: get_skill_roots(agent), CHECK_INTERVAL)
+    )
+
+    scan: Dict[str, Any] = {}
+
+    def stamp():
+        scan["files"] = tuple((root, tuple(_scan_root(root))) for root in roots)
+        return scan["files"]
+
+    return fs_cache.cached(
+        _catalogs,
+        (roots, bool(agent)),
+        stamp,
+        lambda: _build_catalog(scan["files"], dedupe=bool(agent)),
+        CHECK_INTERVAL,
+    )
+
+
+def clear_cache():
+    """Forget scanned skills, the next lookup re-reads the skill folders."""
+    _catalogs.clear()
+    _roots.clear()
+    _parsed.clear()
+
+
+def _build_catalog(scanned: tuple, dedupe: bool) -> SkillCatalog:
+    parsed: List[Tuple[Skill, Skill]] = []
+    for root, skill_files in scanned:
+        seen = set()
+        for path, mtime in skill_files:
+            seen.add(path)
+            cached = _parsed.get(path)
+            if cached is None or cached[0] != mtime:
+                # only new or changed files are parsed again
+                full = skill_from_markdown(Path(path), include_content=True)
+                pair = (replace(full, content="", raw_frontmatter={}), full) if full else None
+                cached = _parsed[path] = (mtime, pair)
+            if cached[1]:
+                parsed.append(cached[1])
+        # forget removed files
+        prefix = os.path.join(root, "")
+        for path in [p for p in _parsed if p.startswith(prefix) and p not in seen]:
+            del _parsed[path]
+    return SkillCatalog(parsed, dedupe=dedupe)
+
+
 def list_skills(
     agent:Agent|None=None,
     include_content: bool = False,
 ) -> List[Skill]:
     """List skills, optionally filtered by agent scope."""
-    skills: List[Skill] = []
-
-    roots = get_skill_roots(agent)
+    return get_catalog(agent).list(include_content=include_content)
 
-    for root in roots:
-        for skill_md in discover_skill_md_files(Path(root)):
-            s = skill_from_markdown(skill_md, include_content=include_content)
-            if s:
-                skills.append(s)
 
-    # no deduplication for global skills
-    if not agent:
-        return skills
-
-    # Dedupe by normalized name, preserving root_order priority (earlier wins)
-    by_name: Dict[str, Skill] = {}
-    for s in skills:
-        key = _normalize_name(s.name) or _normalize_name(s.path.name)
-        if key and key not in by_name:
-            by_name[key] = s
-    
-    return list(by_name.values())
+def match_triggered_skills(text: str, agent: Agent | None = None) -> List[Skill]:
+    """Skills of the agent's scope with a trigger phrase contained in text."""
+    return get_catalog(agent).match_triggers(text)
 
 
 def delete_skill(
@@ -341,6 +509,7 @@ def delete_skill(
 
     # delete directory
     files.delete_dir(skill_path)
+    clear_cache()
 
 
 def find_skill(
@@ -348,20 +517,7 @@ def find_skill(
     agent:Agent|None=None,
     include_content: bool = False,
 ) -> Optional[Skill]:
-    target = _normalize_name(skill_name)
-    if not target:
-        return None
-
-    roots = get_skill_roots(agent)
-
-    for root in roots:
-        for skill_md in discover_skill_md_files(Path(root)):
-            s = skill_from_markdown(skill_md, include_content=include_content)
-            if not s:
-                continue
-            if _normalize_name(s.name) == target or _normalize_name(s.path.name) == target:
-                return s
-    return None
+    return get_catalog(agent).find(skill_name, include_content=include_content)
 
 def load_skill_for_agent(
     skill_name: str,
@@ -438,33 +594,9 @@ def search_skills(
     limit: int = 25,
     agent: Agent|None=None,
 ) -> List[Skill]:
-    q = (query or "").strip().lower()
-    if not q:
+    if not (query or "").strip():
         return []
-
-    terms = [t for t in re.split(r"\s+", q) if t]
-    candidates = list_skills(agent)
-
-    scored: List[Tuple[int, Skill]] = []
-    for s in candidates:
-        name = s.name.lower()
-        desc = (s.description or "").lower()
-        tags = [t.lower() for t in s.tags]
-
-        score = 0
-        for term in terms:
-            if term in name:
-                score += 3
-            if term in desc:
-                score += 2
-            if any(term in tag for tag in tags):
-                score += 1
-
-        if score > 0:
-            scored.append((score, s))
-
-    scored.sort(key=lambda pair: (-pair[0], pair[1].name))
-    return [s for _score, s in scored[:limit]]
+    return get_catalog(agent).search(query, limit=limit)
 
 
 _NAME_RE = re.compile(r"^[a-z0-9-]+$")
@@ -10,7 +10,7 @@ from pathlib import Path
 from typing import Iterable, List, Literal, Optional, Tuple
 
 from python.helpers import files
-from python.helpers.skills import discover_skill_md_files
+from python.helpers.skills import clear_cache, discover_skill_md_files
 
 
 ConflictPolicy = Literal["skip", "overwrite", "rename"]
@@ -254,6 +254,9 @@ def import_skills(
         shutil.copytree(item.src_skill_dir, final_dest)
         imported.append(final_dest)
 
+    if imported and not dry_run:
+        clear_cache()
+
     return ImportResult(
         imported=imported,
         skipped=skipped,
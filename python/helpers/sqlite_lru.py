@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import threading
+from typing import Callable, Sequence
+
+EVICT_TO_RATIO = 0.9  # evict down to this share of max size to avoid evicting on every put
+EVICT_BATCH = 256  # least recently used keys read per eviction query
+
+
+class SqliteLru:
+    """
+    Base of the size-bounded caches kept in a single SQLite file.
+
+    Holds the connection, the lock serializing access to it and the running
+    size of the stored data, so the caches don't have to sum it up on every
+    write. Subclasses set self._size once after opening and keep it current,
+    and call _evict_lru() with the lock held when it grows past max_bytes.
+    Without a path the cache lives in memory.
+    """
+
+    def __init__(self, path: str | None, schema: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(schema)
+        self._size = 0
+
+    def _over_limit(self) -> bool:
+        return self.max_bytes > 0 and self._size > self.max_bytes
+
+    def _evict_lru(
+        self, lru_query: str, params: Sequence, delete: Callable[[list], None]
+    ) -> list:
+        """
+        Evict least recently used entries until the size is down to EVICT_TO_RATIO of max_bytes.
+
+        lru_query selects (key, size) rows ordered by last use, delete(keys)
+        removes them and lowers self._size by what it actually freed, which can
+        be less than the sizes listed when content is shared. Returns the
+        evicted keys.
+        """
+        target = int(self.max_bytes * EVICT_TO_RATIO)
+        evicted = []
+        while self._size > target:
+            rows = self._conn.execute(f"{lru_query} LIMIT {EVICT_BATCH}", params).fetchall()
+            if not rows:
+                break
+            excess = self._size - target
+            batch = []
+            for key, size in rows:
+                batch.append(key)
+                excess -= size
+                if excess <= 0:
+                    break
+            delete(batch)
+            evicted += batch
+        return evicted
+
+
+def marks(values: list) -> str:
+    return ",".join("?" * len(values))
+
+
+def chunks(values: list, size: int = 500) -> list[list]:
+    # stay below SQLite's bound parameter limit
+    return [values[i : i + size] for i in range(0, len(values), size)]
@@ -10,6 +10,7 @@ from typing import Any, TYPE_CHECKING
 from python.helpers import runtime
 from python.helpers.print_style import PrintStyle
 from python.helpers.state_snapshot import (
+    SnapshotFragments,
     StateRequestV1,
     advance_state_request_after_snapshot,
     build_snapshot_from_request,
@@ -45,6 +46,8 @@ class ConnectionProjection:
     # pushes indefinitely during continuous activity (throttled coalescing).
     dirty_version: int = 0
     pushed_version: int = 0
+    # Fragments behind the last push; later pushes send contexts/tasks as deltas against it.
+    pushed_fragments: SnapshotFragments | None = None
     # Development-only diagnostics - last known cause of the most recent dirty wave.
     dirty_reason: str | None = None
     dirty_wave_id: str | None = None
@@ -64,6 +67,9 @@ class StateMonitor:
         self._emit_handler_id: str | None = None
         self._dispatcher_loop: asyncio.AbstractEventLoop | None = None
         self._dirty_wave_seq: int = 0
+        # Bumped on every dirty signal; snapshot fragments are shared while it is unchanged.
+        self._state_version: int = 0
+        self._fragments: dict[str, SnapshotFragments] = {}
 
     def bind_manager(self, manager: "WebSocketManager", *, handler_id: str | None = None) -> None:
         with self._lock:
@@ -112,6 +118,8 @@ class StateMonitor:
         if not isinstance(context_id, str) or not context_id.strip():
             return
         target = context_id.strip()
+        # The context's entry in the shared lists changes even when nobody is viewing it.
+        self._bump_state_version()
         wave_id = None
         if _ws_debug_enabled():
             with self._lock:
@@ -142,6 +150,7 @@ class StateMonitor:
             projection.request = request
             projection.seq_base = seq_base
             projection.seq = seq_base
+            projection.pushed_fragments = None
         _debug_log(
             f"[StateMonitor] update_projection namespace={namespace} sid={sid} context={request.context!r} "
             f"log_from={request.log_from} notifications_from={request.notifications_from} "
@@ -157,6 +166,7 @@ class StateMonitor:
         wave_id: str | None = None,
     ) -> None:
         identity: ConnectionIdentity = (namespace, sid)
+        self._bump_state_version()
         loop = self._dispatcher_loop
         if loop is None or loop.is_closed():
             try:
@@ -175,6 +185,18 @@ class StateMonitor:
 
         loop.call_soon_threadsafe(self._mark_dirty_on_loop, identity, reason, wave_id)
 
+    def _bump_state_version(self) -> None:
+        with self._lock:
+            self._state_version += 1
+
+    def _shared_fragments(self, timezone: str) -> SnapshotFragments:
+        with self._lock:
+            fragments = self._fragments.get(timezone)
+            if fragments is None or fragments.version != self._state_version:
+                fragments = SnapshotFragments(timezone, self._state_version)
+                self._fragments[timezone] = fragments
+            return fragments
+
     def _mark_dirty_on_loop(
         self,
         identity: ConnectionIdentity,
@@ -266,7 +288,8 @@ class StateMonitor:
                 dirty_reason = projection.dirty_reason
                 dirty_wave_id = projection.dirty_wave_id
 
-            snapshot = await build_snapshot_from_request(request=request)
+            fragments = self._shared_fragments(request.timezone)
+            snapshot = await build_snapshot_from_request(request=request, fragments=fragments)
 
             with self._lock:
                 projection = self._projections.get(identity)
@@ -281,16 +304,27 @@ class StateMonitor:
 
                 # Advance cursors after successful snapshot emission (incremental mode).
                 projection.request = advance_state_request_after_snapshot(request, snapshot)
+                base_fragments = projection.pushed_fragments
+                projection.pushed_fragments = fragments
 
                 # Mark all dirties up to `base_version` as pushed. If new dirties
                 # arrived while building/emitting, a follow-up push will be scheduled.
                 projection.pushed_version = max(projection.pushed_version, base_version)
 
-            payload = {
+            payload: dict[str, Any] = {
                 "runtime_epoch": runtime.get_runtime_id(),
                 "seq": seq,
                 "snapshot": snapshot,
             }
+            if base_fragments is not None:
+                # Pushes arrive in seq order and a gap makes the client resync with a
+                # state_request (full lists), so the previous push is its acknowledged base.
+                delta = fragments.delta_from(base_fragments)
+                payload["snapshot"] = {**snapshot, "contexts": delta.contexts, "tasks": delta.tasks}
+                payload["lists_delta"] = {
+                    "removed_contexts": delta.removed_contexts,
+                    "removed_tasks": delta.removed_tasks,
+                }
 
             try:
                 logs_len = (
@@ -211,24 +211,7 @@ def advance_state_request_after_snapshot(
     )
 
 
-async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
-    """Build a poll-shaped snapshot for both /poll and state_push."""
-
-    Localization.get().set_timezone(request.timezone)
-
-    ctxid = request.context if isinstance(request.context, str) else ""
-    ctxid = ctxid.strip()
-
-    from_no = _coerce_non_negative_int(request.log_from, default=0)
-    notifications_from_no = _coerce_non_negative_int(request.notifications_from, default=0)
-
-    active_context = AgentContext.get(ctxid) if ctxid else None
-
-    logs = active_context.log.output(start=from_no) if active_context else []
-
-    notification_manager = AgentContext.get_notification_manager()
-    notifications = notification_manager.output(start=notifications_from_no)
-
+def _build_context_lists() -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
     scheduler = TaskScheduler.get()
 
     ctxs: list[dict[str, Any]] = []
@@ -282,6 +265,104 @@ async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
 
     ctxs.sort(key=lambda x: x["created_at"], reverse=True)
     tasks.sort(key=lambda x: x["created_at"], reverse=True)
+    return ctxs, tasks
+
+
+def _diff_items(
+    base: list[dict[str, Any]],
+    current: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], list[str]]:
+    previous = {item["id"]: item for item in base}
+    changed = [item for item in current if previous.get(item["id"]) != item]
+    current_ids = {item["id"] for item in current}
+    removed = [item_id for item_id in previous if item_id not in current_ids]
+    return changed, removed
+
+
+@dataclass(frozen=True)
+class ListsDelta:
+    contexts: list[dict[str, Any]]
+    tasks: list[dict[str, Any]]
+    removed_contexts: list[str]
+    removed_tasks: list[str]
+
+
+class SnapshotFragments:
+    """Connection-independent snapshot parts for one timezone, built on first use.
+
+    Every snapshot built with the same instance shares its contexts and tasks lists and
+    notification windows; the owner starts a new instance when the state changes.
+    """
+
+    def __init__(self, timezone: str, version: int = 0) -> None:
+        self.timezone = timezone
+        self.version = version
+        self._lists: tuple[list[dict[str, Any]], list[dict[str, Any]]] | None = None
+        self._notifications: dict[int, tuple[list[dict[str, Any]], str, int]] = {}
+        self._deltas: dict[int, ListsDelta] = {}
+
+    def lists(self) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        if self._lists is None:
+            self._lists = _build_context_lists()
+        return self._lists
+
+    def notifications(self, start: int) -> tuple[list[dict[str, Any]], str, int]:
+        window = self._notifications.get(start)
+        if window is None:
+            manager = AgentContext.get_notification_manager()
+            window = (manager.output(start=start), manager.guid, len(manager.updates))
+            self._notifications[start] = window
+        return window
+
+    def delta_from(self, base: "SnapshotFragments") -> ListsDelta:
+        """Contexts and tasks added or changed since `base`, plus the ids that are gone."""
+        delta = self._deltas.get(base.version)
+        if delta is None:
+            base_ctxs, base_tasks = base.lists()
+            ctxs, tasks = self.lists()
+            changed_ctxs, removed_ctxs = _diff_items(base_ctxs, ctxs)
+            changed_tasks, removed_tasks = _diff_items(base_tasks, tasks)
+            delta = ListsDelta(changed_ctxs, changed_tasks, removed_ctxs, removed_tasks)
+            self._deltas[base.version] = delta
+        return delta
+
+
+async def build_snapshot_from_request(
+    *,
+    request: StateRequestV1,
+    fragments: SnapshotFragments | None = None,
+) -> SnapshotV1:
+    """Build a poll-shaped snapshot for both /poll and state_push.
+
+    `fragments` lets several connections share the contexts, tasks and notifications
+    parts; without it they are built fresh for this snapshot.
+    """
+
+    Localization.get().set_timezone(request.timezone)
+
+    ctxid = request.context if isinstance(request.context, str) else ""
+    ctxid = ctxid.strip()
+
+    from_no = _coerce_non_negative_int(request.log_from, default=0)
+    notifications_from_no = _coerce_non_negative_int(request.notifications_from, default=0)
+
+    active_context = AgentContext.get(ctxid) if ctxid else None
+
+    # read the version first and output only up to it, so an update landing in between
+    # is sent on the next snapshot instead of being skipped by the client's log_from
+    log_version = active_context.log.version if active_context else 0
+    logs = (
+        active_context.log.output(start=from_no, end=log_version, appends=True)
+        if active_context
+        else []
+    )
+
+    if fragments is None:
+        fragments = SnapshotFragments(request.timezone)
+    notifications, notifications_guid, notifications_version = fragments.notifications(
+        notifications_from_no
+    )
+    ctxs, tasks = fragments.lists()
 
     snapshot: SnapshotV1 = {
         "deselect_chat": bool(ctxid) and active_context is None,
@@ -290,13 +371,13 @@ async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
         "tasks": tasks,
         "logs": logs,
         "log_guid": active_context.log.guid if active_context else "",
-        "log_version": len(active_context.log.updates) if active_context else 0,
+        "log_version": log_version,
         "log_progress": active_context.log.progress if active_context else 0,
         "log_progress_active": bool(active_context.log.progress_active) if active_context else False,
         "paused": active_context.paused if active_context else False,
         "notifications": notifications,
-        "notifications_guid": notification_manager.guid,
-        "notifications_version": len(notification_manager.updates),
+        "notifications_guid": notifications_guid,
+        "notifications_version": notifications_version,
     }
 
     validate_snapshot_schema_v1(snapshot)
@@ -22,11 +22,14 @@ from python.helpers.print_style import PrintStyle
 from python.helpers.defer import DeferredTask
 from python.helpers.files import get_abs_path, make_dirs, read_file, write_file
 from python.helpers.localization import Localization
+from python.helpers.schedule_queue import ScheduleQueue
 from python.helpers import projects, guids
 import pytz
 from typing import Annotated
 
 SCHEDULER_FOLDER = "usr/scheduler"
+# scheduled runs missed by at most this many seconds still start (e.g. right after startup)
+MISSED_RUN_GRACE = 60
 
 # ----------------------
 # Task Models
@@ -366,6 +369,14 @@ class ScheduledTask(BaseTask):
             crontab = CronTab(crontab=self.schedule.to_crontab())  # type: ignore
             return crontab.next(now=datetime.now(timezone.utc), return_datetime=True)  # type: ignore
 
+    def get_next_run_after(self, after: datetime) -> datetime | None:
+        """First run strictly after the given time, evaluated in the task's timezone, in UTC."""
+        with self._lock:
+            crontab = CronTab(crontab=self.schedule.to_crontab())  # type: ignore
+            task_timezone = pytz.timezone(self.schedule.timezone or Localization.get().get_timezone())
+            next_run = crontab.next(now=after.astimezone(task_timezone), return_datetime=True)  # type: ignore
+            return next_run.astimezone(timezone.utc) if next_run else None  # type: ignore
+
 
 class PlannedTask(BaseTask):
     type: Literal[TaskType.PLANNED] = TaskType.PLANNED
@@ -482,6 +493,13 @@ class SchedulerTaskList(BaseModel):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._lock = threading.RLock()
+        self._stamp: tuple[int, int] | None = None
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever tasks.json was found changed by someone else."""
+        return self._version
 
     async def reload(self) -> "SchedulerTaskList":
         path = get_abs_path(SCHEDULER_FOLDER, "tasks.json")
@@ -490,8 +508,21 @@ class SchedulerTaskList(BaseModel):
                 data = self.__class__.model_validate_json(read_file(path))
                 self.tasks.clear()
                 self.tasks.extend(data.tasks)
+                self._update_stamp(path)
         return self
 
+    async def reload_if_changed(self) -> "SchedulerTaskList":
+        with self._lock:
+            if _file_stamp(get_abs_path(SCHEDULER_FOLDER, "tasks.json")) != self._stamp:
+                await self.reload()
+        return self
+
+    def _update_stamp(self, path: str):
+        stamp = _file_stamp(path)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._version += 1
+
     async def add_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> "SchedulerTaskList":
         with self._lock:
             self.tasks.append(task)
@@ -527,6 +558,8 @@ class SchedulerTaskList(BaseModel):
                 )
 
             write_file(path, json_data)
+            # our own write, not a change to pick up on reload
+            self._stamp = _file_stamp(path)
 
             # Debug: Verify after saving
             if exists(path):
@@ -621,6 +654,8 @@ class TaskScheduler:
     _instance = None
     _running_deferred_tasks: Dict[str, DeferredTask]
     _running_tasks_lock: threading.RLock
+    _queue: ScheduleQueue
+    _queue_version: int
 
     @classmethod
     def get(cls) -> "TaskScheduler":
@@ -635,6 +670,8 @@ class TaskScheduler:
             self._printer = PrintStyle(italic=True, font_color="green", padding=False)
             self._running_deferred_tasks = {}
             self._running_tasks_lock = threading.RLock()
+            self._queue = ScheduleQueue()
+            self._queue_version = -1
             self._initialized = True
 
     def _register_running_task(self, task_uuid: str, deferred_task: DeferredTask) -> None:
@@ -667,6 +704,7 @@ class TaskScheduler:
 
     async def reload(self):
         await self._tasks.reload()
+        self._sync_queue()
 
     def get_tasks(self) -> list[Union[ScheduledTask, AdHocTask, PlannedTask]]:
         return self._tasks.get_tasks()
@@ -676,6 +714,7 @@ class TaskScheduler:
 
     async def add_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> "TaskScheduler":
         await self._tasks.add_task(task)
+        self._queue_task(task)
         ctx = await self._get_chat_context(task)  # invoke context creation
         from python.helpers.state_monitor_integration import mark_dirty_all
         mark_dirty_all(reason="task_scheduler.TaskScheduler.add_task")
@@ -683,12 +722,16 @@ class TaskScheduler:
 
     async def remove_task_by_uuid(self, task_uuid: str) -> "TaskScheduler":
         await self._tasks.remove_task_by_uuid(task_uuid)
+        self._queue.remove(task_uuid)
         from python.helpers.state_monitor_integration import mark_dirty_all
         mark_dirty_all(reason="task_scheduler.TaskScheduler.remove_task_by_uuid")
         return self
 
     async def remove_task_by_name(self, name: str) -> "TaskScheduler":
+        removed = [task.uuid for task in self.get_tasks() if task.name == name]
         await self._tasks.remove_task_by_name(name)
+        for task_uuid in removed:
+            self._queue.remove(task_uuid)
         from python.helpers.state_monitor_integration import mark_dirty_all
         mark_dirty_all(reason="task_scheduler.TaskScheduler.remove_task_by_name")
         return self
@@ -703,8 +746,52 @@ class TaskScheduler:
         return self._tasks.find_task_by_name(name)
 
     async def tick(self):
-        for task in await self._tasks.get_due_tasks():
-            await self._run_task(task)
+        """Start all tasks due by now, only tasks popped from the run queue are looked at."""
+        await self._tasks.reload_if_changed()
+        self._sync_queue()
+        for task_uuid, run_at in self._queue.pop_due():
+            task = self.get_task_by_uuid(task_uuid)
+            if task is None or task.state != TaskState.IDLE:
+                continue  # queued again by update_task once it is idle
+            claimed = self._queue.claim(task_uuid, run_at)
+            self._queue_task(task)
+            if claimed:
+                await self._run_task(task)
+
+    async def wait_for_next(self, max_seconds: float):
+        """Sleep until the next task is due or tasks change, at most max_seconds."""
+        await self._queue.wait(max_seconds)
+
+    def _sync_queue(self):
+        # rebuild after tasks.json was changed outside of this scheduler
+        version = self._tasks.version
+        if version == self._queue_version:
+            return
+        self._queue_version = version
+        self._queue.clear()
+        for task in self.get_tasks():
+            self._queue_task(task)
+
+    def _queue_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]):
+        self._queue.set(task.uuid, self._next_run(task))
+
+    def _next_run(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> datetime | None:
+        if task.state != TaskState.IDLE:
+            return None
+        if isinstance(task, ScheduledTask):
+            # continue after the last launch, never before it
+            candidates = [
+                datetime.now(timezone.utc) - timedelta(seconds=MISSED_RUN_GRACE),
+                self._queue.last_claim(task.uuid),
+                task.last_run,
+            ]
+            return task.get_next_run_after(max(_as_utc(c) for c in candidates if c is not None))
+        if isinstance(task, PlannedTask):
+            return next(
+                (_as_utc(t) for t in task.plan.todo if not self._queue.is_claimed(task.uuid, _as_utc(t))),
+                None,
+            )
+        return None
 
     async def run_task_by_uuid(self, task_uuid: str, task_context: str | None = None):
         # First reload tasks to ensure we have the latest state
@@ -762,6 +849,7 @@ class TaskScheduler:
 
         updated = await self._tasks.update_task_by_uuid(task_uuid, _update_task, verify_func)
         if updated is not None:
+            self._queue_task(updated)
             from python.helpers.state_monitor_integration import mark_dirty_all
             mark_dirty_all(reason="task_scheduler.TaskScheduler.update_task_checked")
         return updated
@@ -981,6 +1069,20 @@ class TaskScheduler:
         return None
 
 
+def _file_stamp(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _as_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
 # ----------------------
 # Task Serialization Helpers
 # ----------------------
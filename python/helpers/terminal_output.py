@@ -0,0 +1,128 @@
+import re
+from collections import deque
+from itertools import chain
+
+MAX_OUTPUT_CHARS = 2_000_000  # half kept from the start, half from the end, twice what the code execution tool shows
+MAX_LINE_CHARS = 100_000  # unterminated lines longer than this are broken so output without newlines stays bounded
+
+_ANSI_ESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+_PARTIAL_ESCAPE = re.compile(r"\x1B(?:\[[0-?]*[ -/]*)?\Z")
+_BYTE_ESCAPE = re.compile(r"(?<!\\)\\x[0-9A-Fa-f]{2}")
+_VISIBLE = re.compile(r"[^>\s]")
+
+
+class TerminalOutput:
+    """
+    Cleaned output of a terminal, built incrementally from raw chunks.
+
+    The text matches clean_string() of everything fed so far with literal \\xXX
+    escapes removed, but each feed() only cleans the new data: lines are final
+    once their newline arrives and just the unterminated last line is processed
+    again. Escape sequences split between chunks are held back until complete.
+    The first and last max_chars // 2 characters are kept, whole lines in
+    between are dropped, so memory stays bounded however long a command runs.
+    """
+
+    def __init__(self, max_chars: int = MAX_OUTPUT_CHARS):
+        self.max_chars = max_chars
+        self.reset()
+
+    def reset(self):
+        self.dropped = 0  # characters of lines dropped from the middle
+        self._held = ""
+        self._start: str | None = ""  # output before the first visible character, None once past it
+        self._head: list[str] = []
+        self._head_chars = 0
+        self._tail: deque[str] = deque()
+        self._tail_chars = 0
+        self._line = ""
+        self._text: str | None = ""
+
+    def feed(self, raw: str) -> bool:
+        """Add raw terminal output, returns whether the cleaned text changed."""
+        if not raw:
+            return False
+        raw = self._held + raw
+        self._held = ""
+        if partial := _PARTIAL_ESCAPE.search(raw):
+            self._held = raw[partial.start():]
+            raw = raw[: partial.start()]
+        text = _ANSI_ESCAPE.sub("", raw).replace("\x00", "")
+
+        if self._start is not None:
+            # prompt leftovers are stripped from the start, which ends with the first visible character
+            text = self._start + text
+            if not _VISIBLE.search(text):
+                self._start = text
+                return False
+            self._start = None
+            text = _strip_start(text)
+        if not text:
+            return False
+
+        lines = (self._line + text).split("\n")
+        self._line = lines.pop()
+        for line in lines:
+            self._append(_clean_line(line[:-1] if line.endswith("\r") else line))
+        if "\r" in text:
+            self._line = _collapse(self._line)
+        if len(self._line) > MAX_LINE_CHARS:
+            self._append(_clean_line(self._line))
+            self._line = ""
+        self._text = None
+        return True
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "\n".join(chain(self._head, self._tail, (_clean_line(self._line),)))
+        return self._text
+
+    def _append(self, line: str):
+        half = self.max_chars // 2
+        if self._head_chars < half:
+            self._head.append(line)
+            self._head_chars += len(line) + 1
+            return
+        self._tail.append(line)
+        self._tail_chars += len(line) + 1
+        while self._tail_chars > half and len(self._tail) > 1:
+            removed = len(self._tail.popleft()) + 1
+            self._tail_chars -= removed
+            self.dropped += removed
+
+
+def last_lines(text: str, count: int) -> list[str]:
+    """Same as text.splitlines()[-count:] for newline separated text, without splitting all of it."""
+    if not text or count <= 0:
+        return []
+    end = len(text) - 1 if text.endswith("\n") else len(text)
+    start = end
+    for _ in range(count):
+        start = text.rfind("\n", 0, start)
+        if start < 0:
+            break
+    return text[start + 1 : end].split("\n")
+
+
+def _strip_start(text: str) -> str:
+    # remove ipython \r\r\n> sequences and any '> ' from the start, then leading \r and spaces
+    text = re.sub(r"^[ \r]*(?:\r*\n>[ \r]*)*", "", text)
+    text = re.sub(r"^(>\s*)+", "", text)
+    return text.lstrip("\r ")
+
+
+def _clean_line(line: str) -> str:
+    # carriage returns overwrite the line, the last non-blank part is what's visible
+    parts = [part for part in line.split("\r") if part.strip()]
+    if parts:
+        line = parts[-1].rstrip()
+    return _BYTE_ESCAPE.sub("", line)
+
+
+def _collapse(line: str) -> str:
+    # parts before the last non-blank one can't become visible again, progress bars stay small
+    parts = line.split("\r")
+    for i in range(len(parts) - 1, 0, -1):
+        if parts[i].strip():
+            return "\r".join(parts[i:])
+    return line
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Literal
 import tiktoken
 
@@ -10,7 +11,7 @@ def count_tokens(text: str, encoding_name="cl100k_base") -> int:
         return 0
 
     # Get the encoding
-    encoding = tiktoken.get_encoding(encoding_name)
+    encoding = get_encoding(encoding_name)
 
     # Encode the text and count the tokens
     tokens = encoding.encode(text, disallowed_special=())
@@ -19,6 +20,12 @@ def count_tokens(text: str, encoding_name="cl100k_base") -> int:
     return token_count
 
 
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = "cl100k_base") -> tiktoken.Encoding:
+    # building the encoder parses the whole BPE table, do it once per process
+    return tiktoken.get_encoding(encoding_name)
+
+
 def approximate_tokens(
     text: str,
 ) -> int:
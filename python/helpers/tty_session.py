@@ -1,4 +1,4 @@
-import asyncio, os, sys, platform, errno
+import asyncio, codecs, os, sys, platform, errno
 
 _IS_WIN = platform.system() == "Windows"
 if _IS_WIN:
@@ -7,8 +7,10 @@ if _IS_WIN:
 
 
 #  Make stdin / stdout tolerant to broken UTF-8 so input() never aborts
-sys.stdin.reconfigure(errors="replace")  # type: ignore
-sys.stdout.reconfigure(errors="replace")  # type: ignore
+#  (streams replaced by a host, e.g. pytest's capture, can't be reconfigured)
+for _stream in (sys.stdin, sys.stdout):
+    if hasattr(_stream, "reconfigure"):
+        _stream.reconfigure(errors="replace")  # type: ignore
 
 
 # ──────────────────────────── PUBLIC CLASS ────────────────────────────
@@ -23,6 +25,7 @@ class TTYSession:
         self.echo = echo  # ← store preference
         self._proc = None
         self._buf = None
+        self._ready = None
 
     def __del__(self):
         # Simple cleanup on object destruction
@@ -38,6 +41,7 @@ class TTYSession:
     # ── user-facing coroutines ────────────────────────────────────────
     async def start(self):
         self._buf = asyncio.Queue()
+        self._ready = asyncio.Event()
         if _IS_WIN:
             self._proc = await _spawn_winpty(
                 self.cmd, self.cwd, self.env, self.echo
@@ -110,6 +114,24 @@ class TTYSession:
     # backward-compat alias:
     readline = read
 
+    def read_nowait(self):
+        # Return all decoded text produced so far and not read yet, without waiting
+        chunks = []
+        while not self._buf.empty():
+            chunks.append(self._buf.get_nowait())
+        return "".join(chunks)
+
+    async def wait_output(self, timeout=None):
+        # Wait until there is unread output without consuming it, False on timeout
+        if not self._buf.empty():
+            return True
+        self._ready.clear()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
     async def read_full_until_idle(self, idle_timeout, total_timeout):
         # Collect child output using iter_until_idle to avoid duplicate logic
         return "".join(
@@ -139,11 +161,16 @@ class TTYSession:
         if self._proc is None:
             raise RuntimeError("TTYSpawn is not started")
         reader = self._proc.stdout
+        # incremental decoding keeps multi-byte characters split between reads intact
+        decoder = codecs.getincrementaldecoder(self.encoding)("replace")
         while True:
             chunk = await reader.read(4096)  # grab whatever is ready # type: ignore
+            text = decoder.decode(chunk, final=not chunk)
+            if text:
+                self._buf.put_nowait(text)
+                self._ready.set()
             if not chunk:
                 break
-            self._buf.put_nowait(chunk.decode(self.encoding, "replace"))
 
 
 # ──────────────────────────── POSIX IMPLEMENTATION ────────────────────
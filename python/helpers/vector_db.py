@@ -1,25 +1,22 @@
+import asyncio
 from typing import Any, List, Sequence
-from langchain_community.vectorstores import FAISS
-
-# faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
-from python.helpers import faiss_monkey_patch
-import faiss
 
+from python.helpers import memory_index, memory_filter
+from python.helpers.memory_index import AnnFaiss
 
 from langchain_core.documents import Document
-from langchain.storage import InMemoryByteStore
 from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores.utils import (
     DistanceStrategy,
 )
-from langchain.embeddings import CacheBackedEmbeddings
-from simpleeval import simple_eval
+from python.helpers import embedding_cache, files
+from python.helpers.embedding_cache import CachedEmbeddings
 
-from agent import Agent
+import models
 from python.helpers import guids
 
 
-class MyFaiss(FAISS):
+class MyFaiss(AnnFaiss):
     # override aget_by_ids
     def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
         # return all self.docstore._dict[id] in ids
@@ -34,34 +31,34 @@ class MyFaiss(FAISS):
 
 class VectorDB:
 
-    _cached_embeddings: dict[str, CacheBackedEmbeddings] = {}
+    _cached_embeddings: dict[str, CachedEmbeddings] = {}
 
     @staticmethod
-    def _get_embeddings(agent: Agent, cache: bool = True):
-        model = agent.get_embedding_model()
+    def _get_embeddings(model_config: models.ModelConfig, cache: bool = True):
+        model = models.get_embedding_model(
+            model_config.provider,
+            model_config.name,
+            model_config=model_config,
+            **model_config.build_kwargs(),
+        )
         if not cache:
             return model  # return raw embeddings if cache is False
-        namespace = getattr(
-            model,
-            "model_name",
-            "default",
-        )
+        # same namespace as memory, so both read vectors the other already paid for
+        namespace = files.safe_file_name(model_config.provider + "_" + model_config.name)
         if namespace not in VectorDB._cached_embeddings:
-            store = InMemoryByteStore()
-            VectorDB._cached_embeddings[namespace] = (
-                CacheBackedEmbeddings.from_bytes_store(
-                    model,
-                    store,
-                    namespace=namespace,
-                )
+            VectorDB._cached_embeddings[namespace] = embedding_cache.cached_embeddings(
+                model, namespace
             )
         return VectorDB._cached_embeddings[namespace]
 
-    def __init__(self, agent: Agent, cache: bool = True):
-        self.agent = agent
+    def __init__(self, model_config: models.ModelConfig, cache: bool = True):
+        self.model_config = model_config
         self.cache = cache  # store cache preference
-        self.embeddings = self._get_embeddings(agent, cache=cache)
-        self.index = faiss.IndexFlatIP(len(self.embeddings.embed_query("example")))
+        self.embeddings = self._get_embeddings(model_config, cache=cache)
+        # per-query document sets are small, brute force is the fastest option
+        self.index = memory_index.create_index(
+            memory_index.INDEX_FLAT, len(self.embeddings.embed_query("example"))
+        )
 
         self.db = MyFaiss(
             embedding_function=self.embeddings,
@@ -78,44 +75,83 @@ class VectorDB:
     ):
         comparator = get_comparator(filter) if filter else None
 
-        return await self.db.asearch(
-            query,
-            search_type="similarity_score_threshold",
-            k=limit,
-            score_threshold=threshold,
-            filter=comparator,
-        )
+        def search():
+            with self.db.lock:
+                return self.db.search(
+                    query,
+                    search_type="similarity_score_threshold",
+                    k=limit,
+                    score_threshold=threshold,
+                    filter=comparator,
+                )
+
+        return await asyncio.to_thread(search)
+
+    async def search_by_similarity_threshold_multi(
+        self, queries: list[str], limit: int, threshold: float, filter: str = ""
+    ) -> list[list[tuple[Document, float]]]:
+        """Search several queries with one embedding batch and index pass, hits carry their relevance score."""
+        if not queries:
+            return []
+        comparator = get_comparator(filter) if filter else None
+        if isinstance(self.embeddings, CachedEmbeddings):
+            vectors = await self.embeddings.aembed_queries(queries)
+        else:
+            vectors = [await self.embeddings.aembed_query(query) for query in queries]
+
+        def search():
+            with self.db.lock:
+                return self.db.similarity_search_with_score_by_vectors(
+                    vectors, k=limit, filter=comparator
+                )
+
+        found = await asyncio.to_thread(search)
+        results = []
+        for docs in found:
+            scored = [(doc, cosine_normalizer(score)) for doc, score in docs]
+            results.append([(doc, score) for doc, score in scored if score >= threshold])
+        return results
 
     async def search_by_metadata(self, filter: str, limit: int = 0) -> list[Document]:
         comparator = get_comparator(filter)
-        all_docs = self.db.get_all_docs()
-        result = []
-        for doc in all_docs.values():
-            if comparator(doc.metadata):
-                result.append(doc)
-                # stop if limit reached and limit > 0
-                if limit > 0 and len(result) >= limit:
-                    break
-        return result
+        with self.db.lock:
+            return self.db.select_documents(comparator, limit=limit)
 
-    async def insert_documents(self, docs: list[Document]):
-        ids = [guids.generate_id() for _ in range(len(docs))]
+    async def embed_documents(self, docs: list[Document]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents([doc.page_content for doc in docs])
 
+    def add_embedded(self, docs: list[Document], vectors: list[list[float]]) -> list[str]:
+        """Add documents with vectors from embed_documents(), without awaiting in between."""
+        ids = [guids.generate_id() for _ in range(len(docs))]
         if ids:
             for doc, id in zip(docs, ids):
                 doc.metadata["id"] = id  # add ids to documents metadata
-
-            self.db.add_documents(documents=docs, ids=ids)
+            with self.db.lock:
+                self.db.add_embeddings(
+                    list(zip([doc.page_content for doc in docs], vectors)),
+                    metadatas=[doc.metadata for doc in docs],
+                    ids=ids,
+                )
         return ids
 
+    async def insert_documents(self, docs: list[Document]):
+        return self.add_embedded(docs, await self.embed_documents(docs))
+
+    def delete_by_metadata(self, filter: str) -> list[Document]:
+        """Delete documents matching filter, returns the deleted documents."""
+        comparator = get_comparator(filter)
+        with self.db.lock:
+            docs = self.db.select_documents(comparator)
+            if docs:
+                self.db.delete(ids=[doc.metadata["id"] for doc in docs])
+        return docs
+
     async def delete_documents_by_ids(self, ids: list[str]):
-        # aget_by_ids is not yet implemented in faiss, need to do a workaround
-        rem_docs = await self.db.aget_by_ids(
-            ids
-        )  # existing docs to remove (prevents error)
-        if rem_docs:
-            rem_ids = [doc.metadata["id"] for doc in rem_docs]  # ids to remove
-            await self.db.adelete(ids=rem_ids)
+        with self.db.lock:
+            # existing docs to remove (prevents error)
+            rem_docs = self.db.get_by_ids(ids)
+            if rem_docs:
+                self.db.delete(ids=[doc.metadata["id"] for doc in rem_docs])
         return rem_docs
 
 
@@ -139,12 +175,4 @@ def cosine_normalizer(val: float) -> float:
 
 
 def get_comparator(condition: str):
-    def comparator(data: dict[str, Any]):
-        try:
-            result = simple_eval(condition, names=data)
-            return result
-        except Exception as e:
-            # PrintStyle.error(f"Error evaluating condition: {e}")
-            return False
-
-    return comparator
+    return memory_filter.compile_filter(condition)
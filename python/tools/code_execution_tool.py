@@ -10,6 +10,7 @@ from python.helpers.shell_ssh import SSHInteractiveSession
 from python.helpers.docker import DockerContainerManager
 from python.helpers.strings import truncate_text as truncate_text_string
 from python.helpers.messages import truncate_text as truncate_text_agent
+from python.helpers.terminal_output import last_lines
 import re
 
 # Timeouts for python, nodejs, and terminal runtimes.
@@ -28,6 +29,11 @@ OUTPUT_TIMEOUTS: dict[str, int] = {
     "dialog_timeout": 5,
 }
 
+# Longest wait for new output before timeouts and interventions are checked.
+IDLE_CHECK_INTERVAL = 0.25
+# Output streaming in quick succession is read and shown at most once per interval.
+OUTPUT_UPDATE_INTERVAL = 0.25
+
 @dataclass
 class ShellWrap:
     id: int
@@ -241,7 +247,6 @@ class CodeExecution(Tool):
         between_output_timeout=15,  # Wait up to x seconds between outputs
         dialog_timeout=5,  # potential dialog detection timeout
         max_exec_timeout=180,  # hard cap on total runtime
-        sleep_time=0.1,
         prefix="",
         timeouts: dict | None = None,
     ):
@@ -260,18 +265,28 @@ class CodeExecution(Tool):
         last_output_time = start_time
         full_output = ""
         truncated_output = ""
+        shown_output = ""  # full output the log content was built from
         got_output = False
+        dialog_checked = False
+        last_read = 0.0
+        shell = self.state.shells[session].session
 
         # if prefix, log right away
         if prefix:
             self.log.update(content=prefix)
 
         while True:
-            await asyncio.sleep(sleep_time)
-            full_output, partial_output = await self.state.shells[session].session.read_output(
-                timeout=1, reset_full_output=reset_full_output
+            # wake up as soon as output arrives, the session keeps its full output cleaned incrementally
+            await shell.wait_output(IDLE_CHECK_INTERVAL)
+            # let fast output pile up in the session instead of rebuilding the full output per chunk
+            pause = last_read + OUTPUT_UPDATE_INTERVAL - time.time()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            full_output, partial_output = await shell.read_output(
+                timeout=0, reset_full_output=reset_full_output
             )
             reset_full_output = False  # only reset once
+            last_read = time.time()
 
             await self.agent.handle_intervention()
 
@@ -281,25 +296,31 @@ class CodeExecution(Tool):
                 # full_output += partial_output # Append new output
                 truncated_output = self.fix_full_output(full_output)
                 self.set_progress(truncated_output)
-                heading = self.get_heading_from_output(truncated_output, 0)
-                self.log.update(content=prefix + truncated_output, heading=heading)
+                heading = self.get_heading_from_output(full_output, 0)
+                if shown_output and full_output.startswith(shown_output):
+                    # only the new text goes to the log, it bounds long content itself
+                    self.log.update(heading=heading)
+                    self.log.stream(content=full_output[len(shown_output):])
+                else:
+                    # first output, a rewritten last line or lines dropped from the middle
+                    self.log.update(content=prefix + truncated_output, heading=heading)
+                shown_output = full_output
                 last_output_time = now
                 got_output = True
+                dialog_checked = False
 
                 # Check for shell prompt at the end of output
-                last_lines = (
-                    truncated_output.splitlines()[-3:] if truncated_output else []
-                )
-                last_lines.reverse()
-                for idx, line in enumerate(last_lines):
+                end_lines = last_lines(full_output, 3)
+                end_lines.reverse()
+                for idx, line in enumerate(end_lines):
                     for pat in self.prompt_patterns:
                         if pat.search(line.strip()):
                             PrintStyle.info(
                                 "Detected shell prompt, returning output early."
                             )
-                            last_lines.reverse()
+                            end_lines.reverse()
                             heading = self.get_heading_from_output(
-                                "\n".join(last_lines), idx + 1, True
+                                "\n".join(end_lines), idx + 1, True
                             )
                             self.log.update(heading=heading)
                             self.mark_session_idle(session)
@@ -342,13 +363,11 @@ class CodeExecution(Tool):
                     self.log.update(content=prefix + response, heading=heading)
                     return response
 
-                # potential dialog detection
-                if now - last_output_time > dialog_timeout:
+                # potential dialog detection, once per pause as the output doesn't change meanwhile
+                if not dialog_checked and now - last_output_time > dialog_timeout:
+                    dialog_checked = True
                     # Check for dialog prompt at the end of output
-                    last_lines = (
-                        truncated_output.splitlines()[-2:] if truncated_output else []
-                    )
-                    for line in last_lines:
+                    for line in last_lines(truncated_output, 2):
                         for pat in self.dialog_patterns:
                             if pat.search(line.strip()):
                                 PrintStyle.info(
@@ -390,11 +409,9 @@ class CodeExecution(Tool):
         self.set_progress(truncated_output)
         heading = self.get_heading_from_output(truncated_output, 0)
 
-        last_lines = (
-            truncated_output.splitlines()[-3:] if truncated_output else []
-        )
-        last_lines.reverse()
-        for idx, line in enumerate(last_lines):
+        end_lines = last_lines(truncated_output, 3)
+        end_lines.reverse()
+        for idx, line in enumerate(end_lines):
             for pat in self.prompt_patterns:
                 if pat.search(line.strip()):
                     PrintStyle.info(
@@ -404,7 +421,7 @@ class CodeExecution(Tool):
                     return None
 
         has_dialog = False 
-        for line in last_lines:
+        for line in end_lines:
             for pat in self.dialog_patterns:
                 if pat.search(line.strip()):
                     has_dialog = True
@@ -454,20 +471,21 @@ class CodeExecution(Tool):
         if not output:
             return self.get_heading() + done_icon
 
-        # find last non-empty line with skip
-        lines = output.splitlines()
-        # Start from len(lines) - skip_lines - 1 down to 0
-        for i in range(len(lines) - skip_lines - 1, -1, -1):
-            line = lines[i].strip()
-            if not line:
-                continue
-            return self.get_heading(line) + done_icon
+        # find last non-empty line with skip, looking at the end first to avoid splitting large outputs
+        for lines in (last_lines(output, skip_lines + 20), output.splitlines()):
+            # Start from len(lines) - skip_lines - 1 down to 0
+            for i in range(len(lines) - skip_lines - 1, -1, -1):
+                line = lines[i].strip()
+                if not line:
+                    continue
+                return self.get_heading(line) + done_icon
+            if len(lines) < skip_lines + 20:
+                break
 
         return self.get_heading() + done_icon
 
     def fix_full_output(self, output: str):
-        # remove any single byte \xXX escapes
-        output = re.sub(r"(?<!\\)\\x[0-9A-Fa-f]{2}", "", output)
+        # single byte \xXX escapes are already removed by the session's TerminalOutput
         # Strip every line of output before truncation
         # output = "\n".join(line.strip() for line in output.splitlines())
         output = truncate_text_agent(agent=self.agent, output=output, threshold=1000000) # ~1MB, larger outputs should be dumped to file, not read from terminal
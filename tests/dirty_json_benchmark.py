@@ -0,0 +1,108 @@
+"""
+Streamed response parsing, full DirtyJson reparse per chunk versus IncrementalDirtyJson.
+
+Not collected by pytest, run directly:
+
+    python tests/dirty_json_benchmark.py --size 8000 --chunk 12
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.dirty_json import DirtyJson, IncrementalDirtyJson
+
+WORDS = "the agent reads file output result value memory task search code error line".split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))).capitalize() + "."
+
+
+def _responses(size: int, rng: random.Random) -> dict[str, str]:
+    # shaped like agent responses, the bulk of the text is in one streamed tool argument
+    thoughts = [_sentence(rng) for _ in range(6)]
+    code = "\n".join(
+        f"    value_{i} = compute('{rng.choice(WORDS)}', {i})  # {_sentence(rng)}"
+        for i in range(size // 60)
+    )
+    text = "\n\n".join(_sentence(rng) + " \"quoted\" é" for _ in range(size // 90))
+    return {
+        "code_execution": json.dumps(
+            {
+                "thoughts": thoughts,
+                "headline": "Running analysis script",
+                "tool_name": "code_execution_tool",
+                "tool_args": {"runtime": "python", "session": 0, "code": code},
+            },
+            indent=4,
+            ensure_ascii=False,
+        ),
+        "response": json.dumps(
+            {
+                "thoughts": thoughts,
+                "headline": "Answering user",
+                "tool_name": "response",
+                "tool_args": {"text": text},
+            },
+            indent=4,
+            ensure_ascii=False,
+        ),
+    }
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _full_reparse(chunks: list[str]):
+    full = ""
+    result = None
+    for chunk in chunks:
+        full += chunk
+        result = DirtyJson.parse_string(full)
+    return result
+
+
+def _incremental(chunks: list[str]):
+    parser = IncrementalDirtyJson()
+    full = ""
+    result = None
+    for chunk in chunks:
+        full += chunk
+        result = parser.update(full)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=8000, help="approximate response size in characters")
+    parser.add_argument("--chunk", type=int, default=12, help="characters per streamed chunk")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'sample':<16}{'chars':>8}{'chunks':>8}{'full ms':>12}{'incr ms':>12}{'speedup':>10}")
+    for name, text in _responses(args.size, rng).items():
+        chunks = _chunks(text, args.chunk)
+        start = time.perf_counter()
+        expected = _full_reparse(chunks)
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        result = _incremental(chunks)
+        incremental = time.perf_counter() - start
+        assert result == expected
+        print(
+            f"{name:<16}{len(text):>8}{len(chunks):>8}{full * 1000:>12.1f}"
+            f"{incremental * 1000:>12.1f}{full / incremental:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
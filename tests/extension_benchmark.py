@@ -0,0 +1,55 @@
+"""
+Per-call overhead of resolving extensions, as paid on every streamed response chunk.
+
+Not collected by pytest, run directly:
+
+    python tests/extension_benchmark.py --calls 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import extension
+
+
+def _agent():
+    # only what path resolution reads
+    return SimpleNamespace(
+        config=SimpleNamespace(profile="agent0"),
+        context=SimpleNamespace(get_data=lambda key: None),
+    )
+
+
+def _time(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--point", default="response_stream_chunk")
+    args = parser.parse_args()
+
+    agent = _agent()
+    classes = extension.get_extension_classes(args.point, agent)  # type: ignore
+    print(f"{args.point}: {len(classes)} extensions, {args.calls} calls\n")
+
+    # before: paths and overrides resolved on every call (folder classes were already cached)
+    before = _time(lambda: extension._resolve_extensions(args.point, agent), args.calls)  # type: ignore
+    after = _time(lambda: extension.get_extension_classes(args.point, agent), args.calls)  # type: ignore
+    print(f"{'resolve per call':<20}{before:>10.1f} us")
+    print(f"{'registry':<20}{after:>10.1f} us   {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
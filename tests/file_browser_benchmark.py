@@ -0,0 +1,77 @@
+"""
+File browser listing of a large folder, parsing `ls -la` versus the scandir snapshot with pages.
+
+Not collected by pytest, run directly:
+
+    python tests/file_browser_benchmark.py --files 50000
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import file_browser
+
+
+def _ls_listing(folder: Path) -> list:
+    # previous FileBrowser._get_files_via_ls: parse ls -la, stat every entry, everything in one response
+    result = subprocess.run(["ls", "-la", str(folder)], capture_output=True, text=True, timeout=30)
+    entries = []
+    for line in result.stdout.strip().split("\n")[1:]:
+        if line.endswith(" .") or line.endswith(" .."):
+            continue
+        parts = line.split()
+        path = folder / " ".join(parts[8:])
+        stat = path.stat()
+        entries.append({"name": path.name, "size": stat.st_size, "modified": stat.st_mtime, "is_dir": path.is_dir()})
+    entries.sort(key=lambda e: (not e["is_dir"], e["name"].casefold()))
+    return entries
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        for i in range(args.files):
+            (folder / f"file_{i:06d}.txt").write_text("x")
+        browser = file_browser.FileBrowser()
+
+        def cold_page():
+            file_browser.clear_snapshots()
+            return browser.get_files(str(folder))
+
+        print(f"{args.files} files\n")
+        print(f"{'case':<34}{'ls -la ms':>11}{'scandir ms':>12}{'speedup':>10}")
+        old = _time(lambda: _ls_listing(folder), args.repeat)
+        cursor = cold_page()["next_cursor"]
+        cases = [
+            ("first page, cold", cold_page),
+            ("next page, cached stats", lambda: browser.get_files(str(folder), cursor=cursor)),
+            ("filtered, cached stats", lambda: browser.get_files(str(folder), filter="_0499")),
+        ]
+        for name, fn in cases:
+            fn()
+            new = _time(fn, args.repeat)
+            print(f"{name:<34}{old:>11.1f}{new:>12.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
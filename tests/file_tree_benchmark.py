@@ -0,0 +1,85 @@
+"""
+Workdir tree for prompt extras, full rescan on every call versus the cached tree.
+
+Not collected by pytest, run directly:
+
+    python tests/file_tree_benchmark.py --folders 200 --files 20
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import file_tree
+
+IGNORE = "node_modules/\n__pycache__/\n*.pyc\n.git/\n"
+
+
+def _create(root: Path, folders: int, files: int):
+    for i in range(folders):
+        for sub in (f"src/pkg{i}", f"node_modules/dep{i}/lib", f"src/pkg{i}/__pycache__"):
+            folder = root / sub
+            folder.mkdir(parents=True)
+            for j in range(files):
+                (folder / f"file{j}.py").write_text("", encoding="utf-8")
+    # nothing is fresh enough to be skipped by the cache
+    for folder, _dirs, names in os.walk(root):
+        for name in [*names, "."]:
+            os.utime(os.path.join(folder, name), ns=(0, 1_000_000_000))
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folders", type=int, default=200)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _create(root, args.folders, args.files)
+
+        def render():
+            return file_tree.file_tree(str(root), max_depth=5, max_files=20, max_folders=20, max_lines=250, ignore=IGNORE)
+
+        def cold():
+            file_tree.clear_cache()
+            return render()
+
+        assert cold() == render()
+        print(f"{args.folders * 3} folders, {args.folders * 3 * args.files} files\n")
+        print(f"{'case':<34}{'rescan ms':>11}{'cached ms':>11}{'speedup':>10}")
+        old = _time(cold, args.repeat)
+        new = _time(render, args.repeat)
+        print(f"{'unchanged tree':<34}{old:>11.2f}{new:>11.2f}{old / new:>9.0f}x")
+
+        changed = root / "src" / "pkg0"
+
+        def change():
+            (changed / "new.py").touch()
+            os.utime(changed, ns=(0, time.time_ns() - file_tree.RACY_WINDOW_NS * 2))
+            render()
+            (changed / "new.py").unlink()
+            os.utime(changed, ns=(0, time.time_ns() - file_tree.RACY_WINDOW_NS * 2))
+            render()
+
+        new = _time(change, args.repeat) / 2
+        print(f"{'one folder changed':<34}{old:>11.2f}{new:>11.2f}{old / new:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
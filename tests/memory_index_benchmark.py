@@ -0,0 +1,88 @@
+"""
+Recall versus latency of the memory ANN index types against the flat baseline.
+
+Not collected by pytest, run directly:
+
+    python tests/memory_index_benchmark.py --count 100000 --dim 384
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import memory_index
+
+
+def _clustered_vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    # real embeddings are clustered, uniform noise would flatter ivf and hnsw
+    centers = rng.standard_normal((max(8, count // 500), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)]
+    vectors += 0.35 * rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _build(type: str, vectors: np.ndarray, pq: bool):
+    index = memory_index.create_index(type, vectors.shape[1], vectors, pq=pq)  # type: ignore
+    if type == memory_index.INDEX_FLAT:
+        index.add(vectors)
+    else:
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+    return index
+
+
+def _search(index, queries: np.ndarray, k: int):
+    # one query at a time, like memory recall does
+    start = time.perf_counter()
+    results = [index.search(q[None, :], k)[1][0] for q in queries]
+    elapsed = time.perf_counter() - start
+    return np.vstack(results), elapsed / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _clustered_vectors(args.count, args.dim, rng)
+    queries = _clustered_vectors(args.queries, args.dim, rng)
+
+    variants = [
+        ("flat", False),
+        ("ivf", False),
+        ("ivf", True),
+        ("hnsw", False),
+    ]
+
+    truth = None
+    print(f"{args.count} vectors, dim {args.dim}, {args.queries} queries, k={args.k}\n")
+    print(f"{'index':<10}{'build s':>10}{'query ms':>12}{'speedup':>10}{f'recall@{args.k}':>12}")
+    baseline_ms = 0.0
+    for type, pq in variants:
+        start = time.perf_counter()
+        index = _build(type, vectors, pq)
+        build = time.perf_counter() - start
+        found, per_query = _search(index, queries, args.k)
+        if truth is None:
+            truth, baseline_ms = found, per_query * 1000
+        recall = np.mean(
+            [len(set(f) & set(t)) / args.k for f, t in zip(found, truth)]
+        )
+        name = f"{type}+pq" if pq else type
+        ms = per_query * 1000
+        print(f"{name:<10}{build:>10.2f}{ms:>12.3f}{baseline_ms / ms:>9.1f}x{recall:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Secret masking at its call sites, per-secret str.replace versus the compiled SecretsMasker.
+
+Not collected by pytest, run directly:
+
+    python tests/secrets_mask_benchmark.py --secrets 50
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.secrets import SecretsMasker, StreamingSecretsFilter, alias_for_key
+
+
+def _replace_each(secrets: dict[str, str], text: str) -> str:
+    # previous SecretsManager.mask_values
+    for key, value in sorted(secrets.items(), key=lambda x: len(x[1]), reverse=True):
+        if value and len(value.strip()) >= 4:
+            text = text.replace(value, alias_for_key(key))
+    return text
+
+
+class _PrefixSetFilter:
+    # previous StreamingSecretsFilter: rescans pending and probes every suffix length per chunk
+    def __init__(self, secrets: dict[str, str]):
+        self.value_to_key = {v: k for k, v in secrets.items() if v}
+        self.prefixes = {v[:i] for v in self.value_to_key for i in range(3, len(v) + 1)}
+        self.max_len = max(map(len, self.value_to_key), default=0)
+        self.pending = ""
+
+    def process_chunk(self, chunk: str) -> str:
+        self.pending += chunk
+        for value in sorted(self.value_to_key, key=len, reverse=True):
+            self.pending = self.pending.replace(value, alias_for_key(self.value_to_key[value]))
+        hold = 0
+        for length in range(min(len(self.pending), self.max_len), 2, -1):
+            if self.pending[-length:] in self.prefixes:
+                hold = length
+                break
+        emit = self.pending[: len(self.pending) - hold]
+        self.pending = self.pending[len(self.pending) - hold :]
+        return emit
+
+
+def _secrets(count: int, rng: random.Random) -> dict[str, str]:
+    alphabet = string.ascii_letters + string.digits
+    return {f"KEY_{i}": "sk-" + "".join(rng.choice(alphabet) for _ in range(rng.randint(12, 40))) for i in range(count)}
+
+
+def _text(size: int, secrets: dict[str, str], rng: random.Random) -> str:
+    words = "the output of command was written to file with status ok and error none".split()
+    parts = []
+    length = 0
+    while length < size:
+        part = rng.choice(list(secrets.values())) if rng.random() < 0.002 else rng.choice(words)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--secrets", type=int, default=50)
+    parser.add_argument("--chunk", type=int, default=8, help="characters per streamed chunk")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    secrets = _secrets(args.secrets, rng)
+    start = time.perf_counter()
+    masker = SecretsMasker(secrets, min_length=4)
+    build = (time.perf_counter() - start) * 1000
+    print(f"{args.secrets} secrets, masker built in {build:.2f} ms\n")
+    print(f"{'call site':<34}{'replace ms':>12}{'masker ms':>12}{'speedup':>10}")
+
+    cases = [
+        ("history message (500 chars)", _text(500, secrets, rng), 2000),
+        ("log update (5 KB)", _text(5_000, secrets, rng), 300),
+        ("tool result (100 KB)", _text(100_000, secrets, rng), 20),
+    ]
+    for name, text, repeat in cases:
+        assert masker.mask(text) == _replace_each(secrets, text)
+        old = _time(lambda: _replace_each(secrets, text), repeat)
+        new = _time(lambda: masker.mask(text), repeat)
+        print(f"{name:<34}{old:>12.3f}{new:>12.3f}{old / new:>9.1f}x")
+
+    stream_text = _text(20_000, secrets, rng)
+    chunks = [stream_text[i : i + args.chunk] for i in range(0, len(stream_text), args.chunk)]
+
+    def stream(filter):
+        for chunk in chunks:
+            filter.process_chunk(chunk)
+
+    old = _time(lambda: stream(_PrefixSetFilter(secrets)), 3)
+    new = _time(lambda: stream(StreamingSecretsFilter({}, masker=masker)), 3)
+    print(f"{f'stream, {len(chunks)} chunks':<34}{old:>12.3f}{new:>12.3f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
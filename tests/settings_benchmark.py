@@ -0,0 +1,58 @@
+"""
+Settings access in the message loop, rebuilding on every get_settings() call versus the shared snapshot.
+
+Not collected by pytest, run directly:
+
+    python tests/settings_benchmark.py --calls 20
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import settings
+
+
+def _rebuild() -> settings.Settings:
+    # previous get_settings: normalize and load keys, dotenv and secrets on every call
+    current = settings._settings or settings.get_default_settings()
+    norm = settings.normalize_settings(current)
+    settings._load_sensitive_settings(norm)
+    return norm
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20, help="get_settings() calls per loop iteration")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    assert dict(settings.get_settings()) == _rebuild()
+
+    def iteration(get):
+        for _ in range(args.calls):
+            get()["chat_model_name"]
+
+    print(f"{'access':<30}{'rebuild ms':>12}{'snapshot ms':>13}{'speedup':>10}")
+    old = _time(_rebuild, args.iterations)
+    new = _time(settings.get_settings, args.iterations * 100)
+    print(f"{'single get_settings()':<30}{old:>12.4f}{new:>13.4f}{old / new:>9.0f}x")
+    old = _time(lambda: iteration(_rebuild), args.iterations)
+    new = _time(lambda: iteration(settings.get_settings), args.iterations)
+    print(f"{f'loop iteration, {args.calls} calls':<30}{old:>12.4f}{new:>13.4f}{old / new:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
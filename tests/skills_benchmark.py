@@ -0,0 +1,113 @@
+"""
+Per-message skill lookups, re-reading every SKILL.md versus the cached skill catalog.
+
+Not collected by pytest, run directly:
+
+    python tests/skills_benchmark.py --skills 300
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import skills
+
+WORDS = "deploy report docker test review data chart email invoice pdf image audio python shell web scrape".split()
+
+
+def _create(root: Path, count: int, rng: random.Random):
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        folder = root / f"skill-{i}"
+        folder.mkdir(parents=True)
+        (folder / "SKILL.md").write_text(
+            "\n".join(
+                [
+                    "---",
+                    f"name: skill-{i}",
+                    f"description: {' '.join(rng.sample(WORDS, 8))}",
+                    "triggers:",
+                    f"  - {words[0]} {words[1]} {i}",
+                    "tags:",
+                    f"  - {words[2]}",
+                    "---",
+                    "# Instructions",
+                    "step " * 200,
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+
+def _list_old(root: Path) -> list:
+    # previous list_skills: rglob, read and parse every SKILL.md
+    return [s for p in skills.discover_skill_md_files(root) if (s := skills.skill_from_markdown(p))]
+
+
+def _match_old(root: Path, message: str) -> list:
+    # previous _62_auto_load_triggered_skills
+    msg = message.lower()
+    return [s for s in _list_old(root) if any(t.lower() in msg for t in s.triggers)]
+
+
+def _search_old(root: Path, query: str) -> list:
+    # previous search_skills: substring counts
+    terms = query.lower().split()
+    scored = []
+    for s in _list_old(root):
+        score = sum(
+            3 * (t in s.name) + 2 * (t in s.description.lower()) + any(t in tag for tag in s.tags) for t in terms
+        )
+        if score:
+            scored.append((score, s))
+    scored.sort(key=lambda pair: (-pair[0], pair[1].name))
+    return [s for _score, s in scored[:25]]
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _create(root, args.skills, rng)
+        skills.get_skill_roots = lambda agent=None: [str(root)]  # type: ignore
+        message = f"please {WORDS[0]} {WORDS[1]} 7 and write a report " * 5
+
+        start = time.perf_counter()
+        skills.get_catalog()
+        build = (time.perf_counter() - start) * 1000
+        print(f"{args.skills} skills, catalog built in {build:.1f} ms\n")
+        assert [s.name for s in skills.match_triggered_skills(message)] == [s.name for s in _match_old(root, message)]
+
+        print(f"{'lookup':<28}{'old ms':>10}{'catalog ms':>12}{'speedup':>10}")
+        cases = [
+            ("list_skills", lambda: _list_old(root), lambda: skills.list_skills()),
+            ("trigger match", lambda: _match_old(root, message), lambda: skills.match_triggered_skills(message)),
+            ("search", lambda: _search_old(root, "deploy report"), lambda: skills.search_skills("deploy report")),
+        ]
+        for name, old_fn, new_fn in cases:
+            old = _time(old_fn, args.repeat)
+            new = _time(new_fn, args.repeat * 10)
+            print(f"{name:<28}{old:>10.3f}{new:>12.3f}{old / new:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
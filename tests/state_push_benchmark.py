@@ -0,0 +1,76 @@
+"""
+State push wave across many tabs, a full snapshot per sid versus shared snapshot fragments.
+
+Not collected by pytest, run directly:
+
+    python tests/state_push_benchmark.py --contexts 100 --sids 20
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agent import AgentContext
+from initialize import initialize_agent
+from python.helpers.state_snapshot import SnapshotFragments, StateRequestV1, build_snapshot_from_request
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        asyncio.run(fn())
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contexts", type=int, default=100)
+    parser.add_argument("--sids", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    config = initialize_agent()
+    ids = [f"bench-{i}" for i in range(args.contexts)]
+    for ctxid in ids:
+        AgentContext(config=config, id=ctxid, set_current=False).log.log(type="user", heading="hi", content="hello")
+    requests = [
+        StateRequestV1(context=ids[i % len(ids)], log_from=0, notifications_from=0, timezone="UTC")
+        for i in range(args.sids)
+    ]
+
+    async def per_sid():
+        # previous StateMonitor._flush_push: every sid rebuilds the whole snapshot
+        return [json.dumps(await build_snapshot_from_request(request=r)) for r in requests]
+
+    base = SnapshotFragments("UTC", 0)
+    base.lists()
+
+    async def shared():
+        fragments = SnapshotFragments("UTC", 1)
+        payloads = []
+        for r in requests:
+            snapshot = await build_snapshot_from_request(request=r, fragments=fragments)
+            delta = fragments.delta_from(base)
+            payloads.append(json.dumps({**snapshot, "contexts": delta.contexts, "tasks": delta.tasks}))
+        return payloads
+
+    try:
+        print(f"{args.contexts} contexts, {args.sids} sids per wave\n")
+        print(f"{'case':<34}{'per sid ms':>12}{'shared ms':>11}{'speedup':>10}")
+        old = _time(per_sid, args.repeat)
+        new = _time(shared, args.repeat)
+        print(f"{'one push wave':<34}{old:>12.2f}{new:>11.2f}{old / new:>9.1f}x")
+    finally:
+        for ctxid in ids:
+            AgentContext.remove(ctxid)
+
+
+if __name__ == "__main__":
+    main()
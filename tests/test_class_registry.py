@@ -0,0 +1,48 @@
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import extension, extract_tools
+from python.helpers.extension import Extension
+
+_SOURCE = (
+    "from python.helpers.extension import Extension\n"
+    "class {name}(Extension):\n"
+    "    async def execute(self, **kwargs):\n"
+    "        pass\n"
+)
+
+
+def _write(path: Path, name: str, bump: int = 0):
+    path.write_text(_SOURCE.format(name=name), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 1_000_000_000))
+
+
+def test_folder_classes_reload_only_on_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(extension, "CHECK_INTERVAL", 0)
+    _write(tmp_path / "_10_first.py", "First")
+
+    first = extension._get_extensions(str(tmp_path))
+    assert [c.__name__ for c in first] == ["First"]
+    assert extension._get_extensions(str(tmp_path)) is first
+
+    _write(tmp_path / "_20_second.py", "Second")
+    assert [c.__name__ for c in extension._get_extensions(str(tmp_path))] == ["First", "Second"]
+
+    _write(tmp_path / "_10_first.py", "Renamed", bump=1)
+    assert [c.__name__ for c in extension._get_extensions(str(tmp_path))] == ["Renamed", "Second"]
+
+
+def test_file_classes_are_executed_once_per_change(tmp_path):
+    file = tmp_path / "tool.py"
+    _write(file, "Tool")
+    first = extract_tools.get_classes_from_file(str(file), Extension)
+    assert extract_tools.get_classes_from_file(str(file), Extension)[0] is first[0]
+
+    _write(file, "Changed", bump=1)
+    assert extract_tools.get_classes_from_file(str(file), Extension)[0].__name__ == "Changed"
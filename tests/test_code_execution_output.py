@@ -0,0 +1,84 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.log import Log
+from python.helpers.terminal_output import TerminalOutput
+from python.tools.code_execution_tool import CodeExecution
+
+
+class _StreamingShell:
+    """Produces many small chunks in quick succession, then a shell prompt."""
+
+    def __init__(self, lines: int):
+        self.output = TerminalOutput()
+        self.pending = ""
+        self.reads = 0
+        self.arrived = asyncio.Event()
+        self.task = asyncio.create_task(self._produce(lines))
+
+    async def _produce(self, lines: int):
+        for i in range(lines):
+            self.pending += f"line {i}\n"
+            self.arrived.set()
+            await asyncio.sleep(0.001)
+        self.pending += "root@box:~# "
+        self.arrived.set()
+
+    async def wait_output(self, timeout: float) -> bool:
+        if self.pending:
+            return True
+        self.arrived.clear()
+        try:
+            await asyncio.wait_for(self.arrived.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def read_output(self, timeout: float = 0, reset_full_output: bool = False):
+        self.reads += 1
+        if reset_full_output:
+            self.output.reset()
+        partial, self.pending = self.pending, ""
+        self.output.feed(partial)
+        return self.output.text(), partial or None
+
+
+@pytest.mark.asyncio
+async def test_streamed_output_is_read_and_logged_in_batches(monkeypatch):
+    shell = _StreamingShell(lines=300)
+    log = Log()
+    item = log.log(type="code_exe", heading="run", content="")
+    updates = []
+    original = log._update_item
+    monkeypatch.setattr(log, "_update_item", lambda *a, **kw: (updates.append(kw), original(*a, **kw))[1])
+
+    async def handle_intervention():
+        pass
+
+    tool = CodeExecution.__new__(CodeExecution)
+    tool.agent = SimpleNamespace(handle_intervention=handle_intervention)  # type: ignore
+    tool.log = item
+    tool.args = {}
+    tool.state = SimpleNamespace(shells={0: SimpleNamespace(session=shell, running=True)})  # type: ignore
+
+    async def prepare_state(**kwargs):
+        return tool.state
+
+    monkeypatch.setattr(tool, "prepare_state", prepare_state)
+    output = await asyncio.wait_for(tool.get_terminal_output(session=0), timeout=10)
+
+    assert output.endswith("line 299\nroot@box:~#")
+    assert item.content == output
+    # one read per update interval while output streams, not one per chunk
+    assert shell.reads < 20
+    # only the first output replaces the content, later output is appended
+    assert sum(1 for kw in updates if kw.get("content") is not None) == 1
+    assert sum(1 for kw in updates if kw.get("content_append")) >= 1
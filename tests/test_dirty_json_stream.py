@@ -0,0 +1,81 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.dirty_json import DirtyJson, IncrementalDirtyJson
+
+RESPONSE = json.dumps(
+    {
+        "thoughts": ["Need to list files", "Then summarize \"them\""],
+        "headline": "Listing files",
+        "tool_name": "code_execution_tool",
+        "tool_args": {"runtime": "terminal", "session": 0, "code": "ls -la\necho \\u00e9 done", "opts": [1, -2.5e3, True, None, [], {}]},
+    },
+    indent=2,
+)
+
+SAMPLES = [
+    RESPONSE,
+    "Sure, here it is:\n" + RESPONSE + "\ntrailing text",
+    '{"a": 1, "a" : 2 "b": [ ], "c": [1 , 2 ,], "d": {"e": {"f": "g"}}, "h": tRue, "i": "\\u12zz"}',
+    '{"a": {"b": 1}}, "c": "x"}',
+    # outside the common grammar, handled by reparsing
+    '{"thoughts": ["a"], // comment\n "tool_args": {"code": """x = 1"""}, key: value}',
+    '{{"a": 1}}',
+]
+
+
+def _expected(text: str):
+    try:
+        return DirtyJson.parse_string(text)
+    except ValueError:
+        return ValueError
+
+
+def _feed_all(text: str, rng: random.Random):
+    parser = IncrementalDirtyJson()
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, 7)
+        try:
+            result = parser.feed(text[pos : pos + size])
+        except ValueError:
+            result = ValueError
+        pos += size
+        yield text[:pos], result, parser
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_every_prefix_matches_full_parse(text):
+    rng = random.Random(0)
+    for _ in range(5):
+        for prefix, result, _parser in _feed_all(text, rng):
+            assert result == _expected(prefix), prefix
+
+
+def test_delta_holds_changed_keys_and_results_are_snapshots():
+    parser = IncrementalDirtyJson()
+    first = parser.feed('{"headline": "Hi", "tool_args": {"text": "Hel')
+    assert parser.delta == {"headline": "Hi", "tool_args": {"text": "Hel"}}
+    second = parser.feed('lo"}')
+    assert parser.delta == {"tool_args": {"text": "Hello"}}
+    assert first["tool_args"] == {"text": "Hel"}  # earlier result untouched
+    assert second["headline"] is first["headline"]
+
+    parser.feed(', "ke')
+    assert parser.delta == {"ke": None}
+    parser.feed('y": 1}')
+    assert parser.removed == ["ke"] and parser.delta == {"key": 1}
+
+
+def test_update_restarts_when_earlier_text_changes():
+    parser = IncrementalDirtyJson()
+    parser.update('{"text": "secret')
+    assert parser.update('{"text": "******"}\n') == {"text": "******"}
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import document_index
+from python.helpers.document_index import DocumentIndex, Validators
+
+
+def test_documents_share_content_by_hash(tmp_path):
+    path = str(tmp_path / "index.db")
+    index = DocumentIndex(path)
+    index.put("https://a/doc", "same text", ["same", "text"])
+    index.put("https://b/doc", "same text", ["same", "text"])
+    assert index.stats()["contents"] == 1
+
+    # survives a restart
+    reopened = DocumentIndex(path)
+    doc = reopened.get("https://a/doc")
+    assert doc is not None
+    assert reopened.content(doc.hash) == ("same text", ["same", "text"])
+
+    reopened.put("https://a/doc", "changed", ["changed"])
+    reopened.remove("https://b/doc")
+    assert reopened.stats()["contents"] == 1
+    assert reopened.get("https://b/doc") is None
+
+
+def test_expired_and_least_recently_used_documents_are_evicted(tmp_path):
+    index = DocumentIndex(str(tmp_path / "index.db"), max_bytes=200, ttl=60)
+    index.put("https://old", "x" * 40, ["x" * 40])
+    index._conn.execute("UPDATE documents SET accessed = ?", (time.time() - 120,))
+    assert index.put("https://new", "y" * 40, ["y" * 40]) == ["https://old"]
+
+    index.put("https://other", "z" * 40, ["z" * 40])
+    index.get("https://new")  # used recently, stays
+    evicted = index.put("https://last", "w" * 40, ["w" * 40])
+    assert evicted == ["https://other"]
+    assert index.stats()["size_bytes"] <= 200
+
+
+def test_local_files_are_revalidated_by_mtime(tmp_path):
+    file = tmp_path / "doc.txt"
+    file.write_text("one")
+    uri = f"file://{file}"
+    index = DocumentIndex(None)
+
+    async def main():
+        index.put(uri, "one", ["one"], await document_index.read_validators(uri))
+        current = await index.is_current(index.get(uri))  # type: ignore
+        os.utime(file, (time.time() + 10, time.time() + 10))
+        return current, await index.is_current(index.get(uri))  # type: ignore
+
+    assert asyncio.run(main()) == (True, False)
+    assert index.get(uri).validators.mtime > 0  # type: ignore
+
+
+def test_remote_documents_are_trusted_until_revalidation_is_due():
+    index = DocumentIndex(None)
+    index.put("https://example.invalid/doc", "text", ["text"], Validators(etag='"v1"'))
+    doc = index.get("https://example.invalid/doc")
+    assert asyncio.run(index.is_current(doc))  # type: ignore
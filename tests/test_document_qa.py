@@ -0,0 +1,134 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("langchain_unstructured")
+
+from langchain_core.documents import Document
+
+from python.helpers import document_query
+from python.helpers.document_query import DocumentQueryHelper
+
+
+@pytest.fixture(autouse=True)
+def one_token_per_char(monkeypatch):
+    monkeypatch.setattr(document_query.tokens, "approximate_tokens", lambda text: len(text))
+
+
+def _chunk(id: str, size: int, uri: str = "https://doc", index: int = 0) -> Document:
+    return Document(
+        page_content="x" * size,
+        metadata={"id": id, "document_uri": uri, "chunk_index": index},
+    )
+
+
+def _ids(docs: list[Document]) -> list[str]:
+    return [doc.metadata["id"] for doc in docs]
+
+
+def test_chunks_over_budget_are_skipped_for_smaller_ones():
+    hits = [[(_chunk("a", 60, index=0), 0.9), (_chunk("b", 60, index=1), 0.8), (_chunk("c", 30, index=2), 0.7)]]
+    selected = DocumentQueryHelper._select_chunks(hits, budget=100)
+    assert _ids(selected) == ["a", "c"]
+    assert DocumentQueryHelper._select_chunks(hits, budget=10) == []
+
+
+def test_queries_take_turns_and_share_hits_once():
+    broad = [(_chunk(f"b{i}", 10, index=i), 0.9 - i * 0.01) for i in range(5)]
+    narrow = [(_chunk("n0", 10, uri="https://other"), 0.6), (broad[1][0], 0.55)]
+    selected = DocumentQueryHelper._select_chunks([broad, narrow], budget=30)
+    # the narrow query gets its best hit in before the broad one fills the budget
+    assert set(_ids(selected)) == {"b0", "n0", "b1"}
+    # returned in document order, not by score
+    assert _ids(selected) == ["b0", "b1", "n0"]
+
+
+def _helper(intervention=None) -> DocumentQueryHelper:
+    async def handle_intervention():
+        if intervention:
+            await intervention()
+
+    helper = DocumentQueryHelper.__new__(DocumentQueryHelper)
+    helper.agent = SimpleNamespace(handle_intervention=handle_intervention)  # type: ignore
+    return helper
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_limits_concurrency_and_keeps_order():
+    running = 0
+    peak = 0
+
+    async def work(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (10 - item))
+        running -= 1
+        return item * 2
+
+    assert await _helper()._run_bounded(work, range(10)) == [i * 2 for i in range(10)]
+    assert peak == document_query.QA_MAX_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_cancels_the_rest_on_failure():
+    started = []
+    cancelled = []
+
+    async def work(item):
+        started.append(item)
+        if item == 0:
+            raise ValueError("model call failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(_helper()._run_bounded(work, range(6)), timeout=5)
+    await asyncio.sleep(0)
+    # started calls are cancelled, the rest of the queue never runs
+    assert sorted(cancelled) == sorted(started)[1:]
+    assert len(started) < 6
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_stops_on_intervention_and_outer_cancel():
+    calls = []
+
+    async def intervene():
+        if len(calls) >= 2:
+            raise asyncio.CancelledError()
+
+    async def work(item):
+        calls.append(item)
+        await asyncio.sleep(0.01)
+        return item
+
+    with pytest.raises(asyncio.CancelledError):
+        await _helper(intervene)._run_bounded(work, range(10))
+    assert len(calls) < 10
+
+    started = asyncio.Event()
+
+    async def slow(item):
+        started.set()
+        await asyncio.sleep(10)
+
+    task = asyncio.create_task(_helper()._run_bounded(slow, range(3)))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(task, timeout=5)
+    # no call is left running once the caller is cancelled
+    pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    await asyncio.sleep(0)
+    assert all(t.done() for t in pending)
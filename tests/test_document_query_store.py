@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("langchain_unstructured")
+
+from langchain_core.embeddings import Embeddings
+
+import models
+from python.helpers import document_index
+from python.helpers.document_index import DocumentIndex
+from python.helpers.document_query import DocumentQueryHelper, DocumentQueryStore
+from python.helpers.vector_db import VectorDB
+
+
+class _SlowEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(0.1)  # both adds are embedding at the same time
+        return self.embed_documents(texts)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(
+        VectorDB, "_get_embeddings", staticmethod(lambda model_config, cache=True: _SlowEmbeddings())
+    )
+    monkeypatch.setattr(document_index, "get_index", lambda: DocumentIndex(None))
+    config = models.ModelConfig(type=models.ModelType.EMBEDDING, provider="test", name="embed")
+    return DocumentQueryStore(config)
+
+
+def test_adds_from_several_loops_keep_one_copy(store):
+    uri = "https://example.com/doc.txt"
+    texts = ["first version of the document", "second version of the document"]
+
+    def add(text):
+        asyncio.run(store.add_document(text, uri))
+
+    threads = [threading.Thread(target=add, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    chunks = asyncio.run(store._get_document_chunks(uri))
+    assert len(chunks) == 1
+    assert chunks[0].page_content in texts
+
+
+@pytest.mark.asyncio
+async def test_validators_are_only_requested_for_indexed_documents(store, monkeypatch):
+    remote_flags = []
+
+    async def read_validators(uri, remote=True):
+        remote_flags.append(remote)
+        return document_index.Validators()
+
+    async def handle_intervention():
+        pass
+
+    monkeypatch.setattr(document_index, "read_validators", read_validators)
+    agent = SimpleNamespace(handle_intervention=handle_intervention)
+    helper = DocumentQueryHelper.__new__(DocumentQueryHelper)
+    helper.agent, helper.store, helper.progress_callback = agent, store, lambda x: None
+    monkeypatch.setattr(helper, "handle_text_document", lambda document, scheme: "text")
+
+    uri = "https://example.com/doc.txt"
+    assert await helper.document_get_content(uri) == "text"
+    store.index._conn.execute("UPDATE documents SET checked = ?", (time.time() - 3600,))
+    assert await helper.document_get_content(uri) == "text"  # refetched, no validators to check
+    assert remote_flags == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_index_is_read_and_written_off_the_event_loop(store, monkeypatch):
+    loop_thread = threading.current_thread()
+    calls = []
+    for name in ("get", "content", "put"):
+        original = getattr(store.index, name)
+
+        def record(*args, _name=name, _original=original):
+            calls.append((_name, threading.current_thread() is loop_thread))
+            return _original(*args)
+
+        monkeypatch.setattr(store.index, name, record)
+
+    uri = "https://example.com/doc.txt"
+    await store.save_document("saved text", uri)
+    assert await store.is_indexed(uri)
+    await store.add_document("indexed text", uri)
+    assert await store.load_document(uri) == "indexed text"
+
+    assert {name for name, _ in calls} == {"get", "content", "put"}
+    assert not [name for name, on_loop in calls if on_loop]
@@ -0,0 +1,101 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.embeddings import Embeddings
+
+from python.helpers import embedding_cache
+from python.helpers.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class _CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def embed_documents(self, texts):
+        self.embedded += texts
+        return [[float(len(t)), 0.5] for t in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return [float(len(text)), 1.5]
+
+
+def test_vectors_persist_across_reopen(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = EmbeddingCache(path, 0)
+    cache.mset([("a", [0.25, -1.0]), ("b", [2.0, 3.0])])
+
+    reopened = EmbeddingCache(path, 0)
+    assert reopened.mget(["b", "missing", "a"]) == [[2.0, 3.0], None, [0.25, -1.0]]
+    stats = reopened.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (2, 2, 1)
+    assert stats["size_bytes"] == 16
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # room for 4 vectors of 2 float32s
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), 32)
+    cache.mset([(k, [1.0, 2.0]) for k in "abcd"])
+    cache._conn.execute("UPDATE embeddings SET accessed = ?", (time.time() - 3600,))
+    cache.mget(["a"])  # a is now the most recently used
+    cache.mset([("e", [1.0, 2.0])])
+
+    assert cache.mget(["b"]) == [None]
+    assert cache.mget(["a"]) != [None]
+    assert cache.stats()["size_bytes"] <= 32
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_cached_embeddings_only_embed_missing_texts():
+    model = _CountingEmbeddings()
+    embedder = CachedEmbeddings(model, EmbeddingCache(None, 0), "model")
+
+    first = embedder.embed_documents(["one", "three"])
+    second = asyncio.run(embedder.aembed_documents(["three", "four", "one"]))
+    assert second == [first[1], [4.0, 0.5], first[0]]
+    assert model.embedded == ["one", "three", "four"]
+
+    # queries are keyed separately from documents
+    assert embedder.embed_query("one") == [3.0, 1.5]
+    assert embedder.embed_query("one") == [3.0, 1.5]
+    assert model.embedded == ["one", "three", "four", "one"]
+
+
+def test_recent_hits_do_not_write_access_time():
+    cache = EmbeddingCache(None, 0)
+    cache.mset([("a", [1.0, 2.0])])
+    accessed = lambda: cache._conn.execute("SELECT accessed FROM embeddings").fetchone()[0]
+    written = accessed()
+    cache.mget(["a"])
+    assert accessed() == written
+
+    cache._conn.execute("UPDATE embeddings SET accessed = ?", (written - 3600,))
+    cache.mget(["a"])
+    assert accessed() >= written
+
+
+def test_in_memory_caches_are_bounded():
+    embedder = embedding_cache.cached_embeddings(_CountingEmbeddings(), "model", in_memory=True)
+    assert embedder.cache.max_bytes == embedding_cache.IN_MEMORY_MAX_BYTES > 0
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_do_not_block_the_loop():
+    cache = EmbeddingCache(None, 0)
+    embedder = CachedEmbeddings(_CountingEmbeddings(), cache, "model")
+    cache._lock.acquire()  # a slow lookup from another thread
+    try:
+        task = asyncio.create_task(embedder.aembed_query("one"))
+        await asyncio.sleep(0.2)  # the loop keeps running meanwhile
+        assert not task.done()
+    finally:
+        cache._lock.release()
+    assert await asyncio.wait_for(task, timeout=5) == [3.0, 1.5]
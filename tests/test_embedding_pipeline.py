@@ -0,0 +1,69 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.embeddings import Embeddings
+
+from python.helpers.embedding_pipeline import embed_texts
+
+
+class _SlowEmbeddings(Embeddings):
+    def __init__(self, fail_on: str | None = None):
+        self.batches: list[list[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    def embed_documents(self, texts):
+        raise AssertionError("the pipeline must use the async API")
+
+    def embed_query(self, text):
+        raise AssertionError("the pipeline must use the async API")
+
+    async def aembed_documents(self, texts):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01 * (len(self.batches) % 3))  # finish out of order
+        self.batches.append(texts)
+        self.in_flight -= 1
+        if self.fail_on in texts:
+            raise RuntimeError("provider error")
+        return [[float(t)] for t in texts]
+
+
+def test_batches_keep_order_and_bound_concurrency():
+    embedder = _SlowEmbeddings()
+    texts = [str(i) for i in range(23)]
+    progress = []
+
+    vectors = asyncio.run(
+        embed_texts(
+            embedder,
+            texts,
+            batch_size=5,
+            concurrency=2,
+            on_progress=lambda done, total: progress.append((done, total)),
+        )
+    )
+
+    assert vectors == [[float(i)] for i in range(23)]
+    assert sorted(len(b) for b in embedder.batches) == [3, 5, 5, 5, 5]
+    assert embedder.max_in_flight == 2
+    assert progress[-1] == (23, 23)
+
+
+def test_errors_propagate():
+    with pytest.raises(RuntimeError):
+        asyncio.run(embed_texts(_SlowEmbeddings(fail_on="7"), [str(i) for i in range(10)], 4))
+
+
+def test_empty_input_makes_no_requests():
+    embedder = _SlowEmbeddings()
+    assert asyncio.run(embed_texts(embedder, [])) == []
+    assert embedder.batches == []
@@ -0,0 +1,53 @@
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.file_browser import FileBrowser
+
+
+def _make(tmp_path: Path):
+    for name in ["beta", "Alpha"]:
+        (tmp_path / name).mkdir()
+    for index, name in enumerate(["c.txt", "a.py", "B.md", "d.json"]):
+        (tmp_path / name).write_bytes(b"x" * (index + 1) * 10)
+    os.symlink(tmp_path / "a.py", tmp_path / "link.py")
+
+
+def _names(result: dict) -> list[str]:
+    return [entry["name"] for entry in result["entries"]]
+
+
+def test_pages_continue_after_cursor(tmp_path):
+    _make(tmp_path)
+    browser = FileBrowser()
+
+    first = browser.get_files(str(tmp_path), limit=3)
+    assert _names(first) == ["Alpha", "beta", "a.py"]
+    assert first["total"] == 7 and first["parent_path"] == str(tmp_path.parent)
+    assert first["entries"][0]["is_dir"] and first["entries"][2]["type"] == "code"
+
+    # entries added before the cursor do not shift the next page
+    (tmp_path / "0.txt").write_text("")
+    browser.save_text_file(str(tmp_path / "00.txt"), "")
+    second = browser.get_files(str(tmp_path), cursor=first["next_cursor"], limit=3)
+    assert _names(second) == ["B.md", "c.txt", "d.json"]
+    third = browser.get_files(str(tmp_path), cursor=second["next_cursor"], limit=3)
+    assert _names(third) == ["link.py"] and third["next_cursor"] is None
+    assert third["entries"][0]["is_symlink"] and third["entries"][0]["size"] == 20
+
+
+def test_sort_and_filter_on_server(tmp_path):
+    _make(tmp_path)
+    browser = FileBrowser()
+
+    by_size = browser.get_files(str(tmp_path), sort="size", direction="desc", limit=4)
+    assert _names(by_size) == ["beta", "Alpha", "d.json", "B.md"]
+    rest = browser.get_files(str(tmp_path), sort="size", direction="desc", cursor=by_size["next_cursor"])
+    assert _names(rest) == ["link.py", "a.py", "c.txt"]  # equal sizes by name, descending too
+
+    filtered = browser.get_files(str(tmp_path), filter=".PY")
+    assert _names(filtered) == ["a.py", "link.py"] and filtered["total"] == 2
@@ -0,0 +1,68 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import file_tree
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_tree, "RACY_WINDOW_NS", 0)
+    file_tree.clear_cache()
+    for path in ["src/app.py", "src/util/helpers.py", "docs/readme.md", "build/out.bin"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(path, encoding="utf-8")
+    yield tmp_path
+    file_tree.clear_cache()
+
+
+def _touch_later(path: Path):
+    # move the mtime forward so the change is visible on coarse file system clocks
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _render(root: Path) -> str:
+    return str(file_tree.file_tree(str(root), sort=("name", "asc"), ignore="build/"))
+
+
+def test_unchanged_tree_is_not_rescanned(tree, monkeypatch):
+    first = _render(tree)
+    assert "app.py" in first and "out.bin" not in first
+
+    listed = []
+    original = file_tree._list_directory_children
+    monkeypatch.setattr(
+        file_tree,
+        "_list_directory_children",
+        lambda directory, *args, **kwargs: listed.append(directory) or original(directory, *args, **kwargs),
+    )
+    assert _render(tree) == first
+    assert listed == []
+
+    (tree / "src" / "util" / "new.py").write_text("", encoding="utf-8")
+    _touch_later(tree / "src" / "util")
+    second = _render(tree)
+    assert "new.py" in second
+    assert listed == [str(tree / "src" / "util")]  # only the changed folder is listed again
+
+
+def test_modified_file_reorders_cached_tree(tree):
+    def render():
+        return str(file_tree.file_tree(str(tree / "docs"), sort=("modified", "desc"))).splitlines()[1:]
+
+    readme, notes = tree / "docs" / "readme.md", tree / "docs" / "notes.md"
+    notes.write_text("notes", encoding="utf-8")
+    os.utime(readme, ns=(0, 2_000_000_000))
+    os.utime(notes, ns=(0, 1_000_000_000))
+    assert render() == ["├── readme.md", "└── notes.md"]
+
+    # touching a file leaves the folder's mtime alone
+    os.utime(notes, ns=(0, 3_000_000_000))
+    assert render() == ["├── notes.md", "└── readme.md"]
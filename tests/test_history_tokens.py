@@ -0,0 +1,80 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import history, tokens
+from python.helpers.history import Bulk, History, Topic
+
+
+class _Agent:
+    async def call_utility_model(self, system, message):
+        return "summary of the conversation"
+
+    def read_prompt(self, file, **kwargs):
+        return file
+
+    def parse_prompt(self, file, **kwargs):
+        return f"summary: {kwargs.get('summary', '')}"
+
+
+def _recount(record) -> int:
+    # the old behaviour, summing every record from scratch
+    if isinstance(record, History):
+        return (
+            sum(_recount(b) for b in record.bulks)
+            + sum(_recount(t) for t in record.topics)
+            + _recount(record.current)
+        )
+    if record.summary and isinstance(record, (Topic, Bulk)):
+        return tokens.approximate_tokens(record.summary)
+    if isinstance(record, Topic):
+        return sum(m.get_tokens() for m in record.messages)
+    if isinstance(record, Bulk):
+        return sum(_recount(r) for r in record.records)
+    return record.get_tokens()
+
+
+def _filled_history(topics: int, messages: int) -> History:
+    hist = History(agent=_Agent())
+    for t in range(topics):
+        for m in range(messages):
+            hist.add_message(ai=bool(m % 2), content=f"topic {t} message {m} " * (m + 1))
+        hist.new_topic()
+    return hist
+
+
+def test_running_totals_match_recount_through_compression():
+    hist = _filled_history(topics=7, messages=6)
+    hist.add_message(ai=False, content={"tool": "x", "args": ["a"] * 50})
+    assert hist.get_tokens() == _recount(hist)
+
+    async def compress_steps():
+        # attention windows first, then topics are moved to bulks
+        for _ in range(10):
+            await hist.compress_topics()
+            assert hist.get_tokens() == _recount(hist)
+        await hist.compress_bulks()
+        assert hist.get_tokens() == _recount(hist)
+        await hist.current.compress_attention()
+        assert hist.get_tokens() == _recount(hist)
+
+    asyncio.run(compress_steps())
+    assert hist.bulks
+
+
+def test_deserialized_history_keeps_totals_without_retokenizing(monkeypatch):
+    hist = _filled_history(topics=3, messages=4)
+    data = hist.serialize()
+
+    calls = []
+    original = tokens.approximate_tokens
+    monkeypatch.setattr(
+        history.tokens, "approximate_tokens", lambda text: calls.append(text) or original(text)
+    )
+    loaded = history.deserialize_history(data, agent=_Agent())
+    assert loaded.get_tokens() == hist.get_tokens()
+    assert not calls
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import knowledge_import
+
+
+def _persisted(index):
+    # what preload_knowledge writes to knowledge_import.json
+    return {
+        file: {k: v for k, v in data.items() if k not in ("documents", "state")}
+        for file, data in index.items()
+    }
+
+
+def test_unchanged_files_are_not_hashed_again(tmp_path, monkeypatch):
+    for name in ("a.txt", "b.md", "skip.bin"):
+        (tmp_path / name).write_text(f"content of {name}")
+    hashed = []
+    checksum = knowledge_import.calculate_checksum
+    monkeypatch.setattr(
+        knowledge_import,
+        "calculate_checksum",
+        lambda path: hashed.append(os.path.basename(path)) or checksum(path),
+    )
+
+    index = knowledge_import.load_knowledge(None, str(tmp_path), {}, {"area": "main"})
+    assert sorted(hashed) == ["a.txt", "b.md"]
+    assert all(data["state"] == "changed" and data["documents"] for data in index.values())
+
+    index = _persisted(index)
+    files = knowledge_import.list_files(str(tmp_path))
+    assert not knowledge_import.has_changes(index, files)
+
+    hashed.clear()
+    index = knowledge_import.load_knowledge(None, str(tmp_path), index, {"area": "main"})
+    assert hashed == []
+    assert {data["state"] for data in index.values()} == {"original"}
+
+    # touched but equal content is hashed once and stays original, modified content is reloaded
+    later = time.time() + 10
+    os.utime(tmp_path / "a.txt", (later, later))
+    (tmp_path / "b.md").write_text("new content")
+    assert knowledge_import.has_changes(_persisted(index), knowledge_import.list_files(str(tmp_path)))
+    index = knowledge_import.load_knowledge(None, str(tmp_path), _persisted(index), {"area": "main"})
+    assert sorted(hashed) == ["a.txt", "b.md"]
+    assert index[str(tmp_path / "a.txt")]["state"] == "original"
+    assert index[str(tmp_path / "b.md")]["state"] == "changed"
@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import log as log_module
+from python.helpers.log import Log
+from python.helpers.secrets import SecretsManager
+
+
+def _log(tmp_path, monkeypatch) -> Log:
+    secrets_file = tmp_path / "secrets.env"
+    secrets_file.write_text("API_KEY=sk-12345678\n")
+    manager = SecretsManager(str(secrets_file))
+    log = Log()
+    monkeypatch.setattr(log, "_secrets_manager", lambda: manager)
+    return log
+
+
+def test_appended_content_is_masked_across_chunks(tmp_path, monkeypatch):
+    log = _log(tmp_path, monkeypatch)
+    item = log.log(type="code_exe", heading="run", content="key: sk-12")
+    item.stream(content="3456")
+    assert "sk-12" in item.content  # a partial value is not a secret yet
+    item.stream(content="78 done")
+    assert item.content == "key: §§secret(API_KEY) done"
+
+    # full updates that only grew take the same path
+    item.update(content=item._stream.source + "\nmore sk-12345678")  # type: ignore
+    assert item.content == "key: §§secret(API_KEY) done\nmore §§secret(API_KEY)"
+    item.update(content="replaced")
+    assert item.content == "replaced"
+
+
+def test_output_is_deduplicated_and_ships_appended_text(tmp_path, monkeypatch):
+    log = _log(tmp_path, monkeypatch)
+    first = log.log(type="agent", heading="a", content="hello")
+    second = log.log(type="agent", heading="b")
+    version = log.version
+
+    for chunk in [" wor", "ld", "!"]:
+        first.stream(content=chunk)
+    second.update(heading="b2")
+
+    full = log.output(start=0, appends=True)
+    assert [o["no"] for o in full] == [0, 1]
+    assert full[0]["content"] == "hello world!"
+
+    delta = log.output(start=version, appends=True)
+    assert [o["no"] for o in delta] == [0, 1]
+    assert "content" not in delta[0]
+    assert (delta[0]["content_offset"], delta[0]["content_append"]) == (5, " world!")
+    assert delta[1]["heading"] == "b2"
+    assert log.output(start=log.version, appends=True) == []
+
+
+def test_truncated_content_is_shipped_in_full(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_module, "CONTENT_MAX_LEN", 50)
+    log = _log(tmp_path, monkeypatch)
+    item = log.log(type="agent", heading="a", content="x" * 40)
+    version = log.version
+    item.stream(content="y" * 40)
+
+    out = log.output(start=version, appends=True)
+    assert "Characters hidden" in out[0]["content"]
+    assert "content_append" not in out[0]
+
+
+def test_rewritten_held_tail_is_shipped_again(tmp_path, monkeypatch):
+    log = _log(tmp_path, monkeypatch)
+    item = log.log(type="code_exe", heading="run", content="key: sk-12")
+    item.stream(content="34")
+    client, version = item.content, log.version
+    assert client == "key: sk-1234"
+
+    item.stream(content="5678 done")
+    out = log.output(start=version, appends=True)[0]
+    rebuilt = client[: out["content_offset"]] + out["content_append"]
+    assert rebuilt == item.content == "key: §§secret(API_KEY) done"
+
+
+def test_restored_item_keeps_content_when_streamed(tmp_path, monkeypatch):
+    log = _log(tmp_path, monkeypatch)
+    log.logs.append(log_module.LogItem(log=log, no=0, type="agent", content="restored text"))
+    log.mark_updated(0)
+    log.logs[0].stream(content=" more")
+    assert log.logs[0].content == "restored text more"
+
+
+def test_long_stream_keeps_only_what_truncation_shows(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_module, "CONTENT_MAX_LEN", 50)
+    monkeypatch.setattr(log_module, "STREAM_KEEP_LEN", 50)
+    log = _log(tmp_path, monkeypatch)
+    item = log.log(type="agent", heading="a", content="")
+    full = ""
+    for i in range(100):
+        chunk = f"chunk {i:03d};"
+        full += chunk
+        item.stream(content=chunk)
+    assert item.content == log_module._truncate_content(full, "agent")
+    stream = item._stream
+    assert stream is not None and len(stream.source) <= 150 and len(stream.filter.text) <= 150
+
+    item.update(content=full + " end")  # still recognised as an append
+    assert item.content == log_module._truncate_content(full + " end", "agent")
+    assert item._stream is stream
@@ -0,0 +1,103 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import anyio
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import mcp_pool
+from python.helpers.mcp_pool import MCPSessionPool
+
+
+class _Server:
+    def __init__(self, fail_connects: int = 0):
+        self.fail_connects = fail_connects
+        self.opened = 0
+        self.closed = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def connect(self, stack):
+        if self.fail_connects:
+            self.fail_connects -= 1
+            raise OSError("server not running")
+        self.opened += 1
+        session = _Session(self, self.opened)
+        stack.push_async_callback(self._close)
+        return session
+
+    async def _close(self):
+        self.closed += 1
+
+
+class _Session:
+    def __init__(self, server: _Server, number: int):
+        self.server = server
+        self.number = number
+        self.broken = False
+
+    async def call(self):
+        if self.broken:
+            raise anyio.ClosedResourceError()
+        self.server.active += 1
+        self.server.max_active = max(self.server.max_active, self.server.active)
+        await asyncio.sleep(0.01)
+        self.server.active -= 1
+        return self.number
+
+
+def test_session_is_reused_and_concurrency_is_bounded():
+    server = _Server()
+    pool = MCPSessionPool("test", server.connect, max_concurrent=3)
+
+    async def main():
+        results = await asyncio.gather(*(pool.run(lambda s: s.call()) for _ in range(12)))
+        await pool.close()
+        return results
+
+    assert asyncio.run(main()) == [1] * 12
+    assert server.opened == 1
+    assert server.closed == 1
+    assert server.max_active == 3
+    status = pool.status()
+    assert status["calls"] == 12 and status["errors"] == 0
+    assert status["avg_ms"] is not None
+
+
+def test_broken_session_is_reopened_transparently():
+    server = _Server()
+    pool = MCPSessionPool("test", server.connect)
+
+    async def main():
+        first = await pool.run(lambda s: s.call())
+        pool._session.broken = True  # type: ignore
+        second = await pool.run(lambda s: s.call())
+        await pool.close()
+        return first, second
+
+    assert asyncio.run(main()) == (1, 2)
+    assert server.closed == 2
+
+
+def test_failed_connects_back_off(monkeypatch):
+    monkeypatch.setattr(mcp_pool, "BACKOFF_BASE", 0.05)
+    server = _Server(fail_connects=1)
+    pool = MCPSessionPool("test", server.connect)
+
+    async def main():
+        with pytest.raises(OSError):
+            await pool.run(lambda s: s.call())
+        # within the backoff the server is not contacted again
+        with pytest.raises(ConnectionError):
+            await pool.run(lambda s: s.call())
+        await asyncio.sleep(0.06)
+        result = await pool.run(lambda s: s.call())
+        await pool.close()
+        return result
+
+    assert asyncio.run(main()) == 1
+    assert pool.status()["connect_errors"] == 1
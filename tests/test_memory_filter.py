@@ -0,0 +1,182 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.embeddings import Embeddings
+from simpleeval import simple_eval
+
+from python.helpers import memory_index
+from python.helpers.memory_filter import MetadataIndex, compile_filter
+from python.helpers.memory_index import AnnFaiss
+
+AREAS = ["main", "fragments", "solutions"]
+
+
+def _metadata(i: int) -> dict:
+    meta = {
+        "id": f"d{i}",
+        "area": AREAS[i % 3],
+        "timestamp": f"2024-01-{i % 28 + 1:02d} 10:00:00",
+    }
+    if i % 4 == 0:
+        meta["knowledge_source"] = True
+        meta["file_type"] = "md" if i % 8 else "pdf"
+    if i % 5 == 0:
+        meta["tags"] = ["a", "b"]  # unhashable, not indexed
+    return meta
+
+
+DOCS = {f"d{i}": _metadata(i) for i in range(200)}
+
+
+def _expected(condition: str) -> set[str]:
+    def matches(meta):
+        try:
+            return bool(simple_eval(condition, names=meta))
+        except Exception:
+            return False
+
+    return {id for id, meta in DOCS.items() if matches(meta)}
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        "area == 'solutions'",
+        "area=='main' or area == 'fragments'",
+        "area == 'main' and knowledge_source == True",
+        # knowledge_source is missing on most docs, short-circuit decides what raises
+        "area == 'main' or knowledge_source",
+        "knowledge_source and area == 'main'",
+        "not knowledge_source",
+        "not (area == 'main')",
+        "area != 'main'",
+        "timestamp >= '2024-01-20'",
+        "file_type != 'pdf' and area == 'main'",
+        "timestamp < '2024-01-05' and missing_field > -1",
+        "'frag' in area",
+        "missing_field == 1 or area == 'main'",
+    ],
+)
+def test_columnar_select_matches_simple_eval(condition):
+    index = MetadataIndex.from_docs(DOCS.items())
+    compiled = compile_filter(condition)
+    assert compiled.columnar
+    assert compiled.select(index, DOCS.__getitem__) == _expected(condition)
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        "len(tags) > 1",
+        "area.startswith('sol')",
+        "'a' in tags",
+        "area in ('main', 'solutions')",
+    ],
+)
+def test_non_columnar_filters_fall_back_to_simple_eval(condition):
+    index = MetadataIndex.from_docs(DOCS.items())
+    compiled = compile_filter(condition)
+    assert compiled.select(index, DOCS.__getitem__) == _expected(condition)
+
+
+def test_index_tracks_removals():
+    index = MetadataIndex.from_docs(DOCS.items())
+    index.remove("d2", DOCS["d2"])
+    selected = compile_filter("area == 'solutions'").select(index, DOCS.__getitem__)
+    assert "d2" not in selected
+    assert "d5" in selected
+
+
+def test_filter_is_callable_like_a_comparator():
+    compiled = compile_filter("area == 'main'")
+    assert compiled({"area": "main"})
+    assert not compiled({"area": "solutions"})
+    assert not compiled({})
+
+
+@pytest.mark.parametrize(
+    "condition",
+    ["area ==", "foo(", "document_uri == 'it's.pdf'"],
+)
+def test_malformed_filters_match_nothing(condition):
+    compiled = compile_filter(condition)
+    assert not compiled(DOCS["d0"])
+    assert compiled.select(MetadataIndex.from_docs(DOCS.items()), DOCS.__getitem__) == set()
+
+
+def test_quoted_values_with_apostrophes_match():
+    uri = "file:///docs/it's.pdf"
+    assert compile_filter(f"document_uri == {uri!r}")({"document_uri": uri})
+
+
+def test_shared_filter_is_thread_safe():
+    from concurrent.futures import ThreadPoolExecutor
+
+    compiled = compile_filter("area == 'main' and n > 1")
+    docs = [{"area": AREAS[i % 3], "n": i % 4} for i in range(2000)]
+    expected = [d["area"] == "main" and d["n"] > 1 for d in docs]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            for _ in range(4):
+                assert list(pool.map(compiled, docs)) == expected
+    finally:
+        sys.setswitchinterval(interval)
+
+
+_rng = np.random.default_rng(3)
+VECTORS = _rng.standard_normal((3000, 16)).astype(np.float32)
+VECTORS /= np.linalg.norm(VECTORS, axis=1, keepdims=True)
+
+
+class _RowEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [VECTORS[int(t)].tolist() for t in texts]
+
+    def embed_query(self, text):
+        return VECTORS[int(text)].tolist()
+
+
+@pytest.mark.parametrize("type", ["flat", "ivf", "hnsw"])
+def test_prefiltered_search_only_returns_matching_documents(type):
+    db = AnnFaiss(
+        embedding_function=_RowEmbeddings(),
+        index=memory_index.create_index("flat", 16),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+    count = len(VECTORS)
+    db.add_texts(
+        [str(i) for i in range(count)],
+        metadatas=[{"area": AREAS[i % 3]} for i in range(count)],
+        ids=[f"d{i}" for i in range(count)],
+    )
+    memory_index.rebuild_index(db, type)  # type: ignore
+
+    # exact neighbours among solutions only
+    solutions = np.arange(2, count, 3)
+    truth = solutions[np.argsort(-(VECTORS[solutions] @ VECTORS[0]))[:5]]
+
+    result = db.similarity_search_with_score(
+        "0", k=5, filter=compile_filter("area == 'solutions'")
+    )
+    assert [doc.id for doc, _ in result] == [f"d{i}" for i in truth]
+
+    db.delete(ids=[f"d{truth[0]}"])
+    result = db.similarity_search_with_score(
+        "0", k=5, filter=compile_filter("area == 'solutions'")
+    )
+    assert all(doc.metadata["area"] == "solutions" for doc, _ in result)
+    assert f"d{truth[0]}" not in [doc.id for doc, _ in result]
+
+    selected = db.select_documents(compile_filter("area == 'main'"), limit=3)
+    assert [doc.id for doc in selected] == ["d0", "d3", "d6"]
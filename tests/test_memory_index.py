@@ -0,0 +1,148 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.embeddings import Embeddings
+
+from python.helpers import memory_filter, memory_index
+from python.helpers.memory_index import AnnFaiss, IndexMeta
+
+DIM = 16
+COUNT = 2000
+
+_rng = np.random.default_rng(7)
+VECTORS = _rng.standard_normal((COUNT, DIM)).astype(np.float32)
+VECTORS /= np.linalg.norm(VECTORS, axis=1, keepdims=True)
+
+
+class _RowEmbeddings(Embeddings):
+    """Text is the row number of the vector to use."""
+
+    def embed_documents(self, texts):
+        return [VECTORS[int(t)].tolist() for t in texts]
+
+    def embed_query(self, text):
+        return VECTORS[int(text)].tolist()
+
+
+def _make_db(type: str, pq: bool = False) -> AnnFaiss:
+    db = AnnFaiss(
+        embedding_function=_RowEmbeddings(),
+        index=memory_index.create_index("flat", DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+    db.add_texts([str(i) for i in range(COUNT)], ids=[f"d{i}" for i in range(COUNT)])
+    memory_index.rebuild_index(db, type, pq)  # type: ignore
+    return db
+
+
+@pytest.mark.parametrize("type", ["flat", "ivf", "hnsw"])
+def test_search_add_and_delete(type):
+    db = _make_db(type)
+    assert db.similarity_search_with_score("42", k=1)[0][0].id == "d42"
+
+    db.delete(ids=["d42"])
+    assert all(doc.id != "d42" for doc, _ in db.similarity_search_with_score("42", k=5))
+
+    db.add_embeddings([("again", VECTORS[42].tolist())], ids=["new"])
+    assert db.similarity_search_with_score("42", k=1)[0][0].id == "new"
+    assert len(db.index_to_docstore_id) == COUNT
+
+
+def test_hnsw_tombstones_survive_save_and_load(tmp_path):
+    db = _make_db("hnsw")
+    db.delete(ids=["d1", "d2"])
+    assert db.tombstones == {1, 2}
+
+    db.save_local(str(tmp_path))
+    loaded = AnnFaiss.load_local(
+        str(tmp_path), _RowEmbeddings(), allow_dangerous_deserialization=True
+    )
+    memory_index.load_tombstones(loaded)
+    assert loaded.tombstones == {1, 2}
+    assert loaded.similarity_search_with_score("1", k=1)[0][0].id != "d1"
+
+
+def test_labels_are_not_reused_after_load(tmp_path):
+    db = _make_db("hnsw")
+    db.delete(ids=[f"d{COUNT - 1}"])  # the highest label is only a tombstone now
+    db.save_local(str(tmp_path))
+    loaded = AnnFaiss.load_local(
+        str(tmp_path), _RowEmbeddings(), allow_dangerous_deserialization=True
+    )
+    memory_index.load_tombstones(loaded)
+    assert loaded.next_label == COUNT
+
+    loaded.add_embeddings([("again", VECTORS[7].tolist())], ids=["new"])
+    loaded.add_embeddings([("more", VECTORS[8].tolist())], ids=["more"])
+    assert loaded._labels_by_id()["new"] == COUNT
+    assert loaded.next_label == COUNT + 2
+    assert loaded.similarity_search_with_score("7", k=1)[0][0].id in ("d7", "new")
+
+
+def test_rebuild_drops_tombstones_and_keeps_documents():
+    db = _make_db("hnsw")
+    db.delete(ids=[f"d{i}" for i in range(600)])
+    assert memory_index.needs_rebuild(db, IndexMeta(type="hnsw"), "hnsw", False)
+
+    meta = memory_index.rebuild_index(db, "hnsw")
+    assert meta.type == "hnsw"
+    assert not db.tombstones
+    assert db.index.ntotal == COUNT - 600
+    assert db.similarity_search_with_score("1500", k=1)[0][0].id == "d1500"
+
+
+def test_resolve_index_type_promotes_auto_at_threshold():
+    assert memory_index.resolve_index_type("auto", 10, 100) == "flat"
+    assert memory_index.resolve_index_type("auto", 100, 100) == "hnsw"
+    assert memory_index.resolve_index_type("auto", 10**6, 0) == "flat"
+    assert memory_index.resolve_index_type("hnsw", 0, 100) == "hnsw"
+    # ivf needs enough vectors to train on
+    assert memory_index.resolve_index_type("ivf", 10, 100) == "flat"
+    assert memory_index.resolve_index_type("ivf", COUNT, 100) == "ivf"
+
+
+def test_ivf_retrains_after_growth():
+    db = _make_db("ivf")
+    meta = memory_index.infer_meta(db.index)
+    assert meta.type == "ivf"
+    assert not memory_index.needs_rebuild(db, meta, "ivf", False)
+    small = IndexMeta(type="ivf", trained_count=COUNT // 8)
+    assert memory_index.needs_rebuild(db, small, "ivf", False)
+
+
+def test_index_meta_roundtrip(tmp_path):
+    assert IndexMeta.load(str(tmp_path)) is None
+    IndexMeta(type="ivf", pq=True, trained_count=5).save(str(tmp_path))
+    assert IndexMeta.load(str(tmp_path)) == IndexMeta(type="ivf", pq=True, trained_count=5)
+
+
+@pytest.mark.parametrize("type", ["flat", "ivf", "hnsw"])
+def test_batched_search_matches_single_searches(type):
+    db = _make_db(type)
+    db.add_embeddings(
+        [(f"s{i}", VECTORS[i].tolist()) for i in range(0, 40, 4)],
+        metadatas=[{"area": "solutions"} for _ in range(10)],
+        ids=[f"s{i}" for i in range(0, 40, 4)],
+    )
+    db.delete(ids=["d8"])
+    solutions = memory_filter.compile_filter("area == 'solutions'")
+    queries = [VECTORS[i].tolist() for i in (8, 12, 500)]
+    ks = [3, 5, 2]
+    filters = [solutions, None, solutions]
+
+    batched = db.similarity_search_with_score_by_vectors(queries, k=ks, filter=filters)
+    for query, k, filter, found in zip(queries, ks, filters, batched):
+        single = db.similarity_search_with_score_by_vector(query, k=k, filter=filter)
+        assert [doc.id for doc, _ in found] == [doc.id for doc, _ in single]
+        assert len(found) == k
+    assert batched[0][0][0].id == "s8"
+    assert all(doc.metadata.get("area") == "solutions" for doc, _ in batched[2])
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.embeddings import Embeddings
+
+
+class _FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+
+def _make_db():
+    from python.helpers.memory import MyFaiss
+
+    db = MyFaiss(
+        embedding_function=_FakeEmbeddings(),
+        index=faiss.IndexFlatIP(3),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+    db.add_texts(["alpha", "beta"], metadatas=[{"id": "a"}, {"id": "b"}], ids=["a", "b"])
+    return db
+
+
+@pytest.mark.asyncio
+async def test_search_waits_for_db_lock():
+    from python.helpers.memory import Memory
+
+    db = _make_db()
+    memory = Memory(db, memory_subdir="test-lock")
+    db.lock.acquire()
+    try:
+        task = asyncio.create_task(memory.search_similarity_threshold_multi(["alpha"], 5, float("-inf")))
+        await asyncio.sleep(0.2)
+        assert not task.done()  # a knowledge reload holding the lock is not raced
+    finally:
+        db.lock.release()
+    found = await asyncio.wait_for(task, timeout=5)
+    assert {doc.metadata["id"] for doc in found[0]} == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_watch_loop_survives_failed_scan(monkeypatch):
+    from python.helpers import memory as memory_module
+    from python.helpers import settings
+    from python.helpers.memory import Memory
+
+    db = _make_db()
+    subdir = "test-watch"
+    memory = Memory(db, memory_subdir=subdir)
+    monkeypatch.setattr(memory_module, "KNOWLEDGE_WATCH_INTERVAL", 0)
+    monkeypatch.setattr(settings, "get_settings", lambda: {"memory_knowledge_watch": True})
+    monkeypatch.setitem(Memory.index, subdir, db)
+
+    scans = []
+
+    def scan(kn_dirs):
+        scans.append(kn_dirs)
+        if len(scans) == 1:
+            raise OSError("knowledge folder unavailable")
+        del Memory.index[subdir]  # a reload ends the watch
+        return {}
+
+    monkeypatch.setattr(memory, "_scan_knowledge", scan)
+    await asyncio.wait_for(memory._watch_knowledge_loop(["custom"]), timeout=5)
+    assert len(scans) == 2
@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+class _FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+
+def _make_db():
+    from python.helpers.memory import MyFaiss
+
+    return MyFaiss(
+        embedding_function=_FakeEmbeddings(),
+        index=faiss.IndexFlatIP(3),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+
+
+def _doc(id: str, text: str) -> Document:
+    return Document(text, metadata={"id": id, "area": "main"})
+
+
+def test_replay_restores_adds_and_deletes(tmp_path):
+    from python.helpers.memory_wal import MemoryWal
+
+    wal = MemoryWal(str(tmp_path))
+    docs = [_doc("a", "alpha"), _doc("b", "beta"), _doc("c", "gamma")]
+    wal.append_add(docs, _FakeEmbeddings().embed_documents([d.page_content for d in docs]))
+    wal.append_delete(["b"])
+
+    db = _make_db()
+    assert wal.replay(db) == 2
+    assert sorted(db.get_all_docs().keys()) == ["a", "c"]
+    assert db.index.ntotal == 2
+    assert db.get_by_ids("c")[0].metadata["area"] == "main"
+
+
+def test_replay_is_idempotent_over_snapshot(tmp_path):
+    from python.helpers.memory_wal import MemoryWal
+
+    wal = MemoryWal(str(tmp_path))
+    docs = [_doc("a", "alpha")]
+    wal.append_add(docs, _FakeEmbeddings().embed_documents(["alpha"]))
+    wal.append_delete(["missing"])
+
+    db = _make_db()
+    wal.replay(db)
+    # a snapshot written before the log was truncated already contains "a"
+    wal.replay(db)
+    assert list(db.get_all_docs().keys()) == ["a"]
+    assert db.index.ntotal == 1
+
+
+def test_replay_skips_torn_record(tmp_path):
+    from python.helpers.memory_wal import MemoryWal
+
+    wal = MemoryWal(str(tmp_path))
+    wal.append_add([_doc("a", "alpha")], _FakeEmbeddings().embed_documents(["alpha"]))
+    with open(wal.path, "a", encoding="utf-8") as f:
+        f.write('{"op": "delete", "ids": ["a"')
+
+    db = _make_db()
+    assert wal.replay(db) == 1 and wal.skipped == 1
+    assert list(db.get_all_docs().keys()) == ["a"]
+
+    # records appended after the torn line are not lost with it
+    wal.append_add([_doc("b", "beta")], _FakeEmbeddings().embed_documents(["beta"]))
+    db = _make_db()
+    assert wal.replay(db) == 2 and wal.skipped == 1
+    assert sorted(db.get_all_docs().keys()) == ["a", "b"]
+
+
+def test_truncate_and_compaction_threshold(tmp_path, monkeypatch):
+    from python.helpers import memory_wal
+    from python.helpers.memory_wal import MemoryWal
+
+    wal = MemoryWal(str(tmp_path))
+    assert wal.size() == 0
+    assert not wal.needs_compaction()
+
+    wal.append_delete(["x"] * 100)
+    monkeypatch.setattr(memory_wal, "COMPACT_MIN_BYTES", 1)
+    (tmp_path / "index.faiss").write_bytes(b"0" * (wal.size() * 4))
+    assert not wal.needs_compaction()
+    (tmp_path / "index.faiss").write_bytes(b"0")
+    assert wal.needs_compaction()
+
+    wal.truncate()
+    assert wal.size() == 0
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import profiler
+
+
+def test_spans_are_attributed_to_the_agent_scope():
+    async def subordinate():
+        scope = profiler.enter("ctx-profile", 1)
+        try:
+            with profiler.span("tool", "inner"):
+                await asyncio.sleep(0.002)
+        finally:
+            profiler.leave(scope)
+
+    async def main():
+        with profiler.span("tool", "outside"):
+            pass  # no agent, nothing recorded
+        scope = profiler.enter("ctx-profile", 0)
+        try:
+            profiler.set_iteration(3)
+            iteration = profiler.start("agent", "iteration")
+            with profiler.span("tool", "call_subordinate") as args:
+                await subordinate()
+                args["ok"] = True
+            # the superior's scope is back after the subordinate's monologue
+            await asyncio.create_task(asyncio.sleep(0.002))
+            profiler.end(iteration)
+        finally:
+            profiler.leave(scope)
+
+    profiler.remove_store("ctx-profile")
+    asyncio.run(main())
+    store = profiler.get_store("ctx-profile")
+    assert store is not None
+    spans = {span.name: span for span in store.spans}
+    assert "outside" not in spans
+    assert (spans["inner"].agent, spans["call_subordinate"].agent) == (1, 0)
+    assert spans["iteration"].iteration == 3
+    assert spans["call_subordinate"].args == {"ok": True}
+    assert spans["iteration"].dur_us >= spans["call_subordinate"].dur_us
+
+    [iteration] = [item for item in store.iterations() if item["agent"] == 0]
+    assert [span["name"] for span in iteration["spans"]] == ["iteration", "call_subordinate"]
+
+
+def test_store_is_bounded_and_aggregates_percentiles():
+    store = profiler.ProfileStore(max_spans=10, samples=100)
+    for dur_ms in range(1, 201):
+        store.add(profiler.Span("llm", "model", start_us=dur_ms, dur_us=dur_ms * 1000, agent=0, iteration=1, args={}))
+    store.add(profiler.Span("extension", "fast", start_us=0, dur_us=10, agent=0, iteration=1, args={}))
+
+    assert len(store.spans) == 10
+    assert all(span.name == "model" for span in store.spans)  # short spans stay out of traces
+    llm, fast = store.aggregates()
+    assert (llm["count"], llm["p50_ms"], llm["p95_ms"], llm["max_ms"]) == (200, 151.0, 196.0, 200.0)
+    assert fast["count"] == 1
+
+
+def test_chrome_trace_format(monkeypatch):
+    monkeypatch.setattr(profiler, "MIN_TRACE_US", 0)
+    profiler.remove_store("ctx-trace")
+    scope = profiler.enter("ctx-trace", 2)
+    profiler.end(profiler.start("tool", "code_execution_tool"), result="ok")
+    profiler.leave(scope)
+
+    trace = profiler.chrome_trace(["ctx-trace"])
+    metadata = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+    [event] = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert {event["name"] for event in metadata} == {"process_name", "thread_name"}
+    assert event["name"] == "code_execution_tool" and event["tid"] == 2 and event["pid"] == 1
+    assert event["args"] == {"iteration": 0, "result": "ok"}
@@ -0,0 +1,80 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import files, prompt_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    prompt_cache.clear()
+    # validate on every call so the tests see file changes right away
+    monkeypatch.setattr(prompt_cache, "CHECK_INTERVAL", 0)
+    yield
+    prompt_cache.clear()
+
+
+def _write(path: Path, text: str):
+    path.write_text(text, encoding="utf-8")
+    # make sure the change is visible even on coarse mtime file systems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_rendering_matches_and_follows_file_changes(tmp_path):
+    base, override = tmp_path / "base", tmp_path / "override"
+    base.mkdir()
+    override.mkdir()
+    _write(base / "main.md", "Hello {{name}}{{if formal}}, sir{{endif}}. {{include 'part.md'}}")
+    _write(base / "part.md", "Part for {{name}}.")
+    dirs = [str(override), str(base)]
+
+    assert files.read_prompt_file("main.md", dirs, name="Ann", formal=True) == "Hello Ann, sir. Part for Ann."
+
+    _write(base / "part.md", "Changed part.")
+    assert files.read_prompt_file("main.md", dirs, name="Ann", formal=False) == "Hello Ann. Changed part."
+
+    # a file added to a higher priority directory takes over
+    _write(override / "main.md", "Override {{name}}")
+    assert files.read_prompt_file("main.md", dirs, name="Ann") == "Override Ann"
+
+    with pytest.raises(FileNotFoundError):
+        files.read_prompt_file("missing.md", dirs)
+
+
+def test_plugin_class_is_imported_once_per_change(tmp_path, monkeypatch):
+    _write(tmp_path / "vars.md", "Value {{value}}")
+    _write(
+        tmp_path / "vars.py",
+        "from python.helpers.files import VariablesPlugin\n"
+        "class Vars(VariablesPlugin):\n"
+        "    def get_variables(self, file, backup_dirs=None, **kwargs):\n"
+        "        return {'value': 1}\n",
+    )
+    from python.helpers import extract_tools
+
+    imports = []
+    original = extract_tools.load_classes_from_file
+    monkeypatch.setattr(
+        extract_tools,
+        "load_classes_from_file",
+        lambda *a, **k: imports.append(a[0]) or original(*a, **k),
+    )
+
+    dirs = [str(tmp_path)]
+    assert files.parse_file("vars.md", dirs) == "Value 1"
+    assert files.parse_file("vars.md", dirs) == "Value 1"
+    assert len(imports) == 1
+
+    _write(tmp_path / "vars.py", (tmp_path / "vars.py").read_text().replace("1}", "2}"))
+    assert files.parse_file("vars.md", dirs) == "Value 2"
+    assert len(imports) == 2
+
+    stats = {s["template"]: s for s in prompt_cache.get_stats()}
+    assert stats[str(tmp_path / "vars.md")]["count"] == 3
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import rate_limiter
+from python.helpers.rate_limiter import RateLimiter
+
+
+class _Clock:
+    def __init__(self, monkeypatch):
+        self.now = 1_000_000.0
+        monkeypatch.setattr(rate_limiter.time, "time", lambda: self.now)
+
+
+def test_window_totals_expire_and_wait_time_is_exact(monkeypatch):
+    clock = _Clock(monkeypatch)
+    limiter = RateLimiter(seconds=60, requests=3)
+    for _ in range(3):
+        limiter.add(requests=1)
+        clock.now += 10
+    limiter.add(requests=1)  # 4 requests in the window: t=0, 10, 20, 30
+
+    assert limiter.total("requests") == 4
+    assert limiter.utilization() == {"requests": 4 / 3}
+    # the first request leaves the window at t=60, we are at t=30
+    assert abs(limiter.wait_time() - 30) < 0.2
+
+    clock.now += 30.2
+    assert limiter.total("requests") == 3
+    assert limiter.wait_time() == 0
+
+
+def test_token_bucket_refills_continuously(monkeypatch):
+    clock = _Clock(monkeypatch)
+    limiter = RateLimiter(seconds=60, mode="bucket", input=600)  # 10 per second
+    limiter.add(input=600)
+    assert limiter.wait_time() == 0  # bursts up to the limit
+    limiter.add(input=100)
+    assert abs(limiter.wait_time() - 10) < 1e-6
+
+    clock.now += 5
+    assert abs(limiter.utilization()["input"] - 650 / 600) < 1e-6
+    clock.now += 5
+    assert limiter.wait_time() == 0
+
+
+def test_limits_can_be_passed_per_call_on_a_shared_limiter(monkeypatch):
+    _Clock(monkeypatch)
+    limiter = RateLimiter(seconds=60)
+    limiter.add(requests=5)
+    assert limiter.wait_time({"requests": 10}) == 0
+    assert limiter.wait_time({"requests": 4}) > 0
+    assert limiter.wait_time({"requests": 0}) == 0  # 0 means no limit
+
+
+def test_wait_sleeps_once_until_within_limit(monkeypatch):
+    clock = _Clock(monkeypatch)
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+    limiter = RateLimiter(seconds=60, requests=1)
+    limiter.add(requests=1)
+    clock.now += 15
+    limiter.add(requests=1)
+
+    messages = []
+
+    async def callback(msg, key, total, limit):
+        messages.append((key, total, limit))
+        return False
+
+    asyncio.run(limiter.wait(callback))
+    assert len(sleeps) == 1 and abs(sleeps[0] - 45) < 0.2
+    assert messages == [("requests", 2, 1)]
+
+
+def test_limit_mode_setting_reaches_model_configs():
+    from initialize import initialize_agent
+
+    config = initialize_agent(
+        {"chat_model_rl_mode": "bucket", "util_model_rl_mode": "window", "embed_model_rl_mode": "bucket"}
+    )
+    assert config.chat_model.limit_mode == "bucket"
+    assert config.utility_model.limit_mode == "window"
+    assert config.embeddings_model.limit_mode == "bucket"
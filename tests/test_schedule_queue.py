@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import task_scheduler
+from python.helpers.schedule_queue import ScheduleQueue
+from python.helpers.task_scheduler import (
+    PlannedTask,
+    ScheduledTask,
+    SchedulerTaskList,
+    TaskPlan,
+    TaskSchedule,
+    TaskScheduler,
+)
+
+
+def _at(seconds: float) -> datetime:
+    return datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc) + timedelta(seconds=seconds)
+
+
+def test_queue_pops_due_entries_in_order_and_skips_replaced_ones():
+    queue = ScheduleQueue()
+    queue.set("a", _at(30))
+    queue.set("b", _at(10))
+    queue.set("c", _at(20))
+    queue.set("a", _at(5))  # moved earlier, old heap entry is stale
+    queue.set("c", None)
+
+    assert queue.next_run() == _at(5)
+    assert queue.pop_due(_at(15)) == [("a", _at(5)), ("b", _at(10))]
+    assert queue.pop_due(_at(60)) == []
+    assert len(queue) == 0
+
+
+def test_claims_are_idempotent_per_run_time():
+    queue = ScheduleQueue()
+    assert queue.claim("a", _at(0))
+    assert not queue.claim("a", _at(0))
+    assert queue.claim("a", _at(60))
+    assert queue.last_claim("a") == _at(60)
+    assert queue.is_claimed("a", _at(0))
+
+
+def test_wait_wakes_up_on_change_from_another_thread():
+    queue = ScheduleQueue()
+
+    async def main():
+        threading.Timer(0.05, queue.set, ("a", datetime.now(timezone.utc) + timedelta(hours=1))).start()
+        start = time.monotonic()
+        await queue.wait(5)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 1
+
+
+def test_scheduled_task_next_run_uses_task_timezone():
+    task = ScheduledTask.create(
+        name="t",
+        system_prompt="",
+        prompt="",
+        schedule=TaskSchedule(minute="0", hour="9", day="*", month="*", weekday="*"),
+        timezone="Europe/Prague",
+    )
+    assert task.get_next_run_after(_at(0)) == datetime(2026, 1, 2, 8, 0, tzinfo=timezone.utc)
+
+
+def test_tick_launches_each_planned_time_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_scheduler, "SCHEDULER_FOLDER", str(tmp_path))
+    now = datetime.now(timezone.utc)
+    task = PlannedTask.create(
+        name="planned",
+        system_prompt="",
+        prompt="",
+        plan=TaskPlan.create(todo=[now - timedelta(seconds=2), now - timedelta(seconds=1), now + timedelta(hours=1)]),
+    )
+    scheduler = TaskScheduler.__new__(TaskScheduler)
+    scheduler._tasks = SchedulerTaskList(tasks=[task])
+    scheduler._queue = ScheduleQueue()
+    scheduler._queue_version = -1
+    launched = []
+
+    async def run_task(task, task_context=None):
+        launched.append(task.uuid)
+
+    monkeypatch.setattr(scheduler, "_run_task", run_task)
+
+    async def main():
+        await scheduler.tick()
+        await scheduler.tick()
+        await scheduler.tick()
+
+    asyncio.run(main())
+    # both past launch times, one per tick, the future one stays queued
+    assert launched == [task.uuid, task.uuid]
+    assert scheduler._queue.next_run() == task.plan.todo[2]
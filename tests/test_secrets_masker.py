@@ -0,0 +1,46 @@
+import random
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.secrets import SecretsManager, SecretsMasker, StreamingSecretsFilter
+
+
+def test_mask_replaces_longest_value_in_one_pass():
+    masker = SecretsMasker({"SHORT": "secret", "LONG": "secret-token"}, min_length=4)
+    text = "a secret-token and a secret"
+    assert masker.mask(text) == "a §§secret(LONG) and a §§secret(SHORT)"
+    assert SecretsMasker({"TINY": "abc"}, min_length=4).mask("abc") == "abc"
+
+
+def test_stream_never_leaks_values_split_across_chunks():
+    rng = random.Random(0)
+    for _ in range(500):
+        secrets = {f"K{i}": "".join(rng.choice("ab") for _ in range(rng.randint(3, 6))) for i in range(3)}
+        masker = SecretsMasker(secrets)
+        text = "".join(rng.choice("abx") for _ in range(rng.randint(0, 40)))
+        stream = StreamingSecretsFilter({}, masker=masker)
+        out = ""
+        pos = 0
+        while pos < len(text):
+            size = rng.randint(1, 4)
+            out += stream.process_chunk(text[pos : pos + size])
+            pos += size
+            full = stream.mask_full(text[:pos])
+            assert not any(value in out or value in full for value in secrets.values())
+        tail = stream.finalize()
+        if "***" not in tail:
+            assert out + tail == masker.mask(text)
+
+
+def test_masker_is_rebuilt_after_save(tmp_path):
+    secrets_file = tmp_path / "secrets.env"
+    secrets_file.write_text("API_KEY=first-value\n")
+    manager = SecretsManager.get_instance(str(secrets_file))
+    masker = manager.get_masker()
+    assert manager.get_masker() is masker
+    manager.save_secrets("API_KEY=second-value\n")
+    assert manager.mask_values("second-value first-value") == "§§secret(API_KEY) first-value"
@@ -0,0 +1,88 @@
+import copy
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import settings
+
+
+@pytest.fixture
+def settings_file(tmp_path, monkeypatch):
+    path = tmp_path / "settings.json"
+    monkeypatch.setattr(settings, "SETTINGS_FILE", str(path))
+    monkeypatch.setattr(settings, "_settings", None)
+    monkeypatch.setattr(settings, "_snapshot", None)
+    monkeypatch.setattr(settings, "_snapshot_stamp", None)
+    monkeypatch.setattr(settings, "_snapshot_checked", 0.0)
+    monkeypatch.setattr(settings, "_subscribers", [])
+    return path
+
+
+def _write(path: Path, **values):
+    path.write_text(json.dumps(values), encoding="utf-8")
+    stat = path.stat()
+    # make sure the change is visible even on coarse file system clocks
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_snapshot_is_shared_and_read_only(settings_file):
+    _write(settings_file, chat_model_name="model-a")
+    first = settings.get_settings()
+    assert settings.get_settings() is first
+    assert first["chat_model_name"] == "model-a"
+
+    with pytest.raises(TypeError):
+        first["chat_model_name"] = "changed"  # type: ignore
+    with pytest.raises(TypeError):
+        first["chat_model_kwargs"]["temperature"] = 1  # type: ignore
+
+    changed = first.copy()
+    changed["chat_model_name"] = "changed"
+    nested = copy.deepcopy(first)
+    nested["chat_model_kwargs"]["temperature"] = 1
+    assert type(changed) is dict and type(nested["chat_model_kwargs"]) is dict
+    assert first["chat_model_name"] == "model-a"
+
+
+def test_file_change_bumps_version_and_notifies(settings_file, monkeypatch):
+    monkeypatch.setattr(settings, "CHECK_INTERVAL", 0)
+    _write(settings_file, chat_model_name="model-a")
+    version = settings.get_settings_version()
+    received = []
+    unsubscribe = settings.subscribe(received.append)
+
+    settings.get_settings()
+    assert settings.get_settings_version() == version  # unchanged sources, same snapshot
+
+    _write(settings_file, chat_model_name="model-b")
+    current = settings.get_settings()
+    assert current["chat_model_name"] == "model-b"
+    assert settings.get_settings_version() == version + 1
+    assert received == [current]
+
+    unsubscribe()
+    _write(settings_file, chat_model_name="model-c")
+    settings.reload_settings()
+    assert settings.get_settings_version() == version + 2
+    assert len(received) == 1
+
+
+def test_saved_settings_are_served_right_away(settings_file, monkeypatch):
+    monkeypatch.setattr(settings, "CHECK_INTERVAL", 100)
+    monkeypatch.setattr(settings, "_write_sensitive_settings", lambda settings: None)
+    _write(settings_file, chat_model_rl_requests=7)
+    assert settings.get_settings()["chat_model_rl_requests"] == 7
+
+    saved = settings.set_settings_delta({"chat_model_rl_requests": 9}, apply=False)
+    assert saved["chat_model_rl_requests"] == 9
+    assert settings.get_settings()["chat_model_rl_requests"] == 9
+
+    settings.set_settings_delta({"chat_model_rl_requests": 11}, apply=False)
+    assert settings.get_settings()["chat_model_rl_requests"] == 11
@@ -0,0 +1,52 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import shell_ssh
+from python.helpers.shell_ssh import SSHInteractiveSession
+
+
+class _FloodingChannel:
+    """Channel that always has more output, like a command printing forever."""
+
+    def __init__(self):
+        self.closed = False
+        self.reads = 0
+
+    def recv(self, size):
+        if self.closed:
+            return b""
+        self.reads += 1
+        return b"x" * size
+
+    def close(self):
+        self.closed = True
+
+
+def test_unread_output_is_bounded(monkeypatch):
+    monkeypatch.setattr(shell_ssh, "MAX_UNREAD", 4 * shell_ssh.RECV_SIZE)
+    session = SSHInteractiveSession(None, "host", 22, "user", "pass")  # type: ignore
+    channel = _FloodingChannel()
+    session.shell = channel  # type: ignore
+    session._start_reader(channel)  # type: ignore
+
+    time.sleep(0.2)
+    assert session._received_bytes <= shell_ssh.MAX_UNREAD + shell_ssh.RECV_SIZE
+    paused_at = channel.reads
+    time.sleep(0.1)
+    assert channel.reads <= paused_at + 1  # the reader waits for a read instead of buffering
+
+    full, _partial = asyncio.run(session.read_output())
+    assert full.startswith("x")
+    time.sleep(0.1)
+    assert channel.reads > paused_at  # draining lets it continue
+
+    asyncio.run(session.close())
+    time.sleep(0.1)
+    assert not [t for t in threading.enumerate() if t.name == "SSHOutput" and t.is_alive()]
@@ -0,0 +1,80 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import skills
+
+
+def _skill(root: Path, name: str, description: str, triggers=(), tags=()) -> Path:
+    folder = root / name
+    folder.mkdir(parents=True, exist_ok=True)
+    lines = ["---", f"name: {name}", f"description: {description}"]
+    if triggers:
+        lines += ["triggers:", *[f"  - {t}" for t in triggers]]
+    if tags:
+        lines += ["tags:", *[f"  - {t}" for t in tags]]
+    path = folder / "SKILL.md"
+    path.write_text("\n".join([*lines, "---", f"# {name}"]), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def skill_root(tmp_path, monkeypatch):
+    root = tmp_path / "skills"
+    root.mkdir()
+    monkeypatch.setattr(skills, "get_skill_roots", lambda agent=None: [str(root)])
+    skills.clear_cache()
+    yield root
+    skills.clear_cache()
+
+
+def test_triggers_match_like_substrings(skill_root):
+    _skill(skill_root, "pdf-report", "Build PDF reports", triggers=["pdf report"])
+    _skill(skill_root, "pdf", "Anything PDF", triggers=["PDF"])
+    _skill(skill_root, "report-mail", "Mail reports", triggers=["report to", "mail"])
+    _skill(skill_root, "plain", "No triggers")
+    _skill(skill_root / ".hidden", "secret", "Hidden", triggers=["pdf"])
+
+    matched = skills.match_triggered_skills("Please make a PDF Report to the team")
+    assert [s.name for s in matched] == ["pdf-report", "pdf", "report-mail"]  # folder order
+    assert skills.match_triggered_skills("nothing here") == []
+
+
+def test_search_ranks_name_matches_first(skill_root):
+    _skill(skill_root, "deploy-app", "Ship the app to servers", tags=["ops"])
+    _skill(skill_root, "write-docs", "Write documentation, including deploy notes")
+    _skill(skill_root, "ops-checklist", "Checklist before release", tags=["deployment"])
+
+    assert [s.name for s in skills.search_skills("deploy")] == ["deploy-app", "write-docs", "ops-checklist"]
+    assert [s.name for s in skills.search_skills("docs", limit=1)] == ["write-docs"]
+    assert skills.search_skills("unrelated") == []
+
+
+def test_catalog_reparses_only_changed_files(skill_root, monkeypatch):
+    monkeypatch.setattr(skills, "CHECK_INTERVAL", 0)
+    first = _skill(skill_root, "first", "First skill")
+    _skill(skill_root, "second", "Second skill")
+    assert skills.find_skill("first", include_content=True).content == "# first"  # type: ignore
+
+    parsed = []
+    original = skills.skill_from_markdown
+    monkeypatch.setattr(
+        skills, "skill_from_markdown", lambda path, **kwargs: parsed.append(path.parent.name) or original(path, **kwargs)
+    )
+    catalog = skills.get_catalog()
+    assert skills.get_catalog() is catalog and parsed == []
+
+    first.write_text(first.read_text(encoding="utf-8").replace("First skill", "Edited skill"), encoding="utf-8")
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    _skill(skill_root, "third", "Third skill")
+
+    assert [s.description for s in skills.list_skills()] == ["Edited skill", "Second skill", "Third skill"]
+    assert sorted(parsed) == ["first", "third"]
+    assert skills.list_skills()[0].content == ""
@@ -60,7 +60,7 @@ async def test_snapshot_builder_active_context_includes_incremental_logs():
         )
         assert first["context"] == ctxid
         assert first["logs"]
-        assert first["log_version"] == len(ctx.log.updates)
+        assert first["log_version"] == ctx.log.version
 
         from python.helpers import state_snapshot as snapshot
 
@@ -75,3 +75,36 @@ async def test_snapshot_builder_active_context_includes_incremental_logs():
         assert second["log_version"] == first["log_version"]
     finally:
         AgentContext.remove(ctxid)
+
+
+@pytest.mark.asyncio
+async def test_update_during_snapshot_is_sent_with_the_next_one(monkeypatch):
+    ctxid = "ctx-snapshot-race"
+    ctx = AgentContext(config=initialize_agent(), id=ctxid, set_current=False)
+    try:
+        item = ctx.log.log(type="agent", heading="hi", content="hello")
+        original = ctx.log.output
+
+        def output_then_update(*args, **kwargs):
+            out = original(*args, **kwargs)
+            item.stream(content=" world")  # another thread writes right after the read
+            return out
+
+        monkeypatch.setattr(ctx.log, "output", output_then_update)
+
+        from python.helpers import state_snapshot as snapshot
+
+        first = await snapshot.build_snapshot(
+            context=ctxid, log_from=0, notifications_from=0, timezone="UTC"
+        )
+        monkeypatch.setattr(ctx.log, "output", original)
+        second = await snapshot.build_snapshot(
+            context=ctxid, log_from=first["log_version"], notifications_from=0, timezone="UTC"
+        )
+
+        received = first["logs"][-1]["content"]
+        update = second["logs"][-1]
+        received = received[: update["content_offset"]] + update["content_append"]
+        assert received == "hello world"
+    finally:
+        AgentContext.remove(ctxid)
@@ -0,0 +1,91 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+NAMESPACE = "/state_sync"
+
+
+def _ctx(ctxid: str, created_at: str, **extra):
+    return {"id": ctxid, "created_at": created_at, **extra}
+
+
+@pytest.mark.asyncio
+async def test_fragments_are_built_once_per_wave_and_pushed_as_deltas(monkeypatch):
+    import python.helpers.state_snapshot as state_snapshot
+    from python.helpers.state_monitor import StateMonitor
+    from python.helpers.state_snapshot import StateRequestV1
+
+    state = {
+        "contexts": [_ctx("b", "2026-01-02", running=True), _ctx("a", "2026-01-01")],
+        "tasks": [_ctx("t", "2026-01-03", state="idle")],
+    }
+    builds: list[int] = []
+
+    def fake_lists():
+        builds.append(1)
+        return [dict(item) for item in state["contexts"]], [dict(item) for item in state["tasks"]]
+
+    monkeypatch.setattr(state_snapshot, "_build_context_lists", fake_lists)
+
+    emitted: dict[str, list[dict]] = {}
+
+    class FakeManager:
+        def __init__(self, loop):
+            self._dispatcher_loop = loop
+
+        async def emit_to(self, namespace, sid, event_type, payload, *, handler_id=None):
+            emitted.setdefault(sid, []).append(payload)
+
+    monitor = StateMonitor(debounce_seconds=60.0)
+    monitor.bind_manager(FakeManager(asyncio.get_running_loop()), handler_id="test.handler")
+    sids = ["sid-1", "sid-2", "sid-3"]
+    for sid in sids:
+        monitor.register_sid(NAMESPACE, sid)
+        monitor.update_projection(
+            NAMESPACE,
+            sid,
+            request=StateRequestV1(context=None, log_from=0, notifications_from=0, timezone="UTC"),
+            seq_base=1,
+        )
+
+    monitor.mark_dirty_all(reason="test")
+    for sid in sids:
+        await monitor._flush_push((NAMESPACE, sid))
+    assert len(builds) == 1
+    for sid in sids:
+        first = emitted[sid][0]
+        assert "lists_delta" not in first
+        assert [c["id"] for c in first["snapshot"]["contexts"]] == ["b", "a"]
+
+    state["contexts"] = [_ctx("c", "2026-01-04"), _ctx("b", "2026-01-02", running=False)]
+    monitor.mark_dirty_all(reason="test")
+    for sid in sids:
+        await monitor._flush_push((NAMESPACE, sid))
+    assert len(builds) == 2  # the base lists are kept by the previous fragments
+    for sid in sids:
+        second = emitted[sid][1]
+        assert second["seq"] == 3
+        assert second["snapshot"]["contexts"] == [_ctx("c", "2026-01-04"), _ctx("b", "2026-01-02", running=False)]
+        assert second["snapshot"]["tasks"] == []
+        assert second["lists_delta"] == {"removed_contexts": ["a"], "removed_tasks": []}
+
+    # a new state_request starts over with full lists
+    monitor.update_projection(
+        NAMESPACE,
+        "sid-1",
+        request=StateRequestV1(context=None, log_from=0, notifications_from=0, timezone="UTC"),
+        seq_base=1,
+    )
+    await monitor._flush_push((NAMESPACE, "sid-1"))
+    third = emitted["sid-1"][2]
+    assert "lists_delta" not in third and len(third["snapshot"]["tasks"]) == 1
+    assert len(builds) == 2
+
+    for sid in sids:
+        monitor.unregister_sid(NAMESPACE, sid)
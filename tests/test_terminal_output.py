@@ -0,0 +1,62 @@
+import random
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.shell_ssh import clean_string
+from python.helpers.terminal_output import TerminalOutput, last_lines
+
+
+def _feed_in_pieces(output: TerminalOutput, raw: str, rng: random.Random):
+    i = 0
+    while i < len(raw):
+        j = i + rng.randint(1, 7)
+        output.feed(raw[i:j])
+        i = j
+
+
+def test_incremental_cleaning_matches_clean_string():
+    raw = (
+        "\r\r\n> \x1b[?2004l\x1b[32muser@host\x1b[0m:~$ ls\r\n"
+        "file1  file2\r\n"
+        "progress 10%\rprogress 50%\rprogress 100%\n"
+        "ünïcödé \x00line\r\n"
+        "trailing   \r   \r\n"
+        "done"
+    )
+    rng = random.Random(7)
+    for _ in range(50):
+        output = TerminalOutput()
+        _feed_in_pieces(output, raw, rng)
+        assert output.text() == clean_string(raw)
+
+
+def test_escape_split_between_chunks_is_held_back():
+    output = TerminalOutput()
+    output.feed("red: \x1b[3")
+    assert output.text() == "red:"
+    output.feed("1mtext\x1b[0m \\x1b")
+    assert output.text() == "red: text "
+
+
+def test_memory_stays_bounded_and_keeps_both_ends():
+    output = TerminalOutput(max_chars=1000)
+    output.feed("first line\n")
+    for i in range(10_000):
+        output.feed(f"line {i}\n")
+        output.feed("\r".join(f"{p}%" for p in range(100)))
+    output.feed("\nlast line")
+    text = output.text()
+    assert text.startswith("first line\n")
+    assert text.endswith("99%\nlast line")
+    assert len(text) <= 1100
+    assert output.dropped > 50_000
+
+
+def test_last_lines_matches_splitlines():
+    for text in ["", "a", "a\n", "a\nb\nc", "a\n\nc\n", "\n\n"]:
+        for count in range(1, 5):
+            assert last_lines(text, count) == text.splitlines()[-count:]
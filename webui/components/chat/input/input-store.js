@@ -6,6 +6,7 @@ import { store as attachmentsStore } from "/components/chat/attachments/attachme
 import { store as chatsStore } from "/components/sidebar/chats/chats-store.js";
 import { store as historyStore } from "/components/modals/history/history-store.js";
 import { store as contextStore } from "/components/modals/context/context-store.js";
+import { store as profilerStore } from "/components/modals/profiler/profiler-store.js";
 
 const BUILTIN_COMMANDS = [
   { command: "/clear",     description: "Clear the current chat history" },
@@ -18,6 +19,7 @@ const BUILTIN_COMMANDS = [
   { command: "/history",   description: "Open conversation history" },
   { command: "/files",     description: "Open the file browser" },
   { command: "/context",   description: "Open the context window" },
+  { command: "/profile",   description: "Show timings of LLM calls, tools and extensions" },
   { command: "/knowledge", description: "Import knowledge files" },
 ];
 
@@ -140,6 +142,9 @@ const model = {
       case "/context":
         contextStore.open();
         return true;
+      case "/profile":
+        profilerStore.open();
+        return true;
       case "/knowledge":
         await this.loadKnowledge();
         return true;
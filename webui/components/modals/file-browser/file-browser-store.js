@@ -13,7 +13,11 @@ const model = {
     parentPath: "",
     sortBy: "name",
     sortDirection: "asc",
+    filter: "",
+    total: 0,
+    nextCursor: null, // set while the server has more pages
   },
+  isLoadingMore: false,
   history: [], // navigation stack
   initialPath: "", // Store path for open() call
   closePromise: null,
@@ -72,6 +76,8 @@ const model = {
     this.history = [];
     this.initialPath = "";
     this.browser.entries = [];
+    this.browser.filter = "";
+    this.browser.nextCursor = null;
     this.openDropdownPath = null;
     this.resetRenameState();
   },
@@ -156,8 +162,8 @@ const model = {
     this.renameError = null;
   },
 
-  // --- Sorting -------------------------------------------------------------
-  toggleSort(column) {
+  // --- Sorting and filtering (server side, listings are paginated) ---------
+  async toggleSort(column) {
     if (this.browser.sortBy === column) {
       this.browser.sortDirection =
         this.browser.sortDirection === "asc" ? "desc" : "asc";
@@ -165,24 +171,16 @@ const model = {
       this.browser.sortBy = column;
       this.browser.sortDirection = "asc";
     }
+    await this.fetchFiles(this.browser.currentPath, { quiet: true });
   },
 
-  sortFiles(entries) {
-    return [...entries].sort((a, b) => {
-      // Folders first
-      if (a.is_dir !== b.is_dir) return a.is_dir ? -1 : 1;
-      const dir = this.browser.sortDirection === "asc" ? 1 : -1;
-      switch (this.browser.sortBy) {
-        case "name":
-          return dir * a.name.localeCompare(b.name);
-        case "size":
-          return dir * (a.size - b.size);
-        case "date":
-          return dir * (new Date(a.modified) - new Date(b.modified));
-        default:
-          return 0;
-      }
-    });
+  async applyFilter() {
+    await this.fetchFiles(this.browser.currentPath, { quiet: true });
+  },
+
+  async loadMore() {
+    if (!this.browser.nextCursor || this.isLoadingMore) return;
+    await this.fetchFiles(this.browser.currentPath, { append: true, quiet: true });
   },
 
   // --- Dropdown Management -------------------------------------------------
@@ -200,27 +198,44 @@ const model = {
   },
 
   // --- Navigation ----------------------------------------------------------
-  async fetchFiles(path = "") {
-    this.isLoading = true;
-    
+  // append: add the next page to the entries, quiet: keep the list visible while loading
+  async fetchFiles(path = "", { append = false, quiet = false } = {}) {
+    if (quiet) this.isLoadingMore = true;
+    else this.isLoading = true;
+
     // Preserve scroll position if refreshing the same path
     const isSamePath = this.browser.currentPath === path || 
                        (!path && !this.browser.currentPath);
-    const scrollPos = isSamePath ? this.saveScrollPosition() : null;
-    
+    const scrollPos = isSamePath && !quiet ? this.saveScrollPosition() : null;
+    if (!isSamePath) this.browser.filter = "";
+
+    // Keep as many entries as were loaded when refreshing the same folder
+    const limit = isSamePath && !append ? Math.max(this.browser.entries.length, 1000) : 1000;
+    const params = new URLSearchParams({
+      path,
+      limit,
+      sort: this.browser.sortBy,
+      direction: this.browser.sortDirection,
+      filter: this.browser.filter,
+    });
+    if (append) params.set("cursor", this.browser.nextCursor);
+
     try {
-      const response = await fetchApi(
-        `/get_work_dir_files?path=${encodeURIComponent(path)}`
-      );
+      const response = await fetchApi(`/get_work_dir_files?${params}`);
       const data = await response.json().catch(() => ({}));
 
       if (response.ok && !data.error) {
-        this.browser.entries = data.data.entries;
+        this.browser.entries = append
+          ? [...this.browser.entries, ...data.data.entries]
+          : data.data.entries;
         this.browser.currentPath = data.data.current_path;
         this.browser.parentPath = data.data.parent_path;
+        this.browser.total = data.data.total ?? this.browser.entries.length;
+        this.browser.nextCursor = data.data.next_cursor || null;
         
         // Set isLoading to false BEFORE restoring scroll to avoid reactivity issues
         this.isLoading = false;
+        this.isLoadingMore = false;
         
         // Restore scroll position if on same path
         if (scrollPos) {
@@ -231,6 +246,7 @@ const model = {
         console.error("Error fetching files:", msg);
         this.browser.entries = [];
         this.isLoading = false;
+        this.isLoadingMore = false;
         window.toastFrontendError(msg, "File Browser Error");
       }
     } catch (e) {
@@ -240,6 +256,7 @@ const model = {
       );
       this.browser.entries = [];
       this.isLoading = false;
+      this.isLoadingMore = false;
     }
   },
 
@@ -390,6 +407,7 @@ const model = {
         this.browser.entries = this.browser.entries.filter(
           (e) => e.path !== file.path
         );
+        this.browser.total = Math.max(0, this.browser.total - 1);
         window.toastFrontendSuccess("File deleted successfully", "File Deleted");
       } else {
         window.toastFrontendError(data.error || "Error deleting file", "Delete Error");
@@ -429,9 +447,8 @@ const model = {
       });
       const data = await resp.json().catch(() => ({}));
       if (resp.ok && !data.error) {
-        this.browser.entries = data.data.entries;
-        this.browser.currentPath = data.data.current_path;
-        this.browser.parentPath = data.data.parent_path;
+        // reload with the current sorting and filter
+        await this.fetchFiles(this.browser.currentPath, { quiet: true });
         if (data.failed && data.failed.length) {
           const msg = data.failed
             .map((f) => `${f.name}: ${f.error}`)
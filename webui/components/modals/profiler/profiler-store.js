@@ -0,0 +1,71 @@
+import { createStore } from "/js/AlpineStore.js";
+
+const model = {
+  // State
+  isLoading: false,
+  error: null,
+  aggregates: [],
+  iterations: [],
+  expanded: null,
+
+  // Open Profiler modal
+  async open() {
+    if (this.isLoading) return; // Prevent double-open
+    window.openModal("modals/profiler/profiler.html");
+    await this.refresh();
+  },
+
+  async refresh(clear = false) {
+    this.isLoading = true;
+    this.error = null;
+    try {
+      const response = await window.sendJsonData("/profiler_get", {
+        context: window.getContext(),
+        clear,
+      });
+      this.aggregates = response.aggregates || [];
+      this.iterations = response.iterations || [];
+    } catch (error) {
+      console.error("Profiler fetch error:", error);
+      this.error = error?.message || "Failed to load profile";
+    } finally {
+      this.isLoading = false;
+    }
+  },
+
+  toggle(iteration) {
+    const key = `${iteration.agent}:${iteration.iteration}`;
+    this.expanded = this.expanded === key ? null : key;
+  },
+
+  isExpanded(iteration) {
+    return this.expanded === `${iteration.agent}:${iteration.iteration}`;
+  },
+
+  iterationTime(iteration) {
+    const span = iteration.spans.find((s) => s.cat === "agent" && s.name === "iteration");
+    return span ? span.dur_ms : Math.max(...iteration.spans.map((s) => s.offset_ms + s.dur_ms));
+  },
+
+  // Download spans in the Chrome trace format for Perfetto or chrome://tracing
+  async exportTrace() {
+    try {
+      const contextId = window.getContext();
+      const trace = await window.sendJsonData("/profiler_get", {
+        context: contextId,
+        format: "trace",
+      });
+      const blob = new Blob([JSON.stringify(trace)], { type: "application/json" });
+      const link = document.createElement("a");
+      link.href = URL.createObjectURL(blob);
+      link.download = `trace_${contextId}.json`;
+      link.click();
+      URL.revokeObjectURL(link.href);
+    } catch (error) {
+      console.error("Trace export error:", error);
+      this.error = error?.message || "Failed to export trace";
+    }
+  },
+};
+
+export const store = createStore("profiler", model);
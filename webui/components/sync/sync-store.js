@@ -4,6 +4,8 @@ import { invalidateCsrfToken } from "/js/api.js";
 import { applySnapshot, buildStateRequestPayload } from "/index.js";
 import { store as chatTopStore } from "/components/chat/top-section/chat-top-store.js";
 import { store as notificationStore } from "/components/notifications/notification-store.js";
+import { store as chatsStore } from "/components/sidebar/chats/chats-store.js";
+import { store as tasksStore } from "/components/sidebar/tasks/tasks-store.js";
 
 const stateSocket = getNamespacedClient("/state_sync");
 
@@ -14,6 +16,22 @@ const SYNC_MODES = {
   DEGRADED: "DEGRADED",
 };
 
+// Pushes after the first one carry only changed contexts/tasks plus the removed ids;
+// rebuild the full lists from what the sidebar stores already hold.
+function mergeListsDelta(snapshot, delta) {
+  const merge = (current, changed, removed) => {
+    const byId = new Map((Array.isArray(current) ? current : []).map((item) => [item.id, item]));
+    for (const id of removed || []) byId.delete(id);
+    for (const item of changed || []) byId.set(item.id, item);
+    return [...byId.values()];
+  };
+  return {
+    ...snapshot,
+    contexts: merge(chatsStore.contexts, snapshot.contexts, delta.removed_contexts),
+    tasks: merge(tasksStore.tasks, snapshot.tasks, delta.removed_tasks),
+  };
+}
+
 function isDevelopmentRuntime() {
   return Boolean(globalThis.runtimeInfo?.isDevelopment);
 }
@@ -481,7 +499,11 @@ const model = {
     }
 
     if (data.snapshot && typeof data.snapshot === "object") {
-      await applySnapshot(data.snapshot, {
+      const snapshot =
+        data.lists_delta && typeof data.lists_delta === "object"
+          ? mergeListsDelta(data.snapshot, data.lists_delta)
+          : data.snapshot;
+      await applySnapshot(snapshot, {
         onLogGuidReset: async () => {
           debug("[syncStore] log_guid reset -> resync (forceFull)");
           await this.sendStateRequest({ forceFull: true });
@@ -318,6 +318,7 @@ export async function applySnapshot(snapshot, options = {}) {
     if (lastLogGuid) {
       const chatHistoryEl = document.getElementById("chat-history");
       if (chatHistoryEl) chatHistoryEl.innerHTML = "";
+      msgs.resetLogContents();
       lastLogVersion = 0;
       lastLogGuid = snapshot.log_guid;
       if (typeof onLogGuidReset === "function") {
@@ -331,9 +332,18 @@ export async function applySnapshot(snapshot, options = {}) {
   }
 
   if (lastLogVersion != snapshot.log_version) {
+    const logs = msgs.resolveLogContents(snapshot.logs);
+    if (!logs) {
+      // appended text for content we don't have, start over from the full log
+      lastLogVersion = 0;
+      if (typeof onLogGuidReset === "function") {
+        await onLogGuidReset();
+      }
+      return { updated: false, resynced: true };
+    }
     updated = true;
-    setMessages(snapshot.logs);
-    afterMessagesUpdate(snapshot.logs);
+    setMessages(logs);
+    afterMessagesUpdate(logs);
   }
 
   lastLogVersion = snapshot.log_version;
@@ -513,6 +523,7 @@ export const setContext = function (id) {
   lastLogGuid = "";
   lastLogVersion = 0;
   lastSpokenNo = 0;
+  msgs.resetLogContents();
 
   // Stop speech when switching chats
   speechStore.stopAudio();
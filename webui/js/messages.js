@@ -27,6 +27,31 @@ let _chatHistory = null;
 // state vars
 let _massRender = false;
 let _scrollOnNextProcessGroup = null;
+// full content of received log items by no, streamed items only send appended text
+const _logContents = new Map();
+
+export function resetLogContents() {
+  _logContents.clear();
+}
+
+// fill in content of items sent as content_append, returns null if a base is missing
+export function resolveLogContents(logs) {
+  const resolved = [];
+  for (const log of logs) {
+    if (log.content_append === undefined) {
+      _logContents.set(log.no, log.content || "");
+      resolved.push(log);
+      continue;
+    }
+    const base = _logContents.get(log.no);
+    if (base === undefined || base.length < log.content_offset) return null;
+    const { content_append, content_offset, ...rest } = log;
+    const content = base.slice(0, content_offset) + content_append;
+    _logContents.set(log.no, content);
+    resolved.push({ ...rest, content });
+  }
+  return resolved;
+}
 
 export function scrollOnNextProcessGroup() {
   _scrollOnNextProcessGroup = "wait";